@@ -0,0 +1,8 @@
+"""
+Bench
+=====
+Benchmarks reproducibles del servidor contra dobles locales (testing/):
+
+    - loadtest: carga concurrente sobre la API HTTP y las tools MCP
+    - micro: microbenchmarks de helpers con línea base y umbral de regresión
+"""
@@ -0,0 +1,623 @@
+"""
+Load Test
+=========
+Prueba de carga reproducible de los caminos de cotización y handoff.
+
+Levanta un Odoo falso (testing.fake_odoo) con latencia inyectada y un
+stand-in de Twilio (testing.fake_twilio), arranca `server:app` con uvicorn
+en un subproceso apuntando a ambos y ejecuta los escenarios con la
+concurrencia configurada:
+
+    quotation       POST /api/quotation/async + sondeo de /api/quotation/status
+    status          GET /api/quotation/status/{id} de cotizaciones existentes
+    handoff         POST /api/elevenlabs/handoff
+    mcp_quotation   dev_create_quotation + sondeo de dev_get_quotation_status
+    list_sales      tool MCP list_sales
+    search          tool MCP search
+
+Por escenario reporta throughput, latencia p50/p95/p99 (de punta a punta en
+las cotizaciones), errores y RPCs a Odoo (por cotización en los escenarios de
+cotización). Además reporta el RSS pico del servidor. El resultado es JSON
+para comparar entre commits; la corrida sale con 1 si algún escenario tiene
+errores (más de `--max-error-rate`, default 0):
+
+    python -m bench.loadtest --concurrency 8 --requests 200 --latency 0.02 \\
+        --output bench-$(git rev-parse --short HEAD).json
+    python -m bench.loadtest compare bench-old.json bench-new.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from testing.fake_odoo import FakeOdooConfig, FakeOdooServer, FakeOdooStore, seed
+from testing.fake_twilio import FakeTwilioServer
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+HTTP_SCENARIOS = ("quotation", "status", "handoff")
+MCP_SCENARIOS = ("mcp_quotation", "list_sales", "search")
+ALL_SCENARIOS = HTTP_SCENARIOS + MCP_SCENARIOS
+QUOTATION_SCENARIOS = ("quotation", "mcp_quotation")
+FINAL_STATES = ("completed", "failed")
+
+# Métricas comparadas por `compare` (mayor es peor salvo throughput)
+COMPARED = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "rpc_per_quotation")
+
+
+# ─── estadísticas ──────────────────────────────────────────────────────
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Percentil con interpolación lineal sobre valores ya ordenados."""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        rank - low
+    )
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    """Resumen de un escenario; latencias en segundos, salida en ms."""
+    values = sorted(latencies)
+    total = len(values) + errors
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        "requests": total,
+        "ok": len(values),
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed > 0 else None,
+        "mean_ms": ms(sum(values) / len(values)) if values else None,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else None,
+    }
+
+
+def peak_rss_mb(pid: int) -> Optional[float]:
+    """RSS pico (VmHWM) de un proceso vivo, en MB (solo Linux)."""
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=SERVICE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def rpc_delta(before: dict, after: dict) -> Dict[str, int]:
+    """Llamadas por clave del fake entre dos lecturas de `stats()`."""
+    calls = {}
+    for key, value in after["calls"].items():
+        delta = value - before["calls"].get(key, 0)
+        if delta:
+            calls[key] = delta
+    return calls
+
+
+# ─── payloads ──────────────────────────────────────────────────────────
+
+
+def quotation_payload(index: int, rng: random.Random, product_ids: List[int]) -> dict:
+    """Cotización con partner nuevo (email único) y 1-3 productos semilla."""
+    products = rng.sample(product_ids, rng.randint(1, min(3, len(product_ids))))
+    return {
+        "partner_name": f"Bench {index}",
+        "contact_name": f"Contacto {index}",
+        "email": f"bench{index}-{rng.randrange(10**9)}@example.com",
+        "phone": f"+5255{index:08d}",
+        "lead_name": f"Cotización bench {index}",
+        "products": [
+            {"product_id": pid, "qty": rng.randint(1, 5), "price": -1}
+            for pid in products
+        ],
+    }
+
+
+def handoff_payload(index: int) -> dict:
+    return {
+        "user_phone": f"+5255{index:08d}",
+        "reason": "Benchmark de handoff",
+        "user_name": f"Cliente {index}",
+        "conversation_id": f"bench-{index}",
+    }
+
+
+# ─── servidor bajo prueba ──────────────────────────────────────────────
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServerProcess:
+    """`uvicorn server:app` en un subproceso con el entorno de los dobles."""
+
+    def __init__(self, env: Dict[str, str], port: int, log_dir: str):
+        self.port = port
+        self.base_url = f"http://127.0.0.1:{port}"
+        self._env = {**os.environ, **env}
+        self._log_path = Path(log_dir) / "server.out"
+        self._process: Optional[subprocess.Popen] = None
+        self.peak_rss_mb: Optional[float] = None
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid
+
+    def start(self, timeout: float = 30.0) -> "ServerProcess":
+        self._log = open(self._log_path, "wb")
+        self._process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "server:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(self.port),
+                "--log-level",
+                "warning",
+            ],
+            cwd=SERVICE_DIR,
+            env=self._env,
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(
+                    f"El servidor terminó al arrancar; ver {self._log_path}"
+                )
+            try:
+                http_json("GET", f"{self.base_url}/health", timeout=1)
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"El servidor no respondió en {timeout}s")
+
+    def stop(self):
+        if self._process is None:
+            return
+        self.peak_rss_mb = peak_rss_mb(self._process.pid)
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        if self.peak_rss_mb is None:
+            # Sin /proc: ru_maxrss de hijos terminados (KB en Linux)
+            usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+            self.peak_rss_mb = round(usage.ru_maxrss / 1024, 1)
+        self._log.close()
+        self._process = None
+
+
+def http_json(method: str, url: str, payload: dict = None, timeout: float = 30):
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(
+        url, data=data, method=method, headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read() or b"null")
+
+
+# ─── ejecución ─────────────────────────────────────────────────────────
+
+
+class Bench:
+    """Ejecuta los escenarios contra un servidor ya arrancado."""
+
+    def __init__(
+        self,
+        base_url: str,
+        fake_odoo: FakeOdooServer,
+        product_ids: List[int],
+        requests: int,
+        concurrency: int,
+        poll_interval: float = 0.05,
+        quotation_timeout: float = 120.0,
+        seed_value: int = 0,
+    ):
+        self.base_url = base_url
+        self.fake_odoo = fake_odoo
+        self.product_ids = product_ids
+        self.requests = requests
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.quotation_timeout = quotation_timeout
+        self.rng = random.Random(seed_value)
+        self.tracking_ids: List[str] = []
+        self._lock = threading.Lock()
+
+    # Escenarios HTTP: callables síncronos ejecutados en un pool de threads
+
+    def _run_threads(self, call: Callable[[int], Optional[float]]) -> dict:
+        latencies: List[float] = []
+        errors = 0
+        error_samples: List[str] = []
+
+        def worker(index: int):
+            nonlocal errors
+            start = time.perf_counter()
+            try:
+                elapsed = call(index)
+            except Exception as exc:  # noqa: BLE001 - se reporta en el resultado
+                with self._lock:
+                    errors += 1
+                    if len(error_samples) < 5:
+                        error_samples.append(f"{type(exc).__name__}: {exc}")
+                return
+            with self._lock:
+                latencies.append(
+                    elapsed if elapsed is not None else time.perf_counter() - start
+                )
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(worker, range(self.requests)))
+        summary = summarize(latencies, errors, time.perf_counter() - start)
+        if error_samples:
+            summary["error_samples"] = error_samples
+        return summary
+
+    def _poll_http(self, tracking_id: str, start: float) -> float:
+        url = f"{self.base_url}/api/quotation/status/{tracking_id}"
+        deadline = start + self.quotation_timeout
+        while time.perf_counter() < deadline:
+            status = http_json("GET", url)
+            if status.get("status") in FINAL_STATES:
+                if status["status"] == "failed":
+                    raise RuntimeError(status.get("error") or "quotation failed")
+                return time.perf_counter() - start
+            time.sleep(self.poll_interval)
+        raise TimeoutError(f"{tracking_id} sin terminar")
+
+    def quotation(self, index: int) -> float:
+        start = time.perf_counter()
+        created = http_json(
+            "POST",
+            f"{self.base_url}/api/quotation/async",
+            quotation_payload(index, self.rng, self.product_ids),
+        )
+        tracking_id = created["tracking_id"]
+        with self._lock:
+            self.tracking_ids.append(tracking_id)
+        return self._poll_http(tracking_id, start)
+
+    def status(self, index: int) -> None:
+        if not self.tracking_ids:
+            raise RuntimeError("sin tracking_ids; ejecutar antes 'quotation'")
+        tracking_id = self.tracking_ids[index % len(self.tracking_ids)]
+        http_json("GET", f"{self.base_url}/api/quotation/status/{tracking_id}")
+
+    def handoff(self, index: int) -> None:
+        result = http_json(
+            "POST", f"{self.base_url}/api/elevenlabs/handoff", handoff_payload(index)
+        )
+        if result.get("status") != "ok":
+            raise RuntimeError(f"handoff: {result}")
+
+    # Escenarios MCP: una sesión SSE por worker, llamadas concurrentes con asyncio
+
+    async def _run_mcp(self, call) -> dict:
+        from mcp import ClientSession
+        from mcp.client.sse import sse_client
+
+        latencies: List[float] = []
+        errors = 0
+        error_samples: List[str] = []
+        indexes = iter(range(self.requests))
+
+        async def worker():
+            nonlocal errors
+            async with sse_client(f"{self.base_url}/mcp/sse") as streams:
+                async with ClientSession(*streams) as session:
+                    await session.initialize()
+                    for index in indexes:
+                        start = time.perf_counter()
+                        try:
+                            await call(session, index)
+                        except Exception as exc:  # noqa: BLE001
+                            errors += 1
+                            if len(error_samples) < 5:
+                                error_samples.append(f"{type(exc).__name__}: {exc}")
+                            continue
+                        latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        summary = summarize(latencies, errors, time.perf_counter() - start)
+        if error_samples:
+            summary["error_samples"] = error_samples
+        return summary
+
+    @staticmethod
+    async def _call_tool(session, name: str, arguments: dict):
+        result = await session.call_tool(name, arguments)
+        text = "".join(getattr(item, "text", "") for item in result.content)
+        if result.isError:
+            raise RuntimeError(f"{name}: {text[:200]}")
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
+    async def mcp_quotation(self, session, index: int):
+        arguments = quotation_payload(index, self.rng, self.product_ids)
+        created = await self._call_tool(session, "dev_create_quotation", arguments)
+        tracking_id = created["tracking_id"]
+        deadline = time.perf_counter() + self.quotation_timeout
+        while time.perf_counter() < deadline:
+            status = await self._call_tool(
+                session, "dev_get_quotation_status", {"tracking_id": tracking_id}
+            )
+            if status.get("status") in FINAL_STATES:
+                if status["status"] == "failed":
+                    raise RuntimeError(status.get("error") or "quotation failed")
+                return
+            await asyncio.sleep(self.poll_interval)
+        raise TimeoutError(f"{tracking_id} sin terminar")
+
+    async def list_sales(self, session, index: int):
+        await self._call_tool(session, "list_sales", {"limit": 20})
+
+    async def search(self, session, index: int):
+        query = ("proyecto", "tarea", "robot")[index % 3]
+        await self._call_tool(session, "search", {"query": query, "limit": 10})
+
+    def run(self, scenario: str) -> dict:
+        before = self.fake_odoo.stats()
+        if scenario in HTTP_SCENARIOS:
+            summary = self._run_threads(getattr(self, scenario))
+        else:
+            summary = asyncio.run(self._run_mcp(getattr(self, scenario)))
+        calls = rpc_delta(before, self.fake_odoo.stats())
+        rpc_total = sum(v for k, v in calls.items() if not k.startswith("fault:"))
+        summary["rpc_total"] = rpc_total
+        summary["rpc_calls"] = dict(sorted(calls.items()))
+        if scenario in QUOTATION_SCENARIOS and summary["ok"]:
+            summary["rpc_per_quotation"] = round(rpc_total / summary["ok"], 2)
+        return summary
+
+
+# ─── CLI ───────────────────────────────────────────────────────────────
+
+
+def run(args) -> dict:
+    scenarios = args.scenarios or list(ALL_SCENARIOS)
+    unknown = set(scenarios) - set(ALL_SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+
+    faults = (
+        [{"rate": args.fault_rate, "kind": args.fault_kind}] if args.fault_rate else []
+    )
+    store = seed(
+        FakeOdooStore(),
+        partners=args.partners,
+        orders=args.orders,
+        rng=random.Random(args.seed),
+    )
+    # Las cotizaciones usan productos que existen en el fake
+    product_ids = store.search("product.product")
+    config = FakeOdooConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        auth_latency=args.auth_latency,
+        faults=faults,
+        seed=args.seed,
+    )
+    with tempfile.TemporaryDirectory(prefix="mcp-bench-") as tmp, FakeOdooServer(
+        store, config
+    ) as fake_odoo, FakeTwilioServer(
+        latency=args.twilio_latency, seed=args.seed
+    ) as fake_twilio:
+        env = {
+            **fake_odoo.env(),
+            **fake_twilio.env(),
+            "ODOO_ENVIRONMENT": "dev",
+            "MESSAGE_CHANNEL": "whatsapp",
+            "MCP_LOG_DIR": tmp,
+            "MIRROR_DIR": os.path.join(tmp, "mirror"),
+            "S3_LOGS_BUCKET": "",
+            "LOG_LEVEL": args.log_level,
+            "TRACE_EXPORTER": "none",
+        }
+        server = ServerProcess(env, args.port or free_port(), tmp).start()
+        try:
+            bench = Bench(
+                server.base_url,
+                fake_odoo,
+                product_ids,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                poll_interval=args.poll_interval,
+                quotation_timeout=args.quotation_timeout,
+                seed_value=args.seed,
+            )
+            results = {}
+            for scenario in scenarios:
+                print(f"▶ {scenario} ...", file=sys.stderr, flush=True)
+                results[scenario] = bench.run(scenario)
+                results[scenario]["server_rss_mb"] = peak_rss_mb(server.pid)
+        finally:
+            server.stop()
+        twilio_messages = len(fake_twilio.messages)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "auth_latency": args.auth_latency,
+            "fault_rate": args.fault_rate,
+            "fault_kind": args.fault_kind,
+            "twilio_latency": args.twilio_latency,
+            "poll_interval": args.poll_interval,
+            "seed": args.seed,
+            "scenarios": scenarios,
+        },
+        "scenarios": results,
+        "server": {"peak_rss_mb": server.peak_rss_mb},
+        "twilio_messages": twilio_messages,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[dict]:
+    """
+    Diferencias por escenario entre dos resultados.
+
+    Una métrica es regresión si empeora más que `threshold` (fracción):
+    throughput baja o latencias/RPCs suben.
+    """
+    rows = []
+    for scenario, now in current.get("scenarios", {}).items():
+        before = baseline.get("scenarios", {}).get(scenario)
+        if not before:
+            continue
+        for metric in COMPARED:
+            old, new = before.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric == "throughput_rps" else change
+            rows.append(
+                {
+                    "scenario": scenario,
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change_pct": round(change * 100, 1),
+                    "regression": worse > threshold,
+                }
+            )
+    return rows
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] == "compare":
+        parser = argparse.ArgumentParser(prog="bench.loadtest compare")
+        parser.add_argument("baseline")
+        parser.add_argument("current")
+        parser.add_argument(
+            "--threshold", type=float, default=0.10, help="fracción tolerada"
+        )
+        args = parser.parse_args(argv[1:])
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        with open(args.current) as fh:
+            current = json.load(fh)
+        rows = compare(baseline, current, args.threshold)
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return 1 if any(row["regression"] for row in rows) else 0
+
+    parser = argparse.ArgumentParser(
+        prog="bench.loadtest", description="Prueba de carga contra dobles locales"
+    )
+    parser.add_argument(
+        "--scenarios", nargs="*", choices=ALL_SCENARIOS, help="default: todos"
+    )
+    parser.add_argument("--requests", type=int, default=50, help="por escenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02, help="segundos por RPC")
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--auth-latency", type=float, default=None)
+    parser.add_argument("--fault-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--fault-kind", choices=("fault", "reset", "html", "timeout"), default="reset"
+    )
+    parser.add_argument("--twilio-latency", type=float, default=0.1)
+    parser.add_argument("--partners", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--quotation-timeout", type=float, default=120.0)
+    parser.add_argument("--port", type=int, default=0, help="0 = puerto libre")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="archivo JSON (default: stdout)")
+    parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=0.0,
+        help="fracción de errores tolerada por escenario (si no, sale con 1)",
+    )
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(f"Resultados en {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    failed = [
+        name
+        for name, summary in result["scenarios"].items()
+        if summary["error_rate"] > args.max_error_rate
+    ]
+    if failed:
+        print(
+            f"Escenarios con errores: {', '.join(failed)}"
+            f" (máximo {args.max_error_rate:.0%})",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
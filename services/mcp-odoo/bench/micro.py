@@ -0,0 +1,511 @@
+"""
+Micro
+=====
+Microbenchmarks de los helpers que corren en cada petición.
+
+Cada caso mide la implementación actual y, si existe, la implementación de
+referencia (la versión previa a la optimización). Antes de medir se verifica
+que ambas devuelven lo mismo; el reporte incluye el speedup contra la
+referencia y la comparación contra la línea base registrada en
+`bench/baselines/micro.json`:
+
+    python -m bench.micro                      # mide y compara con la línea base
+    python -m bench.micro normalize_email      # solo algunos casos
+    python -m bench.micro --save               # registra la línea base actual
+    python -m bench.micro --threshold 0.25     # tolerancia de regresión (25%)
+
+Los casos que cambian el formato de una respuesta reportan además su tamaño
+en bytes (`bytes` / `reference_bytes`).
+
+Sale con código 1 si algún caso es más lento que la línea base por encima
+del umbral. Las líneas base dependen de la máquina: regenerarlas con `--save`
+al cambiar de entorno de CI.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "micro.json"
+DEFAULT_THRESHOLD = 0.20
+REPEATS = 5
+
+
+@dataclass
+class Prepared:
+    """
+    Callables de un caso: cada llamada procesa `items` elementos.
+
+    `check(current, reference)` reemplaza la comparación por igualdad cuando
+    los formatos difieren; `size(resultado)` reporta el tamaño en bytes.
+    """
+
+    current: Callable[[], Any]
+    reference: Optional[Callable[[], Any]] = None
+    items: int = 1
+    check: Optional[Callable[[Any, Any], bool]] = None
+    size: Optional[Callable[[Any], int]] = None
+
+
+CASES: Dict[str, Callable[[], Prepared]] = {}
+
+
+def case(name: str):
+    """Registra la función que prepara un caso (imports y datos)."""
+
+    def decorator(fn: Callable[[], Prepared]):
+        CASES[name] = fn
+        return fn
+
+    return decorator
+
+
+# ─── datos ─────────────────────────────────────────────────────────────
+
+EMAILS = [
+    "luis@almacenes.com",
+    " López@Gmail.com ",
+    "aguilar@gmail.com7",
+    "test@test.co1m",
+    "Juan.Perez@Empresa.com.mx",
+    "ventas@pudu,robotics.com",
+    "compras@@proveedor.mx",
+    "ana.garcía@correo.mx",
+]
+
+PHONES = [
+    "+52 55 1234 5678",
+    "(55) 1234-5678",
+    "5512345678",
+    "+1 (415) 523-8886",
+    "+52 55 XXXX 5678",  # enmascarado por privacidad → None
+]
+
+QUERIES = [
+    "tareas pendientes del proyecto Pudu",
+    "Projects in progress",
+    "robot de limpieza",
+    "my open tasks",
+    "cotización almacenes torres",
+]
+
+SEARCH_RESULT = {
+    "results": [
+        {
+            "id": f"task:{i}",
+            "title": f"Task · Instalación de robot en sucursal {i}",
+            "url": f"https://odoo.example.com/web#id={i}&model=project.task",
+        }
+        for i in range(10)
+    ]
+}
+
+
+def _sale_rows(count: int) -> List[dict]:
+    return [
+        {
+            "id": i,
+            "name": f"S{i:05d}",
+            "partner_id": [100 + i, f"Cliente {i}"],
+            "date_order": "2025-12-22 10:48:40" if i % 3 else False,
+            "amount_total": 1234.5 * i,
+            "state": "draft",
+            "user_id": [2, "Vendedor"],
+        }
+        for i in range(count)
+    ]
+
+
+def _task_rows(count: int) -> List[dict]:
+    return [
+        {
+            "id": i,
+            "name": f"Tarea {i}",
+            "project_id": [1, "Implementación"],
+            "stage_id": [3, "En progreso"],
+            "date_deadline": "2026-01-15" if i % 2 else False,
+            "assignees": [[2, "Vendedor"]],
+        }
+        for i in range(count)
+    ]
+
+
+# ─── implementaciones de referencia (previas a la optimización) ────────
+
+
+def _reference_normalize_email(email: str) -> str:
+    import re
+
+    email = email.strip().lower()
+    email = unicodedata.normalize("NFKD", email)
+    email = email.encode("ASCII", "ignore").decode("ASCII")
+    email = email.replace(" ", "").replace(",", "")
+    if email.count("@") > 1:
+        parts = email.split("@")
+        email = f"{parts[0]}@{''.join(parts[1:])}"
+    if email.count("@") == 0:
+        if "." not in email:
+            return "emailinvalido@corporativosade.com.mx"
+        idx = email.find(".")
+        email = f"{email[:idx]}@{email[idx + 1:]}"
+    if email.count("@") != 1:
+        return "emailinvalido@corporativosade.com.mx"
+    user, domain = email.split("@", 1)
+    if not user:
+        return "emailinvalido@corporativosade.com.mx"
+    domain = re.sub(r"(\.[a-zA-Z]+)\d+$", r"\1", domain)
+    domain = re.sub(r"\.([a-zA-Z]+)\d+([a-zA-Z]+)$", r".\1\2", domain)
+    email_pattern = r"^[a-zA-Z0-9._-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
+    if "." not in domain:
+        if not re.match(email_pattern, f"{user}@{domain}.com"):
+            return "emailinvalido@corporativosade.com.mx"
+        domain = domain + ".com"
+    email_clean = f"{user}@{domain}"
+    if not re.match(email_pattern, email_clean):
+        return "emailinvalido@corporativosade.com.mx"
+    return email_clean
+
+
+def _reference_wants(query: str):
+    ql = query.lower()
+    return (
+        any(t in ql for t in ("proyecto", "proyectos", "project", "projects")),
+        any(t in ql for t in ("tarea", "tareas", "task", "tasks")),
+    )
+
+
+def _completed_task():
+    from core import tracing
+    from core.tasks import QuotationTask
+
+    tracing.set_exporter(tracing.NoopExporter())
+    task = QuotationTask("quot_bench", {"partner_name": "Bench"})
+    task.start()
+    for stage in ("connect", "partner", "lead", "opportunity", "sale_order"):
+        task.update_progress(f"Etapa {stage}", stage=stage)
+        with tracing.span("odoo.rpc", model="crm.lead", method="create"):
+            pass
+    task.complete(
+        {
+            "partner_id": 123,
+            "lead_id": 456,
+            "opportunity_id": 456,
+            "sale_order_id": 789,
+            "sale_order_name": "S00123",
+            "steps": {stage: "ok" for stage in ("partner", "lead", "sale_order")},
+        }
+    )
+    return task
+
+
+# ─── casos ─────────────────────────────────────────────────────────────
+
+
+@case("normalize_email")
+def _normalize_email() -> Prepared:
+    from core.contacts import normalize_email
+
+    # Sin memo: mide el costo de un email nuevo
+    normalize = normalize_email.__wrapped__
+    return Prepared(
+        current=lambda: [normalize(e) for e in EMAILS],
+        reference=lambda: [_reference_normalize_email(e) for e in EMAILS],
+        items=len(EMAILS),
+    )
+
+
+@case("encode_content")
+def _encode_content() -> Prepared:
+    from core.helpers import encode_content
+
+    return Prepared(
+        current=lambda: encode_content(SEARCH_RESULT),
+        reference=lambda: {
+            "content": [
+                {"type": "text", "text": json.dumps(SEARCH_RESULT, ensure_ascii=False)}
+            ]
+        },
+        # La salida ahora es compacta: se compara el JSON decodificado
+        check=lambda current, reference: json.loads(current["content"][0]["text"])
+        == json.loads(reference["content"][0]["text"]),
+    )
+
+
+@case("task_to_dict")
+def _task_to_dict() -> Prepared:
+    task = _completed_task()
+
+    def uncached():
+        task._final_dict = None
+        return task.to_dict()
+
+    return Prepared(current=task.to_dict, reference=uncached)
+
+
+@case("task_status_json")
+def _task_status_json() -> Prepared:
+    task = _completed_task()
+
+    def uncached():
+        # Lo que hacía JSONResponse(content=task.to_dict()) en cada sondeo
+        task._final_dict = None
+        return json.dumps(
+            task.to_dict(), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    return Prepared(current=task.to_json, reference=uncached)
+
+
+@case("task_to_dict_processing")
+def _task_to_dict_processing() -> Prepared:
+    from core.tasks import QuotationTask
+
+    task = QuotationTask("quot_bench", {"partner_name": "Bench"})
+    task.update_progress("Creando lead...")
+    return Prepared(current=task.to_dict)
+
+
+@case("wants_projects_tasks")
+def _wants() -> Prepared:
+    from core.helpers import wants_projects, wants_tasks
+
+    return Prepared(
+        current=lambda: [(wants_projects(q), wants_tasks(q)) for q in QUERIES],
+        reference=lambda: [_reference_wants(q) for q in QUERIES],
+        items=len(QUERIES),
+    )
+
+
+@case("normalize_phone")
+def _normalize_phone() -> Prepared:
+    from core.contacts import normalize_phone
+
+    normalize = normalize_phone.__wrapped__
+    return Prepared(
+        current=lambda: [normalize(p) for p in PHONES],
+        items=len(PHONES),
+    )
+
+
+@case("normalize_contacts_batch")
+def _normalize_contacts_batch() -> Prepared:
+    from core.contacts import clear_memo, normalize_contacts
+
+    # Importación típica: 1000 filas con ~30% de contactos repetidos
+    rows = [
+        {
+            "name": f"Contacto {i}",
+            "email": EMAILS[i % len(EMAILS)].replace("@", f"{i % 700}@", 1),
+            "phone": f"55 {i % 700:04d} {i % 97:04d}",
+        }
+        for i in range(1000)
+    ]
+
+    def cold_batch():
+        clear_memo()
+        return normalize_contacts(rows)
+
+    return Prepared(current=cold_batch, items=len(rows))
+
+
+@case("list_sales_models")
+def _list_sales_models() -> Prepared:
+    from tools.sales import _SALE_ORDER_LIST, SaleOrder
+
+    rows = _sale_rows(50)
+    return Prepared(
+        current=lambda: _SALE_ORDER_LIST.validate_python(rows),
+        reference=lambda: [SaleOrder.model_validate(r) for r in rows],
+        items=len(rows),
+    )
+
+
+@case("list_tasks_models")
+def _list_tasks_models() -> Prepared:
+    from tools.tasks import _TASK_LIST, Task
+
+    rows = _task_rows(50)
+    return Prepared(
+        current=lambda: _TASK_LIST.validate_python(rows),
+        reference=lambda: [Task.model_validate(r) for r in rows],
+        items=len(rows),
+    )
+
+
+def _columnar_case(rows: List[dict]) -> Prepared:
+    from core.helpers import encode_content, from_columns
+    from core.pagination import page_result
+
+    def text(content):
+        return content["content"][0]["text"]
+
+    def same_records(current, reference):
+        compact = json.loads(text(current))
+        return from_columns(compact) == json.loads(text(reference))["items"]
+
+    return Prepared(
+        current=lambda: encode_content(page_result(rows, None, compact=True)),
+        reference=lambda: encode_content(page_result(rows, None)),
+        items=len(rows),
+        check=same_records,
+        size=lambda content: len(text(content).encode("utf-8")),
+    )
+
+
+@case("list_sales_compact")
+def _list_sales_compact() -> Prepared:
+    return _columnar_case(_sale_rows(200))
+
+
+@case("list_tasks_compact")
+def _list_tasks_compact() -> Prepared:
+    return _columnar_case(_task_rows(200))
+
+
+@case("fuzzy_search_tasks")
+def _fuzzy_search_tasks() -> Prepared:
+    import random
+
+    from core.text_index import FuzzyIndex
+
+    # 5000 tareas con vocabulario repetitivo: el peor caso para el índice
+    rng = random.Random(7)
+    vocab = [w for q in QUERIES for w in q.split()] + [
+        "instalación",
+        "mantenimiento",
+        "preventivo",
+        "capacitación",
+        "sucursal",
+        "batería",
+        "entrega",
+    ]
+    index = FuzzyIndex()
+    for i in range(5000):
+        index.upsert(
+            i,
+            [
+                (" ".join(rng.sample(vocab, 4)) + f" {i}", 1.0),
+                (" ".join(rng.sample(vocab, 10)), 0.6),
+            ],
+        )
+    queries = ["instalasion robot", "mantenimeinto preventivo sucursal", "bateria"]
+    return Prepared(
+        current=lambda: [index.search(q, 10) for q in queries],
+        items=len(queries),
+    )
+
+
+# ─── ejecución ─────────────────────────────────────────────────────────
+
+
+def measure(fn: Callable[[], Any], items: int) -> float:
+    """ns por elemento: mínimo de REPEATS series calibradas a ~0.2s."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, number)
+    best = min(timer.repeat(repeat=REPEATS, number=number))
+    return best / number / items * 1e9
+
+
+def run_case(name: str) -> dict:
+    prepared = CASES[name]()
+    result = {"ns_per_op": round(measure(prepared.current, prepared.items), 1)}
+    if prepared.reference is not None:
+        current, expected = prepared.current(), prepared.reference()
+        same = (prepared.check or (lambda a, b: a == b))(current, expected)
+        if not same:
+            raise AssertionError(f"{name}: el resultado difiere de la referencia")
+        reference = measure(prepared.reference, prepared.items)
+        result["reference_ns_per_op"] = round(reference, 1)
+        result["speedup"] = round(reference / result["ns_per_op"], 2)
+        if prepared.size is not None:
+            result["bytes"] = prepared.size(current)
+            result["reference_bytes"] = prepared.size(expected)
+    return result
+
+
+def load_baseline(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with open(path) as fh:
+        return json.load(fh).get("cases", {})
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Casos más lentos que la línea base por encima del umbral."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        change = result["ns_per_op"] / base["ns_per_op"] - 1
+        result["baseline_ns_per_op"] = base["ns_per_op"]
+        result["change_pct"] = round(change * 100, 1)
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.micro", description=__doc__)
+    parser.add_argument("cases", nargs="*", help=f"default: {', '.join(CASES)}")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save", action="store_true", help="actualizar línea base")
+    parser.add_argument("--json", dest="output", help="escribir resultados a archivo")
+    args = parser.parse_args(argv)
+
+    names = args.cases or list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"casos desconocidos: {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        results[name] = run_case(name)
+        r = results[name]
+        line = f"{name:<26} {r['ns_per_op']:>10.1f} ns/op"
+        if "speedup" in r:
+            line += f"   ref {r['reference_ns_per_op']:>10.1f} ns  x{r['speedup']}"
+        if "bytes" in r:
+            line += f"   {r['bytes']} B (ref {r['reference_bytes']} B)"
+        print(line, file=sys.stderr)
+
+    meta = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
+    if args.save:
+        cases = {**load_baseline(args.baseline), **results}
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w") as fh:
+            json.dump({"meta": meta, "cases": cases}, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"Línea base guardada en {args.baseline}", file=sys.stderr)
+        regressions = []
+    else:
+        regressions = compare(results, load_baseline(args.baseline), args.threshold)
+        for name in regressions:
+            print(
+                f"REGRESIÓN {name}: {results[name]['change_pct']}% "
+                f"(umbral {args.threshold:.0%})",
+                file=sys.stderr,
+            )
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"meta": meta, "cases": results}, fh, indent=2)
+            fh.write("\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Analytics
+=========
+Agregados calculados por Odoo (`read_group`) para preguntas como "cuántas
+oportunidades tiene cada vendedor por etapa" o "total cotizado por vendedor
+este mes".
+
+Una sola RPC devuelve los conteos y sumas exactos de cada grupo. No hace
+falta traer cientos de registros y sumarlos en el contexto del LLM, y el
+resultado no depende de un límite de paginación.
+
+    from core.analytics import aggregate
+
+    groups, cached = aggregate(
+        client,
+        "sale.order",
+        [["state", "in", ["sale", "done"]]],
+        ["user_id", "date_order:month"],
+        ["amount_total:sum"],
+    )
+    # [{"user_id": [7, "Ana"], "date_order:month": "January 2026",
+    #   "count": 12, "amount_total": 184000.0}, ...]
+
+Los resultados se guardan en memoria ANALYTICS_CACHE_TTL segundos por
+(base, modelo, dominio, agrupación, medidas). Las preguntas de seguimiento
+del agente no repiten la RPC.
+
+Variables de entorno:
+    ANALYTICS_CACHE_TTL   Segundos que vale un resultado (default: 60; 0 = sin caché)
+    ANALYTICS_CACHE_SIZE  Resultados guardados como máximo (default: 256)
+    ANALYTICS_MAX_GROUPS  Grupos máximos por consulta (default: 500)
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core import mirror
+from core.log import get_logger
+
+log = get_logger(__name__)
+
+CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "60"))
+CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "256"))
+MAX_GROUPS = int(os.getenv("ANALYTICS_MAX_GROUPS", "500"))
+
+INTERVALS = ("day", "week", "month", "quarter", "year")
+AGGREGATES = ("sum", "avg", "min", "max", "count_distinct")
+
+_cache: Dict[str, Tuple[float, List[dict]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _cache_key(client, model, domain, groupby, measures, orderby, limit) -> str:
+    return json.dumps(
+        [
+            getattr(client, "url", ""),
+            getattr(client, "db", ""),
+            model,
+            domain,
+            groupby,
+            measures,
+            orderby,
+            limit,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _cached(key: str) -> Optional[List[dict]]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _cache[key]
+            return None
+        return entry[1]
+
+
+def _store(key: str, groups: List[dict]):
+    with _cache_lock:
+        if len(_cache) >= CACHE_SIZE:
+            # Sale el que vence primero
+            del _cache[min(_cache, key=lambda k: _cache[k][0])]
+        _cache[key] = (time.monotonic() + CACHE_TTL, groups)
+
+
+def clear_cache():
+    """Descarta los resultados guardados (p.ej. después de una escritura masiva)."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _measure_alias(spec: str) -> str:
+    # "amount_total:sum" → "amount_total"
+    return spec.split(":")[0]
+
+
+def _group(row: dict, groupby: Sequence[str], measures: Sequence[str]) -> dict:
+    """Fila de read_group → {agrupación..., "count", medidas...}."""
+    group = {spec: row.get(spec, False) for spec in groupby}
+    group["count"] = row.get("__count", 0)
+    for spec in measures:
+        alias = _measure_alias(spec)
+        group[alias] = row.get(alias) or 0
+    return group
+
+
+def aggregate(
+    client,
+    model: str,
+    domain: Sequence,
+    groupby: Sequence[str],
+    measures: Sequence[str] = (),
+    orderby: Optional[str] = None,
+    limit: int = MAX_GROUPS,
+    use_cache: bool = True,
+) -> Tuple[List[dict], bool]:
+    """
+    Conteo y medidas por grupo con un solo `read_group` (no lazy: todos los
+    niveles de `groupby` en la misma respuesta).
+
+    Args:
+        client: Cliente Odoo (un `mirror.reader` se usa a través del original)
+        model: Modelo a agregar ("crm.lead", "sale.order"...)
+        domain: Dominio de los registros incluidos
+        groupby: Campos de agrupación; las fechas con intervalo ("date_order:month")
+        measures: Medidas "campo:función" (sum, avg, min, max, count_distinct)
+        orderby: Orden de los grupos ("amount_total desc"); None = el de groupby
+        limit: Grupos máximos
+        use_cache: False = siempre consultar Odoo (y refrescar la caché)
+
+    Returns:
+        (grupos, si salieron de la caché). Cada grupo trae las claves de
+        `groupby` (many2one como [id, "Nombre"], fechas como etiqueta del
+        periodo, vacío como False), "count" y el nombre de cada medida.
+    """
+    groupby = list(groupby)
+    measures = list(measures)
+    key = _cache_key(client, model, domain, groupby, measures, orderby, limit)
+    if use_cache and CACHE_TTL > 0:
+        groups = _cached(key)
+        if groups is not None:
+            return groups, True
+
+    kwargs: Dict[str, Any] = {"lazy": False}
+    if limit:
+        kwargs["limit"] = limit
+    if orderby:
+        kwargs["orderby"] = orderby
+    start = time.perf_counter()
+    rows = mirror.live(client).execute_kw(
+        model, "read_group", [list(domain), measures, groupby], kwargs
+    )
+    groups = [_group(row, groupby, measures) for row in rows]
+    log.debug(
+        "read_group %s por %s: %d grupos en %.0f ms",
+        model,
+        groupby,
+        len(groups),
+        (time.perf_counter() - start) * 1000,
+    )
+
+    if CACHE_TTL > 0:
+        _store(key, groups)
+    return groups, False
+
+
+def totals(groups: Sequence[dict], measures: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Totales de todos los grupos: count y sumas se suman, `avg` se pondera
+    por count, `min`/`max` se combinan. `count_distinct` no se puede combinar
+    y se omite.
+    """
+    result: Dict[str, Any] = {"count": sum(g.get("count", 0) for g in groups)}
+    for spec in measures:
+        alias = _measure_alias(spec)
+        func = spec.partition(":")[2] or "sum"
+        values = [g.get(alias) or 0 for g in groups]
+        if func == "sum":
+            result[alias] = sum(values)
+        elif func == "avg":
+            weight = result["count"]
+            result[alias] = (
+                sum(v * g.get("count", 0) for v, g in zip(values, groups)) / weight
+                if weight
+                else 0
+            )
+        elif func == "min" and values:
+            result[alias] = min(values)
+        elif func == "max" and values:
+            result[alias] = max(values)
+    return result
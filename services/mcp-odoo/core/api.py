@@ -3,17 +3,25 @@ API REST con FastAPI para operaciones asíncronas.
 Endpoints para crear cotizaciones en background y consultar su estado.
 """
 
+import os
 import uuid
 from fastapi import FastAPI, BackgroundTasks, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 
 from core.tasks import task_manager, QuotationTask
 from core.logger import quotation_logger
 from core.helpers import retry_on_network_error
+from core import mirror
+from core.contacts import normalize_email, normalize_phone
+from core.partner_index import index_for
+from core import lead_import
+from core.log import get_logger
 from tools.crm import DevOdooCRMClient
 
+log = get_logger(__name__)
+
 
 # Modelos Pydantic para validación
 class ProductLine(BaseModel):
@@ -120,6 +128,17 @@ class QuotationResponse(BaseModel):
     status_url: str
 
 
+class LeadImportResponse(BaseModel):
+    """Modelo para respuesta inmediata de una importación de leads"""
+
+    tracking_id: str
+    status: str
+    message: str
+    format: str
+    bytes: int
+    status_url: str
+
+
 # Crear app FastAPI
 api_app = FastAPI(
     title="MCP Odoo - API Asíncrona",
@@ -150,52 +169,48 @@ def process_quotation_background(task_id: str, params: dict):
 
         # Marcar como en proceso
         task.start()
-        task.update_progress("Iniciando cliente Odoo...")
+        task.update_progress("Iniciando cliente Odoo...", stage="connect")
 
         # Crear cliente
         client = DevOdooCRMClient()
         task.update_progress("Cliente Odoo conectado")
 
         # Buscar/crear partner
-        task.update_progress("Verificando partner...")
-        email_normalizado = params["email"].strip().lower()
-        existing_partners = client.search_read(
-            "res.partner",
-            [("email", "=", email_normalizado)],
-            ["id", "name"],
-            limit=1,
+        task.update_progress("Verificando partner...", stage="partner")
+        email_normalizado = normalize_email(params["email"])
+        phone_normalizado = normalize_phone(params["phone"]) or params["phone"]
+        partner, _ = index_for(client).get_or_create(
+            client,
+            email_normalizado,
+            {
+                "name": params["contact_name"],
+                "email": email_normalizado,
+                "phone": phone_normalizado,
+                "is_company": False,
+            },
         )
-
-        if existing_partners:
-            partner_id = existing_partners[0]["id"]
-        else:
-            partner_id = client.create(
-                "res.partner",
-                {
-                    "name": params["contact_name"],
-                    "email": email_normalizado,
-                    "phone": params["phone"],
-                    "is_company": False,
-                },
-            )
+        partner_id = partner.id
 
         task.update_progress("Partner verificado")
 
         # Asignar vendedor
-        task.update_progress("Asignando vendedor...")
+        task.update_progress("Asignando vendedor...", stage="assign_user")
         assigned_user_id = params.get("user_id", 0)
         if not assigned_user_id:
-            assigned_user_id = client.get_salesperson_with_least_opportunities()
+            # Conteo de oportunidades desde el espejo local
+            assigned_user_id = mirror.reader(
+                client
+            ).get_salesperson_with_least_opportunities()
 
         task.update_progress("Vendedor asignado")
 
         # Crear lead
-        task.update_progress("Creando lead...")
+        task.update_progress("Creando lead...", stage="lead")
         lead_values = {
             "name": params["lead_name"],
             "partner_name": params["partner_name"],
             "contact_name": params["contact_name"],
-            "phone": params["phone"],
+            "phone": phone_normalizado,
             "email_from": email_normalizado,
             "type": "lead",
             "partner_id": partner_id,
@@ -223,7 +238,7 @@ def process_quotation_background(task_id: str, params: dict):
         task.update_progress("Lead creado")
 
         # Convertir a opportunity
-        task.update_progress("Convirtiendo a oportunidad...")
+        task.update_progress("Convirtiendo a oportunidad...", stage="opportunity")
         from datetime import datetime
 
         conversion_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -241,7 +256,7 @@ def process_quotation_background(task_id: str, params: dict):
         task.update_progress("Convertido a oportunidad")
 
         # Crear sale order
-        task.update_progress("Creando cotización...")
+        task.update_progress("Creando cotización...", stage="sale_order")
         sale_values = {
             "partner_id": partner_id,
             "opportunity_id": lead_id,
@@ -262,7 +277,10 @@ def process_quotation_background(task_id: str, params: dict):
 
         if params.get("products"):
             # Formato nuevo: array de productos
-            task.update_progress(f"Agregando {len(params['products'])} producto(s)...")
+            task.update_progress(
+                f"Agregando {len(params['products'])} producto(s)...",
+                stage="order_lines",
+            )
             products_to_add = [
                 {
                     "product_id": p["product_id"],
@@ -273,7 +291,7 @@ def process_quotation_background(task_id: str, params: dict):
             ]
         elif params.get("product_id", 0) > 0:
             # Formato legacy: un solo producto
-            task.update_progress("Agregando producto...")
+            task.update_progress("Agregando producto...", stage="order_lines")
             products_to_add = [
                 {
                     "product_id": params["product_id"],
@@ -400,6 +418,46 @@ def process_quotation_background(task_id: str, params: dict):
         )
 
 
+def process_lead_import_background(
+    task_id: str, path: str, fmt: str, defaults: Optional[dict] = None
+):
+    """
+    Importa en background un archivo de leads ya recibido en `path` (se
+    borra al terminar). El progreso queda en la tarea después de cada lote.
+    """
+    task = task_manager.get_task(task_id)
+    if not task:
+        os.unlink(path)
+        return
+
+    task.start()
+    try:
+        task.update_progress("Conectando a Odoo...", stage="connect")
+        client = DevOdooCRMClient()
+
+        def progress(partial: dict):
+            task.update_progress(
+                f"{partial['rows']} filas procesadas: {partial['leads_created']} "
+                f"leads creados, {partial['skipped']} omitidas",
+                stage="import",
+            )
+
+        task.update_progress("Importando leads...", stage="import")
+        with open(path, "rb") as stream:
+            result = lead_import.import_leads(
+                client,
+                lead_import.iter_rows(stream, fmt),
+                defaults=defaults,
+                progress=progress,
+            )
+        task.complete(result)
+    except Exception as e:
+        log.error("Importación de leads %s falló: %s", task_id, e)
+        task.fail(f"{type(e).__name__}: {str(e)}")
+    finally:
+        os.unlink(path)
+
+
 @api_app.post("/api/quotation/async", response_model=QuotationResponse)
 async def create_quotation_async(
     request: QuotationRequest, background_tasks: BackgroundTasks
@@ -439,7 +497,7 @@ async def get_quotation_status(tracking_id: str):
             status_code=404, detail=f"Tracking ID '{tracking_id}' no encontrado"
         )
 
-    return JSONResponse(content=task.to_dict())
+    return Response(content=task.to_json(), media_type="application/json")
 
 
 @api_app.get("/api/health")
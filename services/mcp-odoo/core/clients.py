@@ -0,0 +1,94 @@
+"""
+Clients
+=======
+Registro compartido de clientes Odoo, uno por ambiente, con las
+credenciales del entorno (nunca en el código):
+
+    prod  ODOO_URL, ODOO_DB, ODOO_LOGIN, ODOO_API_KEY
+    dev   DEV_ODOO_URL, DEV_ODOO_DB, DEV_ODOO_LOGIN, DEV_ODOO_API_KEY
+          (si falta alguna se usa la ODOO_* equivalente)
+
+Cada ambiente se autentica una sola vez por proceso, y los usos siguientes
+reciben el mismo cliente. `OdooClient` abre una conexión XML-RPC por
+thread, así que se puede compartir entre consultas paralelas.
+
+    from core.clients import get_client
+
+    odoo = get_client("prod")   # None = ODOO_ENVIRONMENT (default: dev)
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+from core.log import get_logger
+from core.odoo_client import OdooClient
+
+log = get_logger(__name__)
+
+ENVIRONMENTS = ("prod", "dev")
+
+_VARS = ("URL", "DB", "LOGIN", "API_KEY")
+
+_clients: Dict[str, OdooClient] = {}
+_lock = threading.Lock()
+
+
+def default_environment() -> str:
+    """Ambiente de ODOO_ENVIRONMENT (default: dev)."""
+    return os.getenv("ODOO_ENVIRONMENT", "dev").lower()
+
+
+def credentials(env: str) -> Dict[str, str]:
+    """
+    Credenciales de `env` desde el entorno.
+
+    Raises:
+        ValueError: Si el ambiente no existe o falta alguna variable.
+    """
+    if env not in ENVIRONMENTS:
+        raise ValueError(f"Ambiente inválido: {env} ({', '.join(ENVIRONMENTS)})")
+    values: Dict[str, str] = {}
+    missing = []
+    for var in _VARS:
+        value = os.getenv(f"ODOO_{var}")
+        if env == "dev":
+            value = os.getenv(f"DEV_ODOO_{var}") or value
+        if not value:
+            missing.append(f"DEV_ODOO_{var}" if env == "dev" else f"ODOO_{var}")
+        values[var.lower()] = value
+    if missing:
+        raise ValueError(f"Faltan variables de entorno: {', '.join(missing)}")
+    return values
+
+
+def get_client(env: Optional[str] = None) -> OdooClient:
+    """
+    Cliente autenticado de `env` (se crea la primera vez).
+
+    Raises:
+        ValueError: Credenciales incompletas o autenticación rechazada.
+    """
+    env = (env or default_environment()).lower()
+    with _lock:
+        client = _clients.get(env)
+        if client is not None:
+            return client
+        creds = credentials(env)
+        client = OdooClient(
+            url=creds["url"],
+            db=creds["db"],
+            username=creds["login"],
+            password=creds["api_key"],
+        )
+        if not client.uid:
+            raise ValueError(f"No se pudo autenticar en {creds['url']} ({env})")
+        log.info("Cliente Odoo %s: %s (%s)", env, client.url, client.db)
+        _clients[env] = client
+        return client
+
+
+def reset():
+    """Descarta los clientes creados (p.ej. después de cambiar credenciales)."""
+    with _lock:
+        _clients.clear()
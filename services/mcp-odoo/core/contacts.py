@@ -0,0 +1,286 @@
+"""
+Contacts
+========
+Normalización de datos de contacto: emails y teléfonos E.164.
+
+Un único camino para las cotizaciones (API y MCP), el handoff (número de
+WhatsApp del vendedor), el cliente de Twilio y las importaciones por lote.
+Patrones precompilados y memo LRU por valor: en lotes con contactos
+repetidos cada valor distinto se procesa una sola vez.
+
+Uso:
+    from core.contacts import normalize_email, normalize_phone, normalize_contacts
+
+    normalize_email(" López@Gmail.com ")      # "lopez@gmail.com"
+    normalize_phone("(55) 1234-5678")         # "+525512345678"
+    whatsapp_address("55 1234 5678")          # "whatsapp:+525512345678"
+    normalize_contacts(rows)                  # lote de dicts con email/phone
+
+Variables de entorno:
+    CONTACTS_DEFAULT_COUNTRY_CODE  Lada para números nacionales (default: 52)
+    CONTACTS_MEMO_SIZE             Entradas del memo LRU por función (default: 8192)
+"""
+
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from core.log import get_logger
+
+log = get_logger(__name__)
+
+DEFAULT_COUNTRY_CODE = os.getenv("CONTACTS_DEFAULT_COUNTRY_CODE", "52").lstrip("+")
+MEMO_SIZE = int(os.getenv("CONTACTS_MEMO_SIZE", "8192"))
+
+# Email genérico cuando el original no se puede corregir
+INVALID_EMAIL = "emailinvalido@corporativosade.com.mx"
+
+_EMAIL_PATTERN = re.compile(r"^[a-zA-Z0-9._-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+_TRAILING_EXT_DIGITS = re.compile(r"(\.[a-zA-Z]+)\d+$")
+_MIXED_EXT_DIGITS = re.compile(r"\.([a-zA-Z]+)\d+([a-zA-Z]+)$")
+_NON_DIGITS = re.compile(r"\D+")
+
+# E.164: hasta 15 dígitos incluyendo la lada internacional
+_E164_MIN_DIGITS = 8
+_E164_MAX_DIGITS = 15
+# Número nacional (sin lada) en México
+_NATIONAL_DIGITS = 10
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def normalize_email(email: str) -> str:
+    """
+    Normaliza y limpia un email eliminando acentos, espacios y caracteres inválidos.
+    Corrige automáticamente errores comunes.
+
+    Args:
+        email: Email a normalizar
+
+    Memoizado (LRU): un email repetido no se vuelve a procesar ni a loguear.
+
+    Returns:
+        Email normalizado y corregido en minúsculas sin acentos, o
+        INVALID_EMAIL si no se puede corregir
+
+    Example:
+        normalize_email("López@Gmail.com") -> "lopez@gmail.com"
+        normalize_email("aguilar@gmail.com7") -> "aguilar@gmail.com"
+        normalize_email("test@test.co1m") -> "test@test.com"
+    """
+    # Guardar original para logs
+    original = email
+
+    # Eliminar espacios al inicio y final
+    email = email.strip()
+
+    # Convertir a minúsculas
+    email = email.lower()
+
+    # Eliminar acentos y diacríticos (un email ASCII ya está normalizado)
+    if not email.isascii():
+        email = unicodedata.normalize("NFKD", email)
+        email = email.encode("ASCII", "ignore").decode("ASCII")
+
+    # Eliminar espacios internos que puedan quedar
+    email = email.replace(" ", "")
+    email = email.replace(",", "")
+
+    # Intentos de corrección y normalización en cadena
+    # 1) Si hay múltiples @, conservar el primero y concatenar el resto
+    if email.count("@") > 1:
+        parts = email.split("@")
+        user = parts[0]
+        domain = "".join(parts[1:])
+        email = f"{user}@{domain}"
+
+    # 2) Si no hay @, intentar inferirlo reemplazando el primer punto por @ (heurística)
+    if email.count("@") == 0:
+        if "." in email:
+            idx = email.find(".")
+            user = email[:idx]
+            domain = email[idx + 1 :]
+            email = f"{user}@{domain}"
+        else:
+            # No se puede inferir, fallback al email genérico
+            fallback = INVALID_EMAIL
+            log.warning("Email inválido %r -> usando fallback %r", original, fallback)
+            return fallback
+
+    # A partir de aquí deberíamos tener 1 @
+    if email.count("@") != 1:
+        fallback = INVALID_EMAIL
+        log.warning("Email inválido %r -> usando fallback %r", original, fallback)
+        return fallback
+
+    user, domain = email.split("@", 1)
+
+    # Usuario no puede estar vacío
+    if not user:
+        fallback = INVALID_EMAIL
+        log.warning(
+            "Email inválido %r (usuario vacío) -> usando fallback %r",
+            original,
+            fallback,
+        )
+        return fallback
+
+    # CORRECCIÓN AUTOMÁTICA: Eliminar números al final de la extensión
+    # (search + slicing: re.sub reinterpreta la plantilla "\1" en cada llamada)
+    match = _TRAILING_EXT_DIGITS.search(domain)
+    if match:
+        domain = domain[: match.start()] + match.group(1)
+
+    # CORRECCIÓN AUTOMÁTICA: Arreglar números mezclados en la extensión
+    match = _MIXED_EXT_DIGITS.search(domain)
+    if match:
+        domain = f"{domain[: match.start()]}.{match.group(1)}{match.group(2)}"
+
+    # Si el dominio no tiene punto, intentar añadir .com
+    if "." not in domain:
+        domain_candidate = domain + ".com"
+        email_candidate = f"{user}@{domain_candidate}"
+        if _EMAIL_PATTERN.match(email_candidate):
+            domain = domain_candidate
+        else:
+            fallback = INVALID_EMAIL
+            log.warning(
+                "Email %r no pudo ser corregido -> usando fallback %r",
+                original,
+                fallback,
+            )
+            return fallback
+
+    # Reconstruir email limpio
+    email_clean = f"{user}@{domain}"
+
+    # Validación final del formato
+    if not _EMAIL_PATTERN.match(email_clean):
+        fallback = INVALID_EMAIL
+        log.warning(
+            "Email %r inválido después de limpieza -> usando fallback %r",
+            original,
+            fallback,
+        )
+        return fallback
+
+    # Log si se hizo corrección
+    if original != email_clean:
+        log.debug("Email corregido: %r -> %r", original, email_clean)
+
+    return email_clean
+
+
+def is_valid_email(email: str) -> bool:
+    """Indica si un email ya tiene formato válido (sin corregir ni loguear)."""
+    return bool(email) and _EMAIL_PATTERN.match(email) is not None
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def normalize_phone(
+    phone: Optional[str], default_country_code: str = DEFAULT_COUNTRY_CODE
+) -> Optional[str]:
+    """
+    Normaliza un teléfono a E.164 (`+<lada><número>`, solo dígitos).
+
+    Acepta espacios, guiones, puntos, paréntesis, el prefijo `whatsapp:` y el
+    prefijo internacional `00`. Un número sin `+` de 10 dígitos se toma como
+    nacional (se antepone `default_country_code`); uno más largo que ya
+    empieza con la lada se respeta.
+
+    Memoizado (LRU).
+
+    Returns:
+        Número E.164 o None si no tiene una cantidad válida de dígitos o
+        trae letras (p.ej. un número enmascarado por privacidad)
+
+    Example:
+        normalize_phone("(55) 1234-5678") -> "+525512345678"
+        normalize_phone("whatsapp:+1 415 523 8886") -> "+14155238886"
+        normalize_phone("0052 55 1234 5678") -> "+525512345678"
+        normalize_phone("+52 55 XXXX 5678") -> None
+    """
+    if not phone:
+        return None
+    text = str(phone).strip()
+    if text.startswith("whatsapp:"):
+        text = text[len("whatsapp:") :].strip()
+    if any(c.isalpha() for c in text):
+        # Quitar las letras de "+52 55 XXXX 5678" daría otro número válido
+        log.debug("Teléfono enmascarado o con letras %r", phone)
+        return None
+
+    international = text.startswith("+")
+    digits = _NON_DIGITS.sub("", text)
+    if not international and digits.startswith("00"):
+        international = True
+        digits = digits[2:]
+
+    if not international:
+        if len(digits) == _NATIONAL_DIGITS or not digits.startswith(
+            default_country_code
+        ):
+            digits = default_country_code + digits
+
+    if not _E164_MIN_DIGITS <= len(digits) <= _E164_MAX_DIGITS:
+        log.debug("Teléfono inválido %r (%d dígitos)", phone, len(digits))
+        return None
+    return f"+{digits}"
+
+
+def whatsapp_address(phone: Optional[str]) -> Optional[str]:
+    """Dirección de WhatsApp de Twilio (`whatsapp:+E164`) o None si es inválido."""
+    number = normalize_phone(phone)
+    return f"whatsapp:{number}" if number else None
+
+
+def normalize_emails(emails: Iterable[str]) -> List[str]:
+    """Versión por lote de `normalize_email` (mismo orden que la entrada)."""
+    return [normalize_email(email) for email in emails]
+
+
+def normalize_phones(phones: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """Versión por lote de `normalize_phone` (mismo orden que la entrada)."""
+    return [normalize_phone(phone) for phone in phones]
+
+
+def normalize_contacts(
+    rows: Iterable[Dict],
+    email_field: str = "email",
+    phone_fields: Iterable[str] = ("phone", "mobile"),
+) -> List[Dict]:
+    """
+    Normaliza un lote de registros de contacto (importaciones, deduplicación).
+
+    Devuelve copias de los registros con el email y los teléfonos
+    normalizados; los campos ausentes o vacíos se dejan como vienen. Un
+    teléfono inválido conserva el valor original.
+    """
+    phone_fields = tuple(phone_fields)
+    normalized = []
+    for row in rows:
+        row = dict(row)
+        email = row.get(email_field)
+        if email:
+            row[email_field] = normalize_email(email)
+        for field in phone_fields:
+            value = row.get(field)
+            if value:
+                row[field] = normalize_phone(value) or value
+        normalized.append(row)
+    return normalized
+
+
+def memo_info() -> Dict[str, dict]:
+    """Estadísticas del memo LRU por función (hits/misses/tamaño)."""
+    return {
+        name: fn.cache_info()._asdict()
+        for name, fn in (("email", normalize_email), ("phone", normalize_phone))
+    }
+
+
+def clear_memo():
+    """Vacía el memo (p.ej. entre importaciones grandes)."""
+    normalize_email.cache_clear()
+    normalize_phone.cache_clear()
@@ -0,0 +1,248 @@
+"""
+Domain
+======
+Evaluación local de dominios de Odoo (`[("field", "op", value), "|", ...]`).
+
+Permite filtrar registros ya leídos sin volver a Odoo (fake de pruebas,
+caches locales). Soporta la notación prefija de Odoo (`&`, `|`, `!`, con `&`
+implícito entre términos) y los operadores:
+
+    =  !=  <>  <  >  <=  >=  in  not in  like  not like  ilike  not ilike
+    =like  =ilike
+
+Los many2one pueden venir como id o como `[id, "nombre"]`; se comparan por id
+(y por nombre en `like`/`ilike`). Los x2many son listas de ids: `=`/`in`
+son verdaderos si algún id coincide.
+
+Uso:
+    from core.domain import compile_domain
+    match = compile_domain([("email", "=ilike", "a@b.com"), ("active", "=", True)])
+    rows = [r for r in rows if match(r)]
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Sequence
+
+Record = Dict[str, Any]
+Predicate = Callable[[Record], bool]
+
+OPERATORS = {"&", "|", "!"}
+TERM_OPERATORS = {
+    "=",
+    "!=",
+    "<>",
+    "<",
+    ">",
+    "<=",
+    ">=",
+    "in",
+    "not in",
+    "like",
+    "not like",
+    "ilike",
+    "not ilike",
+    "=like",
+    "=ilike",
+}
+TRUE_LEAF = (1, "=", 1)
+FALSE_LEAF = (0, "=", 1)
+
+
+def normalize(domain: Sequence) -> List:
+    """
+    Agrega los `&` implícitos para obtener un dominio prefijo completo.
+
+    Raises:
+        ValueError: Si el dominio está mal formado.
+    """
+    if not domain:
+        return [TRUE_LEAF]
+    result = []
+    expected = 1  # términos que faltan por consumir
+    for token in domain:
+        if expected == 0:
+            # Término adicional de nivel superior: AND implícito
+            result[0:0] = ["&"]
+            expected = 1
+        if isinstance(token, str):
+            if token not in OPERATORS:
+                raise ValueError(f"Operador de dominio inválido: {token!r}")
+            expected += 0 if token == "!" else 1
+        else:
+            if not isinstance(token, (list, tuple)) or len(token) != 3:
+                raise ValueError(f"Término de dominio inválido: {token!r}")
+            expected -= 1
+        result.append(token)
+    if expected != 0:
+        raise ValueError(f"Dominio incompleto: {list(domain)!r}")
+    return result
+
+
+def _is_null(value) -> bool:
+    # `0 == False` en Python: comparar por identidad para no tratar 0 como vacío
+    return value is None or value is False
+
+
+def _is_m2o(value) -> bool:
+    """`[id, "nombre"]` tal como Odoo devuelve un many2one."""
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) == 2
+        and isinstance(value[1], str)
+    )
+
+
+def _m2o_id(value):
+    if isinstance(value, (list, tuple)) and value:
+        return value[0]
+    return value
+
+
+def _m2o_name(value):
+    if isinstance(value, (list, tuple)) and len(value) > 1:
+        return value[1]
+    return value
+
+
+def _like_pattern(value: str, anchored: bool) -> "re.Pattern":
+    if anchored:
+        # =like / =ilike: % y _ son comodines SQL
+        regex = "".join(
+            ".*" if c == "%" else "." if c == "_" else re.escape(c) for c in value
+        )
+        return re.compile(f"^{regex}$", re.S)
+    return re.compile(re.escape(value), re.S)
+
+
+def _compile_leaf(leaf) -> Predicate:
+    field, op, value = leaf
+    if field in (0, 1) and op == "=" and value == 1:
+        result = field == 1
+        return lambda record: result
+    if op not in TERM_OPERATORS:
+        raise ValueError(f"Operador no soportado: {op!r}")
+    if not isinstance(field, str):
+        raise ValueError(f"Campo inválido: {field!r}")
+    if "." in field:
+        raise ValueError(f"Rutas relacionales no soportadas: {field!r}")
+    if op == "<>":
+        op = "!="
+
+    if op in ("like", "not like", "ilike", "not ilike", "=like", "=ilike"):
+        insensitive = "ilike" in op
+        pattern = _like_pattern(
+            str(value).lower() if insensitive else str(value), op.startswith("=")
+        )
+        negate = op.startswith("not")
+
+        def like(record: Record) -> bool:
+            current = record.get(field)
+            if _is_m2o(current):
+                current = _m2o_name(current)
+            if _is_null(current):
+                return negate
+            text = str(current).lower() if insensitive else str(current)
+            found = pattern.search(text) is not None
+            return not found if negate else found
+
+        return like
+
+    if op in ("in", "not in"):
+        wanted = set(_m2o_id(v) for v in (value or []))
+        negate = op == "not in"
+
+        def member(record: Record) -> bool:
+            current = record.get(field)
+            if isinstance(current, (list, tuple)) and not _is_m2o(current):
+                found = any(v in wanted for v in current)
+            else:
+                current = _m2o_id(current)
+                found = current in wanted or (_is_null(current) and False in wanted)
+            return not found if negate else found
+
+        return member
+
+    value = _m2o_id(value)
+
+    if op in ("=", "!="):
+        negate = op == "!="
+
+        def equal(record: Record) -> bool:
+            current = record.get(field)
+            if isinstance(current, (list, tuple)) and not _is_m2o(current):
+                if _is_null(value):
+                    found = not current
+                else:
+                    found = value in current
+            else:
+                current = _m2o_id(current)
+                if _is_null(value):
+                    found = _is_null(current)
+                else:
+                    found = current == value
+            return not found if negate else found
+
+        return equal
+
+    compare = {
+        "<": lambda a, b: a < b,
+        ">": lambda a, b: a > b,
+        "<=": lambda a, b: a <= b,
+        ">=": lambda a, b: a >= b,
+    }[op]
+
+    def ordered(record: Record) -> bool:
+        current = _m2o_id(record.get(field))
+        if _is_null(current) or _is_null(value):
+            return False
+        try:
+            return compare(current, value)
+        except TypeError:
+            return compare(str(current), str(value))
+
+    return ordered
+
+
+def compile_domain(domain: Sequence) -> Predicate:
+    """
+    Compila un dominio a un predicado `record -> bool`.
+
+    Raises:
+        ValueError: Si el dominio está mal formado o usa algo no soportado.
+    """
+    tokens = normalize(domain)
+    position = 0
+
+    def parse() -> Predicate:
+        nonlocal position
+        token = tokens[position]
+        position += 1
+        if token == "!":
+            inner = parse()
+            return lambda record: not inner(record)
+        if token == "&":
+            left, right = parse(), parse()
+            return lambda record: left(record) and right(record)
+        if token == "|":
+            left, right = parse(), parse()
+            return lambda record: left(record) or right(record)
+        return _compile_leaf(token)
+
+    return parse()
+
+
+def filter_records(records, domain: Sequence) -> List[Record]:
+    """Filtra una lista de registros con un dominio."""
+    match = compile_domain(domain)
+    return [record for record in records if match(record)]
+
+
+def fields_in(domain: Sequence) -> List[str]:
+    """Campos referenciados por un dominio (en orden de aparición)."""
+    seen = []
+    for token in domain or []:
+        if isinstance(token, (list, tuple)) and len(token) == 3:
+            field = token[0]
+            if isinstance(field, str) and field not in seen:
+                seen.append(field)
+    return seen
@@ -6,12 +6,60 @@ Funciones de utilidad compartidas para el servidor MCP-Odoo.
 
 import json
 import time
-from typing import Dict, Any, Callable, TypeVar, Optional
+from typing import Dict, Any, Callable, List, TypeVar, Optional
 from functools import wraps
 import xmlrpc.client
 
+from core.contacts import whatsapp_address
+from core.log import get_logger
+from core.metrics import RETRY_ATTEMPTS, RETRY_EXHAUSTED
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa el encoder estándar
+    orjson = None
+
+log = get_logger(__name__)
+
 T = TypeVar("T")
 
+# Encoder reutilizable: json.dumps con argumentos no default crea uno por llamada
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False)
+_COMPACT_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+# Claves no str como json (1 → "1"); fechas y dataclasses caen al encoder
+# estándar, que las rechaza igual que antes
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson
+    else 0
+)
+
+
+def _compact_json(obj: Any) -> str:
+    """JSON compacto: orjson si está instalado (~5x más rápido), si no stdlib."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode("utf-8")
+        except TypeError:
+            # Enteros de más de 64 bits o tipos que orjson no serializa
+            pass
+    return _COMPACT_JSON_ENCODER.encode(obj)
+
+
+def json_dumps(obj: Any, compact: bool = False) -> str:
+    """
+    Serializa a JSON sin escapar caracteres no ASCII.
+
+    Equivale a `json.dumps(obj, ensure_ascii=False)` (o con separadores
+    compactos `,`/`:` si `compact`), reutilizando el encoder.
+    """
+    if compact:
+        return _compact_json(obj)
+    return _JSON_ENCODER.encode(obj)
+
 
 def get_user_whatsapp_number(odoo_client, user_id: int) -> Optional[str]:
     """
@@ -31,7 +79,7 @@ def get_user_whatsapp_number(odoo_client, user_id: int) -> Optional[str]:
         )
 
         if not user:
-            print(f"⚠️  Usuario {user_id} no encontrado")
+            log.warning("Usuario %s no encontrado", user_id)
             return None
 
         user_data = user[0]
@@ -40,26 +88,20 @@ def get_user_whatsapp_number(odoo_client, user_id: int) -> Optional[str]:
         phone = user_data.get("phone") or user_data.get("mobile")
 
         if not phone:
-            print(f"⚠️  Usuario {user_id} no tiene número de teléfono configurado")
+            log.warning("Usuario %s no tiene número de teléfono configurado", user_id)
             return None
 
-        # Limpiar el número (quitar espacios, guiones, etc)
-        phone = (
-            phone.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
-        )
-
-        # Si no empieza con +, asumir México (+52)
-        if not phone.startswith("+"):
-            phone = f"+52{phone}"
-
-        # Formato WhatsApp
-        whatsapp_number = f"whatsapp:{phone}"
+        # Normalizar a E.164 con formato WhatsApp (lada 52 si no trae prefijo)
+        whatsapp_number = whatsapp_address(phone)
+        if not whatsapp_number:
+            log.warning("Usuario %s tiene un teléfono inválido: %r", user_id, phone)
+            return None
 
-        print(f"✅ Número WhatsApp para usuario {user_id}: {whatsapp_number}")
+        log.debug("Número WhatsApp para usuario %s: %s", user_id, whatsapp_number)
         return whatsapp_number
 
     except Exception as e:
-        print(f"❌ Error obteniendo número de WhatsApp para usuario {user_id}: {e}")
+        log.error("Error obteniendo número de WhatsApp para usuario %s: %s", user_id, e)
         return None
 
 
@@ -67,6 +109,8 @@ def encode_content(obj: Any) -> Dict[str, Any]:
     """
     Envuelve un objeto en el formato de content array de MCP.
 
+    El JSON va compacto (sin espacios tras `,` y `:`).
+
     Args:
         obj: Objeto a envolver (será serializado como JSON)
 
@@ -77,12 +121,86 @@ def encode_content(obj: Any) -> Dict[str, Any]:
         "content": [
             {
                 "type": "text",
-                "text": json.dumps(obj, ensure_ascii=False),
+                "text": _compact_json(obj),
             }
         ]
     }
 
 
+def _is_m2o(value) -> bool:
+    """`[id, "Nombre"]` tal como Odoo devuelve un many2one."""
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) == 2
+        and type(value[0]) is int
+        and isinstance(value[1], str)
+    )
+
+
+def to_columns(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Codificación columnar de una lista de registros.
+
+    Cada fila repite solo valores (no claves), y los many2one `[id, "Nombre"]`
+    (sueltos o en listas, p.ej. asignados) quedan como id con el nombre
+    guardado una sola vez por campo en `refs`:
+
+        {"columns": ["id", "name", "partner_id"],
+         "rows": [[1, "S00001", 7], [2, "S00002", 7]],
+         "refs": {"partner_id": {"7": "Cliente"}}}
+
+    `from_columns` reconstruye los registros originales.
+    """
+    columns: List[str] = []
+    seen = set()
+    for row in rows:
+        for key in row:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+
+    # Odoo devuelve el mismo tipo en todo un campo: se clasifica cada columna
+    # por su primer valor no vacío y se transforma completa (vacíos = False/[])
+    refs: Dict[str, Dict[str, str]] = {}
+    data = []
+    for key in columns:
+        values = [row.get(key) for row in rows]
+        sample = next((v for v in values if v), None)
+        if _is_m2o(sample):
+            names = refs[key] = {}
+            for v in values:
+                if v:
+                    names[str(v[0])] = v[1]
+            values = [v[0] if v else v for v in values]
+        elif isinstance(sample, list) and _is_m2o(sample[0]):
+            names = refs[key] = {}
+            for v in values:
+                for item in v or ():
+                    names[str(item[0])] = item[1]
+            values = [[item[0] for item in v] if v else v for v in values]
+        data.append(values)
+    return {"columns": columns, "rows": list(map(list, zip(*data))), "refs": refs}
+
+
+def from_columns(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Registros originales a partir de `to_columns` (ida y vuelta exacta)."""
+    columns = data["columns"]
+    refs = data.get("refs") or {}
+    records = []
+    for values in data["rows"]:
+        record = {}
+        for key, value in zip(columns, values):
+            names = refs.get(key)
+            if names is not None:
+                if type(value) is int and str(value) in names:
+                    value = [value, names[str(value)]]
+                elif isinstance(value, list) and value:
+                    value = [[v, names[str(v)]] for v in value]
+            record[key] = value
+        records.append(record)
+    return records
+
+
 def odoo_form_url(model: str, rec_id: int, base_url: str = None) -> str:
     """
     Genera URL del formulario de Odoo para un registro.
@@ -117,8 +235,9 @@ def wants_projects(query: str) -> bool:
     Returns:
         True si la query menciona proyectos
     """
+    # "proyectos"/"projects" contienen "proyecto"/"project"
     ql = query.lower()
-    return any(t in ql for t in ("proyecto", "proyectos", "project", "projects"))
+    return "proyecto" in ql or "project" in ql
 
 
 def wants_tasks(query: str) -> bool:
@@ -131,8 +250,9 @@ def wants_tasks(query: str) -> bool:
     Returns:
         True si la query menciona tareas
     """
+    # "tareas"/"tasks" contienen "tarea"/"task"
     ql = query.lower()
-    return any(t in ql for t in ("tarea", "tareas", "task", "tasks"))
+    return "tarea" in ql or "task" in ql
 
 
 def is_retryable_error(error: Exception) -> bool:
@@ -207,6 +327,9 @@ def retry_on_network_error(
     """
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        attempts_counter = RETRY_ATTEMPTS.labels(func.__name__)
+        exhausted_counter = RETRY_EXHAUSTED.labels(func.__name__)
+
         @wraps(func)
         def wrapper(*args, **kwargs) -> T:
             last_error = None
@@ -226,8 +349,9 @@ def retry_on_network_error(
 
                     # Si es el último intento, lanzar el error
                     if attempt >= max_attempts:
-                        print(
-                            f"❌ Todos los reintentos fallaron ({max_attempts} intentos)"
+                        exhausted_counter.inc()
+                        log.error(
+                            "Todos los reintentos fallaron (%d intentos)", max_attempts
                         )
                         raise
 
@@ -237,12 +361,17 @@ def retry_on_network_error(
                     )
 
                     # Log del reintento
-                    print(f"⚠️  Error temporal detectado: {type(e).__name__}: {str(e)}")
-                    print(
-                        f"🔄 Reintentando ({attempt}/{max_attempts}) en {delay:.1f}s..."
+                    log.warning(
+                        "Error temporal %s: %s, reintentando (%d/%d) en %.1fs",
+                        type(e).__name__,
+                        e,
+                        attempt,
+                        max_attempts,
+                        delay,
                     )
 
                     # Esperar antes de reintentar
+                    attempts_counter.inc()
                     time.sleep(delay)
 
             # Nunca debería llegar aquí, pero por si acaso
@@ -0,0 +1,316 @@
+"""
+Lead Import
+===========
+Importación masiva de leads (exportaciones de eventos de marketing) desde
+CSV o JSONL, para `POST /api/leads/import`.
+
+El archivo se lee en streaming (fila por fila, nunca completo en memoria) y
+se procesa por lotes de `LEAD_IMPORT_BATCH_SIZE` filas. Por lote:
+
+    1. normaliza emails y teléfonos (`core.contacts.normalize_contacts`)
+    2. busca los partners existentes por email en el índice local y, los que
+       no estén, con una sola búsqueda (`PartnerIndex.lookup_many`)
+    3. crea los partners nuevos con un solo `create([...])`
+    4. crea los leads con otro `create([...])`
+
+Un contacto repetido en el archivo (mismo email o, sin email, mismo
+teléfono) usa un solo partner. 10k filas son ~150 RPC en lugar de ~40k.
+
+Columnas reconocidas (CSV con encabezado o claves de cada objeto JSONL;
+sin distinguir mayúsculas): name, contact_name, partner_name, email, phone,
+mobile, city, description, y sus equivalentes en español (ver `COLUMNS`).
+
+    from core.lead_import import iter_rows, import_leads
+
+    with open(path, "rb") as f:
+        result = import_leads(client, iter_rows(f, "csv"))
+
+Variables de entorno:
+    LEAD_IMPORT_BATCH_SIZE  Filas por lote / por create (default: 200)
+    LEAD_IMPORT_MAX_ERRORS  Errores detallados en el resultado (default: 100)
+"""
+
+import codecs
+import csv
+import io
+import json
+import os
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.contacts import INVALID_EMAIL, is_valid_email, normalize_contacts
+from core.log import get_logger
+from core.partner_index import PartnerEntry, index_for
+
+log = get_logger(__name__)
+
+BATCH_SIZE = int(os.getenv("LEAD_IMPORT_BATCH_SIZE", "200"))
+MAX_ERRORS = int(os.getenv("LEAD_IMPORT_MAX_ERRORS", "100"))
+
+FORMATS = ("csv", "jsonl")
+
+# Columna canónica → nombres aceptados en el archivo
+COLUMNS = {
+    "name": ("name", "lead_name", "lead", "nombre_lead", "asunto"),
+    "contact_name": ("contact_name", "contact", "contacto", "nombre"),
+    "partner_name": ("partner_name", "company", "empresa", "compañia", "compania"),
+    "email": ("email", "email_from", "correo", "e-mail"),
+    "phone": ("phone", "telefono", "teléfono", "tel"),
+    "mobile": ("mobile", "celular", "movil", "móvil"),
+    "city": ("city", "ciudad"),
+    "description": ("description", "descripcion", "descripción", "notas", "notes"),
+}
+_ALIASES = {alias: field for field, names in COLUMNS.items() for alias in names}
+
+Row = Dict[str, Any]
+
+
+class RowError(ValueError):
+    """Fila que no se pudo leer (JSON inválido, no es un objeto...)."""
+
+
+def detect_format(
+    head: bytes, content_type: Optional[str] = None, requested: Optional[str] = None
+) -> str:
+    """
+    Formato del archivo: el pedido explícitamente, el del Content-Type o,
+    si no, el del primer carácter (`{` = JSONL).
+
+    Raises:
+        ValueError: Si se pide un formato no soportado.
+    """
+    if requested:
+        requested = requested.lower()
+        if requested not in FORMATS:
+            raise ValueError(f"Formato no soportado: {requested} (csv o jsonl)")
+        return requested
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "jsonl"
+    return "jsonl" if head.lstrip(codecs.BOM_UTF8).lstrip()[:1] == b"{" else "csv"
+
+
+def _canonical(raw: Dict[Any, Any]) -> Row:
+    row: Row = {}
+    for key, value in raw.items():
+        if not isinstance(key, str):
+            continue
+        field = _ALIASES.get(key.strip().lower())
+        if field is None or value is None:
+            continue
+        value = str(value).strip()
+        if value and field not in row:
+            row[field] = value
+    return row
+
+
+def iter_rows(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Filas del archivo en streaming: (número de línea, fila canónica o RowError).
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for raw in reader:
+            yield reader.line_num, _canonical(raw)
+        return
+    for line_no, line in enumerate(text, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            raw = json.loads(line)
+        except ValueError as e:
+            yield line_no, RowError(f"JSON inválido: {e}")
+            continue
+        if not isinstance(raw, dict):
+            yield line_no, RowError("Se esperaba un objeto JSON por línea")
+            continue
+        yield line_no, _canonical(raw)
+
+
+def _contact_key(row: Row) -> Optional[str]:
+    """Clave de deduplicación dentro del archivo: email o, sin él, teléfono."""
+    if row.get("email"):
+        return row["email"]
+    phone = row.get("phone") or row.get("mobile")
+    return f"tel:{phone}" if phone else None
+
+
+def _partner_values(row: Row) -> Dict[str, Any]:
+    values = {
+        "name": row.get("contact_name")
+        or row.get("partner_name")
+        or row.get("email")
+        or row.get("phone")
+        or row.get("mobile"),
+    }
+    for field in ("email", "phone", "mobile", "city"):
+        if row.get(field):
+            values[field] = row[field]
+    return values
+
+
+def _lead_values(row: Row, partner_id: int, defaults: Dict[str, Any]) -> Dict[str, Any]:
+    contact = row.get("contact_name") or row.get("partner_name") or row.get("email")
+    values = {
+        "name": row.get("name") or f"{contact} (importado)",
+        "type": "lead",
+        "partner_id": partner_id,
+    }
+    for source, field in (
+        ("contact_name", "contact_name"),
+        ("partner_name", "partner_name"),
+        ("email", "email_from"),
+        ("city", "city"),
+        ("description", "description"),
+    ):
+        if row.get(source):
+            values[field] = row[source]
+    phone = row.get("phone") or row.get("mobile")
+    if phone:
+        values["phone"] = phone
+    values.update(defaults)
+    return values
+
+
+class _Import:
+    """Estado de una importación: contactos ya resueltos y contadores."""
+
+    def __init__(self, client, defaults: Dict[str, Any]):
+        self.client = client
+        self.defaults = defaults
+        self.index = index_for(client)
+        self.partners: Dict[str, int] = {}  # _contact_key → partner_id
+        self.result = {
+            "rows": 0,
+            "leads_created": 0,
+            "partners_created": 0,
+            "partners_existing": 0,
+            "skipped": 0,
+            "errors": [],
+        }
+
+    def error(self, line: int, message: str):
+        self.result["skipped"] += 1
+        if len(self.result["errors"]) < MAX_ERRORS:
+            self.result["errors"].append({"line": line, "error": message})
+
+    def batch(self, batch: List[Tuple[int, Row]]):
+        rows = normalize_contacts([row for _, row in batch])
+        valid: List[Tuple[int, Row, str]] = []
+        for (line, _), row in zip(batch, rows):
+            email = row.get("email")
+            if email and (email == INVALID_EMAIL or not is_valid_email(email)):
+                row.pop("email")
+            key = _contact_key(row)
+            if key is None:
+                self.error(line, "Fila sin email ni teléfono válidos")
+                continue
+            valid.append((line, row, key))
+        if not valid:
+            return
+
+        # Partners existentes: índice local + una búsqueda para el resto
+        emails = [
+            row["email"]
+            for _, row, key in valid
+            if row.get("email") and key not in self.partners
+        ]
+        if emails:
+            existing = self.index.lookup_many(self.client, emails)
+            for email, entry in existing.items():
+                if email not in self.partners:
+                    self.partners[email] = entry.id
+                    self.result["partners_existing"] += 1
+
+        # Partners nuevos: un solo create para todo el lote
+        new: Dict[str, Row] = {}
+        for _, row, key in valid:
+            if key not in self.partners and key not in new:
+                new[key] = row
+        if new:
+            try:
+                ids = self.client.create_many(
+                    "res.partner", [_partner_values(row) for row in new.values()]
+                )
+            except Exception as e:
+                log.error("Error creando %d partners del lote: %s", len(new), e)
+                for line, _, key in valid:
+                    if key in new:
+                        self.error(line, f"Error creando el partner: {e}")
+                valid = [item for item in valid if item[2] not in new]
+            else:
+                for (key, row), partner_id in zip(new.items(), ids):
+                    self.partners[key] = partner_id
+                    if row.get("email"):
+                        name = _partner_values(row)["name"]
+                        self.index.record(row["email"], PartnerEntry(partner_id, name))
+                self.result["partners_created"] += len(ids)
+        if not valid:
+            return
+
+        # Leads: otro create para todo el lote
+        try:
+            lead_ids = self.client.create_many(
+                "crm.lead",
+                [
+                    _lead_values(row, self.partners[key], self.defaults)
+                    for _, row, key in valid
+                ],
+            )
+        except Exception as e:
+            log.error("Error creando %d leads del lote: %s", len(valid), e)
+            for line, _, _ in valid:
+                self.error(line, f"Error creando el lead: {e}")
+            return
+        self.result["leads_created"] += len(lead_ids)
+
+
+def import_leads(
+    client,
+    rows: Iterator[Tuple[int, Any]],
+    batch_size: int = BATCH_SIZE,
+    defaults: Optional[Dict[str, Any]] = None,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Importa leads por lotes.
+
+    Args:
+        client: Cliente Odoo con search_read y create_many (DevOdooCRMClient)
+        rows: Salida de `iter_rows`
+        batch_size: Filas por lote (y por create)
+        defaults: Valores para todos los leads (p.ej. {"user_id": 7})
+        progress: Se llama con el resultado parcial después de cada lote
+
+    Returns:
+        {"rows", "leads_created", "partners_created", "partners_existing",
+         "skipped", "errors": [{"line", "error"}] (los primeros MAX_ERRORS)}
+    """
+    state = _Import(client, defaults or {})
+    batch: List[Tuple[int, Row]] = []
+    for line, row in rows:
+        state.result["rows"] += 1
+        if isinstance(row, RowError):
+            state.error(line, str(row))
+            continue
+        batch.append((line, row))
+        if len(batch) >= batch_size:
+            state.batch(batch)
+            batch = []
+            if progress:
+                progress(state.result)
+    if batch:
+        state.batch(batch)
+        if progress:
+            progress(state.result)
+    log.info(
+        "Importación de leads: %d filas, %d leads, %d partners nuevos, %d omitidas",
+        state.result["rows"],
+        state.result["leads_created"],
+        state.result["partners_created"],
+        state.result["skipped"],
+    )
+    return state.result
@@ -0,0 +1,240 @@
+"""
+Log
+===
+Logging estructurado por niveles para el servicio.
+
+Uso:
+    from core.log import get_logger
+    log = get_logger(__name__)
+    log.info("Cotización %s completada", tracking_id, extra={"tracking_id": tracking_id})
+
+Los mensajes usan formateo perezoso (`%s` + argumentos): si el nivel está
+suprimido no se formatea nada. Los registros habilitados se encolan sin
+bloquear con el mensaje y la traza ya resueltos (los argumentos pueden cambiar
+después), y un thread de fondo (`QueueListener`) les da formato y los escribe
+en stdout, así el hilo de la petición no espera por I/O.
+
+Variables de entorno:
+    LOG_LEVEL          Nivel global (default INFO)
+    LOG_LEVELS         Niveles por módulo: "tools.crm=DEBUG,core.whatsapp=WARNING"
+    LOG_FORMAT         "text" (default) o "json" (una línea JSON por registro)
+    LOG_DEBUG_RATE     Máximo de DEBUG por segundo por sitio de llamada (default 20, 0 = sin límite)
+    LOG_DEBUG_SAMPLE   Fracción de DEBUG que se emite, 0-1 (default 1)
+    LOG_QUEUE_SIZE     Capacidad de la cola del sink (default 10000)
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+# Atributos estándar de LogRecord (el resto son campos `extra`)
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_configured = False
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita y muestrea registros DEBUG por sitio de llamada (logger + plantilla).
+
+    Los registros descartados se cuentan y el siguiente registro emitido del
+    mismo sitio lleva `suppressed=<n>`.
+    """
+
+    def __init__(self, rate: float = 20.0, sample: float = 1.0):
+        super().__init__()
+        self.rate = rate
+        self.sample = sample
+        self._windows: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        if self.sample < 1.0 and random.random() >= self.sample:
+            return False
+        if self.rate <= 0:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= 1.0:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 4096:
+                    self._windows.clear()
+            elif window[1] < self.rate:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+_EXC_FORMATTER = logging.Formatter()
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler que descarta (y cuenta) en lugar de bloquear si la cola está llena."""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Como QueueHandler.prepare: mensaje y traza se resuelven aquí, porque
+        # los args y el traceback pueden cambiar o liberarse antes de que el
+        # listener los lea. El formato de la línea sigue en el listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _NonBlockingQueueHandler.dropped += 1
+
+
+class TextFormatter(logging.Formatter):
+    """`2026-01-30 10:00:00 INFO tools.crm: mensaje key=value`"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = {k: v for k, v in vars(record).items() if k not in _RESERVED}
+        if extras:
+            line += " " + " ".join(f"{k}={v}" for k, v in extras.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro, con los campos `extra` al nivel superior."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _parse_levels(spec: str) -> Dict[str, int]:
+    levels = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return {k: v for k, v in levels.items() if isinstance(v, int)}
+
+
+def configure(
+    level: Optional[str] = None,
+    module_levels: Optional[str] = None,
+    fmt: Optional[str] = None,
+    force: bool = False,
+):
+    """
+    Configura el logging del proceso (idempotente).
+
+    Args:
+        level: Nivel global (default: LOG_LEVEL o INFO)
+        module_levels: Niveles por módulo "mod=NIVEL,..." (default: LOG_LEVELS)
+        fmt: "text" o "json" (default: LOG_FORMAT)
+        force: Reconfigurar aunque ya esté configurado
+    """
+    global _configured, _listener
+
+    with _configure_lock:
+        if _configured and not force:
+            return
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+        level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+        module_levels = (
+            module_levels if module_levels is not None else os.getenv("LOG_LEVELS", "")
+        )
+        fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+        sink = _NonBlockingQueueHandler(
+            queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        )
+        sink.addFilter(
+            RateLimitFilter(
+                rate=float(os.getenv("LOG_DEBUG_RATE", "20")),
+                sample=float(os.getenv("LOG_DEBUG_SAMPLE", "1")),
+            )
+        )
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, _NonBlockingQueueHandler):
+                root.removeHandler(handler)
+        root.addHandler(sink)
+        root.setLevel(level)
+
+        for name, module_level in _parse_levels(module_levels).items():
+            logging.getLogger(name).setLevel(module_level)
+
+        _listener = logging.handlers.QueueListener(sink.queue, stream)
+        _listener.start()
+        if not _configured:
+            atexit.register(shutdown)
+        _configured = True
+
+
+def shutdown():
+    """Vacía la cola del sink y detiene el listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_count() -> int:
+    """Registros descartados porque la cola del sink estaba llena."""
+    return _NonBlockingQueueHandler.dropped
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Obtiene un logger de módulo (configura el logging en el primer uso)."""
+    if not _configured:
+        configure()
+    return logging.getLogger(name)
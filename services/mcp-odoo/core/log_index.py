@@ -0,0 +1,386 @@
+"""
+Log Index
+=========
+Índice SQLite (con FTS5 cuando está disponible) sobre los eventos JSONL de
+cotizaciones y handoffs.
+
+El escritor de segmentos alimenta el índice por lotes; cada fila guarda el
+segmento y el offset del evento para poder recuperar el registro completo
+(localmente o desde el archivo en S3).
+"""
+
+import base64
+import gzip
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    event TEXT,
+    tracking_id TEXT,
+    handoff_id TEXT,
+    status TEXT,
+    lead_id INTEGER,
+    sale_order_id INTEGER,
+    assigned_user_id INTEGER,
+    error TEXT,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    UNIQUE (segment, offset)
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_tracking ON events (tracking_id, ts);
+CREATE INDEX IF NOT EXISTS idx_events_handoff ON events (handoff_id);
+CREATE INDEX IF NOT EXISTS idx_events_status ON events (status, ts);
+CREATE INDEX IF NOT EXISTS idx_events_lead ON events (lead_id);
+CREATE INDEX IF NOT EXISTS idx_events_order ON events (sale_order_id);
+CREATE INDEX IF NOT EXISTS idx_events_user ON events (assigned_user_id, ts);
+CREATE TABLE IF NOT EXISTS segments (
+    name TEXT PRIMARY KEY,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(error, body);
+"""
+
+# Columnas filtrables por igualdad en query()
+_FILTERS = (
+    "event",
+    "tracking_id",
+    "handoff_id",
+    "status",
+    "lead_id",
+    "sale_order_id",
+    "assigned_user_id",
+)
+
+_COLUMNS = (
+    "id, ts, event, tracking_id, handoff_id, status, lead_id, sale_order_id, "
+    "assigned_user_id, error, segment, offset"
+)
+
+
+def _as_int(value: Any) -> Optional[int]:
+    if isinstance(value, bool) or value in (None, ""):
+        return None
+    if isinstance(value, list) and value:
+        value = value[0]
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Extrae las columnas indexadas de un evento (cotización o handoff)."""
+    output = record.get("output") or {}
+    input_data = record.get("input") or {}
+    request = record.get("request") or {}
+    vendor = record.get("vendor_assignment") or {}
+    client_info = record.get("client_info") or {}
+
+    if not isinstance(output, dict):
+        output = {}
+    if not isinstance(input_data, dict):
+        input_data = {}
+
+    body_parts = [
+        input_data.get("partner_name"),
+        input_data.get("contact_name"),
+        input_data.get("email"),
+        input_data.get("lead_name"),
+        output.get("sale_order_name"),
+        request.get("reason"),
+        request.get("additional_context"),
+        client_info.get("name"),
+        client_info.get("phone"),
+    ]
+
+    return {
+        "ts": str(record.get("ts") or record.get("timestamp") or ""),
+        "event": record.get("event") or record.get("type"),
+        "tracking_id": record.get("tracking_id"),
+        "handoff_id": record.get("handoff_id"),
+        "status": record.get("status"),
+        "lead_id": _as_int(output.get("lead_id") or request.get("lead_id")),
+        "sale_order_id": _as_int(
+            output.get("sale_order_id") or request.get("sale_order_id")
+        ),
+        "assigned_user_id": _as_int(
+            output.get("user_id") or vendor.get("user_id") or input_data.get("user_id")
+        ),
+        "error": record.get("error"),
+        "body": " ".join(str(p) for p in body_parts if p),
+    }
+
+
+def encode_cursor(ts: str, row_id: int) -> str:
+    """Cursor opaco para paginar en orden (ts, id) descendente."""
+    raw = json.dumps([ts, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decodifica un cursor de `encode_cursor` (ValueError si es inválido)."""
+    try:
+        ts, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(ts), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {cursor!r}") from e
+
+
+class LogIndex:
+    """Índice consultable de eventos de log."""
+
+    def __init__(self, db_path: Path):
+        """
+        Abre (o crea) el índice.
+
+        Args:
+            db_path: Ruta del archivo SQLite
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            # SQLite compilado sin FTS5: la búsqueda de texto usa LIKE
+            self.fts_enabled = False
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def add(self, written: Iterable[Tuple[Dict[str, Any], str, int]]) -> int:
+        """
+        Indexa un lote de eventos (callback del escritor de segmentos).
+
+        Args:
+            written: Iterable de (registro, segmento, offset)
+
+        Returns:
+            Cantidad de eventos nuevos indexados
+        """
+        rows = []
+        for record, segment_name, offset in written:
+            fields = extract_fields(record)
+            rows.append((fields, segment_name, offset))
+        return self._insert(rows)
+
+    def _insert(self, rows: List[Tuple[Dict[str, Any], str, int]]) -> int:
+        inserted = 0
+        with self._lock:
+            cur = self._conn.cursor()
+            for fields, segment_name, offset in rows:
+                cur.execute(
+                    "INSERT OR IGNORE INTO events (ts, event, tracking_id, handoff_id, "
+                    "status, lead_id, sale_order_id, assigned_user_id, error, segment, "
+                    "offset) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        fields["ts"],
+                        fields["event"],
+                        fields["tracking_id"],
+                        fields["handoff_id"],
+                        fields["status"],
+                        fields["lead_id"],
+                        fields["sale_order_id"],
+                        fields["assigned_user_id"],
+                        fields["error"],
+                        segment_name,
+                        offset,
+                    ),
+                )
+                if not cur.rowcount:
+                    continue
+                inserted += 1
+                if self.fts_enabled and (fields["error"] or fields["body"]):
+                    cur.execute(
+                        "INSERT INTO events_fts (rowid, error, body) VALUES (?, ?, ?)",
+                        (cur.lastrowid, fields["error"] or "", fields["body"]),
+                    )
+            self._conn.commit()
+        return inserted
+
+    def mark_complete(self, segment_path: Path):
+        """Marca un segmento cerrado como completamente indexado."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO segments (name, complete) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET complete = 1",
+                (Path(segment_path).name,),
+            )
+            self._conn.commit()
+
+    def is_complete(self, segment_name: str) -> bool:
+        """Indica si un segmento ya fue indexado por completo."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT complete FROM segments WHERE name = ?", (segment_name,)
+            ).fetchone()
+        return bool(row and row["complete"])
+
+    def index_stream(self, segment_name: str, stream: BinaryIO) -> int:
+        """
+        Indexa un segmento completo leído desde un stream (JSONL sin comprimir).
+
+        Es idempotente: los eventos ya indexados (mismo segmento y offset) se ignoran.
+        """
+        rows = []
+        inserted = 0
+        offset = 0
+        for line in stream:
+            line_offset = offset
+            offset += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            rows.append((extract_fields(record), segment_name, line_offset))
+            if len(rows) >= 500:
+                inserted += self._insert(rows)
+                rows = []
+        inserted += self._insert(rows)
+        return inserted
+
+    def index_segment(self, path: Path, complete: bool = True) -> int:
+        """Indexa un segmento local (`.jsonl`, `.jsonl.part` o `.jsonl.gz`)."""
+        path = Path(path)
+        name = path.name
+        opener = open
+        if name.endswith(".gz"):
+            name = name[: -len(".gz")]
+            opener = gzip.open
+        if name.endswith(".part"):
+            name = name[: -len(".part")]
+            complete = False
+        with opener(path, "rb") as stream:
+            inserted = self.index_stream(name, stream)
+        if complete:
+            self.mark_complete(Path(name))
+        return inserted
+
+    def delete_segment(self, segment_name: str):
+        """Elimina del índice los eventos de un segmento."""
+        with self._lock:
+            if self.fts_enabled:
+                self._conn.execute(
+                    "DELETE FROM events_fts WHERE rowid IN "
+                    "(SELECT id FROM events WHERE segment = ?)",
+                    (segment_name,),
+                )
+            self._conn.execute("DELETE FROM events WHERE segment = ?", (segment_name,))
+            self._conn.execute("DELETE FROM segments WHERE name = ?", (segment_name,))
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        text: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        **filters: Any,
+    ) -> Dict[str, Any]:
+        """
+        Consulta eventos indexados, del más reciente al más antiguo.
+
+        Args:
+            since: Timestamp ISO mínimo (inclusive), p.ej. "2025-12-22"
+            until: Timestamp ISO máximo (exclusivo)
+            text: Búsqueda de texto en error/razón/contexto/nombres
+            cursor: Cursor de la página anterior (`next_cursor`)
+            limit: Máximo de eventos por página (1-500)
+            **filters: Igualdad sobre event, tracking_id, handoff_id, status,
+                lead_id, sale_order_id, assigned_user_id
+
+        Returns:
+            {"items": [...], "next_cursor": str | None}
+        """
+        limit = max(1, min(int(limit), 500))
+        where: List[str] = []
+        params: List[Any] = []
+
+        for name in _FILTERS:
+            value = filters.get(name)
+            if value is None or value == "":
+                continue
+            where.append(f"e.{name} = ?")
+            params.append(value)
+
+        unknown = set(filters) - set(_FILTERS)
+        if unknown:
+            raise ValueError(f"Filtros desconocidos: {', '.join(sorted(unknown))}")
+
+        if since:
+            where.append("e.ts >= ?")
+            params.append(since)
+        if until:
+            where.append("e.ts < ?")
+            params.append(until)
+
+        join = ""
+        if text:
+            if self.fts_enabled:
+                terms = " ".join(
+                    '"' + t.replace('"', '""') + '"' for t in text.split() if t
+                )
+                join = "JOIN events_fts f ON f.rowid = e.id"
+                where.append("events_fts MATCH ?")
+                params.append(terms)
+            else:
+                where.append("(e.error LIKE ?)")
+                params.append(f"%{text}%")
+
+        if cursor:
+            ts, row_id = decode_cursor(cursor)
+            where.append("(e.ts < ? OR (e.ts = ? AND e.id < ?))")
+            params.extend([ts, ts, row_id])
+
+        sql = (
+            f"SELECT {', '.join('e.' + c.strip() for c in _COLUMNS.split(','))} "
+            f"FROM events e {join}"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY e.ts DESC, e.id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        items = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(last["ts"], last["id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    def count(self) -> int:
+        """Cantidad total de eventos indexados."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def close(self):
+        """Cierra la conexión SQLite."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,290 @@
+"""
+Log Shipper
+===========
+Envío en segundo plano de segmentos JSONL cerrados a S3.
+
+Cada segmento se comprime con gzip y se sube con el transfer manager de boto3
+(multipart a partir de `multipart_threshold`, con concurrencia limitada). Un
+manifiesto local registra los segmentos ya enviados, de modo que al reiniciar
+el proceso se reanudan los pendientes sin duplicar los que ya están en S3.
+
+Cualquier objeto con `upload_file(Filename, Bucket, Key, ExtraArgs=, Config=)`
+sirve como cliente, lo que permite probarlo contra un S3 local (MinIO, moto)
+o un stand-in en memoria.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from core import tracing
+from core.log import get_logger
+from core.log_writer import iter_segments, segment_date
+
+log = get_logger(__name__)
+
+
+MANIFEST_NAME = ".shipper_manifest.json"
+
+
+class LogShipper:
+    """Comprime y sube a S3 los segmentos cerrados, con manifiesto de reanudación."""
+
+    def __init__(
+        self,
+        log_dir: Path,
+        bucket_name: str,
+        s3_client: Any,
+        prefix: str = "mcp-odoo-logs",
+        max_concurrency: int = 2,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunksize: int = 8 * 1024 * 1024,
+        scan_interval: float = 60.0,
+        manifest_path: Optional[Path] = None,
+    ):
+        """
+        Inicializa el shipper y arranca su thread.
+
+        Args:
+            log_dir: Directorio de segmentos
+            bucket_name: Bucket S3 destino
+            s3_client: Cliente S3 (boto3 o stand-in compatible)
+            prefix: Prefijo de las keys (se agrega YYYY/MM/)
+            max_concurrency: Segmentos subiéndose en paralelo (y partes por segmento)
+            multipart_threshold: Bytes a partir de los cuales se usa multipart
+            multipart_chunksize: Tamaño de cada parte multipart
+            scan_interval: Segundos entre escaneos del directorio (reintentos)
+            manifest_path: Ruta del manifiesto (default: <log_dir>/.shipper_manifest.json)
+        """
+        self.log_dir = Path(log_dir)
+        self.bucket_name = bucket_name
+        self.s3_client = s3_client
+        self.prefix = prefix.strip("/")
+        self.max_concurrency = max_concurrency
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = multipart_chunksize
+        self.scan_interval = scan_interval
+        self.manifest_path = Path(manifest_path or self.log_dir / MANIFEST_NAME)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+        self._in_flight: Set[str] = set()
+        self._pending: Dict[str, float] = {}
+
+        self.shipped = 0
+        self.failed = 0
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="log-shipper-upload"
+        )
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="log-shipper", daemon=True
+        )
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def notify(self, segment_path: Path):
+        """Avisa que un segmento se cerró (callback del escritor)."""
+        with self._lock:
+            if segment_path.name not in self._manifest:
+                self._pending.setdefault(segment_path.name, time.time())
+        self._idle.clear()
+        self._wakeup.set()
+
+    def is_shipped(self, segment_name: str) -> bool:
+        """Indica si un segmento ya está en S3 según el manifiesto."""
+        with self._lock:
+            return segment_name in self._manifest
+
+    def s3_key(self, segment_name: str) -> str:
+        """Key S3 del segmento comprimido: <prefix>/YYYY/MM/<segmento>.gz"""
+        date_str = segment_date(segment_name) or datetime.now().strftime("%Y-%m-%d")
+        date_prefix = date_str[:7].replace("-", "/")
+        return f"{self.prefix}/{date_prefix}/{segment_name}.gz"
+
+    def pending_segments(self) -> List[str]:
+        """Segmentos cerrados que aún no se han subido."""
+        with self._lock:
+            return sorted(self._pending)
+
+    def lag_seconds(self) -> float:
+        """Antigüedad del segmento pendiente más viejo (0 si no hay pendientes)."""
+        with self._lock:
+            if not self._pending:
+                return 0.0
+            return max(0.0, time.time() - min(self._pending.values()))
+
+    def drain(self, timeout: Optional[float] = 30.0) -> bool:
+        """Espera a que no queden segmentos pendientes ni subidas en curso."""
+        self._wakeup.set()
+        return self._idle.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Intenta vaciar los pendientes y detiene el thread."""
+        if self._closed:
+            return
+        self.drain(timeout)
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Thread principal
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        self._scan()
+        while not self._closed:
+            self._dispatch()
+            woken = self._wakeup.wait(self.scan_interval)
+            self._wakeup.clear()
+            if self._closed:
+                return
+            if not woken:
+                # Timeout: reescanear para reintentar fallos y segmentos nuevos
+                self._scan()
+
+    def _scan(self):
+        """Busca segmentos cerrados que no estén en el manifiesto."""
+        now = time.time()
+        for path in iter_segments(self.log_dir, include_active=False):
+            with self._lock:
+                if path.name in self._manifest:
+                    continue
+                try:
+                    mtime = path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                self._pending.setdefault(path.name, min(mtime, now))
+
+    def _dispatch(self):
+        with self._lock:
+            ready = [
+                name for name in sorted(self._pending) if name not in self._in_flight
+            ]
+            self._in_flight.update(ready)
+            busy = bool(self._pending) or bool(self._in_flight)
+        for name in ready:
+            self._executor.submit(self._ship, name)
+        if not busy:
+            self._idle.set()
+
+    def _ship(self, segment_name: str):
+        segment_path = self.log_dir / segment_name
+        gz_path = segment_path.with_name(segment_name + ".gz")
+        key = self.s3_key(segment_name)
+        span = tracing.start_trace("s3.ship_segment", segment=segment_name)
+
+        try:
+            if not segment_path.exists():
+                # Eliminado localmente antes de subirse: no hay nada que enviar
+                with self._lock:
+                    self._pending.pop(segment_name, None)
+                return
+
+            with open(segment_path, "rb") as src, gzip.open(gz_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+
+            kwargs = {
+                "ExtraArgs": {
+                    "ContentType": "application/x-ndjson",
+                    "ContentEncoding": "gzip",
+                    "ServerSideEncryption": "AES256",
+                }
+            }
+            transfer_config = self._transfer_config()
+            if transfer_config is not None:
+                kwargs["Config"] = transfer_config
+
+            self.s3_client.upload_file(str(gz_path), self.bucket_name, key, **kwargs)
+
+            entry = {
+                "key": key,
+                "bytes": segment_path.stat().st_size,
+                "compressed_bytes": gz_path.stat().st_size,
+                "shipped_at": datetime.now().isoformat(),
+            }
+            with self._lock:
+                self._manifest[segment_name] = entry
+                self._pending.pop(segment_name, None)
+                self._save_manifest()
+            self.shipped += 1
+            log.info("Segmento enviado a S3: s3://%s/%s", self.bucket_name, key)
+
+        except Exception as e:
+            span.end(e)
+            self.failed += 1
+            log.error(
+                "Error enviando segmento %s a S3: %s: %s (reintento en %.0fs)",
+                segment_name,
+                type(e).__name__,
+                e,
+                self.scan_interval,
+            )
+        finally:
+            span.end()
+            try:
+                gz_path.unlink()
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self._in_flight.discard(segment_name)
+                done = not self._pending and not self._in_flight
+            if done:
+                self._idle.set()
+
+    def _transfer_config(self):
+        """TransferConfig de boto3 (None si boto3 no está disponible)."""
+        try:
+            from boto3.s3.transfer import TransferConfig
+        except ImportError:
+            return None
+        return TransferConfig(
+            multipart_threshold=self.multipart_threshold,
+            multipart_chunksize=self.multipart_chunksize,
+            max_concurrency=self.max_concurrency,
+            use_threads=self.max_concurrency > 1,
+        )
+
+    # ------------------------------------------------------------------
+    # Manifiesto
+    # ------------------------------------------------------------------
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("segments", {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning("Manifiesto de envío ilegible (%s), se reenviarán segmentos", e)
+            return {}
+
+    def _save_manifest(self):
+        """Escribe el manifiesto de forma atómica (tmp + rename)."""
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"segments": self._manifest}, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def forget(self, segment_name: str):
+        """Elimina un segmento del manifiesto (tras borrarlo localmente)."""
+        with self._lock:
+            if self._manifest.pop(segment_name, None) is not None:
+                self._save_manifest()
@@ -0,0 +1,383 @@
+"""
+Log Writer
+==========
+Escritor append-only de eventos en formato JSONL.
+
+Los eventos se encolan desde los threads de petición y un thread de fondo los
+escribe en segmentos por fecha (`YYYY-MM-DD_HHMMSS_<id>.jsonl`). El segmento
+activo lleva la extensión `.part` y se renombra a `.jsonl` al cerrarse (cambio
+de día, tamaño o antigüedad máxima). Los fsync se hacen por lotes, y cada
+lote llega a los callbacks antes de que se cierre su segmento.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.log import get_logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+log = get_logger(__name__)
+
+ACTIVE_SUFFIX = ".part"
+SEGMENT_SUFFIX = ".jsonl"
+
+# Callback por lote escrito: lista de (registro, nombre_de_segmento, offset)
+BatchCallback = Callable[[List[Tuple[Dict[str, Any], str, int]]], None]
+SegmentCallback = Callable[[Path], None]
+
+
+class _Flush:
+    """Marcador en cola para forzar fsync y avisar cuando terminó."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = True
+
+
+_STOP = object()
+
+
+def segment_date(name: str) -> Optional[str]:
+    """Extrae la fecha (YYYY-MM-DD) del nombre de un segmento o log legacy."""
+    date_str = Path(name).name.split("_", 1)[0]
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        return None
+    return date_str
+
+
+def iter_segments(log_dir: Path, include_active: bool = True) -> List[Path]:
+    """Lista los segmentos JSONL del directorio en orden cronológico."""
+    paths = list(log_dir.glob(f"*{SEGMENT_SUFFIX}"))
+    if include_active:
+        paths += list(log_dir.glob(f"*{SEGMENT_SUFFIX}{ACTIVE_SUFFIX}"))
+    return sorted(paths, key=lambda p: p.name)
+
+
+def is_orphan_segment(path: Path) -> bool:
+    """
+    Indica si un segmento `.part` quedó huérfano (su escritor ya no existe).
+
+    El escritor mantiene un flock exclusivo sobre su segmento activo; si el
+    lock se puede tomar, nadie lo está escribiendo.
+    """
+    if fcntl is None:
+        return False
+    try:
+        with open(path, "ab") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return True
+    except OSError:
+        return False
+
+
+def recover_orphan_segments(log_dir: Path) -> List[Path]:
+    """Cierra (renombra a `.jsonl`) los segmentos `.part` sin escritor vivo."""
+    recovered = []
+    for path in log_dir.glob(f"*{SEGMENT_SUFFIX}{ACTIVE_SUFFIX}"):
+        if is_orphan_segment(path):
+            closed = path.with_name(path.name[: -len(ACTIVE_SUFFIX)])
+            os.replace(path, closed)
+            recovered.append(closed)
+    return recovered
+
+
+class SegmentWriter:
+    """Escribe registros JSONL en segmentos por fecha desde un thread de fondo."""
+
+    def __init__(
+        self,
+        log_dir: Path,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_age: float = 900.0,
+        fsync_batch: int = 64,
+        fsync_interval: float = 1.0,
+        queue_size: int = 10000,
+        on_segment_closed: Optional[SegmentCallback] = None,
+    ):
+        """
+        Inicializa el escritor y arranca su thread.
+
+        Args:
+            log_dir: Directorio de segmentos
+            max_segment_bytes: Tamaño máximo de un segmento antes de rotar
+            max_segment_age: Segundos máximos que un segmento permanece abierto
+            fsync_batch: Registros escritos entre fsync
+            fsync_interval: Segundos máximos entre fsync con datos pendientes
+            queue_size: Capacidad de la cola (al llenarse se descartan eventos)
+            on_segment_closed: Callback con la ruta de cada segmento cerrado
+        """
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._segment_closed_callbacks: List[SegmentCallback] = []
+        self._batch_callbacks: List[BatchCallback] = []
+        if on_segment_closed:
+            self._segment_closed_callbacks.append(on_segment_closed)
+
+        self._file = None
+        self._path: Optional[Path] = None
+        self._date: Optional[str] = None
+        self._opened_at = 0.0
+        self._size = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        self.written = 0
+        self.dropped = 0
+
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="log-segment-writer", daemon=True
+        )
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # API pública (llamada desde cualquier thread)
+    # ------------------------------------------------------------------
+
+    def add_segment_closed_callback(self, callback: SegmentCallback):
+        """Registra un callback que recibe cada segmento cerrado."""
+        self._segment_closed_callbacks.append(callback)
+
+    def add_batch_callback(self, callback: BatchCallback):
+        """Registra un callback que recibe cada lote escrito."""
+        self._batch_callbacks.append(callback)
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """
+        Encola un registro sin bloquear.
+
+        Returns:
+            False si la cola estaba llena y el registro se descartó
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                log.warning("Cola de logs llena, %d eventos descartados", self.dropped)
+            return False
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Espera a que los registros encolados estén escritos y sincronizados.
+        False si la cola sigue llena, vence el timeout o el lote falló.
+        """
+        if self._closed:
+            return True
+        marker = _Flush()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout) and marker.ok
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Vacía la cola, cierra el segmento activo y detiene el thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def queue_depth(self) -> int:
+        """Cantidad de registros pendientes de escribir."""
+        return self._queue.qsize()
+
+    @property
+    def current_segment(self) -> Optional[Path]:
+        """Ruta del segmento activo (None si aún no se ha escrito nada)."""
+        return self._path
+
+    # ------------------------------------------------------------------
+    # Thread de escritura
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            batch: List[Any] = []
+            try:
+                try:
+                    item = self._queue.get(timeout=self.fsync_interval)
+                except queue.Empty:
+                    self._sync()
+                    self._maybe_roll_by_age()
+                    continue
+
+                batch.append(item)
+                while len(batch) < 512:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = self._process(batch)
+                if stop:
+                    self._sync()
+                    self._close_segment()
+                    return
+            except Exception as e:
+                # Un error de disco no detiene el thread: el siguiente lote lo
+                # reintenta. Los flush del lote se liberan y un stop se respeta
+                log.error("Error en el escritor de log: %s: %s", type(e).__name__, e)
+                for pending in batch:
+                    if isinstance(pending, _Flush) and not pending.done.is_set():
+                        pending.ok = False
+                        pending.done.set()
+                if any(pending is _STOP for pending in batch):
+                    return
+
+    def _process(self, batch: List[Any]) -> bool:
+        written: List[Tuple[Dict[str, Any], str, int]] = []
+        stop = False
+
+        for item in batch:
+            if item is _STOP:
+                stop = True
+                continue
+            if isinstance(item, _Flush):
+                self._sync()
+                self._emit_batch(written)
+                written = []
+                item.done.set()
+                continue
+            try:
+                line, date_str = self._encode(item)
+                if self._needs_segment(date_str, len(line)):
+                    # El último lote del segmento sale antes de cerrarlo: quien
+                    # reciba el cierre ya recibió todos sus registros
+                    self._sync()
+                    self._emit_batch(written)
+                    written = []
+                    self._open_segment(date_str)
+                written.append(self._write_record(item, line))
+            except Exception as e:
+                log.error("Error escribiendo evento de log: %s: %s", type(e).__name__, e)
+
+        if self._unsynced >= self.fsync_batch or (
+            self._unsynced
+            and time.monotonic() - self._last_sync >= self.fsync_interval
+        ):
+            self._sync()
+
+        self._emit_batch(written)
+        return stop
+
+    def _encode(self, record: Dict[str, Any]) -> Tuple[bytes, str]:
+        """Línea JSONL del registro y la fecha de su segmento."""
+        line = (
+            json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+            + "\n"
+        ).encode("utf-8")
+
+        date_str = str(record.get("ts", ""))[:10] or datetime.now().strftime(
+            "%Y-%m-%d"
+        )
+        return line, date_str
+
+    def _needs_segment(self, date_str: str, length: int) -> bool:
+        """Si la línea requiere abrir un segmento nuevo (o el primero)."""
+        return (
+            self._file is None
+            or date_str != self._date
+            or self._size + length > self.max_segment_bytes
+            or time.monotonic() - self._opened_at >= self.max_segment_age
+        )
+
+    def _write_record(
+        self, record: Dict[str, Any], line: bytes
+    ) -> Tuple[Dict[str, Any], str, int]:
+        """Agrega la línea al segmento activo: (registro, segmento, offset)."""
+        offset = self._size
+        self._file.write(line)
+        self._size += len(line)
+        self._unsynced += 1
+        self.written += 1
+        return record, self._segment_name(), offset
+
+    def _segment_name(self) -> str:
+        """Nombre estable del segmento activo (sin la extensión `.part`)."""
+        return self._path.name[: -len(ACTIVE_SUFFIX)]
+
+    def _open_segment(self, date_str: str):
+        self._sync()
+        self._close_segment()
+
+        stamp = datetime.now().strftime("%H%M%S")
+        name = f"{date_str}_{stamp}_{uuid.uuid4().hex[:6]}{SEGMENT_SUFFIX}{ACTIVE_SUFFIX}"
+        self._path = self.log_dir / name
+        self._file = open(self._path, "ab")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._date = date_str
+        self._opened_at = time.monotonic()
+        self._size = 0
+
+    def _maybe_roll_by_age(self):
+        if (
+            self._file is not None
+            and self._size
+            and time.monotonic() - self._opened_at >= self.max_segment_age
+        ):
+            self._close_segment()
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        path = self._path
+        self._file.close()
+        self._file = None
+        self._path = None
+        self._date = None
+
+        closed = path.with_name(path.name[: -len(ACTIVE_SUFFIX)])
+        if path.stat().st_size == 0:
+            path.unlink()
+            return
+        os.replace(path, closed)
+
+        for callback in self._segment_closed_callbacks:
+            try:
+                callback(closed)
+            except Exception as e:
+                log.warning("Error en callback de segmento cerrado: %s", e)
+
+    def _sync(self):
+        if self._file is None or not self._unsynced:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _emit_batch(self, written: List[Tuple[Dict[str, Any], str, int]]):
+        if not written:
+            return
+        for callback in self._batch_callbacks:
+            try:
+                callback(written)
+            except Exception as e:
+                log.warning("Error en callback de lote de logs: %s", e)
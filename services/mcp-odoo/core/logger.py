@@ -1,15 +1,39 @@
 """
-Logger para guardar flujos de entrada/salida en JSON y subirlos a S3.
+Logger para registrar flujos de entrada/salida como eventos JSONL y subirlos a S3.
+
+Los eventos se encolan y un thread de fondo (`SegmentWriter`) los escribe en
+segmentos por fecha; los segmentos cerrados se comprimen y se envían a S3 en
+segundo plano (`LogShipper`).
 """
 
+import atexit
+import gzip
+import io
 import json
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any
 import boto3
 from botocore.exceptions import ClientError
 
+from core.log import get_logger
+from core.log_index import LogIndex
+from core.log_shipper import LogShipper
+from core.log_writer import (
+    ACTIVE_SUFFIX,
+    SEGMENT_SUFFIX,
+    SegmentWriter,
+    iter_segments,
+    recover_orphan_segments,
+    segment_date,
+)
+from core.metrics import LOG_DROPPED, LOG_QUEUE_DEPTH, S3_SHIP_LAG, S3_SHIP_PENDING
+
+log = get_logger(__name__)
+
 
 class QuotationLogger:
     """Gestiona el logging de cotizaciones y subida a S3"""
@@ -19,6 +43,13 @@ class QuotationLogger:
         log_dir: str = "/tmp/mcp_odoo_logs",
         bucket_name: Optional[str] = None,
         aws_region: str = "us-east-1",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_age: float = 900.0,
+        fsync_batch: int = 64,
+        s3_endpoint_url: Optional[str] = None,
+        s3_client: Any = None,
+        ship_concurrency: int = 2,
+        index_path: Optional[str] = None,
     ):
         """
         Inicializa el logger.
@@ -27,42 +58,134 @@ class QuotationLogger:
             log_dir: Directorio local para logs
             bucket_name: Nombre del bucket S3 (None = solo local)
             aws_region: Región de AWS
+            max_segment_bytes: Tamaño máximo de un segmento JSONL
+            max_segment_age: Segundos máximos que un segmento permanece abierto
+            fsync_batch: Eventos escritos entre fsync
+            s3_endpoint_url: Endpoint S3 alternativo (MinIO/moto para pruebas locales)
+            s3_client: Cliente S3 ya construido (reemplaza al de boto3)
+            ship_concurrency: Subidas simultáneas del shipper
+            index_path: Ruta del índice SQLite de eventos (None = sin índice)
         """
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
         self.bucket_name = bucket_name
         self.aws_region = aws_region
-        self.s3_client = None
+        self.s3_client = s3_client
         self.s3_enabled = False
+        self.shipper: Optional[LogShipper] = None
 
         # Inicializar cliente S3 si está configurado
         if self.bucket_name:
             try:
-                print(f"[S3] Inicializando cliente S3...")
-                print(f"[S3] Bucket: {self.bucket_name}")
-                print(f"[S3] Region: {self.aws_region}")
+                log.info(
+                    "Inicializando cliente S3 (bucket=%s, region=%s)",
+                    self.bucket_name,
+                    self.aws_region,
+                )
 
                 # Crear cliente S3 (usará credenciales disponibles automáticamente)
                 # En local: usa ~/.aws/credentials
                 # En App Runner: usa Instance Role si está configurado
-                self.s3_client = boto3.client("s3", region_name=self.aws_region)
+                if self.s3_client is None:
+                    self.s3_client = boto3.client(
+                        "s3", region_name=self.aws_region, endpoint_url=s3_endpoint_url
+                    )
 
                 # Verificar credenciales intentando listar el bucket
                 self.s3_client.head_bucket(Bucket=self.bucket_name)
                 self.s3_enabled = True
-                print(f"✅ Cliente S3 inicializado correctamente")
+                log.info("Cliente S3 inicializado correctamente")
 
             except ClientError as e:
                 error_code = e.response.get("Error", {}).get("Code", "Unknown")
-                print(f"❌ Error de credenciales S3 ({error_code}): {e}")
-                print(f"   → Los logs se guardarán solo localmente en {log_dir}")
+                log.error(
+                    "Error de credenciales S3 (%s): %s → logs solo locales en %s",
+                    error_code,
+                    e,
+                    log_dir,
+                )
                 self.s3_enabled = False
             except Exception as e:
-                print(f"⚠️  No se pudo inicializar cliente S3: {e}")
-                print(f"   → Los logs se guardarán solo localmente en {log_dir}")
+                log.warning(
+                    "No se pudo inicializar cliente S3: %s → logs solo locales en %s",
+                    e,
+                    log_dir,
+                )
                 self.s3_enabled = False
 
+        # Segmentos que quedaron abiertos por un proceso anterior
+        # (el shipper los detecta al escanear el directorio)
+        for segment in recover_orphan_segments(self.log_dir):
+            log.info("Segmento huérfano cerrado: %s", segment.name)
+
+        if self.s3_enabled:
+            self.shipper = LogShipper(
+                self.log_dir,
+                self.bucket_name,
+                self.s3_client,
+                max_concurrency=ship_concurrency,
+            )
+
+        # tracking_id/handoff_id → nombre del segmento con su último evento
+        self._locations: "OrderedDict[str, str]" = OrderedDict()
+        self._max_locations = 10000
+
+        self.writer = SegmentWriter(
+            self.log_dir,
+            max_segment_bytes=max_segment_bytes,
+            max_segment_age=max_segment_age,
+            fsync_batch=fsync_batch,
+            on_segment_closed=self.shipper.notify if self.shipper else None,
+        )
+        self.writer.add_batch_callback(self._remember_locations)
+
+        # Índice consultable de eventos (alimentado por lotes desde el escritor)
+        self.index: Optional[LogIndex] = None
+        if index_path:
+            try:
+                self.index = LogIndex(Path(index_path))
+                self.writer.add_batch_callback(self.index.add)
+                self.writer.add_segment_closed_callback(self.index.mark_complete)
+                threading.Thread(
+                    target=self._backfill_index, name="log-index-backfill", daemon=True
+                ).start()
+            except Exception as e:
+                log.warning("No se pudo abrir el índice de logs (%s): %s", index_path, e)
+                self.index = None
+
+        atexit.register(self.close)
+
+    def _backfill_index(self):
+        """Indexa los segmentos locales cerrados que aún no están en el índice."""
+        indexed = 0
+        for path in iter_segments(self.log_dir, include_active=False):
+            if self.index.is_complete(path.name):
+                continue
+            try:
+                indexed += self.index.index_segment(path)
+            except Exception as e:
+                log.warning("Error indexando %s: %s", path.name, e)
+        if indexed:
+            log.info("Índice de logs: %d eventos indexados desde disco", indexed)
+
+    def _submit(self, record: Dict[str, Any]) -> str:
+        """Encola un registro para el escritor y retorna el segmento activo."""
+        self.writer.submit(record)
+        segment = self.writer.current_segment
+        return str(segment) if segment else str(self.log_dir)
+
+    def _remember_locations(self, written):
+        """Callback del escritor: recuerda en qué segmento quedó cada evento."""
+        for record, segment_name, _offset in written:
+            key = record.get("tracking_id") or record.get("handoff_id")
+            if not key:
+                continue
+            self._locations[key] = segment_name
+            self._locations.move_to_end(key)
+        while len(self._locations) > self._max_locations:
+            self._locations.popitem(last=False)
+
     def log_quotation(
         self,
         tracking_id: str,
@@ -72,7 +195,7 @@ class QuotationLogger:
         error: Optional[str] = None,
     ) -> str:
         """
-        Registra una cotización en formato JSON.
+        Registra una cotización como evento JSONL.
 
         Args:
             tracking_id: ID de seguimiento
@@ -82,36 +205,18 @@ class QuotationLogger:
             error: Mensaje de error si falló
 
         Returns:
-            Ruta del archivo de log
+            Ruta del segmento de log activo
         """
-        timestamp = datetime.now()
-        log_entry = {
+        record = {
+            "ts": datetime.now().isoformat(),
+            "event": "quotation",
             "tracking_id": tracking_id,
-            "timestamp": timestamp.isoformat(),
-            "date": timestamp.strftime("%Y-%m-%d"),
-            "time": timestamp.strftime("%H:%M:%S.%f")[:-3],
             "status": status,
             "input": input_data,
             "output": output_data,
             "error": error,
         }
-
-        # Generar nombre de archivo: YYYY-MM-DD_tracking_id.log
-        date_str = timestamp.strftime("%Y-%m-%d")
-        log_filename = f"{date_str}_{tracking_id}.log"
-        log_path = self.log_dir / log_filename
-
-        # Escribir log en archivo
-        with open(log_path, "w", encoding="utf-8") as f:
-            json.dump(log_entry, f, indent=2, ensure_ascii=False)
-
-        print(f"📝 Log guardado localmente: {log_path}")
-
-        # Subir a S3 si está habilitado
-        if self.s3_enabled:
-            self._upload_to_s3(log_path, log_filename)
-
-        return str(log_path)
+        return self._submit(record)
 
     def update_quotation_log(
         self,
@@ -121,7 +226,10 @@ class QuotationLogger:
         error: Optional[str] = None,
     ):
         """
-        Actualiza un log existente con el resultado final.
+        Registra el resultado final de una cotización.
+
+        No reescribe el evento inicial: agrega un nuevo registro con el mismo
+        tracking_id, por lo que funciona aunque la cotización cruce medianoche.
 
         Args:
             tracking_id: ID de seguimiento
@@ -129,95 +237,168 @@ class QuotationLogger:
             status: Estado final (completed, failed)
             error: Mensaje de error si falló
         """
-        # Buscar el archivo de log
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        log_filename = f"{date_str}_{tracking_id}.log"
-        log_path = self.log_dir / log_filename
-
-        if not log_path.exists():
-            print(f"⚠️  Log no encontrado: {log_path}")
-            return
-
-        # Leer log existente
-        with open(log_path, "r", encoding="utf-8") as f:
-            log_entry = json.load(f)
-
-        # Actualizar con output
-        log_entry["output"] = output_data
-        log_entry["status"] = status
-        log_entry["error"] = error
-        log_entry["updated_at"] = datetime.now().isoformat()
-
-        # Guardar actualización
-        with open(log_path, "w", encoding="utf-8") as f:
-            json.dump(log_entry, f, indent=2, ensure_ascii=False)
+        record = {
+            "ts": datetime.now().isoformat(),
+            "event": "quotation",
+            "tracking_id": tracking_id,
+            "status": status,
+            "output": output_data,
+            "error": error,
+        }
+        self._submit(record)
 
-        print(f"📝 Log actualizado: {log_path}")
+    def get_log_path(self, tracking_id: str) -> Optional[Path]:
+        """
+        Obtiene la ruta del segmento que contiene el último evento de un tracking_id.
 
-        # Subir versión actualizada a S3
-        if self.s3_enabled:
-            self._upload_to_s3(log_path, log_filename)
+        Args:
+            tracking_id: ID de seguimiento (o handoff_id)
 
-    def _upload_to_s3(self, local_path: Path, s3_key: str):
+        Returns:
+            Path del segmento o None si no se conoce
+        """
+        segment_name = self._locations.get(tracking_id)
+        if not segment_name and self.index:
+            # Eventos de días anteriores o de otro proceso: buscar en el índice
+            for field in ("tracking_id", "handoff_id"):
+                found = self.index.query(limit=1, **{field: tracking_id})["items"]
+                if found:
+                    segment_name = found[0]["segment"]
+                    break
+        if not segment_name:
+            return None
+
+        for candidate in (segment_name, segment_name + ACTIVE_SUFFIX):
+            path = self.log_dir / candidate
+            if path.exists():
+                return path
+        return None
+
+    def query_events(
+        self, include_records: bool = False, **kwargs: Any
+    ) -> Dict[str, Any]:
         """
-        Sube un archivo de log a S3.
+        Consulta eventos en el índice (ver `LogIndex.query`).
 
         Args:
-            local_path: Ruta local del archivo
-            s3_key: Key del objeto en S3 (ruta en el bucket)
+            include_records: Adjunta el evento JSON completo en `record`
+            **kwargs: Filtros, rango de fechas, texto, cursor y límite
+
+        Returns:
+            {"items": [...], "next_cursor": str | None}
         """
-        if not self.s3_enabled:
-            print(f"⚠️  S3 deshabilitado, log solo guardado localmente")
-            return
+        if not self.index:
+            raise RuntimeError("Índice de logs deshabilitado (MCP_LOG_INDEX_ENABLED)")
+        page = self.index.query(**kwargs)
+        if include_records:
+            # Cada segmento archivado se descarga una sola vez por página
+            archive: Dict[str, Optional[bytes]] = {}
+            for item in page["items"]:
+                item["record"] = self.read_event(
+                    item["segment"], item["offset"], archive=archive
+                )
+        return page
+
+    def read_event(
+        self,
+        segment_name: str,
+        offset: int,
+        archive: Optional[Dict[str, Optional[bytes]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Lee un evento completo por segmento y offset.
 
+        Busca primero el segmento local (cerrado o activo) y, si ya se eliminó
+        por retención, lo descarga comprimido desde S3. `archive` guarda los
+        segmentos descargados para reutilizarlos entre lecturas de una misma
+        consulta.
+        """
+        for candidate in (segment_name, segment_name + ACTIVE_SUFFIX):
+            path = self.log_dir / candidate
+            try:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    return json.loads(f.readline())
+            except FileNotFoundError:
+                continue
+            except ValueError:
+                return None
+
+        if not self.shipper:
+            return None
+        if archive is None:
+            archive = {}
+        if segment_name not in archive:
+            archive[segment_name] = self._download_segment(segment_name)
+        data = archive[segment_name]
+        if data is None:
+            return None
+        end = data.find(b"\n", offset)
         try:
-            # Agregar prefijo con año/mes para organización
-            date_prefix = datetime.now().strftime("%Y/%m")
-            full_s3_key = f"mcp-odoo-logs/{date_prefix}/{s3_key}"
+            return json.loads(data[offset : end if end >= 0 else len(data)])
+        except ValueError:
+            return None
 
-            print(f"[S3] Subiendo log a S3...")
-            print(f"[S3] Bucket: {self.bucket_name}")
-            print(f"[S3] Key: {full_s3_key}")
-
-            self.s3_client.upload_file(
-                str(local_path),
-                self.bucket_name,
-                full_s3_key,
-                ExtraArgs={
-                    "ContentType": "application/json",
-                    "ServerSideEncryption": "AES256",
-                },
+    def _download_segment(self, segment_name: str) -> Optional[bytes]:
+        """Contenido descomprimido de un segmento archivado en S3 (None si falla)."""
+        try:
+            obj = self.s3_client.get_object(
+                Bucket=self.bucket_name, Key=self.shipper.s3_key(segment_name)
             )
-
-            s3_url = f"s3://{self.bucket_name}/{full_s3_key}"
-            print(f"☁️  ✅ Log subido exitosamente a S3: {s3_url}")
-
-        except ClientError as e:
-            error_code = e.response.get("Error", {}).get("Code", "Unknown")
-            error_msg = e.response.get("Error", {}).get("Message", str(e))
-            print(f"❌ Error de S3 ({error_code}): {error_msg}")
-            print(f"   → Bucket: {self.bucket_name}")
-            print(f"   → Key: {full_s3_key}")
-            print(f"   → El log permanece guardado localmente en: {local_path}")
+            return gzip.decompress(obj["Body"].read())
         except Exception as e:
-            print(f"❌ Error inesperado subiendo a S3: {type(e).__name__}: {e}")
-            print(f"   → El log permanece guardado localmente en: {local_path}")
+            log.warning("No se pudo leer %s desde S3: %s", segment_name, e)
+            return None
 
-    def get_log_path(self, tracking_id: str) -> Optional[Path]:
+    def reindex_archive(self, month: Optional[str] = None) -> int:
         """
-        Obtiene la ruta del archivo de log para un tracking_id.
+        Indexa los segmentos archivados en S3 que no estén en el índice.
+
+        Útil para reconstruir el índice en un contenedor nuevo.
 
         Args:
-            tracking_id: ID de seguimiento
+            month: Limitar a un mes "YYYY-MM" (None = todo el archivo)
 
         Returns:
-            Path del archivo o None si no existe
+            Cantidad de eventos indexados
         """
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        log_filename = f"{date_str}_{tracking_id}.log"
-        log_path = self.log_dir / log_filename
-
-        return log_path if log_path.exists() else None
+        if not self.index or not self.shipper:
+            return 0
+
+        prefix = self.shipper.prefix + "/"
+        if month:
+            prefix += month.replace("-", "/") + "/"
+
+        indexed = 0
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                name = obj["Key"].rsplit("/", 1)[-1]
+                if not name.endswith(SEGMENT_SUFFIX + ".gz"):
+                    continue
+                segment_name = name[: -len(".gz")]
+                if self.index.is_complete(segment_name):
+                    continue
+                body = self.s3_client.get_object(
+                    Bucket=self.bucket_name, Key=obj["Key"]
+                )["Body"]
+                with gzip.GzipFile(fileobj=io.BytesIO(body.read())) as f:
+                    indexed += self.index.index_stream(segment_name, f)
+                self.index.mark_complete(Path(segment_name))
+        return indexed
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Espera a que los eventos encolados estén escritos en disco."""
+        return self.writer.flush(timeout)
+
+    def close(self):
+        """Vacía la cola, cierra el segmento activo e intenta enviarlo a S3."""
+        self.writer.close()
+        if self.shipper:
+            self.shipper.close()
+        if self.index:
+            self.index.close()
+            self.index = None
 
     def log_sms_handoff(
         self,
@@ -236,7 +417,7 @@ class QuotationLogger:
         error: Optional[str] = None,
     ) -> str:
         """
-        Registra un handoff de SMS en formato JSON.
+        Registra un handoff de SMS como evento JSONL.
 
         Args:
             handoff_id: ID único del handoff (timestamp-based)
@@ -254,18 +435,15 @@ class QuotationLogger:
             error: Mensaje de error si falló
 
         Returns:
-            Path del archivo de log
+            Ruta del segmento de log activo
         """
         now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
         timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
 
-        log_data = {
+        record = {
+            "ts": now.isoformat(),
+            "event": "sms_handoff",
             "handoff_id": handoff_id,
-            "timestamp": timestamp,
-            "date": date_str,
-            "time": now.strftime("%H:%M:%S.%f")[:-3],
-            "type": "sms_handoff",
             "status": status,
             "client_info": {
                 "phone": user_phone,
@@ -293,28 +471,11 @@ class QuotationLogger:
             },
             "error": error,
         }
-
-        # Guardar localmente
-        log_filename = f"{date_str}_sms_{handoff_id}.log"
-        log_path = self.log_dir / log_filename
-
-        with open(log_path, "w", encoding="utf-8") as f:
-            json.dump(log_data, f, indent=2, ensure_ascii=False)
-
-        print(f"📝 Log de handoff guardado: {log_path}")
-
-        # Subir a S3 si está habilitado
-        if self.s3_enabled:
-            try:
-                self._upload_to_s3(log_path, log_filename)
-            except Exception as e:
-                print(f"⚠️  Error subiendo handoff log a S3: {e}")
-
-        return str(log_path)
+        return self._submit(record)
 
     def cleanup_old_logs(self, days: int = 7):
         """
-        Elimina logs locales más antiguos que N días.
+        Elimina segmentos cerrados (y logs legacy `.log`) más antiguos que N días.
         Los logs en S3 no se eliminan (usar lifecycle policy del bucket).
 
         Args:
@@ -325,20 +486,33 @@ class QuotationLogger:
         cutoff_date = datetime.now() - timedelta(days=days)
 
         deleted_count = 0
-        for log_file in self.log_dir.glob("*.log"):
+        candidates = list(self.log_dir.glob(f"*{SEGMENT_SUFFIX}")) + list(
+            self.log_dir.glob("*.log")
+        )
+        for log_file in candidates:
             try:
                 # Extraer fecha del nombre de archivo (YYYY-MM-DD_...)
-                date_str = log_file.stem.split("_")[0]
+                date_str = segment_date(log_file.name)
+                if not date_str:
+                    continue
                 file_date = datetime.strptime(date_str, "%Y-%m-%d")
 
                 if file_date < cutoff_date:
+                    # No borrar segmentos que aún no llegaron a S3
+                    if self.shipper and log_file.suffix == SEGMENT_SUFFIX:
+                        if not self.shipper.is_shipped(log_file.name):
+                            continue
+                        self.shipper.forget(log_file.name)
+                    elif self.index and log_file.suffix == SEGMENT_SUFFIX:
+                        # Sin archivo en S3 el evento ya no se puede leer
+                        self.index.delete_segment(log_file.name)
                     log_file.unlink()
                     deleted_count += 1
             except Exception as e:
-                print(f"⚠️  Error procesando {log_file}: {e}")
+                log.warning("Error procesando %s: %s", log_file, e)
 
         if deleted_count > 0:
-            print(f"🗑️  Eliminados {deleted_count} logs antiguos")
+            log.info("Eliminados %d logs antiguos", deleted_count)
 
 
 # Instancia global del logger
@@ -346,7 +520,35 @@ class QuotationLogger:
 _bucket_name = os.getenv("S3_LOGS_BUCKET")
 _aws_region = os.getenv("AWS_REGION", "us-east-1")
 _log_dir = os.getenv("MCP_LOG_DIR", "/tmp/mcp_odoo_logs")
+_segment_max_bytes = int(os.getenv("MCP_LOG_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+_segment_max_age = float(os.getenv("MCP_LOG_SEGMENT_MAX_AGE", "900"))
+_fsync_batch = int(os.getenv("MCP_LOG_FSYNC_BATCH", "64"))
+_s3_endpoint_url = os.getenv("S3_ENDPOINT_URL") or None
+_ship_concurrency = int(os.getenv("MCP_LOG_SHIP_CONCURRENCY", "2"))
+_index_enabled = os.getenv("MCP_LOG_INDEX_ENABLED", "true").lower() == "true"
+_index_path = os.getenv("MCP_LOG_INDEX_DB", os.path.join(_log_dir, "events.sqlite3"))
 
 quotation_logger = QuotationLogger(
-    log_dir=_log_dir, bucket_name=_bucket_name, aws_region=_aws_region
+    log_dir=_log_dir,
+    bucket_name=_bucket_name,
+    aws_region=_aws_region,
+    max_segment_bytes=_segment_max_bytes,
+    max_segment_age=_segment_max_age,
+    fsync_batch=_fsync_batch,
+    s3_endpoint_url=_s3_endpoint_url,
+    ship_concurrency=_ship_concurrency,
+    index_path=_index_path if _index_enabled else None,
+)
+
+LOG_QUEUE_DEPTH.set_callback(lambda: quotation_logger.writer.queue_depth())
+LOG_DROPPED.set_callback(lambda: quotation_logger.writer.dropped)
+S3_SHIP_LAG.set_callback(
+    lambda: quotation_logger.shipper.lag_seconds() if quotation_logger.shipper else 0
+)
+S3_SHIP_PENDING.set_callback(
+    lambda: (
+        len(quotation_logger.shipper.pending_segments())
+        if quotation_logger.shipper
+        else 0
+    )
 )
@@ -0,0 +1,385 @@
+"""
+Metrics
+=======
+Registro de métricas en memoria con exposición en formato de texto Prometheus.
+
+Uso:
+    from core.metrics import ODOO_RPC_SECONDS
+    ODOO_RPC_SECONDS.labels("crm.lead", "create").observe(0.12)
+
+Cada combinación de labels se resuelve una sola vez (dict lookup); observar
+un valor es un `bisect` y una suma bajo un lock, sin asignaciones.
+Los `Gauge` con `callback` se evalúan solo al hacer scrape de `/metrics`.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Registry:
+    """Colección de métricas expuestas en `/metrics`."""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> "_Metric":
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Serializa todas las métricas en formato de exposición Prometheus."""
+        lines: List[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        registry: Registry = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def labels(self, *values: str):
+        """Hijo para una combinación de labels (se crea en el primer uso)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} espera labels {self.labelnames}, recibió {key}"
+                )
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        return self.labels()
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Contador monotónico."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels_text(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class Gauge(_Metric):
+    """
+    Valor instantáneo.
+
+    Con `callback` el valor se calcula al hacer scrape; el callback puede
+    retornar un número (sin labels) o un dict {tupla_de_labels: valor}.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        registry=REGISTRY,
+        callback: Optional[Callable[[], object]] = None,
+    ):
+        super().__init__(name, documentation, labelnames, registry)
+        self.callback = callback
+
+    def set_callback(self, callback: Callable[[], object]):
+        """Define la función que calcula el valor al hacer scrape."""
+        self.callback = callback
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+    def samples(self) -> List[str]:
+        if self.callback is not None:
+            try:
+                value = self.callback()
+            except Exception:
+                return []
+            if isinstance(value, dict):
+                items = [
+                    (key if isinstance(key, tuple) else (key,), v)
+                    for key, v in value.items()
+                ]
+            else:
+                items = [((), value)]
+            return [
+                f"{self.name}{_labels_text(self.labelnames, key)} {_format_value(float(v))}"
+                for key, v in items
+            ]
+        return [
+            f"{self.name}{_labels_text(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in list(self._children.items())
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("_upper", "_counts", "sum", "count", "_lock")
+
+    def __init__(self, upper: Tuple[float, ...]):
+        self._upper = upper
+        self._counts = [0] * len(upper)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect.bisect_left(self._upper, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self._counts), self.sum, self.count
+
+
+class Histogram(_Metric):
+    """Histograma con buckets acumulativos (`le`)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        registry=REGISTRY,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        upper = sorted(float(b) for b in buckets)
+        if not upper or upper[-1] != math.inf:
+            upper.append(math.inf)
+        self._upper = tuple(upper)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self._upper)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for upper, n in zip(self._upper, counts):
+                cumulative += n
+                le = f'le="{_format_value(upper)}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels_text(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _labels_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render() -> str:
+    """Texto de exposición del registro global."""
+    return REGISTRY.render()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# MÉTRICAS DEL SERVICIO
+# ═══════════════════════════════════════════════════════════════════════
+# Definidas aquí para tener el catálogo completo en un solo lugar; cada
+# módulo observa las suyas desde su punto central (execute_kw, update_progress,
+# retry_on_network_error, SMSClient, autoload de tools).
+
+ODOO_RPC_SECONDS = Histogram(
+    "odoo_rpc_duration_seconds",
+    "Latencia de llamadas execute_kw a Odoo",
+    ["model", "method"],
+)
+ODOO_RPC_ERRORS = Counter(
+    "odoo_rpc_errors_total",
+    "Llamadas execute_kw a Odoo que lanzaron excepción",
+    ["model", "method", "error"],
+)
+RETRY_ATTEMPTS = Counter(
+    "retry_attempts_total",
+    "Reintentos de retry_on_network_error por función",
+    ["function"],
+)
+RETRY_EXHAUSTED = Counter(
+    "retry_exhausted_total",
+    "Funciones que agotaron todos sus reintentos",
+    ["function"],
+)
+QUOTATION_STAGE_SECONDS = Histogram(
+    "quotation_stage_duration_seconds",
+    "Duración de cada etapa del pipeline de cotización",
+    ["source", "stage"],
+)
+QUOTATION_SECONDS = Histogram(
+    "quotation_duration_seconds",
+    "Duración total de una cotización (start → complete/fail)",
+    ["source", "status"],
+    buckets=(1, 2.5, 5, 10, 15, 20, 30, 45, 60, 90, 120, 300),
+)
+TASKS = Gauge(
+    "quotation_tasks",
+    "Tareas de cotización en memoria por estado",
+    ["status"],
+)
+LOG_QUEUE_DEPTH = Gauge(
+    "log_writer_queue_depth", "Eventos de log pendientes de escribir"
+)
+LOG_DROPPED = Gauge(
+    "log_writer_dropped_events", "Eventos de log descartados por cola llena"
+)
+S3_SHIP_LAG = Gauge(
+    "log_shipper_lag_seconds",
+    "Antigüedad del segmento más viejo pendiente de enviar a S3",
+)
+S3_SHIP_PENDING = Gauge(
+    "log_shipper_pending_segments", "Segmentos cerrados pendientes de enviar a S3"
+)
+TWILIO_SEND_SECONDS = Histogram(
+    "twilio_send_duration_seconds",
+    "Latencia de envío de mensajes por Twilio",
+    ["channel", "status"],
+)
+PARTNER_INDEX_LOOKUPS = Counter(
+    "partner_index_lookups_total",
+    "Búsquedas de partner por email según cómo se resolvieron",
+    ["result"],
+)
+PARTNER_INDEX_SIZE = Gauge(
+    "partner_index_entries", "Emails en el índice local de partners"
+)
+MIRROR_READS = Counter(
+    "mirror_reads_total",
+    "Lecturas de tools por modelo: espejo local o Odoo (y por qué)",
+    ["model", "source"],
+)
+MIRROR_LAG_SECONDS = Gauge(
+    "mirror_lag_seconds",
+    "Segundos desde la última sincronización de cada modelo del espejo",
+    ["db", "model"],
+)
+TEXT_INDEX_DOCS = Gauge(
+    "text_index_documents",
+    "Registros en el índice difuso local (trigramas) por modelo",
+    ["model"],
+)
+MCP_TOOL_CALLS = Counter(
+    "mcp_tool_calls_total",
+    "Llamadas a tools MCP",
+    ["tool", "status"],
+)
+MCP_TOOL_SECONDS = Histogram(
+    "mcp_tool_duration_seconds",
+    "Latencia de tools MCP",
+    ["tool"],
+)
@@ -0,0 +1,929 @@
+"""
+Mirror
+======
+Espejo local de solo lectura (SQLite) de modelos de CRM/ventas de Odoo.
+
+Muchas lecturas toleran datos con unos segundos de retraso (list_sales,
+get_sale, list_projects, list_users, list_tasks, search, search_products, el
+balanceo de vendedores y el lead → orden del handoff). El espejo:
+
+    - copia los campos de `SPECS` que existan en la base (fields_get) a
+      SQLite y los mantiene en memoria para filtrarlos con `core.domain`
+    - sincroniza de forma incremental por `write_date`, con un cursor por
+      modelo que sobrevive reinicios (`write_date` también se puede leer y
+      ordenar desde el espejo). Cada sincronización relee desde
+      `MIRROR_SYNC_OVERLAP` segundos antes del cursor: Odoo pone `write_date`
+      al iniciar la transacción, y una transacción larga puede confirmarse
+      después de que otra más nueva ya se sincronizó. Las páginas avanzan por
+      (write_date, id), no por offset: un registro reescrito mientras se pagina
+      no hace saltar a otro
+    - reconcilia ids cada `MIRROR_RECONCILE_INTERVAL` segundos: quita los
+      borrados en Odoo y carga los que falten en el espejo
+    - indexa en memoria los many2one de `INDEXED_FIELDS` (e `id`): un
+      dominio con `campo = X` o `campo in [...]` filtra solo esos registros
+      en lugar de recorrer el modelo completo (las líneas de una orden, las
+      órdenes de un lead, las tareas de un proyecto)
+    - solo responde si el modelo se sincronizó hace menos de `max_staleness`
+      segundos y la lectura usa campos espejados; si no, la lectura va a Odoo
+
+Las tools usan un cliente envuelto; lo que el espejo no cubre (escrituras,
+campos no espejados, `read` de un id que aún no llegó...) pasa directo al
+cliente original:
+
+    from core import mirror
+    odoo = mirror.reader(deps["odoo"])
+    odoo.search_read("sale.order", [("state", "=", "sale")], ["id", "name"], 50)
+
+Los one2many (`order_line`, `order_ids`) no se espejan: crear un hijo no
+cambia el `write_date` del padre. Se consultan por el many2one inverso
+(`sale.order.line.order_id`, `sale.order.opportunity_id`).
+
+Variables de entorno:
+    MIRROR_ENABLED             false = todas las lecturas van a Odoo (default: true)
+    MIRROR_DIR                 Directorio de las bases SQLite (default: /tmp/mcp_odoo_mirror)
+    MIRROR_SYNC_INTERVAL       Segundos entre sincronizaciones (default: 30)
+    MIRROR_SYNC_OVERLAP        Segundos que se releen antes del cursor (default: 300)
+    MIRROR_RECONCILE_INTERVAL  Segundos entre reconciliaciones de ids (default: 900)
+    MIRROR_MAX_STALENESS       Antigüedad máxima que aceptan las tools, en segundos (default: 120)
+    MIRROR_PAGE_SIZE           Registros por página al sincronizar (default: 2000)
+    MIRROR_MODELS              Modelos a espejar, separados por coma (default: todos)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import xmlrpc.client
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from core.domain import compile_domain, fields_in
+from core.log import get_logger
+from core.metrics import MIRROR_LAG_SECONDS, MIRROR_READS
+from core.odoo_client import OdooClient
+
+log = get_logger(__name__)
+
+ENABLED = os.getenv("MIRROR_ENABLED", "true").lower() == "true"
+MIRROR_DIR = os.getenv("MIRROR_DIR", "/tmp/mcp_odoo_mirror")
+SYNC_INTERVAL = float(os.getenv("MIRROR_SYNC_INTERVAL", "30"))
+SYNC_OVERLAP = float(os.getenv("MIRROR_SYNC_OVERLAP", "300"))
+RECONCILE_INTERVAL = float(os.getenv("MIRROR_RECONCILE_INTERVAL", "900"))
+MAX_STALENESS = float(os.getenv("MIRROR_MAX_STALENESS", "120"))
+PAGE_SIZE = int(os.getenv("MIRROR_PAGE_SIZE", "2000"))
+
+# many2one con índice en memoria (valor → ids) para `=` / `in`
+INDEXED_FIELDS = ("order_id", "opportunity_id", "project_id")
+
+
+class MirrorSpec(NamedTuple):
+    """Modelo espejado: campos candidatos y orden por defecto (`_order`)."""
+
+    model: str
+    fields: tuple
+    order: str = "id"
+
+
+SPECS = (
+    MirrorSpec(
+        "sale.order",
+        (
+            "name",
+            "partner_id",
+            "date_order",
+            "amount_total",
+            "amount_untaxed",
+            "amount_tax",
+            "state",
+            "user_id",
+            "opportunity_id",
+            "payment_term_id",
+            "validity_date",
+            "note",
+        ),
+        "date_order desc, id desc",
+    ),
+    MirrorSpec(
+        "sale.order.line",
+        (
+            "order_id",
+            "product_id",
+            "name",
+            "product_uom_qty",
+            "price_unit",
+            "price_subtotal",
+            "sequence",
+        ),
+        "order_id, sequence, id",
+    ),
+    MirrorSpec("project.project", ("name", "active", "sequence"), "sequence, name, id"),
+    MirrorSpec("res.users", ("name", "login", "active"), "name, login"),
+    MirrorSpec(
+        "project.task",
+        (
+            "name",
+            "active",
+            "project_id",
+            "stage_id",
+            "date_deadline",
+            "user_id",
+            "user_ids",
+            "description",
+            "priority",
+            "sequence",
+        ),
+        "priority desc, sequence, id desc",
+    ),
+    MirrorSpec(
+        "crm.lead",
+        (
+            "name",
+            "type",
+            "active",
+            "partner_id",
+            "email_from",
+            "user_id",
+            "team_id",
+            "stage_id",
+        ),
+        "id desc",
+    ),
+    MirrorSpec("crm.team", ("name", "active", "member_ids"), "id"),
+    MirrorSpec(
+        "product.product",
+        ("name", "default_code", "categ_id", "list_price", "active", "sale_ok"),
+        "default_code, name, id",
+    ),
+    MirrorSpec(
+        "product.pricelist.item",
+        ("pricelist_id", "product_id", "fixed_price", "min_quantity"),
+        "min_quantity desc, id desc",
+    ),
+)
+
+_only = [m.strip() for m in os.getenv("MIRROR_MODELS", "").split(",") if m.strip()]
+if _only:
+    SPECS = tuple(spec for spec in SPECS if spec.model in _only)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    model TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    write_date TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (model, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cursors (
+    model TEXT PRIMARY KEY,
+    fields TEXT NOT NULL,
+    watermark TEXT,
+    synced_at REAL NOT NULL DEFAULT 0,
+    reconciled_at REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class _ModelState:
+    """Cursor de sincronización de un modelo."""
+
+    def __init__(
+        self,
+        fields: List[str],
+        watermark: Optional[str] = None,
+        synced_at: float = 0.0,
+        reconciled_at: float = 0.0,
+    ):
+        self.fields = fields
+        self.watermark = watermark  # write_date más reciente aplicado
+        self.synced_at = synced_at  # time.time() al iniciar la última sync exitosa
+        self.reconciled_at = reconciled_at
+
+
+def overlap_start(watermark: str, overlap: float) -> str:
+    """`watermark` de Odoo ("YYYY-MM-DD HH:MM:SS") menos `overlap` segundos."""
+    try:
+        moment = datetime.strptime(watermark[:19], "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return watermark
+    return (moment - timedelta(seconds=overlap)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def after_keyset(write_date: str, record_id: int) -> list:
+    """Dominio de los registros posteriores a (write_date, id) en ese orden."""
+    return [
+        "|",
+        ("write_date", ">", write_date),
+        "&",
+        ("write_date", "=", write_date),
+        ("id", ">", record_id),
+    ]
+
+
+def _key(value):
+    # many2one [id, "Nombre"] → id; vacío → None
+    if isinstance(value, (list, tuple)):
+        return value[0] if value else None
+    return None if _is_null(value) else value
+
+
+def _int_values(op: str, value) -> Optional[list]:
+    """Ids de un término `= id` / `in [ids]`, o None si no es de ese tipo."""
+    if op == "=":
+        value = [value]
+    elif op != "in" or not isinstance(value, (list, tuple)):
+        return None
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in value):
+        return list(value)
+    return None
+
+
+def _is_null(value) -> bool:
+    return value is None or value is False
+
+
+def _sort_value(value):
+    # Los many2one se ordenan por nombre; nulos al final (al inicio en desc)
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        value = value[1]
+    return (_is_null(value), "" if _is_null(value) else value)
+
+
+def _sort(records: List[dict], order: str) -> List[dict]:
+    """Ordena como `order` de Odoo ("campo [asc|desc], ...")."""
+    for part in reversed([p.strip() for p in order.split(",") if p.strip()]):
+        tokens = part.split()
+        field = tokens[0]
+        reverse = len(tokens) > 1 and tokens[1].lower() == "desc"
+        records.sort(key=lambda r, f=field: _sort_value(r.get(f)), reverse=reverse)
+    return records
+
+
+def _project(record: dict, fields: Sequence[str]) -> dict:
+    """Copia de los campos pedidos (listas incluidas) con `id` siempre presente."""
+    row = {"id": record["id"]}
+    for field in fields:
+        value = record.get(field, False)
+        row[field] = list(value) if isinstance(value, list) else value
+    return row
+
+
+class Mirror:
+    """Espejo de los modelos de `SPECS` de una base de Odoo."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        specs: Sequence[MirrorSpec] = SPECS,
+        page_size: int = PAGE_SIZE,
+        reconcile_interval: float = RECONCILE_INTERVAL,
+        sync_overlap: float = SYNC_OVERLAP,
+    ):
+        """
+        Abre (o crea) el espejo y carga en memoria lo ya sincronizado.
+
+        Args:
+            db_path: Ruta del archivo SQLite
+            specs: Modelos a espejar
+            page_size: Registros por página al sincronizar
+            reconcile_interval: Segundos entre reconciliaciones de ids
+            sync_overlap: Segundos que se releen antes del cursor
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.specs = {spec.model: spec for spec in specs}
+        self.page_size = page_size
+        self.reconcile_interval = reconcile_interval
+        self.sync_overlap = sync_overlap
+
+        self._lock = threading.Lock()  # memoria y conexión SQLite
+        self._sync_lock = threading.Lock()  # una sincronización a la vez
+        self._listen_lock = threading.RLock()  # orden de avisos a suscriptores
+        self._listeners: Dict[str, List[Callable]] = {}
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        self._records: Dict[str, Dict[int, dict]] = {m: {} for m in self.specs}
+        # modelo → campo → valor → ids (INDEXED_FIELDS que tiene la spec)
+        self._keys: Dict[str, Dict[str, Dict[Any, set]]] = {
+            spec.model: {f: {} for f in INDEXED_FIELDS if f in spec.fields}
+            for spec in specs
+        }
+        self._states: Dict[str, _ModelState] = {}
+        self._available: Dict[str, Optional[List[str]]] = {}  # fields_get por modelo
+        self._load()
+
+    def _load(self):
+        for model, fields, watermark, synced_at, reconciled_at in self._conn.execute(
+            "SELECT model, fields, watermark, synced_at, reconciled_at FROM cursors"
+        ):
+            if model in self.specs:
+                self._states[model] = _ModelState(
+                    json.loads(fields), watermark, synced_at, reconciled_at
+                )
+        for model, write_date, data in self._conn.execute(
+            "SELECT model, write_date, data FROM records"
+        ):
+            if model in self._states:
+                record = json.loads(data)
+                record["write_date"] = write_date or False
+                self._put(model, record)
+
+    def _put(self, model: str, record: dict):
+        """Guarda un registro en memoria y en los índices (con self._lock)."""
+        self._discard(model, record["id"])
+        self._records[model][record["id"]] = record
+        for field, index in self._keys[model].items():
+            key = _key(record.get(field))
+            if key is not None:
+                index.setdefault(key, set()).add(record["id"])
+
+    def _discard(self, model: str, record_id: int):
+        """Quita un registro de memoria y de los índices (con self._lock)."""
+        record = self._records[model].pop(record_id, None)
+        if record is None:
+            return
+        for field, index in self._keys[model].items():
+            key = _key(record.get(field))
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del index[key]
+
+    def _candidates(self, model: str, domain: Sequence) -> Optional[List[dict]]:
+        """
+        Registros que pueden cumplir `domain` según sus términos indexados
+        (`id` o INDEXED_FIELDS con `=`/`in`), o None si hay que recorrer todo.
+        Solo con dominios que son una conjunción (sin "|" ni "!"). Con self._lock.
+        """
+        if any(term in ("|", "!") for term in domain if isinstance(term, str)):
+            return None
+        records = self._records[model]
+        ids = None
+        for term in domain:
+            if isinstance(term, str) or len(term) != 3:
+                continue
+            field, op, value = term
+            values = _int_values(op, value)
+            if values is None:
+                continue
+            if field == "id":
+                found = {v for v in values if v in records}
+            elif field in self._keys[model]:
+                index = self._keys[model][field]
+                found = set().union(*(index.get(v, ()) for v in values))
+            else:
+                continue
+            ids = found if ids is None else ids & found
+        if ids is None:
+            return None
+        return [records[i] for i in ids]
+
+    # ------------------------------------------------------------------
+    # Sincronización
+    # ------------------------------------------------------------------
+
+    def sync(self, client) -> Dict[str, int]:
+        """
+        Sincroniza todos los modelos; un error en uno no detiene al resto.
+
+        Returns:
+            Registros leídos por modelo
+        """
+        changes = {}
+        with self._sync_lock:
+            for model in self.specs:
+                try:
+                    changes[model] = self._sync_model(client, model)
+                except Exception as e:
+                    log.warning("Error sincronizando %s en el espejo: %s", model, e)
+        return changes
+
+    def sync_model(self, client, model: str) -> int:
+        """
+        Aplica los cambios de un modelo desde su cursor (o lo carga completo).
+        Útil después de una escritura propia, sin esperar al siguiente ciclo.
+
+        Returns:
+            Registros leídos
+        """
+        with self._sync_lock:
+            return self._sync_model(client, model)
+
+    def _sync_model(self, client, model: str) -> int:
+        fields = self._fields_for(client, model)
+        if fields is None:
+            return 0
+        state = self._states.get(model)
+        if state is None or state.fields != fields:
+            # Primera vez o cambiaron los campos disponibles: carga completa
+            state = self._reset(model, fields)
+
+        started = time.time()
+        if state.watermark is None:
+            total = self._load_all(client, model, state)
+            state.reconciled_at = started
+        else:
+            total = self._load_changes(client, model, state)
+            if started - state.reconciled_at >= self.reconcile_interval:
+                self.reconcile(client, model)
+                state.reconciled_at = started
+        state.synced_at = started
+        self._save_state(model, state)
+        return total
+
+    def reconcile(self, client, model: str) -> int:
+        """
+        Quita los registros que ya no existen en Odoo (ni archivados) y carga
+        los que existen en Odoo pero faltan en el espejo (p.ej. una escritura
+        confirmada fuera de la ventana de `sync_overlap`).
+
+        Returns:
+            Registros eliminados del espejo
+        """
+        state = self._states[model]
+        existing = set(
+            client.execute_kw(model, "search", [self._all_domain(state)], {})
+        )
+        with self._lock:
+            local = self._records[model]
+            gone = [i for i in local if i not in existing]
+            missing = sorted(i for i in existing if i not in local)
+        for start in range(0, len(missing), self.page_size):
+            chunk = missing[start : start + self.page_size]
+            domain = self._all_domain(state) + [("id", "in", chunk)]
+            self._apply(model, state, self._page(client, model, state, domain, "id"))
+        if missing:
+            log.info("Espejo %s: %d registros faltantes cargados", model, len(missing))
+        with self._lock:
+            for record_id in gone:
+                self._discard(model, record_id)
+            self._conn.executemany(
+                "DELETE FROM records WHERE model = ? AND id = ?",
+                [(model, record_id) for record_id in gone],
+            )
+            self._conn.commit()
+        if gone:
+            log.info("Espejo %s: %d registros borrados en Odoo", model, len(gone))
+            self._notify(model, [], gone)
+        return len(gone)
+
+    def _fields_for(self, client, model: str) -> Optional[List[str]]:
+        """Campos de la spec que existen en la base (None si falta el modelo)."""
+        if model not in self._available:
+            try:
+                available = client.execute_kw(
+                    model, "fields_get", [], {"attributes": ["type"]}
+                )
+            except xmlrpc.client.Fault as e:
+                log.warning("Modelo %s no disponible para el espejo: %s", model, e)
+                self._available[model] = None
+                return None
+            self._available[model] = ["id"] + [
+                f for f in self.specs[model].fields if f in available
+            ]
+        return self._available[model]
+
+    @staticmethod
+    def _all_domain(state: _ModelState) -> list:
+        # Incluir archivados: un registro archivado debe dejar de aparecer
+        if "active" in state.fields:
+            return [("active", "in", [True, False])]
+        return []
+
+    def _page(self, client, model, state, domain, order) -> List[dict]:
+        return client.execute_kw(
+            model,
+            "search_read",
+            [domain],
+            {
+                "fields": state.fields + ["write_date"],
+                "order": order,
+                "limit": self.page_size,
+            },
+        )
+
+    def _load_all(self, client, model: str, state: _ModelState) -> int:
+        start = time.perf_counter()
+        last_id = 0
+        total = 0
+        while True:
+            domain = self._all_domain(state) + [("id", ">", last_id)]
+            rows = self._page(client, model, state, domain, "id asc")
+            self._apply(model, state, rows)
+            total += len(rows)
+            if len(rows) < self.page_size:
+                break
+            last_id = rows[-1]["id"]
+        log.info(
+            "Espejo %s cargado: %d registros en %.2fs",
+            model,
+            total,
+            time.perf_counter() - start,
+        )
+        return total
+
+    def _load_changes(self, client, model: str, state: _ModelState) -> int:
+        # Desde `sync_overlap` antes del cursor (reaplicar es idempotente) y
+        # por páginas (write_date, id): nada se salta aunque cambie mientras
+        since = overlap_start(state.watermark, self.sync_overlap)
+        base = self._all_domain(state) + [("write_date", ">=", since)]
+        domain = base
+        total = 0
+        while True:
+            rows = self._page(client, model, state, domain, "write_date asc, id asc")
+            self._apply(model, state, rows)
+            total += len(rows)
+            if len(rows) < self.page_size:
+                break
+            last = rows[-1]
+            domain = base + after_keyset(last["write_date"], last["id"])
+        return total
+
+    def _apply(self, model: str, state: _ModelState, rows: List[dict]):
+        if not rows:
+            return
+        params = []
+        records = []
+        watermark = state.watermark
+        for row in rows:
+            record = {field: row.get(field, False) for field in state.fields}
+            write_date = row.get("write_date") or None
+            record["write_date"] = write_date or False
+            if write_date and (watermark is None or write_date > watermark):
+                watermark = write_date
+            records.append(record)
+            params.append(
+                (model, record["id"], write_date, json.dumps(record, default=str))
+            )
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO records (model, id, write_date, data) "
+                "VALUES (?, ?, ?, ?)",
+                params,
+            )
+            self._conn.commit()
+            for record in records:
+                self._put(model, record)
+            state.watermark = watermark
+        self._notify(model, records, [])
+
+    def _reset(self, model: str, fields: List[str]) -> _ModelState:
+        state = _ModelState(fields)
+        with self._lock:
+            dropped = list(self._records[model])
+            self._records[model] = {}
+            for index in self._keys[model].values():
+                index.clear()
+            self._states[model] = state
+            self._conn.execute("DELETE FROM records WHERE model = ?", (model,))
+            self._conn.commit()
+        self._notify(model, [], dropped)
+        return state
+
+    # ------------------------------------------------------------------
+    # Suscriptores (índices derivados)
+    # ------------------------------------------------------------------
+
+    def subscribe(self, model: str, listener: Callable[[List[dict], List[int]], None]):
+        """
+        Avisa a `listener(actualizados, ids_borrados)` de cada cambio de
+        `model`. Se llama de inmediato con los registros actuales; los
+        avisos llegan en orden, desde el thread que sincroniza.
+        """
+        with self._listen_lock:
+            with self._lock:
+                self._listeners.setdefault(model, []).append(listener)
+                current = list(self._records.get(model, {}).values())
+            listener(current, [])
+
+    def _notify(self, model: str, records: List[dict], removed: List[int]):
+        if not self._listeners.get(model) or not (records or removed):
+            return
+        with self._listen_lock:
+            for listener in list(self._listeners.get(model, ())):
+                try:
+                    listener(records, removed)
+                except Exception as e:
+                    log.warning("Suscriptor del espejo %s falló: %s", model, e)
+
+    def snapshot(self, model: str) -> List[dict]:
+        """Registros en memoria de `model` (sin filtrar ni verificar frescura)."""
+        with self._lock:
+            return list(self._records.get(model, {}).values())
+
+    def fresh(self, model: str, max_staleness: float = MAX_STALENESS) -> bool:
+        """¿`model` se sincronizó hace menos de `max_staleness` segundos?"""
+        state = self._states.get(model)
+        return bool(
+            state is not None
+            and state.synced_at
+            and time.time() - state.synced_at <= max_staleness
+        )
+
+    def _save_state(self, model: str, state: _ModelState):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cursors "
+                "(model, fields, watermark, synced_at, reconciled_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    model,
+                    json.dumps(state.fields),
+                    state.watermark,
+                    state.synced_at,
+                    state.reconciled_at,
+                ),
+            )
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def _usable(
+        self, model: str, domain: Sequence, fields: Sequence[str], max_staleness
+    ) -> Optional[_ModelState]:
+        """Estado del modelo si el espejo puede responder; si no, None."""
+        if model not in self.specs:
+            MIRROR_READS.labels(model, "unsupported").inc()
+            return None
+        state = self._states.get(model)
+        if state is None:
+            # Aún sin primera sincronización
+            MIRROR_READS.labels(model, "stale").inc()
+            return None
+        covered = set(state.fields)
+        covered.add("write_date")
+        if not fields or not covered.issuperset(fields):
+            MIRROR_READS.labels(model, "unsupported").inc()
+            return None
+        if not covered.issuperset(fields_in(domain)):
+            MIRROR_READS.labels(model, "unsupported").inc()
+            return None
+        if time.time() - state.synced_at > max_staleness:
+            MIRROR_READS.labels(model, "stale").inc()
+            return None
+        return state
+
+    def search_read(
+        self,
+        model: str,
+        domain: Sequence,
+        fields: Sequence[str],
+        limit: Optional[int] = None,
+        offset: int = 0,
+        order: Optional[str] = None,
+        max_staleness: float = MAX_STALENESS,
+    ) -> Optional[List[dict]]:
+        """
+        `search_read` local con la semántica de Odoo (archivados excluidos si
+        el dominio no menciona `active`, orden por defecto del modelo).
+
+        Returns:
+            Registros, o None si el espejo no puede responder (ir a Odoo)
+        """
+        domain = list(domain or [])
+        state = self._usable(model, domain, fields, max_staleness)
+        if state is None:
+            return None
+        if "active" in state.fields and "active" not in fields_in(domain):
+            domain = [("active", "=", True)] + domain
+        try:
+            match = compile_domain(domain)
+        except ValueError:
+            MIRROR_READS.labels(model, "unsupported").inc()
+            return None
+
+        with self._lock:
+            candidates = self._candidates(model, domain)
+            if candidates is None:
+                candidates = self._records[model].values()
+            rows = [r for r in candidates if match(r)]
+        rows = _sort(rows, order or self.specs[model].order)
+        end = offset + limit if limit else None
+        MIRROR_READS.labels(model, "mirror").inc()
+        return [_project(r, fields) for r in rows[offset:end]]
+
+    def get(
+        self,
+        model: str,
+        record_id: int,
+        fields: Sequence[str],
+        max_staleness: float = MAX_STALENESS,
+    ) -> Optional[dict]:
+        """
+        Un registro por id (archivado o no), o None si no está o el espejo no
+        puede responder. Un id ausente puede ser un registro recién creado:
+        el llamador debe ir a Odoo.
+        """
+        if self._usable(model, [], fields, max_staleness) is None:
+            return None
+        with self._lock:
+            record = self._records[model].get(int(record_id))
+        if record is None:
+            MIRROR_READS.labels(model, "miss").inc()
+            return None
+        MIRROR_READS.labels(model, "mirror").inc()
+        return _project(record, fields)
+
+    def lag(self) -> Dict[str, float]:
+        """Segundos desde la última sincronización de cada modelo."""
+        now = time.time()
+        return {
+            model: now - state.synced_at
+            for model, state in list(self._states.items())
+            if state.synced_at
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                model: {
+                    "records": len(self._records[model]),
+                    "watermark": state.watermark,
+                    "synced_at": state.synced_at,
+                    "reconciled_at": state.reconciled_at,
+                }
+                for model, state in self._states.items()
+            }
+
+    def close(self):
+        """Cierra la conexión SQLite."""
+        with self._lock:
+            self._conn.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# CLIENTE DE LECTURA
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class MirroredClient:
+    """
+    Envuelve un cliente Odoo: `search_read`/`read` salen del espejo cuando
+    está al día y cubre la consulta; todo lo demás va al cliente original.
+    """
+
+    def __init__(
+        self,
+        client,
+        mirror: Optional[Mirror],
+        max_staleness: float = MAX_STALENESS,
+    ):
+        self._client = client
+        self._mirror = mirror
+        self.max_staleness = max_staleness
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def search_read(
+        self,
+        model: str,
+        domain=None,
+        fields=None,
+        limit: int = 50,
+        order: Optional[str] = None,
+        live_if_empty: bool = False,
+    ):
+        """
+        Como `OdooClient.search_read`.
+
+        Args:
+            live_if_empty: Si el espejo no encuentra nada, confirmar en Odoo
+                (para registros que pueden haberse creado hace segundos)
+        """
+        fields = fields or ["id", "name"]
+        rows = None
+        if self._mirror is not None:
+            rows = self._mirror.search_read(
+                model,
+                domain or [],
+                fields,
+                limit,
+                order=order,
+                max_staleness=self.max_staleness,
+            )
+        if rows is None or (live_if_empty and not rows):
+            if order:
+                return self._client.search_read(
+                    model, domain, fields, limit, order=order
+                )
+            return self._client.search_read(model, domain, fields, limit)
+        return rows
+
+    def read(self, model: str, record_id: int, fields: list = None):
+        """Como `OdooClient.read`; un id que el espejo no tiene se lee de Odoo."""
+        if fields and self._mirror is not None:
+            row = self._mirror.get(model, record_id, fields, self.max_staleness)
+            if row is not None:
+                return row
+        return self._client.read(model, record_id, fields)
+
+    # Solo usa search_read: con el espejo al día no hace RPCs
+    get_salesperson_with_least_opportunities = (
+        OdooClient.get_salesperson_with_least_opportunities
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# UN ESPEJO POR BASE DE DATOS
+# ═══════════════════════════════════════════════════════════════════════
+
+_mirrors: Dict[tuple, Mirror] = {}
+_mirrors_lock = threading.Lock()
+_syncing: set = set()
+_stop = threading.Event()
+
+
+def _db_path(url: str, db: str) -> Path:
+    safe = re.sub(r"[^\w.-]", "_", db or "odoo")
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+    return Path(MIRROR_DIR) / f"{safe}-{digest}.sqlite3"
+
+
+def mirror_for(client) -> Mirror:
+    """Espejo de la base de datos del cliente (url + db)."""
+    key = (getattr(client, "url", ""), getattr(client, "db", ""))
+    with _mirrors_lock:
+        mirror = _mirrors.get(key)
+        if mirror is None:
+            mirror = _mirrors[key] = Mirror(_db_path(*key))
+        return mirror
+
+
+def reader(client, max_staleness: float = MAX_STALENESS):
+    """
+    Cliente de lectura respaldado por el espejo de la base de `client`.
+
+    Con el espejo deshabilitado todas las lecturas van a `client`.
+    """
+    client = live(client)
+    return MirroredClient(
+        client, mirror_for(client) if ENABLED else None, max_staleness
+    )
+
+
+def live(client):
+    """
+    Cliente original de un `reader` (o el mismo cliente): para lecturas que
+    no toleran retraso, p.ej. las que deciden qué escribir.
+    """
+    return client._client if isinstance(client, MirroredClient) else client
+
+
+def start_in_background(
+    client_factory: Callable[[], Any], interval: float = SYNC_INTERVAL
+) -> Optional[threading.Thread]:
+    """
+    Sincroniza en un thread, cada `interval` segundos, el espejo de la base
+    que usa `client_factory` (un thread por base aunque se llame varias veces).
+    """
+    if not ENABLED:
+        return None
+
+    def run():
+        try:
+            client = client_factory()
+        except Exception as e:
+            log.warning("No se pudo iniciar la sincronización del espejo: %s", e)
+            return
+        key = (client.url, client.db)
+        with _mirrors_lock:
+            if key in _syncing:
+                return
+            _syncing.add(key)
+        mirror = mirror_for(client)
+        while True:
+            try:
+                mirror.sync(client)
+            except Exception as e:
+                log.warning("Error en la sincronización del espejo: %s", e)
+            if _stop.wait(interval):
+                return
+
+    thread = threading.Thread(target=run, name="odoo-mirror-sync", daemon=True)
+    thread.start()
+    return thread
+
+
+def stop():
+    """Detiene los threads de sincronización (pruebas/benchmarks)."""
+    _stop.set()
+
+
+MIRROR_LAG_SECONDS.set_callback(
+    lambda: {
+        (db, model): lag
+        for (url, db), mirror in list(_mirrors.items())
+        for model, lag in mirror.lag().items()
+    }
+)
@@ -0,0 +1,155 @@
+"""
+Notifications
+=============
+Datos de la cotización para el WhatsApp de handoff al vendedor
+(`lead_data` de `core.whatsapp.sms_client.send_handoff_notification`).
+
+Lo usan `message_notification` (tools/whatsapp.py) y el paso de notificación
+de `dev_create_quotation` (tools/crm.py). Las lecturas se hacen en bloque,
+sin importar cuántos productos tenga la cotización:
+
+    - una lectura de todas las líneas de la orden (si no se pasan los productos)
+    - una de los nombres de producto que falten (del espejo si está al día)
+    - una de los campos del partner (ciudad) si no se conocen
+
+    from core.notifications import quotation_lead_data
+
+    lead_data = quotation_lead_data(
+        client, "S00042", partner=[7, "Cliente"], email="a@b.mx", order_id=42
+    )
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from core import mirror
+from core.log import get_logger
+
+log = get_logger(__name__)
+
+NOT_AVAILABLE = "N/A"
+
+
+def _many2one(value) -> tuple:
+    # [id, "Nombre"] → (id, "Nombre"); id suelto → (id, None); vacío → (None, None)
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return value[0], value[1]
+    if isinstance(value, int) and value:
+        return value, None
+    return None, None
+
+
+def _order_products(client, order_id: int) -> List[Dict[str, Any]]:
+    """Productos de la orden con una sola lectura de sale.order.line."""
+    # Una orden recién creada puede no estar aún en el espejo
+    extra = {}
+    if isinstance(client, mirror.MirroredClient):
+        extra["live_if_empty"] = True
+    lines = client.search_read(
+        "sale.order.line",
+        [["order_id", "=", order_id]],
+        ["product_id", "product_uom_qty"],
+        None,
+        **extra,
+    )
+    products = []
+    for line in lines:
+        product_id, name = _many2one(line.get("product_id"))
+        if product_id:
+            products.append(
+                {
+                    "product_id": product_id,
+                    "name": name,
+                    "qty": line.get("product_uom_qty", 1),
+                }
+            )
+    return products
+
+
+def _product_names(client, product_ids: Sequence[int]) -> Dict[int, str]:
+    """Nombres de varios productos en una sola lectura."""
+    rows = client.search_read(
+        "product.product",
+        [["id", "in", list(product_ids)]],
+        ["id", "name"],
+        len(product_ids),
+    )
+    return {row["id"]: row.get("name") for row in rows}
+
+
+def format_products(products: Sequence[Dict[str, Any]]) -> str:
+    """Texto de productos del mensaje: `Producto A (x2), Producto B (x1)` o N/A."""
+    names = [
+        (
+            f"{p['name']} (x{p.get('qty', 1)})"
+            if p.get("name")
+            else f"Producto ID {p['product_id']}"
+        )
+        for p in products
+    ]
+    return ", ".join(names) if names else NOT_AVAILABLE
+
+
+def quotation_lead_data(
+    client,
+    sale_order_name: str,
+    partner: Any = None,
+    email: Optional[str] = None,
+    order_id: Optional[int] = None,
+    products: Optional[Sequence[Dict[str, Any]]] = None,
+    city: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    `lead_data` del mensaje de handoff.
+
+    Args:
+        client: Cliente Odoo (o `mirror.reader`) con search_read/read
+        sale_order_name: Nombre de la orden ("S00042")
+        partner: many2one `[id, "Nombre"]` o id del cliente
+        email: Email del cliente
+        order_id: Orden de la que leer los productos si no se pasan
+        products: [{"product_id", "qty", "name"?}]; sin `name` se lee en bloque
+        city: Ciudad conocida; si falta se lee del partner
+
+    Returns:
+        {"sale_order_name", "partner_name", "ciudad", "email", "products"};
+        lo que no se pueda leer queda como "N/A"
+    """
+    partner_id, partner_name = _many2one(partner)
+
+    if products is None:
+        products = []
+        if order_id:
+            try:
+                products = _order_products(client, order_id)
+            except Exception as e:
+                log.warning("No se pudieron leer las líneas de %s: %s", order_id, e)
+    else:
+        products = [dict(p) for p in products]
+
+    missing = list(
+        dict.fromkeys(p["product_id"] for p in products if not p.get("name"))
+    )
+    if missing:
+        try:
+            names = _product_names(client, missing)
+        except Exception as e:
+            log.warning("No se pudieron leer los nombres de producto: %s", e)
+            names = {}
+        for p in products:
+            if not p.get("name"):
+                p["name"] = names.get(p["product_id"])
+
+    if not city and partner_id:
+        try:
+            partner_data = client.read("res.partner", partner_id, ["city"])
+            city = (partner_data or {}).get("city") or None
+        except Exception as e:
+            log.warning("No se pudo obtener ciudad del partner: %s", e)
+
+    return {
+        "sale_order_name": sale_order_name or NOT_AVAILABLE,
+        "partner_name": partner_name or NOT_AVAILABLE,
+        "ciudad": city or NOT_AVAILABLE,
+        "email": email or NOT_AVAILABLE,
+        "products": format_products(products),
+    }
@@ -1,6 +1,11 @@
 import os
+import threading
+import time
 import xmlrpc.client
 
+from core import tracing
+from core.metrics import ODOO_RPC_ERRORS, ODOO_RPC_SECONDS
+
 
 class OdooClient:
     """Cliente base (solo conexión y utilidades genéricas)."""
@@ -22,24 +27,66 @@ class OdooClient:
         self.common = xmlrpc.client.ServerProxy(
             f"{self.url}/xmlrpc/2/common", allow_none=True
         )
-        self.models = xmlrpc.client.ServerProxy(
-            f"{self.url}/xmlrpc/2/object", allow_none=True
-        )
-        self.uid = self.common.authenticate(self.db, self.username, self.password, {})
+        self._local = threading.local()
+        with tracing.span("odoo.authenticate", url=self.url, db=self.db):
+            self.uid = self.common.authenticate(
+                self.db, self.username, self.password, {}
+            )
+
+    @property
+    def models(self) -> xmlrpc.client.ServerProxy:
+        """
+        Proxy de `/xmlrpc/2/object` del thread actual.
+
+        ServerProxy reutiliza una sola conexión HTTP y no es thread-safe: cada
+        thread (tools concurrentes, búsquedas en paralelo) usa la suya.
+        """
+        proxy = getattr(self._local, "models", None)
+        if proxy is None:
+            proxy = self._local.models = xmlrpc.client.ServerProxy(
+                f"{self.url}/xmlrpc/2/object", allow_none=True
+            )
+        return proxy
 
     def execute_kw(self, model: str, method: str, args=None, kwargs=None):
+        """
+        Ejecuta un método en Odoo.
+
+        Punto único por el que pasan todas las llamadas a modelos (también
+        las de los clientes de desarrollo), instrumentado con latencia y
+        errores por modelo/método, y con un span si hay una traza activa.
+        """
         args = args or []
         kwargs = kwargs or {}
-        return self.models.execute_kw(
-            self.db, self.uid, self.password, model, method, args, kwargs
-        )
-
-    def search_read(self, model: str, domain=None, fields=None, limit: int = 50):
+        span = tracing.span("odoo.rpc", model=model, method=method)
+        error = None
+        start = time.perf_counter()
+        try:
+            return self.models.execute_kw(
+                self.db, self.uid, self.password, model, method, args, kwargs
+            )
+        except Exception as e:
+            error = e
+            ODOO_RPC_ERRORS.labels(model, method, type(e).__name__).inc()
+            raise
+        finally:
+            ODOO_RPC_SECONDS.labels(model, method).observe(time.perf_counter() - start)
+            span.end(error)
+
+    def search_read(
+        self,
+        model: str,
+        domain=None,
+        fields=None,
+        limit: int = 50,
+        order: str | None = None,
+    ):
         domain = domain or []
         fields = fields or ["id", "name"]
-        return self.execute_kw(
-            model, "search_read", [domain], {"fields": fields, "limit": limit}
-        )
+        kwargs = {"fields": fields, "limit": limit}
+        if order:
+            kwargs["order"] = order
+        return self.execute_kw(model, "search_read", [domain], kwargs)
 
     def create(self, model: str, values: dict) -> int:
         """Crea un registro en Odoo."""
@@ -49,6 +96,10 @@ class OdooClient:
         """Actualiza un registro en Odoo."""
         return self.execute_kw(model, "write", [[record_id], values])
 
+    def write_many(self, model: str, record_ids: list, values: dict) -> bool:
+        """Aplica los mismos valores a varios registros con un solo write."""
+        return self.execute_kw(model, "write", [list(record_ids), values])
+
     def read(self, model: str, record_id: int, fields: list = None):
         """Lee un registro específico de Odoo."""
         fields = fields or []
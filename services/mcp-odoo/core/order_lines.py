@@ -0,0 +1,180 @@
+"""
+Order Lines
+===========
+Sincronización de líneas de una cotización (sale.order.order_line) por
+diferencias.
+
+En lugar de borrar todas las líneas (`(5, 0, 0)`) y crearlas de nuevo una
+por una, compara las líneas actuales con los productos pedidos y aplica el
+resultado en un solo `write` sobre sale.order con comandos one2many:
+
+    (1, id, vals)  la línea del mismo producto cambió de cantidad o precio
+                   (con `price_unit` siempre que se conoce el precio)
+    (0, 0, vals)   producto nuevo
+    (2, id)        la línea ya no está en los productos pedidos
+
+Las líneas que no cambian no se tocan (conservan id e historial), y las de
+sección o nota (sin producto) se respetan.
+
+    from core.order_lines import sync_order_lines
+
+    result = sync_order_lines(
+        client, sale_order_id, [{"product_id": 26174, "qty": 2, "price": -1}]
+    )
+    # {"added": 1, "updated": 0, "removed": 2, "unchanged": 0, "commands": 3}
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core import mirror
+from core.log import get_logger
+
+log = get_logger(__name__)
+
+LINE_FIELDS = ["id", "product_id", "product_uom_qty", "price_unit", "display_type"]
+
+_EPSILON = 1e-6
+
+
+def _product_id(value) -> Optional[int]:
+    # many2one [id, "Nombre"] → id
+    if isinstance(value, (list, tuple)):
+        return value[0] if value else None
+    return value or None
+
+
+def _changed(current: Any, wanted: float) -> bool:
+    return abs(float(current or 0.0) - float(wanted)) > _EPSILON
+
+
+def list_prices(client, product_ids: Sequence[int]) -> Dict[int, float]:
+    """`list_price` de varios productos en una sola lectura."""
+    if not product_ids:
+        return {}
+    rows = client.search_read(
+        "product.product",
+        [["id", "in", list(product_ids)]],
+        ["id", "list_price"],
+        len(product_ids),
+    )
+    return {row["id"]: row.get("list_price") or 0.0 for row in rows}
+
+
+def plan_line_commands(
+    lines: Sequence[Dict[str, Any]],
+    products: Sequence[Dict[str, Any]],
+    prices: Optional[Dict[int, float]] = None,
+    replace: bool = True,
+) -> Tuple[List[tuple], Dict[str, int]]:
+    """
+    Comandos one2many que llevan `lines` a `products`.
+
+    Args:
+        lines: Líneas actuales con LINE_FIELDS
+        products: [{"product_id", "qty" (1), "price" (<= 0: precio de lista)}]
+        prices: list_price por producto, para los que no traen precio
+        replace: False = solo agregar (no compara ni elimina líneas)
+
+    Returns:
+        (comandos, {"added", "updated", "removed", "unchanged"})
+
+    Cada producto pedido se empareja con la primera línea libre del mismo
+    producto, así que pedir dos veces un producto conserva dos líneas.
+    """
+    prices = prices or {}
+
+    # Líneas de producto disponibles para emparejar, en su orden original
+    available: Dict[int, List[Dict[str, Any]]] = {}
+    if replace:
+        for line in lines:
+            pid = _product_id(line.get("product_id"))
+            if pid and not line.get("display_type"):
+                available.setdefault(pid, []).append(line)
+
+    commands: List[tuple] = []
+    summary = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    for product in products:
+        pid = product.get("product_id")
+        qty = product.get("qty", 1.0)
+        price = product.get("price") or 0
+        if price <= 0:
+            price = prices.get(pid)
+
+        matches = available.get(pid)
+        if matches:
+            line = matches.pop(0)
+            vals = {}
+            if _changed(line.get("product_uom_qty"), qty):
+                vals["product_uom_qty"] = qty
+            if price is not None and _changed(line.get("price_unit"), price):
+                vals["price_unit"] = price
+            if vals:
+                # Odoo recalcula price_unit al cambiar la cantidad (precio de
+                # tarifa): el precio pedido va siempre con la actualización
+                if price is not None:
+                    vals["price_unit"] = price
+                commands.append((1, line["id"], vals))
+                summary["updated"] += 1
+            else:
+                summary["unchanged"] += 1
+            continue
+
+        vals = {"product_id": pid, "product_uom_qty": qty}
+        if price is not None:
+            vals["price_unit"] = price
+        commands.append((0, 0, vals))
+        summary["added"] += 1
+
+    for leftovers in available.values():
+        for line in leftovers:
+            commands.append((2, line["id"]))
+            summary["removed"] += 1
+
+    return commands, summary
+
+
+def sync_order_lines(
+    client,
+    sale_order_id: int,
+    products: Sequence[Dict[str, Any]],
+    replace: bool = True,
+) -> Dict[str, int]:
+    """
+    Sincroniza las líneas de `sale_order_id` con `products`.
+
+    Hace como máximo tres RPC: lectura de líneas (si `replace`), lectura de
+    precios de lista (si algún producto no trae precio) y un solo `write`.
+
+    Returns:
+        {"added", "updated", "removed", "unchanged", "commands"}
+    """
+    lines: List[Dict[str, Any]] = []
+    if replace:
+        # Del cliente original: el diff no puede partir de un espejo atrasado
+        lines = mirror.live(client).search_read(
+            "sale.order.line",
+            [["order_id", "=", sale_order_id]],
+            LINE_FIELDS,
+            None,
+        )
+
+    unpriced = list(
+        dict.fromkeys(
+            p.get("product_id") for p in products if (p.get("price") or 0) <= 0
+        )
+    )
+    prices = list_prices(client, unpriced)
+
+    commands, summary = plan_line_commands(lines, products, prices, replace)
+    if commands:
+        client.write("sale.order", sale_order_id, {"order_line": commands})
+    log.info(
+        "Líneas de la orden %s: %d nuevas, %d actualizadas, %d eliminadas, "
+        "%d sin cambios",
+        sale_order_id,
+        summary["added"],
+        summary["updated"],
+        summary["removed"],
+        summary["unchanged"],
+    )
+    return {**summary, "commands": len(commands)}
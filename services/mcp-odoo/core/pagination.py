@@ -0,0 +1,212 @@
+"""
+Pagination
+==========
+Paginación por cursor (keyset) y selección de campos para las tools de listado.
+
+En lugar de `offset`, cada página continúa "después" del último registro de
+la anterior según un orden estable cuyo último campo es único (`id`): el
+costo de la consulta en Odoo no crece con el número de página y no se
+saltan ni repiten registros si se insertan otros entre llamadas.
+
+Uso:
+    from core.pagination import paginate, select_fields
+
+    fields = select_fields(fields, allowed=("id", "name", "state"))
+    rows, next_cursor = paginate(
+        odoo, "sale.order", domain, fields,
+        order=(("date_order", True), ("id", True)),
+        limit=limit, cursor=cursor,
+    )
+
+El cursor es opaco para el cliente (base64 de JSON) y solo vale para el
+modelo que lo generó. Los campos de orden deben ser no nulos.
+
+`rank_page` pagina en memoria resultados ordenados por relevancia (score
+desc, id desc), con el mismo tipo de cursor.
+
+`page_result(items, next_cursor, compact)` arma la respuesta de la tool; con
+`compact=True` los registros van en formato columnar (`core.helpers.to_columns`).
+
+Variables de entorno:
+    PAGINATION_MAX_LIMIT  Registros máximos por página (default: 200)
+"""
+
+import base64
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.helpers import to_columns
+
+MAX_LIMIT = int(os.getenv("PAGINATION_MAX_LIMIT", "200"))
+
+Order = Sequence[Tuple[str, bool]]  # [(campo, descendente), ...]
+
+
+def encode_cursor(model: str, values: Sequence[Any]) -> str:
+    """Cursor opaco con los valores de orden del último registro de la página."""
+    raw = json.dumps([model, list(values)], separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, model: str, size: int) -> List[Any]:
+    """
+    Decodifica un cursor de `encode_cursor`.
+
+    Raises:
+        ValueError: Si el cursor es inválido o de otro modelo/orden.
+    """
+    try:
+        cursor_model, values = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+    except Exception as e:
+        raise ValueError(f"Cursor inválido: {cursor!r}") from e
+    if cursor_model != model or not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"Cursor inválido para {model}: {cursor!r}")
+    return values
+
+
+def keyset_domain(order: Order, values: Sequence[Any]) -> list:
+    """
+    Dominio (notación prefija de Odoo) de los registros posteriores a
+    `values` en el orden `order`:
+
+        k1 > v1  OR  (k1 = v1 AND k2 > v2)  OR ...
+
+    con `<` en los campos descendentes.
+    """
+    terms = []
+    for i, (field, desc) in enumerate(order):
+        term = ["&"] * i
+        term.extend((order[j][0], "=", values[j]) for j in range(i))
+        term.append((field, "<" if desc else ">", values[i]))
+        terms.append(term)
+    domain = ["|"] * (len(terms) - 1)
+    for term in terms:
+        domain.extend(term)
+    return domain
+
+
+def order_clause(order: Order) -> str:
+    """`order` en el formato de Odoo ("date_order desc, id desc")."""
+    return ", ".join(f"{field} {'desc' if desc else 'asc'}" for field, desc in order)
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Límite de página entre 1 y PAGINATION_MAX_LIMIT."""
+    return max(1, min(int(limit or MAX_LIMIT), MAX_LIMIT))
+
+
+def select_fields(
+    requested: Optional[Iterable[str]],
+    allowed: Sequence[str],
+    required: Sequence[str] = ("id",),
+) -> List[str]:
+    """
+    Campos a devolver: todos los permitidos si no se piden, o los pedidos
+    (más los obligatorios) validados contra la lista blanca.
+
+    Raises:
+        ValueError: Si se pide un campo fuera de `allowed`.
+    """
+    if not requested:
+        return list(allowed)
+    requested = list(requested)
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(
+            f"Campos no permitidos: {', '.join(unknown)}. "
+            f"Disponibles: {', '.join(allowed)}"
+        )
+    return [f for f in allowed if f in required or f in requested]
+
+
+def paginate(
+    odoo,
+    model: str,
+    domain: list,
+    fields: Sequence[str],
+    order: Order,
+    limit: Optional[int],
+    cursor: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Lee una página de `model` con `search_read` ordenado.
+
+    Args:
+        odoo: Cliente con `search_read(model, domain, fields, limit, order=...)`
+        domain: Filtros de la consulta
+        fields: Campos de Odoo a leer (se agregan los de orden)
+        order: Orden estable; el último campo debe ser único (normalmente id)
+        limit: Registros por página (acotado a PAGINATION_MAX_LIMIT)
+        cursor: `next_cursor` de la página anterior
+
+    Returns:
+        (registros, next_cursor o None si es la última página)
+
+    Raises:
+        ValueError: Si el cursor es inválido.
+    """
+    limit = clamp_limit(limit)
+    keys = [field for field, _ in order]
+    domain = list(domain)
+    if cursor:
+        domain += keyset_domain(order, decode_cursor(cursor, model, len(keys)))
+    read_fields = list(fields) + [k for k in keys if k not in fields]
+
+    # Un registro extra indica si hay página siguiente
+    rows = odoo.search_read(
+        model, domain, read_fields, limit + 1, order=order_clause(order)
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(model, [rows[-1].get(k) for k in keys])
+    return rows, next_cursor
+
+
+def rank_page(
+    model: str,
+    rows: List[dict],
+    scores: Dict[int, float],
+    limit: Optional[int],
+    cursor: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Página de `rows` por relevancia: score desc, id desc.
+
+    Para resultados de un índice local ya acotados (p.ej. `text_index`), que
+    Odoo no sabe ordenar. El cursor guarda (score, id) del último registro.
+
+    Raises:
+        ValueError: Si el cursor es inválido.
+    """
+    limit = clamp_limit(limit)
+    ranked = sorted(
+        rows, key=lambda r: (scores.get(r["id"], 0.0), r["id"]), reverse=True
+    )
+    if cursor:
+        last = tuple(decode_cursor(cursor, model, 2))
+        ranked = [r for r in ranked if (scores.get(r["id"], 0.0), r["id"]) < last]
+    next_cursor = None
+    if len(ranked) > limit:
+        ranked = ranked[:limit]
+        last_id = ranked[-1]["id"]
+        next_cursor = encode_cursor(model, [scores.get(last_id, 0.0), last_id])
+    return ranked, next_cursor
+
+
+def page_result(
+    items: List[dict], next_cursor: Optional[str], compact: bool = False
+) -> Dict[str, Any]:
+    """
+    Respuesta de una tool de listado.
+
+    Returns:
+        {"items": [...], "next_cursor": ...} o, si `compact`,
+        {"columns": [...], "rows": [[...]], "refs": {...}, "next_cursor": ...}
+    """
+    if compact:
+        return {**to_columns(items), "next_cursor": next_cursor}
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,498 @@
+"""
+Partner Index
+=============
+Índice local email normalizado → partner de Odoo (`res.partner`).
+
+Cada cotización empieza buscando (o creando) el partner por email. El índice:
+
+    - se precarga desde Odoo (warm, paginado por id) y se actualiza de forma
+      incremental por `write_date` (altas, cambios de email y archivados),
+      releyendo `PARTNER_INDEX_REFRESH_OVERLAP` segundos antes del último
+      visto (commits tardíos) y paginando por (write_date, id)
+    - cada `PARTNER_INDEX_RECONCILE_INTERVAL` comprueba que los ids indexados
+      sigan existiendo: los partners borrados o fusionados no cambian su
+      `write_date`, simplemente desaparecen
+    - registra los partners que crea el propio servicio
+    - recuerda los "no existe" durante un TTL corto (caché negativa)
+    - serializa por email: peticiones concurrentes del mismo cliente
+      comparten una sola búsqueda/creación, sin partners duplicados
+
+Un hit ahorra el `search_read`; un miss sin caché negativa hace la misma
+búsqueda que antes. Hay un índice por base de datos (url + db del cliente):
+
+    from core.partner_index import index_for
+    partner, created = index_for(client).get_or_create(
+        client, email, {"name": "Luis", "email": email, "phone": phone}
+    )
+
+Variables de entorno:
+    PARTNER_INDEX_ENABLED           false = siempre consulta a Odoo (default: true)
+    PARTNER_INDEX_MISS_TTL          Segundos que se recuerda un "no existe" (default: 30)
+    PARTNER_INDEX_REFRESH_INTERVAL  Segundos entre refrescos incrementales (default: 60)
+    PARTNER_INDEX_REFRESH_OVERLAP   Segundos que se releen antes del último write_date (default: 300)
+    PARTNER_INDEX_RECONCILE_INTERVAL  Segundos entre revisiones de ids borrados (default: 600)
+    PARTNER_INDEX_WARM              Precargar al arrancar el servidor (default: true)
+    PARTNER_INDEX_PAGE_SIZE         Registros por página al precargar (default: 2000)
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from core.contacts import is_valid_email, normalize_email
+from core.log import get_logger
+from core.mirror import after_keyset, overlap_start
+from core.metrics import PARTNER_INDEX_LOOKUPS, PARTNER_INDEX_SIZE
+
+log = get_logger(__name__)
+
+ENABLED = os.getenv("PARTNER_INDEX_ENABLED", "true").lower() == "true"
+MISS_TTL = float(os.getenv("PARTNER_INDEX_MISS_TTL", "30"))
+REFRESH_INTERVAL = float(os.getenv("PARTNER_INDEX_REFRESH_INTERVAL", "60"))
+REFRESH_OVERLAP = float(os.getenv("PARTNER_INDEX_REFRESH_OVERLAP", "300"))
+RECONCILE_INTERVAL = float(os.getenv("PARTNER_INDEX_RECONCILE_INTERVAL", "600"))
+WARM_ON_START = os.getenv("PARTNER_INDEX_WARM", "true").lower() == "true"
+PAGE_SIZE = int(os.getenv("PARTNER_INDEX_PAGE_SIZE", "2000"))
+
+MODEL = "res.partner"
+FIELDS = ["id", "name", "email", "active", "write_date"]
+
+
+class PartnerEntry(NamedTuple):
+    """Partner indexado: id y nombre (para los mensajes de pasos)."""
+
+    id: int
+    name: str
+
+
+class _KeyedLocks:
+    """Un lock por clave, creado al usarse y liberado cuando nadie lo ocupa."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks: Dict[str, list] = {}  # clave -> [lock, usuarios]
+
+    @contextmanager
+    def hold(self, key: str):
+        with self._lock:
+            slot = self._locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._locks[key]
+
+
+def _index_key(stored_email) -> Optional[str]:
+    """
+    Clave de un email tal como está en Odoo.
+
+    Solo se indexan emails válidos: los que `normalize_email` tendría que
+    corregir (o cambiar por el genérico) no deben colisionar con otros.
+    """
+    if not stored_email or not isinstance(stored_email, str):
+        return None
+    cleaned = stored_email.strip().lower()
+    return normalize_email(cleaned) if is_valid_email(cleaned) else None
+
+
+class PartnerIndex:
+    """Mapa email → partner con precarga, refresco incremental y caché negativa."""
+
+    def __init__(
+        self,
+        miss_ttl: float = MISS_TTL,
+        refresh_interval: float = REFRESH_INTERVAL,
+        refresh_overlap: float = REFRESH_OVERLAP,
+        reconcile_interval: float = RECONCILE_INTERVAL,
+        page_size: int = PAGE_SIZE,
+        enabled: bool = ENABLED,
+    ):
+        self.miss_ttl = miss_ttl
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = refresh_overlap
+        self.reconcile_interval = reconcile_interval
+        self.page_size = page_size
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, PartnerEntry] = {}
+        self._emails_by_id: Dict[int, str] = {}
+        self._misses: Dict[str, float] = {}  # email -> expira (monotonic)
+        self._email_locks = _KeyedLocks()
+        self._refresh_lock = threading.Lock()
+
+        self.watermark: Optional[str] = None  # write_date más reciente visto
+        self.warmed = False
+        self._last_refresh = 0.0
+        self._last_reconcile = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Búsqueda y creación
+    # ------------------------------------------------------------------
+
+    def lookup(self, client, email: str) -> Optional[PartnerEntry]:
+        """
+        Partner con ese email: del índice, o de Odoo si no está.
+
+        Un "no existe" reciente (caché negativa) se responde sin RPC.
+        """
+        key = normalize_email(email)
+        if not self.enabled:
+            return self._search(client, key)
+
+        self.maybe_refresh(client)
+        expires = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                expires = self._misses.get(key)
+                if expires is not None and expires <= time.monotonic():
+                    del self._misses[key]
+                    expires = None
+        if entry is not None:
+            PARTNER_INDEX_LOOKUPS.labels("hit").inc()
+            return entry
+        if expires is not None:
+            PARTNER_INDEX_LOOKUPS.labels("negative").inc()
+            return None
+
+        entry = self._search(client, key)
+        with self._lock:
+            if entry is not None:
+                self._store(key, entry)
+            else:
+                self._misses[key] = time.monotonic() + self.miss_ttl
+        PARTNER_INDEX_LOOKUPS.labels("rpc_found" if entry else "rpc_missing").inc()
+        return entry
+
+    def get_or_create(
+        self, client, email: str, values: dict
+    ) -> Tuple[PartnerEntry, bool]:
+        """
+        Busca el partner por email y lo crea con `values` si no existe.
+
+        Serializado por email: dos cotizaciones simultáneas del mismo cliente
+        no crean dos partners.
+
+        Returns:
+            (partner, creado)
+        """
+        key = normalize_email(email)
+        if not self.enabled:
+            entry = self._search(client, key)
+            if entry is not None:
+                return entry, False
+            partner_id = client.create(MODEL, values)
+            return PartnerEntry(partner_id, values.get("name") or ""), True
+
+        with self._email_locks.hold(key):
+            entry = self.lookup(client, key)
+            if entry is not None:
+                return entry, False
+            partner_id = client.create(MODEL, values)
+            entry = PartnerEntry(partner_id, values.get("name") or "")
+            self.record(key, entry)
+            PARTNER_INDEX_LOOKUPS.labels("created").inc()
+            return entry, True
+
+    def lookup_many(self, client, emails: Iterable[str]) -> Dict[str, PartnerEntry]:
+        """
+        Partners de varios emails: los indexados sin RPC y el resto (salvo
+        los "no existe" recientes) con una sola búsqueda `email in [...]`.
+
+        Returns:
+            {email normalizado: partner} solo de los que existen
+        """
+        keys = list(dict.fromkeys(normalize_email(e) for e in emails if e))
+        found: Dict[str, PartnerEntry] = {}
+        if not self.enabled:
+            missing = keys
+        else:
+            self.maybe_refresh(client)
+            now = time.monotonic()
+            missing = []
+            with self._lock:
+                for key in keys:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        found[key] = entry
+                    elif self._misses.get(key, 0.0) <= now:
+                        missing.append(key)
+            PARTNER_INDEX_LOOKUPS.labels("hit").inc(len(found))
+            PARTNER_INDEX_LOOKUPS.labels("negative").inc(
+                len(keys) - len(found) - len(missing)
+            )
+        if not missing:
+            return found
+
+        rows = client.search_read(
+            MODEL, [("email", "in", missing)], ["id", "name", "email"], None
+        )
+        fetched: Dict[str, PartnerEntry] = {}
+        # Emails duplicados en Odoo: se queda el partner más antiguo
+        for row in sorted(rows, key=lambda r: r["id"]):
+            key = _index_key(row.get("email"))
+            if key is not None and key not in fetched:
+                fetched[key] = PartnerEntry(row["id"], row.get("name") or "")
+        found.update(fetched)
+        if self.enabled:
+            expires = time.monotonic() + self.miss_ttl
+            with self._lock:
+                for key in missing:
+                    entry = fetched.get(key)
+                    if entry is not None:
+                        self._store(key, entry)
+                    else:
+                        self._misses[key] = expires
+        hits = sum(1 for key in missing if key in fetched)
+        PARTNER_INDEX_LOOKUPS.labels("rpc_found").inc(hits)
+        PARTNER_INDEX_LOOKUPS.labels("rpc_missing").inc(len(missing) - hits)
+        return found
+
+    def record(self, email: str, entry: PartnerEntry):
+        """Registra un partner creado o encontrado fuera del índice."""
+        key = normalize_email(email)
+        with self._lock:
+            self._store(key, entry)
+
+    def forget(self, email: str):
+        """Olvida un email (p.ej. si Odoo rechazó el partner indexado)."""
+        key = normalize_email(email)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._emails_by_id.pop(entry.id, None)
+            self._misses.pop(key, None)
+
+    def _search(self, client, key: str) -> Optional[PartnerEntry]:
+        rows = client.search_read(
+            MODEL, [("email", "=", key)], ["id", "name", "email"], limit=1
+        )
+        if not rows:
+            return None
+        return PartnerEntry(rows[0]["id"], rows[0].get("name") or "")
+
+    def _store(self, key: str, entry: PartnerEntry):
+        """Asigna key → entry (con self._lock tomado)."""
+        previous_key = self._emails_by_id.get(entry.id)
+        if previous_key is not None and previous_key != key:
+            # El partner cambió de email
+            previous = self._entries.get(previous_key)
+            if previous is not None and previous.id == entry.id:
+                del self._entries[previous_key]
+        current = self._entries.get(key)
+        if current is not None and current.id != entry.id and current.id < entry.id:
+            # Emails duplicados en Odoo: se queda el partner más antiguo
+            return
+        self._entries[key] = entry
+        self._emails_by_id[entry.id] = key
+        self._misses.pop(key, None)
+
+    def _drop(self, partner_id: int):
+        """Quita un partner archivado, borrado o sin email válido (con self._lock)."""
+        key = self._emails_by_id.pop(partner_id, None)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is not None and entry.id == partner_id:
+            del self._entries[key]
+
+    def _apply(self, row: dict):
+        key = _index_key(row.get("email"))
+        with self._lock:
+            if key is None or row.get("active") is False:
+                self._drop(row["id"])
+            else:
+                self._store(key, PartnerEntry(row["id"], row.get("name") or ""))
+            write_date = row.get("write_date")
+            if write_date and (self.watermark is None or write_date > self.watermark):
+                self.watermark = write_date
+
+    # ------------------------------------------------------------------
+    # Precarga y refresco
+    # ------------------------------------------------------------------
+
+    def warm(self, client) -> int:
+        """
+        Carga todos los partners con email, paginando por id.
+
+        Returns:
+            Registros leídos
+        """
+        start = time.perf_counter()
+        last_id = 0
+        total = 0
+        while True:
+            rows = client.execute_kw(
+                MODEL,
+                "search_read",
+                [[("email", "!=", False), ("id", ">", last_id)]],
+                {"fields": FIELDS, "order": "id asc", "limit": self.page_size},
+            )
+            for row in rows:
+                self._apply(row)
+            total += len(rows)
+            if len(rows) < self.page_size:
+                break
+            last_id = rows[-1]["id"]
+        self.warmed = True
+        self._last_refresh = self._last_reconcile = time.monotonic()
+        log.info(
+            "Índice de partners precargado: %d emails de %d partners en %.2fs",
+            len(self),
+            total,
+            time.perf_counter() - start,
+        )
+        return total
+
+    def refresh(self, client) -> int:
+        """
+        Aplica los partners modificados desde `refresh_overlap` segundos
+        antes del último `write_date` visto (incluye archivados, para
+        quitarlos). Reaplicar es idempotente; las páginas avanzan por
+        (write_date, id), así un partner reescrito mientras se pagina no hace
+        saltar a otro.
+
+        Returns:
+            Registros leídos
+        """
+        if self.watermark is None:
+            return self.warm(client)
+        since = overlap_start(self.watermark, self.refresh_overlap)
+        base = [("write_date", ">=", since), ("active", "in", [True, False])]
+        domain = base
+        total = 0
+        while True:
+            rows = client.execute_kw(
+                MODEL,
+                "search_read",
+                [domain],
+                {
+                    "fields": FIELDS,
+                    "order": "write_date asc, id asc",
+                    "limit": self.page_size,
+                },
+            )
+            for row in rows:
+                self._apply(row)
+            total += len(rows)
+            if len(rows) < self.page_size:
+                break
+            domain = base + after_keyset(rows[-1]["write_date"], rows[-1]["id"])
+        self._last_refresh = time.monotonic()
+        log.debug("Índice de partners refrescado: %d cambios", total)
+        return total
+
+    def reconcile(self, client) -> int:
+        """
+        Quita los partners indexados que ya no existen (borrados o fusionados)
+        o que se archivaron: un `search` por id, paginado.
+
+        Returns:
+            Partners quitados
+        """
+        with self._lock:
+            ids = sorted(self._emails_by_id)
+        removed = 0
+        for start in range(0, len(ids), self.page_size):
+            chunk = ids[start : start + self.page_size]
+            alive = set(client.execute_kw(MODEL, "search", [[("id", "in", chunk)]]))
+            gone = [partner_id for partner_id in chunk if partner_id not in alive]
+            if gone:
+                with self._lock:
+                    for partner_id in gone:
+                        self._drop(partner_id)
+                removed += len(gone)
+        self._last_reconcile = time.monotonic()
+        if removed:
+            log.info("Índice de partners: %d partners ya no existen en Odoo", removed)
+        return removed
+
+    def maybe_refresh(self, client):
+        """
+        Refresca si ya pasó `refresh_interval` desde el último (y revisa los
+        ids borrados si ya pasó `reconcile_interval`).
+
+        Solo un thread refresca; el resto sigue con el índice actual. Un error
+        se registra y no interrumpe la búsqueda.
+        """
+        if not self.warmed:
+            return
+        if time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self.refresh(client)
+            if time.monotonic() - self._last_reconcile >= self.reconcile_interval:
+                self.reconcile(client)
+        except Exception as e:
+            # Reintentar en el siguiente intervalo, no en cada búsqueda
+            self._last_refresh = time.monotonic()
+            log.warning("Error refrescando el índice de partners: %s", e)
+        finally:
+            self._refresh_lock.release()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            misses = sum(1 for expires in self._misses.values() if expires > now)
+            return {
+                "enabled": self.enabled,
+                "warmed": self.warmed,
+                "entries": len(self._entries),
+                "cached_misses": misses,
+                "watermark": self.watermark,
+            }
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# UN ÍNDICE POR BASE DE DATOS
+# ═══════════════════════════════════════════════════════════════════════
+
+_indexes: Dict[Tuple[str, str], PartnerIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def index_for(client) -> PartnerIndex:
+    """Índice de la base de datos del cliente (url + db)."""
+    key = (getattr(client, "url", ""), getattr(client, "db", ""))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = PartnerIndex()
+        return index
+
+
+def warm_in_background(
+    client_factory: Callable[[], object],
+) -> Optional[threading.Thread]:
+    """
+    Precarga en un thread el índice de la base que usa `client_factory`.
+
+    No hace nada si el índice o la precarga están deshabilitados.
+    """
+    if not (ENABLED and WARM_ON_START):
+        return None
+
+    def run():
+        try:
+            client = client_factory()
+            index_for(client).warm(client)
+        except Exception as e:
+            log.warning("No se pudo precargar el índice de partners: %s", e)
+
+    thread = threading.Thread(target=run, name="partner-index-warm", daemon=True)
+    thread.start()
+    return thread
+
+
+PARTNER_INDEX_SIZE.set_callback(lambda: sum(len(i) for i in list(_indexes.values())))
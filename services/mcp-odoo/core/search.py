@@ -0,0 +1,323 @@
+"""
+Search
+======
+Búsqueda en varios modelos de Odoo en paralelo con ranking combinado.
+
+Los modelos buscables se registran en `SEARCHABLE` (tipo → `Searchable`):
+el tipo es el prefijo de los ids que devuelve la tool (`task:12`). Para
+agregar un modelo basta con registrarlo:
+
+    from core.search import Searchable, register_searchable
+
+    register_searchable(Searchable(
+        kind="ticket", model="helpdesk.ticket", label="Ticket",
+        wants=keywords("ticket", "soporte"),
+    ))
+
+`search(odoo, query, limit)` consulta cada modelo pedido en un thread del
+pool (un `search_read` con `ilike` sobre `search_fields`, los más recientes
+primero) y ordena la unión por relevancia (sin distinguir acentos):
+
+    3  el nombre es el query        2  el nombre empieza con el query
+    1  el nombre contiene el query  0.5  coincide en otro campo (email...)
+
+más un bono de recencia en (0, 0.25] por `write_date` (0.25 / (1 + días / 30)),
+que solo desempata dentro del mismo nivel. Un modelo que falla (no
+instalado, sin permisos) se omite sin afectar a los demás.
+
+Los modelos con `fuzzy=True` (proyectos, tareas y productos) buscan en el
+índice local de `core.text_index` mientras el espejo está al día: toleran
+errores de dedo y acentos, y un registro que no contiene el query literal
+puntúa con su similitud (0..1) en lugar de 0.5.
+
+Variables de entorno:
+    SEARCH_DEFAULT_MODELS  Tipos a buscar si el query no menciona ninguno (default: project,task)
+    SEARCH_MAX_WORKERS     Threads para consultar modelos en paralelo (default: 4)
+    SEARCH_CANDIDATES      Candidatos por modelo = limit × este factor, máx. 100 (default: 3)
+"""
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core import text_index
+from core.helpers import odoo_form_url, wants_projects, wants_tasks
+from core.log import get_logger
+from core.text_index import fold
+
+log = get_logger(__name__)
+
+DEFAULT_MODELS = [
+    k.strip()
+    for k in os.getenv("SEARCH_DEFAULT_MODELS", "project,task").split(",")
+    if k.strip()
+]
+MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", "4"))
+CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "3"))
+MAX_CANDIDATES = 100
+
+_ODOO_DATETIME = "%Y-%m-%d %H:%M:%S"
+_RECENCY_DAYS = 30.0
+_RECENCY_WEIGHT = 0.25
+
+
+def keywords(*terms: str) -> Callable[[str], bool]:
+    """`wants` que detecta cualquiera de `terms` en el query (sin mayúsculas)."""
+
+    def wants(query: str) -> bool:
+        ql = query.lower()
+        return any(term in ql for term in terms)
+
+    return wants
+
+
+@dataclass(frozen=True)
+class Searchable:
+    """Modelo buscable por la tool `search`."""
+
+    kind: str  # prefijo del id ("task" → "task:12")
+    model: str
+    label: str  # prefijo del título ("Task · ...")
+    wants: Callable[[str], bool]  # ¿el query pide este modelo?
+    search_fields: Tuple[str, ...] = ("name",)  # el primero es el nombre
+    fetch_fields: Tuple[str, ...] = ()  # campos extra para `fetch`
+    fuzzy: bool = False  # buscar en core.text_index si está disponible
+
+    @property
+    def name_field(self) -> str:
+        return self.search_fields[0]
+
+
+SEARCHABLE: Dict[str, Searchable] = {}
+
+
+def register_searchable(spec: Searchable):
+    """Agrega (o reemplaza) un modelo buscable."""
+    SEARCHABLE[spec.kind] = spec
+
+
+for _spec in (
+    Searchable("project", "project.project", "Project", wants_projects, fuzzy=True),
+    Searchable("task", "project.task", "Task", wants_tasks, fuzzy=True),
+    Searchable(
+        "lead",
+        "crm.lead",
+        "Lead",
+        keywords("lead", "oportunidad", "opportunit", "prospecto"),
+        ("name", "email_from", "partner_id"),
+        ("type", "partner_id", "email_from", "user_id", "stage_id"),
+    ),
+    Searchable(
+        "sale",
+        "sale.order",
+        "Sale",
+        keywords("venta", "cotizaci", "pedido", "orden", "sale", "quotation", "order"),
+        ("name", "partner_id"),
+        ("partner_id", "date_order", "amount_total", "state", "user_id"),
+    ),
+    Searchable(
+        "product",
+        "product.product",
+        "Product",
+        keywords("producto", "product", "sku", "catálogo", "catalogo"),
+        ("name", "default_code"),
+        ("default_code", "categ_id", "list_price"),
+        fuzzy=True,
+    ),
+    Searchable(
+        "partner",
+        "res.partner",
+        "Partner",
+        keywords("cliente", "contacto", "empresa", "partner", "customer", "contact"),
+        ("name", "email"),
+        ("email", "phone", "is_company"),
+    ),
+):
+    register_searchable(_spec)
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=MAX_WORKERS, thread_name_prefix="search"
+        )
+    return _executor
+
+
+def resolve_kinds(query: str, kinds: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Tipos a buscar: los pedidos explícitamente, los que el query menciona o,
+    si no menciona ninguno, `SEARCH_DEFAULT_MODELS`.
+
+    Raises:
+        ValueError: Si se pide un tipo no registrado.
+    """
+    if kinds:
+        unknown = [k for k in kinds if k not in SEARCHABLE]
+        if unknown:
+            raise ValueError(
+                f"Modelos no buscables: {', '.join(unknown)}. "
+                f"Disponibles: {', '.join(SEARCHABLE)}"
+            )
+        return list(dict.fromkeys(kinds))
+    wanted = [kind for kind, spec in SEARCHABLE.items() if spec.wants(query)]
+    return wanted or [k for k in DEFAULT_MODELS if k in SEARCHABLE]
+
+
+def _domain(spec: Searchable, query: str) -> list:
+    if not query:
+        return []
+    domain = ["|"] * (len(spec.search_fields) - 1)
+    domain.extend((field, "ilike", query) for field in spec.search_fields)
+    return domain
+
+
+def _text(value: Any) -> str:
+    # many2one → su nombre; False/None → ""
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        value = value[1]
+    return value if isinstance(value, str) else ""
+
+
+def _recency(write_date: Any, now: datetime) -> float:
+    if not isinstance(write_date, str):
+        return 0.0
+    try:
+        changed = datetime.strptime(write_date[:19], _ODOO_DATETIME)
+    except ValueError:
+        return 0.0
+    days = max(0.0, (now - changed).total_seconds() / 86400)
+    return _RECENCY_WEIGHT / (1.0 + days / _RECENCY_DAYS)
+
+
+def score(
+    spec: Searchable,
+    row: dict,
+    query: str,
+    now: datetime,
+    similarity: Optional[float] = None,
+) -> float:
+    """
+    Relevancia de un registro: nivel de coincidencia + bono de recencia.
+
+    `similarity` (del índice difuso) reemplaza el 0.5 de "otro campo".
+    """
+    q = fold(query)
+    name = fold(_text(row.get(spec.name_field)))
+    if not q:
+        tier = 0.0
+    elif name == q:
+        tier = 3.0
+    elif name.startswith(q):
+        tier = 2.0
+    elif q in name:
+        tier = 1.0
+    elif similarity is not None:
+        tier = similarity
+    else:
+        tier = 0.5  # coincidió en otro de los search_fields
+    return tier + _recency(row.get("write_date"), now)
+
+
+def _search_one(
+    odoo, spec: Searchable, query: str, limit: int
+) -> Tuple[List[dict], Dict[int, float]]:
+    """Registros candidatos de un modelo y su similitud difusa (si aplica)."""
+    fields = ["id", *spec.search_fields, "write_date"]
+    hits = None
+    if spec.fuzzy and query:
+        hits = text_index.search(odoo, spec.model, query, limit)
+    if hits is None:
+        rows = odoo.search_read(
+            spec.model,
+            _domain(spec, query),
+            fields,
+            limit,
+            order="write_date desc, id desc",
+        )
+        return rows, {}
+    similarity = dict(hits)
+    if not similarity:
+        return [], similarity
+    rows = odoo.search_read(
+        spec.model, [("id", "in", list(similarity))], fields, len(similarity)
+    )
+    return rows, similarity
+
+
+def search(
+    odoo,
+    query: str,
+    limit: int = 10,
+    kinds: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Busca `query` en los modelos pedidos en paralelo.
+
+    Args:
+        odoo: Cliente con `search_read(..., order=...)` (thread-safe)
+        query: Texto a buscar (ilike); vacío = los más recientes
+        limit: Resultados máximos en total
+        kinds: Tipos de `SEARCHABLE`; None = según el query
+
+    Returns:
+        [{"id": "task:12", "title": "Task · ...", "url": ..., "score": ...}]
+        ordenados por relevancia
+
+    Raises:
+        ValueError: Si se pide un tipo no registrado.
+    """
+    specs = [SEARCHABLE[kind] for kind in resolve_kinds(query, kinds)]
+    if not specs or limit <= 0:
+        return []
+    candidates = min(limit * CANDIDATES, MAX_CANDIDATES)
+
+    # copy_context: los spans de cada RPC se cuelgan de la traza de la tool
+    futures = [
+        (
+            spec,
+            _pool().submit(
+                contextvars.copy_context().run,
+                _search_one,
+                odoo,
+                spec,
+                query,
+                candidates,
+            ),
+        )
+        for spec in specs
+    ]
+
+    # write_date de Odoo es UTC sin zona
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    ranked = []
+    for order, (spec, future) in enumerate(futures):
+        try:
+            rows, similarity = future.result()
+        except Exception as e:
+            log.warning("Búsqueda en %s falló: %s", spec.model, e)
+            continue
+        for position, row in enumerate(rows):
+            relevance = score(spec, row, query, now, similarity.get(row["id"]))
+            ranked.append((-relevance, order, position, spec, row))
+    ranked.sort(key=lambda item: item[:3])
+
+    results = []
+    for neg_score, _, _, spec, row in ranked[:limit]:
+        rid = int(row["id"])
+        name = _text(row.get(spec.name_field)) or "(sin nombre)"
+        results.append(
+            {
+                "id": f"{spec.kind}:{rid}",
+                "title": f"{spec.label} · {name}",
+                "url": odoo_form_url(spec.model, rid),
+                "score": round(-neg_score, 3),
+            }
+        )
+    return results
@@ -3,10 +3,15 @@ Gestión de tareas asíncronas para cotizaciones.
 Almacena el estado de las tareas en memoria.
 """
 
+import time
 from datetime import datetime
 from typing import Dict, Optional, Any
 from enum import Enum
 
+from core import tracing
+from core.helpers import json_dumps
+from core.metrics import QUOTATION_SECONDS, QUOTATION_STAGE_SECONDS, TASKS
+
 
 class TaskStatus(str, Enum):
     """Estados posibles de una tarea"""
@@ -20,8 +25,15 @@ class TaskStatus(str, Enum):
 class QuotationTask:
     """Representa una tarea de cotización en proceso"""
 
-    def __init__(self, task_id: str, params: dict):
+    def __init__(
+        self,
+        task_id: str,
+        params: dict,
+        source: str = "api",
+        correlation_id: Optional[str] = None,
+    ):
         self.id = task_id
+        self.source = source
         self.status = TaskStatus.QUEUED
         self.params = params
         self.result: Optional[Any] = None
@@ -30,27 +42,86 @@ class QuotationTask:
         self.started_at: Optional[datetime] = None
         self.completed_at: Optional[datetime] = None
         self.progress: Optional[str] = None
+        # Etapa en curso y su inicio (perf_counter) para métricas por etapa
+        self.stage: Optional[str] = None
+        self._stage_started = 0.0
+        self._started = 0.0
+        # Traza de la tarea: span raíz "quotation" y un span hijo por etapa
+        self.trace = tracing.Trace(correlation_id or task_id)
+        self._root_span: Optional[tracing.Span] = None
+        self._stage_span: Optional[tracing.Span] = None
+        # to_dict()/to_json() cacheados una vez que la tarea termina: los
+        # clientes sondean el estado y el resultado final ya no cambia
+        self._final_dict: Optional[dict] = None
+        self._final_json: Optional[bytes] = None
 
     def start(self):
-        """Marca la tarea como en proceso"""
+        """
+        Marca la tarea como en proceso y abre su traza en el thread actual.
+
+        Si se llama de nuevo (reintento) la traza y el tiempo total continúan.
+        """
+        self._final_dict = self._final_json = None
         self.status = TaskStatus.PROCESSING
         self.started_at = datetime.now()
+        if self._root_span is None:
+            self._started = time.perf_counter()
+            self._root_span = self.trace.start_span(
+                "quotation", tracking_id=self.id, source=self.source
+            )
 
     def complete(self, result: Any):
         """Marca la tarea como completada"""
-        self.status = TaskStatus.COMPLETED
+        self._finish()
+        self._final_dict = self._final_json = None
+        # El estado va al final: to_dict() de otro thread ve la tarea completa
         self.result = result
         self.completed_at = datetime.now()
+        self.status = TaskStatus.COMPLETED
 
     def fail(self, error: str):
         """Marca la tarea como fallida"""
-        self.status = TaskStatus.FAILED
+        self._finish(error=error)
+        self._final_dict = self._final_json = None
         self.error = error
         self.completed_at = datetime.now()
+        self.status = TaskStatus.FAILED
 
-    def update_progress(self, message: str):
-        """Actualiza el mensaje de progreso"""
+    def update_progress(self, message: str, stage: Optional[str] = None):
+        """
+        Actualiza el mensaje de progreso.
+
+        Args:
+            message: Mensaje legible para el cliente
+            stage: Si se indica, cierra la etapa anterior y abre una nueva
+                (p.ej. "partner", "lead", "sale_order"); se mide su duración
+        """
         self.progress = message
+        if stage is not None and stage != self.stage:
+            self._close_stage()
+            self.stage = stage
+            self._stage_started = time.perf_counter()
+            if self._root_span is not None:
+                self._stage_span = self.trace.start_span(f"stage.{stage}")
+
+    def _close_stage(self, error: Optional[str] = None):
+        if self.stage is not None:
+            QUOTATION_STAGE_SECONDS.labels(self.source, self.stage).observe(
+                time.perf_counter() - self._stage_started
+            )
+            self.stage = None
+        if self._stage_span is not None:
+            self._stage_span.end(error)
+            self._stage_span = None
+
+    def _finish(self, error: Optional[str] = None):
+        self._close_stage(error)
+        if self._started:
+            QUOTATION_SECONDS.labels(
+                self.source, "failed" if error is not None else "completed"
+            ).observe(time.perf_counter() - self._started)
+        if self._root_span is not None:
+            self._root_span.end(error)
 
     def elapsed_seconds(self) -> float:
         """Tiempo transcurrido desde la creación"""
@@ -58,7 +129,15 @@ class QuotationTask:
         return (end_time - self.created_at).total_seconds()
 
     def to_dict(self) -> dict:
-        """Convierte la tarea a diccionario para respuesta JSON"""
+        """
+        Convierte la tarea a diccionario para respuesta JSON.
+
+        En estado final (completed/failed) se construye una sola vez; el dict
+        devuelto es compartido y no debe modificarse.
+        """
+        if self._final_dict is not None:
+            return self._final_dict
+
         data = {
             "tracking_id": self.id,
             "status": self.status.value,
@@ -80,8 +159,26 @@ class QuotationTask:
             data["error"] = self.error
             data["completed_at"] = self.completed_at.isoformat()
 
+        if self.trace.root is not None:
+            data["trace"] = self.trace.waterfall()
+
+        if self.completed_at is not None and self.status in (
+            TaskStatus.COMPLETED,
+            TaskStatus.FAILED,
+        ):
+            self._final_dict = data
         return data
 
+    def to_json(self) -> bytes:
+        """`to_dict()` serializado (JSON compacto, UTF-8); cacheado en estado final."""
+        if self._final_json is not None:
+            return self._final_json
+        data = self.to_dict()
+        encoded = json_dumps(data, compact=True).encode("utf-8")
+        if data is self._final_dict:
+            self._final_json = encoded
+        return encoded
+
 
 class TaskManager:
     """Gestor de tareas en memoria"""
@@ -89,9 +186,18 @@ class TaskManager:
     def __init__(self):
         self._tasks: Dict[str, QuotationTask] = {}
 
-    def create_task(self, task_id: str, params: dict) -> QuotationTask:
-        """Crea una nueva tarea"""
-        task = QuotationTask(task_id, params)
+    def create_task(
+        self, task_id: str, params: dict, source: str = "api"
+    ) -> QuotationTask:
+        """
+        Crea una nueva tarea (source: "api" o "mcp", para métricas).
+
+        El correlation id de su traza es el de la petición en curso
+        (header `X-Correlation-ID`) o, si no hay, el propio task_id.
+        """
+        task = QuotationTask(
+            task_id, params, source, correlation_id=tracing.request_correlation_id()
+        )
         self._tasks[task_id] = task
         return task
 
@@ -119,6 +225,14 @@ class TaskManager:
 
         return len(to_remove)
 
+    def count_by_status(self) -> Dict[str, int]:
+        """Cantidad de tareas en memoria por estado"""
+        counts = {status.value: 0 for status in TaskStatus}
+        for task in list(self._tasks.values()):
+            counts[task.status.value] += 1
+        return counts
+
 
 # Instancia global del gestor de tareas
 task_manager = TaskManager()
+TASKS.set_callback(task_manager.count_by_status)
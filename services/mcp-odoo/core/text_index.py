@@ -0,0 +1,381 @@
+"""
+Text Index
+==========
+Índice difuso local (trigramas) sobre nombres, descripciones y asignados de
+proyectos y tareas, y sobre nombre, código y categoría de los productos, para
+búsquedas tolerantes a errores de dedo y acentos ("instalacion" encuentra
+"Instalación") en milisegundos.
+
+El índice vive en memoria y se alimenta del espejo (`core.mirror`): se
+suscribe a los cambios de cada modelo, así que se actualiza con cada
+sincronización incremental por `write_date` sin consultas propias a Odoo.
+Solo se usa mientras el espejo del modelo está al día; si no, `search()`
+devuelve None y el llamador usa `ilike` en Odoo.
+
+    from core import text_index
+
+    hits = text_index.search(odoo, "project.task", "instalasion robot")
+    # [(task_id, similitud 0..1), ...] de mayor a menor, o None
+
+Similitud: promedio (ponderado por IDF) de qué tanto se parece cada palabra
+del query a la palabra más cercana del registro (trigramas, sin acentos; un
+prefijo también cuenta, y una subcadena desde 3 letras);
+las del nombre cuentan completas y las del resto del texto (proyecto,
+asignados, descripción) con peso `TEXT_WEIGHT`. En productos el código cuenta
+completo y la categoría con `CATEGORY_WEIGHT`.
+
+Además, todo registro que contiene el query literal (como `ilike`: "tarea 3"
+encuentra "Tarea 30") entra con al menos `LITERAL_SIMILARITY` × el peso del
+campo, así el índice nunca devuelve menos que el `ilike` al que reemplaza.
+
+Variables de entorno:
+    TEXT_INDEX_ENABLED    false = búsquedas con ilike en Odoo (default: true)
+    TEXT_INDEX_MIN_SCORE  Similitud mínima de un resultado (default: 0.4)
+"""
+
+import heapq
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from core import mirror
+from core.log import get_logger
+from core.metrics import TEXT_INDEX_DOCS
+
+log = get_logger(__name__)
+
+ENABLED = os.getenv("TEXT_INDEX_ENABLED", "true").lower() == "true"
+MIN_SCORE = float(os.getenv("TEXT_INDEX_MIN_SCORE", "0.4"))
+TEXT_WEIGHT = 0.6  # proyecto, asignados y descripción frente al nombre
+CATEGORY_WEIGHT = 0.8  # "limpiesa" encuentra la categoría "Robots de limpieza"
+WORD_SIMILARITY = 0.5  # Dice mínimo entre una palabra del query y del índice
+PREFIX_SIMILARITY = 0.85  # "insta" → "instalacion"
+SUBSTRING_SIMILARITY = 0.7  # "bot" → "pudubot"
+LITERAL_SIMILARITY = 0.9  # el texto contiene el query completo (ilike)
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+_TAGS = re.compile(r"<[^>]+>")
+
+
+def fold(text: str) -> str:
+    """Minúsculas sin acentos ni puntuación: "Instalación #3" → "instalacion 3"."""
+    ascii_text = (
+        unicodedata.normalize("NFKD", text.casefold())
+        .encode("ascii", "ignore")
+        .decode("ascii")
+    )
+    return _NON_WORD.sub(" ", ascii_text).strip()
+
+
+def _word_grams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """
+    Índice invertido palabra → {id: peso} con búsqueda difusa.
+
+    Cada palabra del query se compara contra el vocabulario (no contra cada
+    documento) por trigramas (Dice); luego se suman, ponderadas por IDF, las
+    palabras parecidas de cada documento. Las palabras raras se procesan
+    primero y, cuando un documento aún no visto ya no puede alcanzar el
+    umbral, el resto solo actualiza a los candidatos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._words: Dict[str, Dict[int, float]] = {}  # palabra → {id: peso}
+        self._grams: Dict[str, Set[str]] = {}  # trigrama → palabras
+        self._docs: Dict[int, Dict[str, float]] = {}  # id → {palabra: peso}
+        self._texts: Dict[int, List[Tuple[str, float]]] = {}  # id → [(texto, peso)]
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def upsert(self, doc_id: int, texts: Sequence[Tuple[str, float]]):
+        """Indexa (o reindexa) un documento: [(texto, peso 0..1), ...]."""
+        words: Dict[str, float] = {}
+        folded = []
+        for text, weight in texts:
+            text = fold(text) if text else ""
+            if text:
+                folded.append((text, weight))
+            for word in text.split():
+                if weight > words.get(word, 0.0):
+                    words[word] = weight
+        with self._lock:
+            self._remove(doc_id)
+            if not words:
+                return
+            self._docs[doc_id] = words
+            self._texts[doc_id] = folded
+            for word, weight in words.items():
+                posting = self._words.get(word)
+                if posting is None:
+                    posting = self._words[word] = {}
+                    for gram in _word_grams(word):
+                        self._grams.setdefault(gram, set()).add(word)
+                posting[doc_id] = weight
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: int):
+        self._texts.pop(doc_id, None)
+        for word in self._docs.pop(doc_id, ()):
+            posting = self._words[word]
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._words[word]
+                for gram in _word_grams(word):
+                    vocab = self._grams[gram]
+                    vocab.discard(word)
+                    if not vocab:
+                        del self._grams[gram]
+
+    def _similar(self, word: str) -> Dict[str, float]:
+        """Palabras del vocabulario parecidas a `word`: {palabra: similitud}."""
+        grams = _word_grams(word)
+        shared = Counter()
+        for gram in grams:
+            vocab = self._grams.get(gram)
+            if vocab:
+                shared.update(vocab)
+        similar = {}
+        for candidate, count in shared.items():
+            sim = 2.0 * count / (len(grams) + len(candidate) + 1)
+            if candidate.startswith(word):
+                # "insta" → "instalacion"; también cortas y números: "3" → "30"
+                sim = max(sim, PREFIX_SIMILARITY)
+            elif len(word) >= 3 and word in candidate:
+                sim = max(sim, SUBSTRING_SIMILARITY)  # "bot" → "pudubot"
+            if sim >= WORD_SIMILARITY:
+                similar[candidate] = min(sim, 1.0)
+        return similar
+
+    def _literal(
+        self, phrase: str, words: Set[str], similar: Dict[str, float]
+    ) -> Dict[int, float]:
+        """
+        Documentos cuyo texto contiene `phrase` literal: {id: peso del campo}.
+
+        Cada palabra del query está dentro de una palabra del texto, así que
+        los candidatos salen del vocabulario (no de recorrer los documentos);
+        con varias palabras se confirma la frase en el texto de cada candidato.
+        `similar` son las parecidas de la única palabra del query: las que
+        ya valen LITERAL_SIMILARITY o más no cambian el resultado.
+        """
+        if len(words) == 1:
+            (token,) = words
+            literal: Dict[int, float] = {}
+            for word, posting in self._words.items():
+                if token in word and similar.get(word, 0.0) < LITERAL_SIMILARITY:
+                    for doc_id, weight in posting.items():
+                        if weight > literal.get(doc_id, 0.0):
+                            literal[doc_id] = weight
+            return literal
+        # Candidatos por la palabra más larga (la más selectiva, por lo general)
+        token = max(words, key=len)
+        candidates: Set[int] = set()
+        for word, posting in self._words.items():
+            if token in word:
+                candidates.update(posting)
+        literal = {}
+        for doc_id in candidates:
+            for text, weight in self._texts[doc_id]:
+                if phrase in text and weight > literal.get(doc_id, 0.0):
+                    literal[doc_id] = weight
+        return literal
+
+    def search(
+        self, query: str, limit: int = 20, min_score: float = MIN_SCORE
+    ) -> List[Tuple[int, float]]:
+        """
+        Documentos más parecidos a `query`, más los que lo contienen literal.
+
+        Returns:
+            [(id, similitud 0..1)] de mayor a menor, como máximo `limit`
+        """
+        phrase = fold(query)
+        words = set(phrase.split())
+        if not words:
+            return []
+        with self._lock:
+            total_docs = len(self._docs) + 1
+            terms = []  # (peso IDF, {id: mejor similitud × peso del campo})
+            for word in words:
+                similar = self._similar(word)
+                if len(similar) == 1:
+                    ((match, sim),) = similar.items()
+                    best = self._words[match]
+                    if sim < 1.0:
+                        best = {doc: sim * w for doc, w in best.items()}
+                else:
+                    best = {}
+                    for match, sim in similar.items():
+                        for doc_id, weight in self._words[match].items():
+                            value = sim * weight
+                            if value > best.get(doc_id, 0.0):
+                                best[doc_id] = value
+                # Una palabra que no está en ningún registro ("el", "producto")
+                # pesa lo mínimo en lugar de lo máximo
+                idf = math.log(total_docs / len(best)) + 1.0 if best else 1.0
+                terms.append((idf, best))
+            literal = self._literal(phrase, words, similar)
+
+        # Raras primero (más IDF, listas más cortas)
+        terms.sort(key=lambda term: len(term[1]))
+        norm = sum(idf for idf, _ in terms)
+        threshold = min_score * norm
+        remaining = norm
+        scores: Dict[int, float] = {}
+        get = scores.get
+        for idf, best in terms:
+            if remaining >= threshold:
+                for doc_id, value in best.items():
+                    scores[doc_id] = get(doc_id, 0.0) + idf * value
+            else:
+                # Un documento aún no visto ya no alcanza el umbral (MaxScore)
+                lookup = best.get
+                for doc_id, score in scores.items():
+                    value = lookup(doc_id)
+                    if value:
+                        scores[doc_id] = score + idf * value
+            remaining -= idf
+        for doc_id, weight in literal.items():
+            value = LITERAL_SIMILARITY * weight * norm
+            if value >= threshold and value > get(doc_id, 0.0):
+                scores[doc_id] = value
+        top = heapq.nlargest(
+            limit,
+            ((score, doc_id) for doc_id, score in scores.items() if score >= threshold),
+        )
+        return [(doc_id, round(score / norm, 3)) for score, doc_id in top]
+
+
+# ─── documentos por modelo ─────────────────────────────────────────────
+
+
+def _name(value) -> str:
+    # many2one [id, "Nombre"] → "Nombre"
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return value[1] if isinstance(value[1], str) else ""
+    return value if isinstance(value, str) else ""
+
+
+def _project_texts(record: dict, users: Callable[[], Dict[int, str]]):
+    return [(_name(record.get("name")), 1.0)]
+
+
+def _task_texts(record: dict, users: Callable[[], Dict[int, str]]):
+    assignees = [_name(record.get("user_id"))]
+    user_ids = record.get("user_ids")
+    if user_ids:
+        names = users()
+        assignees.extend(names.get(uid, "") for uid in user_ids)
+    description = _TAGS.sub(" ", _name(record.get("description")))
+    return [
+        (_name(record.get("name")), 1.0),
+        (_name(record.get("project_id")), TEXT_WEIGHT),
+        (" ".join(assignees), TEXT_WEIGHT),
+        (description, TEXT_WEIGHT),
+    ]
+
+
+def _product_texts(record: dict, users: Callable[[], Dict[int, str]]):
+    return [
+        (_name(record.get("name")), 1.0),
+        (_name(record.get("default_code")), 1.0),
+        (_name(record.get("categ_id")), CATEGORY_WEIGHT),
+    ]
+
+
+BUILDERS: Dict[str, Callable] = {
+    "project.project": _project_texts,
+    "project.task": _task_texts,
+    "product.product": _product_texts,
+}
+
+_indexes: Dict[Tuple[int, str], FuzzyIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _attach(source: "mirror.Mirror", model: str) -> FuzzyIndex:
+    index = FuzzyIndex()
+    build = BUILDERS[model]
+
+    def on_change(records: List[dict], removed: List[int]):
+        users_cache: Dict[int, str] = {}
+
+        def users() -> Dict[int, str]:
+            # Nombres de res.users del espejo, una vez por lote
+            if not users_cache:
+                users_cache.update(
+                    (u["id"], _name(u.get("name")))
+                    for u in source.snapshot("res.users")
+                )
+            return users_cache
+
+        for doc_id in removed:
+            index.remove(doc_id)
+        for record in records:
+            index.upsert(record["id"], build(record, users))
+
+    source.subscribe(model, on_change)
+    return index
+
+
+def index_for(client, model: str) -> Optional[FuzzyIndex]:
+    """
+    Índice de `model` para la base de `client` (se crea y suscribe al espejo
+    la primera vez), o None si el índice o el espejo están deshabilitados.
+    """
+    if not (ENABLED and mirror.ENABLED) or model not in BUILDERS:
+        return None
+    source = mirror.mirror_for(client)
+    if model not in source.specs:
+        return None
+    key = (id(source), model)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = _attach(source, model)
+        return index
+
+
+def search(
+    client,
+    model: str,
+    query: str,
+    limit: int = 20,
+    min_score: float = MIN_SCORE,
+    max_staleness: float = mirror.MAX_STALENESS,
+) -> Optional[List[Tuple[int, float]]]:
+    """
+    Búsqueda difusa en el índice de `model`.
+
+    Returns:
+        [(id, similitud)] de mayor a menor, o None si el índice no puede
+        responder (deshabilitado o espejo desactualizado): usar ilike.
+    """
+    index = index_for(client, model)
+    if index is None or not mirror.mirror_for(client).fresh(model, max_staleness):
+        return None
+    return index.search(query, limit, min_score)
+
+
+def warm(client, models: Iterable[str] = tuple(BUILDERS)):
+    """Crea los índices al registrar las tools (se llenan con el espejo)."""
+    for model in models:
+        index_for(client, model)
+
+
+TEXT_INDEX_DOCS.set_callback(
+    lambda: {(model,): len(index) for (_, model), index in list(_indexes.items())}
+)
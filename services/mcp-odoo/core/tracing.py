@@ -0,0 +1,508 @@
+"""
+Tracing
+=======
+Trazas ligeras (spans anidados) para cotizaciones, handoffs y tools MCP.
+
+Uso:
+    from core import tracing
+
+    with tracing.start_trace("handoff", user_phone=phone):
+        with tracing.span("odoo.read", model="crm.lead"):
+            ...
+
+Cada traza tiene un `correlation_id`: el header `X-Correlation-ID` de la
+petición si vino, o el que se indique al abrir la traza (el tracking_id en
+las cotizaciones). El span activo vive en un `ContextVar`, así que los
+`tracing.span(...)` anidados en cualquier módulo (p.ej. `execute_kw`) se
+cuelgan del span en curso; si no hay traza activa son un no-op.
+
+Al cerrar el span raíz la traza completa se encola para exportarse en un
+thread de fondo (JSONL local u OTLP/HTTP JSON a un collector).
+
+Variables de entorno:
+    TRACE_EXPORTER       "jsonl" (default), "otlp" o "none"
+    TRACE_JSONL_PATH     Archivo JSONL (default <MCP_LOG_DIR>/traces.jsonl)
+    TRACE_OTLP_ENDPOINT  Collector OTLP/HTTP (default http://localhost:4318)
+    TRACE_SERVICE_NAME   service.name en OTLP (default mcp-odoo)
+    TRACE_MAX_SPANS      Máximo de spans por traza (default 500)
+"""
+
+import contextvars
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.log import get_logger
+
+
+log = get_logger(__name__)
+
+CORRELATION_HEADER = "x-correlation-id"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+_correlation_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "correlation_id", default=None
+)
+
+_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "500"))
+
+
+def current_span() -> Optional["Span"]:
+    """Span activo en el contexto actual (o None)."""
+    return _current_span.get()
+
+
+def current_correlation_id() -> Optional[str]:
+    """Correlation id de la traza activa o del header de la petición."""
+    span = _current_span.get()
+    if span is not None:
+        return span.trace.correlation_id
+    return _correlation_id.get()
+
+
+def request_correlation_id() -> Optional[str]:
+    """Correlation id recibido en el header de la petición en curso (o None)."""
+    return _correlation_id.get()
+
+
+def set_correlation_id(value: Optional[str]) -> contextvars.Token:
+    """Fija el correlation id del contexto (lo hace el middleware HTTP)."""
+    return _correlation_id.set(value)
+
+
+class Span:
+    """Operación con nombre, atributos y duración dentro de una traza."""
+
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent",
+        "name",
+        "attributes",
+        "start_time",
+        "end_time",
+        "_t0",
+        "duration",
+        "error",
+        "_previous",
+    )
+
+    def __init__(self, trace: "Trace", name: str, parent: Optional["Span"], attrs):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.name = name
+        self.attributes: Dict[str, Any] = attrs
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self._t0 = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self._previous: Optional[Span] = None
+
+    @property
+    def depth(self) -> int:
+        depth, parent = 0, self.parent
+        while parent is not None:
+            depth, parent = depth + 1, parent.parent
+        return depth
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def activate(self) -> "Span":
+        """Hace de este span el activo del contexto actual."""
+        self._previous = _current_span.get()
+        _current_span.set(self)
+        return self
+
+    def end(self, error: Optional[BaseException | str] = None):
+        """Cierra el span (idempotente) y restaura el span activo anterior."""
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._t0
+        self.end_time = self.start_time + self.duration
+        if error is not None:
+            self.error = (
+                error
+                if isinstance(error, str)
+                else f"{type(error).__name__}: {str(error)[:200]}"
+            )
+        current = _current_span.get()
+        is_root = self is self.trace.root
+        if current is self or (
+            is_root and current is not None and current.trace is self.trace
+        ):
+            _current_span.set(self._previous)
+        self.trace._on_end(self)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end(exc)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "start": self.start_time,
+            "duration_ms": round(self.duration * 1000, 2)
+            if self.duration is not None
+            else None,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Span vacío cuando no hay traza activa (sin asignaciones por llamada)."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key, value):
+        pass
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Conjunto de spans de una operación (una cotización, un handoff...)."""
+
+    def __init__(self, correlation_id: Optional[str] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.correlation_id = correlation_id or self.trace_id
+        self.root: Optional[Span] = None
+        self.spans: List[Span] = []
+        self._open: Dict[str, Span] = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attrs) -> Span:
+        """Abre un span (raíz si aún no hay) y lo activa en el contexto."""
+        if parent is None and self.root is not None and self.root.duration is None:
+            parent = self.root
+        span = Span(self, name, parent, attrs)
+        with self._lock:
+            self._open[span.span_id] = span
+        if self.root is None:
+            self.root = span
+            span.attributes.setdefault("correlation_id", self.correlation_id)
+        return span.activate()
+
+    def _on_end(self, span: Span):
+        with self._lock:
+            self._open.pop(span.span_id, None)
+            if len(self.spans) < _MAX_SPANS:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+        if span is self.root:
+            exporter.export(self)
+
+    def waterfall(self) -> Dict[str, Any]:
+        """
+        Resumen cronológico de los spans cerrados (y los abiertos, en curso).
+
+        Cada entrada trae `offset_ms` desde el inicio de la traza, `duration_ms`
+        y `depth` para dibujar la cascada.
+        """
+        if self.root is None:
+            return {"trace_id": self.trace_id, "correlation_id": self.correlation_id}
+
+        with self._lock:
+            spans = list(self.spans) + list(self._open.values())
+        origin = self.root.start_time
+        now = time.perf_counter()
+
+        items = []
+        for span in sorted(spans, key=lambda s: s.start_time):
+            duration = span.duration
+            item = {
+                "name": span.name,
+                "offset_ms": round((span.start_time - origin) * 1000, 1),
+                "duration_ms": round(
+                    (duration if duration is not None else now - span._t0) * 1000, 1
+                ),
+                "depth": span.depth,
+            }
+            if duration is None:
+                item["in_progress"] = True
+            if span.error:
+                item["error"] = span.error
+            attrs = {k: v for k, v in span.attributes.items() if k != "correlation_id"}
+            if attrs:
+                item["attributes"] = attrs
+            items.append(item)
+
+        data = {
+            "trace_id": self.trace_id,
+            "correlation_id": self.correlation_id,
+            "spans": items,
+        }
+        if self.dropped:
+            data["dropped_spans"] = self.dropped
+        return data
+
+
+def start_trace(
+    name: str, correlation_id: Optional[str] = None, **attrs
+) -> Span:
+    """
+    Abre una traza nueva y su span raíz (usar como context manager).
+
+    El correlation id es el header de la petición si existe; si no, el
+    indicado (p.ej. el tracking_id) o el propio trace_id.
+    """
+    trace = Trace(_correlation_id.get() or correlation_id)
+    return trace.start_span(name, **attrs)
+
+
+def span(name: str, **attrs):
+    """Span hijo del activo; no-op si no hay traza en curso."""
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    return parent.trace.start_span(name, parent=parent, **attrs)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# EXPORTADORES
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class SpanExporter:
+    """Exporta trazas cerradas en un thread de fondo; descarta si la cola está llena."""
+
+    def __init__(self, max_queue: int = 1000):
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def export(self, trace: Trace):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="trace-exporter", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 100:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.export_batch(batch)
+            except Exception as e:
+                log.warning("Error exportando %d trazas: %s", len(batch), e)
+
+    def export_batch(self, traces: List[Trace]):
+        raise NotImplementedError
+
+
+class NoopExporter(SpanExporter):
+    def export(self, trace: Trace):
+        pass
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Un span por línea JSON en un archivo local."""
+
+    def __init__(self, path: str, max_queue: int = 1000):
+        super().__init__(max_queue)
+        self.path = Path(path)
+
+    def export_batch(self, traces: List[Trace]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for trace in traces:
+                for span in trace.spans:
+                    f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str))
+                    f.write("\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    data = {
+        "traceId": span.trace.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(int(span.start_time * 1e9)),
+        "endTimeUnixNano": str(int((span.end_time or span.start_time) * 1e9)),
+        "attributes": [
+            {"key": k, "value": _otlp_value(v)}
+            for k, v in span.attributes.items()
+            if v is not None
+        ],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent is not None:
+        data["parentSpanId"] = span.parent.span_id
+    return data
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """Envía trazas a un collector OTLP/HTTP con codificación JSON (`/v1/traces`)."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str = "mcp-odoo",
+        timeout: float = 5.0,
+        max_queue: int = 1000,
+    ):
+        super().__init__(max_queue)
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export_batch(self, traces: List[Trace]):
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "core.tracing"},
+                            "spans": [
+                                _otlp_span(span)
+                                for trace in traces
+                                for span in trace.spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload, default=str).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def _build_exporter() -> SpanExporter:
+    kind = os.getenv("TRACE_EXPORTER", "jsonl").lower()
+    if kind == "otlp":
+        return OtlpHttpSpanExporter(
+            os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318"),
+            service_name=os.getenv("TRACE_SERVICE_NAME", "mcp-odoo"),
+        )
+    if kind == "jsonl":
+        default_path = os.path.join(
+            os.getenv("MCP_LOG_DIR", "/tmp/mcp_odoo_logs"), "traces.jsonl"
+        )
+        return JsonlSpanExporter(os.getenv("TRACE_JSONL_PATH", default_path))
+    return NoopExporter()
+
+
+# Exportador global (reemplazable con set_exporter)
+exporter: SpanExporter = _build_exporter()
+
+
+def set_exporter(new_exporter: SpanExporter):
+    """Reemplaza el exportador global."""
+    global exporter
+    exporter = new_exporter
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# MIDDLEWARE HTTP
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class CorrelationIdMiddleware:
+    """
+    Middleware ASGI: toma `X-Correlation-ID` del request, lo deja en el
+    contexto para las trazas que se abran y lo devuelve en la respuesta.
+
+    Es ASGI puro (no BaseHTTPMiddleware) para no bufferizar el stream SSE de MCP.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        correlation_id = None
+        for key, value in scope.get("headers", []):
+            if key.decode("latin-1").lower() == CORRELATION_HEADER:
+                correlation_id = value.decode("latin-1")[:128]
+                break
+
+        if correlation_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (CORRELATION_HEADER.encode(), correlation_id.encode("latin-1"))
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _correlation_id.set(correlation_id)
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            _correlation_id.reset(token)
@@ -4,11 +4,18 @@ Soporta múltiples canales y ambientes (dev/prod) mediante variables de entorno.
 """
 
 import os
+import time
 from typing import Optional, Dict, Any
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
 
+from core.contacts import normalize_phone
+from core.log import get_logger
 from core.logger import quotation_logger
+from core import tracing
+from core.metrics import TWILIO_SEND_SECONDS
+
+log = get_logger(__name__)
 
 
 class SMSClient:
@@ -38,17 +45,21 @@ class SMSClient:
         )  # Para notificaciones de error
 
         if not all([self.account_sid, self.auth_token]):
-            print("⚠️  Twilio client not configured. Missing credentials.")
+            log.warning("Twilio client not configured. Missing credentials.")
             self.client = None
         else:
             self.client = Client(self.account_sid, self.auth_token)
+            # API alternativa (stand-in local para benchmarks/pruebas)
+            api_base_url = os.getenv("TWILIO_API_BASE_URL")
+            if api_base_url:
+                self.client.api.base_url = api_base_url.rstrip("/")
 
         # Log de configuración
-        print(f"📱 SMS/WhatsApp Client configurado:")
-        print(f"   Canal: {self.message_channel}")
-        print(f"   Ambiente: {self.environment}")
-        print(
-            f"   Notificaciones de error: {'✅ Habilitadas' if self.enable_error_notifications else '❌ Deshabilitadas'}"
+        log.info(
+            "SMS/WhatsApp Client configurado (canal=%s, ambiente=%s, notificaciones de error=%s)",
+            self.message_channel,
+            self.environment,
+            "habilitadas" if self.enable_error_notifications else "deshabilitadas",
         )
 
     def is_configured(self) -> bool:
@@ -78,14 +89,14 @@ class SMSClient:
         if not number:
             return None
 
-        # Limpiar formato existente
-        clean_number = number.replace("whatsapp:", "").strip()
+        # Normalizar a E.164; si no es válido se usa tal cual (sin prefijo)
+        clean_number = (
+            normalize_phone(number) or number.replace("whatsapp:", "").strip()
+        )
 
         # Aplicar formato según canal
         if self.message_channel == "whatsapp":
-            if not clean_number.startswith("whatsapp:"):
-                return f"whatsapp:{clean_number}"
-            return clean_number
+            return f"whatsapp:{clean_number}"
         else:
             return clean_number
 
@@ -119,7 +130,7 @@ class SMSClient:
             dict con status y message_sid o error
         """
         if not self.is_configured():
-            print(f"❌ {self.message_channel.upper()} client not configured")
+            log.error("%s client not configured", self.message_channel.upper())
             return {
                 "status": "error",
                 "message": f"{self.message_channel.upper()} client not configured. Check environment variables.",
@@ -128,8 +139,8 @@ class SMSClient:
         # 🚨 LÓGICA DE NOTIFICACIONES DE ERROR
         if is_error_notification:
             if not self.enable_error_notifications:
-                print(
-                    "⚠️ Notificaciones de error deshabilitadas (ENABLE_ERROR_NOTIFICATIONS=false)"
+                log.warning(
+                    "Notificaciones de error deshabilitadas (ENABLE_ERROR_NOTIFICATIONS=false)"
                 )
                 return {
                     "status": "skipped",
@@ -139,8 +150,8 @@ class SMSClient:
             # Usar número de fallback para errores
             actual_target = self.format_number(self.error_fallback_number)
             if not actual_target:
-                print(
-                    "❌ No se configuró VENDEDOR_WHATSAPP para notificaciones de error"
+                log.error(
+                    "No se configuró VENDEDOR_WHATSAPP para notificaciones de error"
                 )
                 return {
                     "status": "error",
@@ -150,7 +161,7 @@ class SMSClient:
             # 📱 NOTIFICACIONES NORMALES: Enviar directo al vendedor
             actual_target = self.format_number(to_number)
             if not actual_target:
-                print("❌ No se proporcionó número del vendedor (to_number)")
+                log.error("No se proporcionó número del vendedor (to_number)")
                 return {"status": "error", "message": "Vendor number not provided"}
 
         # Construir mensaje según si hay lead_data o no
@@ -169,22 +180,26 @@ Contexto: {additional_context or reason}
 
 Vendedor asignado: ID {assigned_user_id or 'N/A'}""".strip()
 
+        send_status = "error"
+        error = None
+        span = tracing.span("twilio.send", channel=self.message_channel)
+        start = time.perf_counter()
         try:
             # Enviar mensaje
             from_number = self.get_from_number()
             twilio_message = self.client.messages.create(
                 from_=from_number, to=actual_target, body=message
             )
-
-            channel_emoji = "📱" if self.message_channel == "whatsapp" else "💬"
-            print(
-                f"{channel_emoji} {self.message_channel.upper()} notification sent. SID: {twilio_message.sid}"
+            send_status = "success"
+
+            log.info(
+                "%s notification sent. SID: %s (destino=%s, ambiente=%s, error=%s)",
+                self.message_channel.upper(),
+                twilio_message.sid,
+                actual_target,
+                self.environment,
+                is_error_notification,
             )
-            print(f"   Destino: {actual_target}")
-            print(f"   Ambiente: {self.environment}")
-
-            if is_error_notification:
-                print(f"   🚨 Tipo: Notificación de ERROR")
 
             return {
                 "status": "success",
@@ -196,13 +211,21 @@ Vendedor asignado: ID {assigned_user_id or 'N/A'}""".strip()
             }
 
         except TwilioRestException as e:
-            print(f"❌ Twilio error sending {self.message_channel}: {e}")
+            error = e
+            log.error("Twilio error sending %s: %s", self.message_channel, e)
             return {"status": "error", "message": f"Twilio error: {str(e)}"}
 
         except Exception as e:
-            print(f"❌ Unexpected error sending {self.message_channel}: {e}")
+            error = e
+            log.error("Unexpected error sending %s: %s", self.message_channel, e)
             return {"status": "error", "message": f"Unexpected error: {str(e)}"}
 
+        finally:
+            TWILIO_SEND_SECONDS.labels(self.message_channel, send_status).observe(
+                time.perf_counter() - start
+            )
+            span.end(error)
+
 
 # Instancia global del cliente
 sms_client = SMSClient()
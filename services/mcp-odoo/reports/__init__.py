@@ -0,0 +1,15 @@
+"""
+Reports
+=======
+CLI de reportes de operación sobre Odoo (reemplaza los scripts de
+resources/odoo/data.py):
+
+    - ops: reportes (agrupaciones con read_group, registros puntuales y el
+      reporte semanal en paralelo)
+    - export: exportación de un modelo a CSV/Parquet página por página
+
+    python -m reports weekly --env prod
+    python -m reports export crm.lead --fields name,user_id --out leads.csv
+
+Las credenciales salen del entorno (`core.clients`).
+"""
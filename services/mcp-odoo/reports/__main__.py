@@ -0,0 +1,170 @@
+"""
+Reportes de operación sobre Odoo.
+
+    python -m reports weekly [--days 7]          # reportes de la semana en paralelo
+    python -m reports repairs                    # reparaciones abiertas por responsable
+    python -m reports pipeline [--team ID]       # oportunidades por vendedor y etapa
+    python -m reports sales [--days 7]           # ventas por vendedor y estado
+    python -m reports new-leads [--days 7]       # leads nuevos por vendedor
+    python -m reports workload [--team 14]       # carga de oportunidades del equipo
+    python -m reports team-members --team ID     # miembros de un equipo de ventas
+    python -m reports lead ID                    # campos de un lead
+    python -m reports sale-order ID              # orden de venta con sus líneas
+    python -m reports partner EMAIL              # contactos por email
+    python -m reports pricelist [--id 82]        # items de una tarifa (y robots)
+    python -m reports export MODEL --out F.csv   # exporta a CSV/Parquet por páginas
+
+Opciones comunes:
+    --env prod|dev     ambiente (default: ODOO_ENVIRONMENT o dev)
+    --format json|table
+
+Equivalencias con resources/odoo/data.py:
+    reparaciones()                               → repairs
+    field_by_id_leads(env, id)                   → lead ID --env ENV
+    field_by_id_sale_order(env, id)              → sale-order ID --env ENV
+    search_partner_by_email(env, email)          → partner EMAIL --env ENV
+    get_salesperson_with_least_opportunities()   → workload
+    get_sales_team_member_ids(env, team)         → team-members --team ID
+    validate_pricelist(env, id)                  → pricelist --id ID
+
+Credenciales: ODOO_URL/ODOO_DB/ODOO_LOGIN/ODOO_API_KEY para prod y
+DEV_ODOO_* para dev (ver core/clients.py).
+"""
+
+import argparse
+import json
+import sys
+import xmlrpc.client
+from typing import Any, List
+
+from core.clients import ENVIRONMENTS, get_client
+from reports import export, ops
+
+
+def _table(rows: List[dict]) -> str:
+    """Tabla de texto de una lista de registros planos."""
+    if not rows:
+        return "(sin resultados)"
+    cols = list(dict.fromkeys(k for row in rows for k in row))
+    cells = [[_cell(row.get(c)) for c in cols] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(cols)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(cols, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    lines += ["  ".join(v.ljust(w) for v, w in zip(r, widths)) for r in cells]
+    return "\n".join(lines)
+
+
+def _cell(value: Any) -> str:
+    if isinstance(value, list) and len(value) == 2 and isinstance(value[1], str):
+        return value[1]
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    if value is None or value is False:
+        return ""
+    return str(value)
+
+
+def _print(result: Any, fmt: str):
+    if fmt == "json":
+        print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+        return
+    if isinstance(result, list) and all(isinstance(r, dict) for r in result):
+        print(_table(result))
+        return
+    if isinstance(result, dict):
+        for key, value in result.items():
+            if isinstance(value, dict) or (
+                isinstance(value, list) and value and isinstance(value[0], dict)
+            ):
+                print(f"\n== {key} ==")
+                _print(value, fmt)
+            else:
+                print(f"{key}: {_cell(value)}")
+        return
+    print(_cell(result))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="reports",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--env", choices=ENVIRONMENTS, default=None)
+    parser.add_argument("--format", choices=("json", "table"), default="table")
+    sub = parser.add_subparsers(dest="report", required=True)
+
+    p = sub.add_parser("weekly")
+    p.add_argument("--days", type=int, default=7)
+    sub.add_parser("repairs")
+    p = sub.add_parser("pipeline")
+    p.add_argument("--team", type=int, default=None)
+    for name in ("sales", "new-leads"):
+        p = sub.add_parser(name)
+        p.add_argument("--days", type=int, default=7)
+    p = sub.add_parser("workload")
+    p.add_argument("--team", type=int, default=ops.WORKLOAD_TEAM_ID)
+    p = sub.add_parser("team-members")
+    p.add_argument("--team", type=int, required=True)
+    p = sub.add_parser("lead")
+    p.add_argument("id", type=int)
+    p = sub.add_parser("sale-order")
+    p.add_argument("id", type=int)
+    p = sub.add_parser("partner")
+    p.add_argument("email")
+    p = sub.add_parser("pricelist")
+    p.add_argument("--id", type=int, default=ops.PRICELIST_ID)
+    p = sub.add_parser("export")
+    p.add_argument("model")
+    p.add_argument("--out", required=True, help="archivo .csv o .parquet")
+    p.add_argument("--fields", default="id,name", help="campos separados por coma")
+    p.add_argument("--domain", default="[]", help='dominio JSON: [["type","=","lead"]]')
+    p.add_argument("--page-size", type=int, default=export.PAGE_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        client = get_client(args.env)
+        if args.report == "weekly":
+            result = ops.weekly(client, args.days)
+        elif args.report == "repairs":
+            result = ops.repairs(client)
+        elif args.report == "pipeline":
+            result = ops.pipeline(client, args.team)
+        elif args.report == "sales":
+            result = ops.sales(client, args.days)
+        elif args.report == "new-leads":
+            result = ops.new_leads(client, args.days)
+        elif args.report == "workload":
+            result = ops.workload(client, args.team)
+        elif args.report == "team-members":
+            result = ops.team_members(client, args.team)
+        elif args.report == "lead":
+            result = ops.lead(client, args.id)
+        elif args.report == "sale-order":
+            result = ops.sale_order(client, args.id)
+        elif args.report == "partner":
+            result = ops.partner(client, args.email)
+        elif args.report == "pricelist":
+            result = ops.pricelist(client, args.id)
+        else:
+            result = export.export(
+                client,
+                args.model,
+                json.loads(args.domain),
+                [f.strip() for f in args.fields.split(",") if f.strip()],
+                args.out,
+                page_size=args.page_size,
+            )
+    except (ValueError, RuntimeError, xmlrpc.client.Fault) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if result is None:
+        print("No encontrado", file=sys.stderr)
+        return 1
+    _print(result, args.format)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
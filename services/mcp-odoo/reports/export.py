@@ -0,0 +1,193 @@
+"""
+Export
+======
+Exportación de un modelo completo a CSV o Parquet, página por página.
+
+Cada página se lee con `search_read` ordenado por id y continúa después del
+último id de la anterior (keyset, como `core.pagination`), y se escribe al
+archivo antes de pedir la siguiente. La memoria usada depende del tamaño de
+página y no del número de registros.
+
+Columnas: un many2one `user_id` se exporta como `user_id` (id) y
+`user_id_name` (nombre); los one2many/many2many como ids separados por `;`.
+
+Parquet requiere pyarrow (`pip install pyarrow`); CSV no tiene dependencias.
+
+    from reports.export import export
+
+    export(client, "crm.lead", [["type", "=", "opportunity"]],
+           ["id", "name", "user_id", "expected_revenue"], "leads.parquet")
+"""
+
+import csv
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from core.log import get_logger
+
+log = get_logger(__name__)
+
+PAGE_SIZE = int(os.getenv("REPORT_EXPORT_PAGE_SIZE", "2000"))
+
+FORMATS = ("csv", "parquet")
+
+_X2MANY = ("one2many", "many2many")
+
+
+def pages(
+    client, model: str, domain: Sequence, fields: Sequence[str], page_size: int
+) -> Iterator[List[dict]]:
+    """Páginas de `model` en orden de id, sin offset."""
+    last_id = 0
+    while True:
+        rows = client.search_read(
+            model,
+            list(domain) + [["id", ">", last_id]],
+            list(fields),
+            page_size,
+            order="id asc",
+        )
+        if not rows:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+def columns(types: Dict[str, str], fields: Sequence[str]) -> List[Tuple[str, str]]:
+    """(columna, tipo) de cada campo; un many2one ocupa dos columnas."""
+    result = []
+    for field in fields:
+        ftype = types.get(field, "char")
+        if ftype == "many2one":
+            result.append((field, "integer"))
+            result.append((f"{field}_name", "char"))
+        elif ftype in _X2MANY:
+            result.append((field, "char"))
+        else:
+            result.append((field, ftype))
+    return result
+
+
+def flatten(row: dict, types: Dict[str, str], fields: Sequence[str]) -> Dict[str, Any]:
+    """Registro de Odoo → valores planos por columna (False vacío → None)."""
+    flat: Dict[str, Any] = {}
+    for field in fields:
+        value = row.get(field)
+        ftype = types.get(field, "char")
+        if ftype == "many2one":
+            is_m2o = isinstance(value, (list, tuple)) and len(value) == 2
+            flat[field] = value[0] if is_m2o else None
+            flat[f"{field}_name"] = value[1] if is_m2o else None
+        elif ftype in _X2MANY:
+            flat[field] = ";".join(str(v) for v in value or [])
+        elif value is False and ftype != "boolean":
+            flat[field] = None
+        else:
+            flat[field] = value
+    return flat
+
+
+class _CsvWriter:
+    def __init__(self, path: str, cols: List[Tuple[str, str]]):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, [name for name, _ in cols])
+        self._writer.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    """Un row group por página."""
+
+    def __init__(self, path: str, cols: List[Tuple[str, str]]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError(
+                "Exportar a Parquet requiere pyarrow (pip install pyarrow)"
+            )
+        arrow_types = {
+            "integer": pa.int64(),
+            "float": pa.float64(),
+            "monetary": pa.float64(),
+            "boolean": pa.bool_(),
+        }
+        self._pa = pa
+        self._schema = pa.schema(
+            [(name, arrow_types.get(ftype, pa.string())) for name, ftype in cols]
+        )
+        self._strings = {name for name, ftype in cols if ftype not in arrow_types}
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[Dict[str, Any]]):
+        data = {
+            name: [
+                (
+                    str(r[name])
+                    if name in self._strings and r[name] is not None
+                    else r[name]
+                )
+                for r in rows
+            ]
+            for name in self._schema.names
+        }
+        self._writer.write_table(self._pa.Table.from_pydict(data, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def export(
+    client,
+    model: str,
+    domain: Sequence,
+    fields: Sequence[str],
+    path: str,
+    fmt: Optional[str] = None,
+    page_size: int = PAGE_SIZE,
+) -> Dict[str, Any]:
+    """
+    Exporta los registros de `model` que cumplen `domain` a `path`.
+
+    Args:
+        fmt: "csv" o "parquet"; None = según la extensión de `path`
+
+    Returns:
+        {"path", "format", "rows", "pages"}
+
+    Raises:
+        ValueError: Formato no soportado.
+        RuntimeError: Parquet sin pyarrow instalado.
+    """
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".") or "csv").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt} ({', '.join(FORMATS)})")
+    fields = list(dict.fromkeys(["id", *fields]))
+
+    described = client.execute_kw(
+        model, "fields_get", [fields], {"attributes": ["type"]}
+    )
+    unknown = [f for f in fields if f not in described]
+    if unknown:
+        raise ValueError(f"Campos inexistentes en {model}: {', '.join(unknown)}")
+    types = {name: info["type"] for name, info in described.items()}
+    cols = columns(types, fields)
+
+    writer = (_ParquetWriter if fmt == "parquet" else _CsvWriter)(path, cols)
+    total = count = 0
+    try:
+        for rows in pages(client, model, domain, fields, page_size):
+            writer.write([flatten(r, types, fields) for r in rows])
+            total += len(rows)
+            count += 1
+            log.info("Exportación %s: página %d, %d registros", model, count, total)
+    finally:
+        writer.close()
+    return {"path": path, "format": fmt, "rows": total, "pages": count}
@@ -0,0 +1,320 @@
+"""
+Ops
+===
+Reportes de operación sobre Odoo (antes funciones sueltas de
+resources/odoo/data.py).
+
+Cada reporte recibe un cliente (`core.clients.get_client`) y devuelve datos
+serializables a JSON. Los reportes de agrupación usan `read_group`
+(`core.analytics`): Odoo devuelve los conteos y ya no hace falta traer
+todos los registros para contarlos en Python.
+
+`weekly` corre en paralelo los reportes independientes entre sí. Si uno
+falla, su sección trae {"error": ...} y los demás se entregan igual.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core import analytics
+from core.contacts import is_valid_email, normalize_email
+from core.log import get_logger
+
+log = get_logger(__name__)
+
+# Equipo y etapas activas de la asignación de leads
+# (OdooClient.get_salesperson_with_least_opportunities)
+WORKLOAD_TEAM_ID = 14
+WORKLOAD_STAGE_IDS = (1, 2, 10, 3)
+
+PRICELIST_ID = 82
+ROBOT_KEYWORDS = ("robot", "cc1", "swiftbot", "pudu", "kettybot")
+
+LEAD_FIELDS = [
+    "id",
+    "active",
+    "company_id",
+    "contact_name",
+    "create_date",
+    "date_conversion",
+    "name",
+    "probability",
+    "user_id",
+    "stage_id",
+    "state_id",
+    "type",
+    "partner_id",
+    "partner_name",
+    "phone",
+    "email_from",
+    "order_ids",
+]
+PARTNER_FIELDS = [
+    "id",
+    "name",
+    "email",
+    "phone",
+    "mobile",
+    "street",
+    "city",
+    "country_id",
+    "create_date",
+]
+PRICELIST_ITEM_FIELDS = [
+    "id",
+    "product_tmpl_id",
+    "product_id",
+    "min_quantity",
+    "fixed_price",
+    "percent_price",
+    "price_discount",
+    "compute_price",
+    "applied_on",
+]
+
+
+def _name(value, empty: str = "Sin asignar") -> str:
+    # many2one [id, "Nombre"] → "Nombre"
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return value[1]
+    return empty
+
+
+def _since(days: int) -> str:
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def _groups(groups: List[dict], names: Dict[str, str]) -> List[dict]:
+    """Grupos de `analytics.aggregate` con nombres legibles por dimensión."""
+    rows = []
+    for group in groups:
+        row = {}
+        for spec, name in names.items():
+            value = group.get(spec)
+            row[name] = _name(value) if isinstance(value, list) else value
+        row.update((k, v) for k, v in group.items() if k not in names)
+        rows.append(row)
+    return rows
+
+
+# ─── agrupaciones (read_group) ─────────────────────────────────────────
+
+
+def repairs(client) -> List[dict]:
+    """Reparaciones abiertas (ni done ni cancel) por responsable."""
+    groups, _ = analytics.aggregate(
+        client,
+        "repair.order",
+        [["state", "not in", ["done", "cancel"]]],
+        ["user_id"],
+        use_cache=False,
+    )
+    rows = _groups(groups, {"user_id": "user"})
+    return sorted(rows, key=lambda r: r["user"])
+
+
+def pipeline(client, team_id: Optional[int] = None) -> List[dict]:
+    """Oportunidades e ingreso esperado por vendedor y etapa."""
+    domain: List[list] = [["type", "=", "opportunity"]]
+    if team_id:
+        domain.append(["team_id", "=", team_id])
+    groups, _ = analytics.aggregate(
+        client,
+        "crm.lead",
+        domain,
+        ["user_id", "stage_id"],
+        ["expected_revenue:sum"],
+        use_cache=False,
+    )
+    return _groups(groups, {"user_id": "user", "stage_id": "stage"})
+
+
+def sales(client, days: int = 7) -> List[dict]:
+    """Órdenes de venta de los últimos `days` días por vendedor y estado."""
+    groups, _ = analytics.aggregate(
+        client,
+        "sale.order",
+        [["date_order", ">=", _since(days)]],
+        ["user_id", "state"],
+        ["amount_untaxed:sum", "amount_total:sum"],
+        use_cache=False,
+    )
+    return _groups(groups, {"user_id": "user", "state": "state"})
+
+
+def new_leads(client, days: int = 7) -> List[dict]:
+    """Leads y oportunidades creados en los últimos `days` días por vendedor."""
+    groups, _ = analytics.aggregate(
+        client,
+        "crm.lead",
+        [["create_date", ">=", _since(days)]],
+        ["user_id", "type"],
+        use_cache=False,
+    )
+    return _groups(groups, {"user_id": "user", "type": "type"})
+
+
+def team_members(client, team_id: int) -> List[dict]:
+    """Miembros de un equipo de ventas con su nombre."""
+    teams = client.search_read("crm.team", [["id", "=", team_id]], ["member_ids"], 1)
+    if not teams:
+        raise ValueError(f"No existe el equipo de ventas {team_id}")
+    member_ids = teams[0].get("member_ids") or []
+    if not member_ids:
+        return []
+    users = client.search_read(
+        "res.users", [["id", "in", member_ids]], ["id", "name", "login"], None
+    )
+    return sorted(users, key=lambda u: u["id"])
+
+
+def workload(
+    client,
+    team_id: int = WORKLOAD_TEAM_ID,
+    stage_ids: Sequence[int] = WORKLOAD_STAGE_IDS,
+) -> Dict[str, Any]:
+    """
+    Oportunidades activas por miembro del equipo (incluye a los que tienen
+    cero) y el de menor carga, el que recibe el siguiente lead.
+    """
+    members = team_members(client, team_id)
+    if not members:
+        return {"members": [], "least_loaded": None}
+    groups, _ = analytics.aggregate(
+        client,
+        "crm.lead",
+        [
+            ["stage_id", "in", list(stage_ids)],
+            ["active", "=", True],
+            ["type", "=", "opportunity"],
+            ["user_id", "in", [m["id"] for m in members]],
+        ],
+        ["user_id"],
+        use_cache=False,
+    )
+    counts = {g["user_id"][0]: g["count"] for g in groups if g.get("user_id")}
+    rows = [
+        {"user_id": m["id"], "user": m["name"], "count": counts.get(m["id"], 0)}
+        for m in members
+    ]
+    least = min(rows, key=lambda r: r["count"])
+    return {"members": rows, "least_loaded": least["user_id"]}
+
+
+# ─── registros puntuales ───────────────────────────────────────────────
+
+
+def lead(client, lead_id: int) -> Optional[dict]:
+    """Campos principales de un lead (incluye archivados)."""
+    rows = client.search_read(
+        "crm.lead",
+        ["|", ["active", "=", True], ["active", "=", False], ["id", "=", lead_id]],
+        LEAD_FIELDS,
+        1,
+    )
+    return rows[0] if rows else None
+
+
+def sale_order(client, order_id: int) -> Optional[dict]:
+    """Orden de venta con sus líneas (dos lecturas en total)."""
+    orders = client.search_read(
+        "sale.order",
+        [["id", "=", order_id]],
+        ["id", "name", "partner_id", "state", "amount_total"],
+        1,
+    )
+    if not orders:
+        return None
+    lines = client.search_read(
+        "sale.order.line",
+        [["order_id", "=", order_id]],
+        ["product_id", "product_uom_qty", "price_unit"],
+        None,
+    )
+    order = orders[0]
+    return {
+        "sale_order_id": order["id"],
+        "sale_order_name": order["name"],
+        "partner": order.get("partner_id"),
+        "state": order.get("state"),
+        "amount_total": order.get("amount_total"),
+        "product_ids": [l["product_id"][0] for l in lines if l.get("product_id")],
+        "lines": lines,
+    }
+
+
+def partner(client, email: str) -> List[dict]:
+    """
+    Contactos con ese email (sin distinguir mayúsculas).
+
+    Raises:
+        ValueError: Email sin formato válido (`normalize_email` lo cambiaría
+            por el genérico y traería los contactos de ese).
+    """
+    cleaned = (email or "").strip().lower()
+    if not is_valid_email(cleaned):
+        raise ValueError(f"Email inválido: {email!r}")
+    return client.search_read(
+        "res.partner",
+        [["email", "=ilike", normalize_email(cleaned)]],
+        PARTNER_FIELDS,
+        10,
+    )
+
+
+def pricelist(
+    client,
+    pricelist_id: int = PRICELIST_ID,
+    keywords: Sequence[str] = ROBOT_KEYWORDS,
+) -> Dict[str, Any]:
+    """
+    Tarifa con todos sus items (una sola lectura de items) y los que
+    corresponden a robots según `keywords`.
+    """
+    rows = client.search_read(
+        "product.pricelist",
+        [["id", "=", pricelist_id]],
+        ["id", "name", "active", "currency_id", "company_id"],
+        1,
+    )
+    if not rows:
+        raise ValueError(f"No existe la tarifa {pricelist_id}")
+    items = client.search_read(
+        "product.pricelist.item",
+        [["pricelist_id", "=", pricelist_id]],
+        PRICELIST_ITEM_FIELDS,
+        None,
+    )
+    robots = [
+        item
+        for item in items
+        if any(k in _name(item.get("product_id"), "").lower() for k in keywords)
+    ]
+    return {**rows[0], "item_count": len(items), "items": items, "robots": robots}
+
+
+# ─── reporte semanal ───────────────────────────────────────────────────
+
+
+def weekly(client, days: int = 7, max_workers: int = 5) -> Dict[str, Any]:
+    """Reportes de la semana en paralelo: {sección: datos o {"error"}}."""
+    sections: Dict[str, Callable[[], Any]] = {
+        "repairs": lambda: repairs(client),
+        "pipeline": lambda: pipeline(client),
+        "sales": lambda: sales(client, days),
+        "new_leads": lambda: new_leads(client, days),
+        "workload": lambda: workload(client),
+    }
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="report"
+    ) as pool:
+        futures = {name: pool.submit(fn) for name, fn in sections.items()}
+    result: Dict[str, Any] = {}
+    for name, future in futures.items():
+        try:
+            result[name] = future.result()
+        except Exception as e:
+            log.warning("Reporte %s falló: %s", name, e)
+            result[name] = {"error": f"{type(e).__name__}: {e}"}
+    return result
@@ -24,7 +24,10 @@ ENDPOINTS PRINCIPALES:
     - /mcp/sse      → Stream SSE para Model Context Protocol
     - /api/quotation/async → Crear cotización asíncrona
     - /api/quotation/status/{id} → Consultar estado de cotización
+    - /api/leads/import → Importación masiva de leads (CSV/JSONL)
     - /api/elevenlabs/handoff → Notificar handoff a vendedor
+    - /api/logs/events → Consultar el índice de eventos de log
+    - /metrics      → Métricas Prometheus
 
 HERRAMIENTAS MCP DISPONIBLES:
     Las herramientas se cargan dinámicamente desde /tools:
@@ -46,12 +49,14 @@ FECHA: Enero 2026
 ═══════════════════════════════════════════════════════════════════════
 """
 
+import os
+import tempfile
 import uvicorn
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
-from fastapi import FastAPI, BackgroundTasks, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from mcp.server.fastmcp import FastMCP
 
 from core import Config, OdooClient
@@ -59,11 +64,18 @@ from core.api import (
     QuotationRequest,
     QuotationResponse,
     HandoffRequest,
+    LeadImportResponse,
     task_manager,
     process_quotation_background,
+    process_lead_import_background,
 )
+from core import lead_import, metrics, mirror, partner_index, tracing
+from core.log import get_logger
 from core.whatsapp import sms_client
 from tools import load_all
+from tools.crm import DevOdooCRMClient
+
+log = get_logger(__name__)
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -106,18 +118,18 @@ def init_tools_once() -> None:
     # Validar configuración requerida
     missing = Config.validate()
     if missing:
-        print(f"[WARN] Missing environment variables: {', '.join(missing)}")
-        print("[INFO] Server will start but Odoo operations will fail.")
+        log.warning("Missing environment variables: %s", ", ".join(missing))
+        log.info("Server will start but Odoo operations will fail.")
 
     # Inicializar cliente Odoo (conexión XML-RPC)
     deps["odoo"] = OdooClient()
 
     # Cargar todas las herramientas desde el directorio /tools
-    print("[INFO] Loading tools from tools/ directory...")
+    log.info("Loading tools from tools/ directory...")
     load_all(mcp, deps)
 
     _tools_loaded = True
-    print("[INFO] MCP tools registered successfully.")
+    log.info("MCP tools registered successfully.")
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -215,9 +227,20 @@ app = FastAPI(
     version="2.0.0",
 )
 
+# Correlation id: toma X-Correlation-ID del request y lo devuelve en la respuesta
+app.add_middleware(tracing.CorrelationIdMiddleware)
+
 # Inicializar herramientas MCP al inicio
 init_tools_once()
 
+# Precargar el índice local de partners (cotizaciones) sin bloquear el arranque
+partner_index.warm_in_background(DevOdooCRMClient)
+
+# Espejo local de lecturas: producción (tools de consulta) y desarrollo
+# (cotizaciones y handoffs); un solo thread si ambas apuntan a la misma base
+mirror.start_in_background(OdooClient)
+mirror.start_in_background(DevOdooCRMClient)
+
 # Montar el servidor MCP en /mcp
 # Esto expone automáticamente:
 #   /mcp/sse → Stream SSE para el protocolo MCP
@@ -248,6 +271,22 @@ async def health_check():
     return {"ok": True, "mcp_loaded": _tools_loaded}
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    Métricas en formato de texto Prometheus.
+
+    Incluye latencia y errores de RPC a Odoo por modelo/método, reintentos,
+    duración por etapa de cotización, tareas en memoria, cola de logs,
+    retraso de envío a S3, latencia de Twilio y llamadas a tools MCP.
+
+    Ejemplo:
+        GET /metrics
+        → odoo_rpc_duration_seconds_bucket{model="crm.lead",method="create",le="0.5"} 12
+    """
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.post("/api/quotation/async", response_model=QuotationResponse)
 async def create_quotation_async(
     request: QuotationRequest, background_tasks: BackgroundTasks
@@ -371,13 +410,148 @@ async def get_quotation_status(tracking_id: str):
             },
             "error": null,
             "created_at": "2026-01-30T10:00:00",
-            "updated_at": "2026-01-30T10:00:25"
+            "updated_at": "2026-01-30T10:00:25",
+            "trace": {
+                "trace_id": "...",
+                "correlation_id": "quot_abc123def456",
+                "spans": [
+                    {"name": "quotation", "offset_ms": 0, "duration_ms": 24810.2,
+                     "depth": 0},
+                    {"name": "stage.connect", "offset_ms": 0.1, "duration_ms": 1210.5,
+                     "depth": 1},
+                    {"name": "odoo.authenticate", "offset_ms": 0.3,
+                     "duration_ms": 905.0, "depth": 2},
+                    ...
+                ]
+            }
+        }
+    """
+    task = task_manager.get_task(tracking_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Tracking ID no encontrado")
+    return Response(content=task.to_json(), media_type="application/json")
+
+
+# Tamaño máximo del archivo de importación (bytes)
+LEAD_IMPORT_MAX_BYTES = int(os.getenv("LEAD_IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+@app.post("/api/leads/import", response_model=LeadImportResponse)
+async def import_leads(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    format: Optional[str] = None,
+    user_id: int = 0,
+    team_id: int = 0,
+):
+    """
+    Importa leads en bloque desde un CSV o JSONL (exportaciones de eventos).
+
+    El cuerpo es el archivo tal cual (no multipart). Se recibe en streaming a
+    un archivo temporal, sin cargarlo en memoria, y se procesa en background
+    por lotes (ver core/lead_import.py): por lote, una búsqueda de partners
+    existentes, un create de partners nuevos y un create de leads.
+
+    Args:
+        request: Cuerpo con el archivo (CSV con encabezado o un objeto JSON
+            por línea)
+        format: "csv" o "jsonl"; si no se indica, se deduce del
+            Content-Type o del contenido
+        user_id: Vendedor asignado a todos los leads (0 = sin asignar)
+        team_id: Equipo de ventas de todos los leads (0 = sin asignar)
+
+    Returns:
+        LeadImportResponse: tracking_id para consultar el progreso en
+        /api/leads/import/{tracking_id}
+
+    Raises:
+        HTTPException 400: Formato no soportado o archivo vacío
+        HTTPException 413: Archivo mayor a LEAD_IMPORT_MAX_BYTES
+
+    Ejemplo:
+        curl -X POST "http://localhost:8000/api/leads/import?user_id=7" \\
+             -H "Content-Type: text/csv" --data-binary @evento.csv
+
+        → {
+            "tracking_id": "import_abc123def456",
+            "status": "queued",
+            "message": "Importación en proceso. Consulte el tracking_id.",
+            "format": "csv",
+            "bytes": 1048576,
+            "status_url": "/api/leads/import/import_abc123def456"
         }
     """
+    size = 0
+    head = b""
+    spool = tempfile.NamedTemporaryFile(
+        prefix="lead_import_", suffix=".tmp", delete=False
+    )
+    try:
+        with spool:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > LEAD_IMPORT_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Archivo mayor a {LEAD_IMPORT_MAX_BYTES} bytes",
+                    )
+                if len(head) < 1024:
+                    head += chunk[: 1024 - len(head)]
+                spool.write(chunk)
+        if not size:
+            raise HTTPException(status_code=400, detail="Archivo vacío")
+        fmt = lead_import.detect_format(
+            head, request.headers.get("content-type"), format
+        )
+    except ValueError as e:
+        os.unlink(spool.name)
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        os.unlink(spool.name)
+        raise
+
+    defaults = {}
+    if user_id:
+        defaults["user_id"] = user_id
+    if team_id:
+        defaults["team_id"] = team_id
+
+    task_id = f"import_{uuid.uuid4().hex[:12]}"
+    task_manager.create_task(
+        task_id, {"format": fmt, "bytes": size, **defaults}, source="import"
+    )
+    background_tasks.add_task(
+        process_lead_import_background, task_id, spool.name, fmt, defaults
+    )
+    log.info("Importación de leads %s en cola: %s, %d bytes", task_id, fmt, size)
+
+    return LeadImportResponse(
+        tracking_id=task_id,
+        status="queued",
+        message="Importación en proceso. Consulte el tracking_id.",
+        format=fmt,
+        bytes=size,
+        status_url=f"/api/leads/import/{task_id}",
+    )
+
+
+@app.get("/api/leads/import/{tracking_id}")
+async def get_lead_import_status(tracking_id: str):
+    """
+    Consulta el progreso de una importación de leads.
+
+    Mismo formato que /api/quotation/status/{id}; `progress` indica las
+    filas procesadas hasta el último lote y, al terminar, `output` trae
+    {"rows", "leads_created", "partners_created", "partners_existing",
+    "skipped", "errors": [{"line", "error"}]}.
+
+    Raises:
+        HTTPException 404: Si el tracking_id no existe
+    """
     task = task_manager.get_task(tracking_id)
     if not task:
         raise HTTPException(status_code=404, detail="Tracking ID no encontrado")
-    return JSONResponse(content=task.to_dict())
+    return Response(content=task.to_json(), media_type="application/json")
 
 
 @app.post("/api/elevenlabs/handoff")
@@ -442,92 +616,134 @@ async def elevenlabs_handoff(request: HandoffRequest):
             "selected_number": "+5215587654321"
         }
     """
-    # Validar que el servicio de SMS esté configurado
-    if not sms_client.is_configured():
-        raise HTTPException(
-            status_code=503,
-            detail="SMS service not configured. Check TWILIO_* environment variables.",
-        )
+    with tracing.start_trace(
+        "handoff",
+        conversation_id=request.conversation_id,
+        lead_id=getattr(request, "lead_id", None),
+        sale_order_id=getattr(request, "sale_order_id", None),
+    ):
+        # Validar que el servicio de SMS esté configurado
+        if not sms_client.is_configured():
+            raise HTTPException(
+                status_code=503,
+                detail=(
+                    "SMS service not configured. "
+                    "Check TWILIO_* environment variables."
+                ),
+            )
 
-    # Importar dependencias necesarias
-    from core.helpers import get_user_whatsapp_number
-    from tools.crm import DevOdooCRMClient
+        # Importar dependencias necesarias
+        from core.helpers import get_user_whatsapp_number
+        from tools.crm import DevOdooCRMClient
+
+        # Variables para el vendedor asignado
+        assigned_user_id = None
+        vendor_sms = None
+
+        # Lecturas (vendedor del lead/orden, balanceo) desde el espejo local
+        client = mirror.reader(DevOdooCRMClient())
+
+        # CASO 1: Hay lead_id, obtener el vendedor del lead
+        if hasattr(request, "lead_id") and request.lead_id:
+            try:
+                lead = client.read("crm.lead", request.lead_id, ["user_id"])
+                if lead and lead.get("user_id"):
+                    assigned_user_id = lead["user_id"][0]
+                    log.info(
+                        "Vendedor del lead %s: %s", request.lead_id, assigned_user_id
+                    )
+            except Exception as e:
+                log.warning("Error obteniendo vendedor del lead: %s", e)
+
+        # CASO 2: Hay sale_order_id, obtener el vendedor de la orden
+        elif hasattr(request, "sale_order_id") and request.sale_order_id:
+            try:
+                order = client.read("sale.order", request.sale_order_id, ["user_id"])
+                if order and order.get("user_id"):
+                    assigned_user_id = order["user_id"][0]
+                    log.info(
+                        "Vendedor de la orden %s: %s",
+                        request.sale_order_id,
+                        assigned_user_id,
+                    )
+            except Exception as e:
+                log.warning("Error obteniendo vendedor de la orden: %s", e)
+
+        # CASO 3: No hay lead ni orden, usar balanceo de carga
+        # (vendedor con menos leads activos)
+        if not assigned_user_id:
+            log.info("Buscando vendedor con menos leads...")
+            try:
+                assigned_user_id = client.get_salesperson_with_least_opportunities()
+                if assigned_user_id:
+                    log.info("Vendedor con menos leads: %s", assigned_user_id)
+                else:
+                    log.warning("No se encontró vendedor disponible")
+            except Exception as e:
+                log.warning("Error obteniendo vendedor con menos leads: %s", e)
+
+        # Obtener el número de WhatsApp del vendedor desde Odoo
+        if assigned_user_id:
+            vendor_sms = get_user_whatsapp_number(client, assigned_user_id)
+            # Limpiar prefijo "whatsapp:" si existe
+            if vendor_sms and vendor_sms.startswith("whatsapp:"):
+                vendor_sms = vendor_sms.replace("whatsapp:", "")
+            # Validar que el número no esté oculto por privacidad
+            if vendor_sms and ("X" in vendor_sms or "x" in vendor_sms):
+                log.warning(
+                    "Número del vendedor oculto por privacidad, usando default"
+                )
+                vendor_sms = None
+            if not vendor_sms:
+                log.warning(
+                    "No se pudo obtener número SMS válido del vendedor %s, usando default",
+                    assigned_user_id,
+                )
+        else:
+            log.warning("No se asignó vendedor, usando número default")
 
-    # Variables para el vendedor asignado
-    assigned_user_id = None
-    vendor_sms = None
+        # Enviar notificación SMS/WhatsApp
+        result = sms_client.send_handoff_notification(
+            user_phone=request.user_phone,
+            reason=request.reason,
+            to_number=vendor_sms,  # Número del vendedor o default
+            user_name=request.user_name,
+            conversation_id=request.conversation_id,
+            additional_context=request.additional_context,
+            assigned_user_id=assigned_user_id,
+        )
 
-    client = DevOdooCRMClient()
+        # Si hubo error, registrar en logs y lanzar excepción
+        if result["status"] == "error":
+            try:
+                from datetime import datetime
+                import uuid
+                from core.logger import quotation_logger
 
-    # CASO 1: Hay lead_id, obtener el vendedor del lead
-    if hasattr(request, "lead_id") and request.lead_id:
-        try:
-            lead = client.read("crm.lead", request.lead_id, ["user_id"])
-            if lead and lead.get("user_id"):
-                assigned_user_id = lead["user_id"][0]
-                print(
-                    f"[API Handoff] ✅ Vendedor del lead {request.lead_id}: {assigned_user_id}"
+                handoff_id = (
+                    f"sms_{int(datetime.now().timestamp())}_{str(uuid.uuid4())[:8]}"
                 )
-        except Exception as e:
-            print(f"[API Handoff] ⚠️  Error obteniendo vendedor del lead: {e}")
-
-    # CASO 2: Hay sale_order_id, obtener el vendedor de la orden
-    elif hasattr(request, "sale_order_id") and request.sale_order_id:
-        try:
-            order = client.read("sale.order", request.sale_order_id, ["user_id"])
-            if order and order.get("user_id"):
-                assigned_user_id = order["user_id"][0]
-                print(
-                    f"[API Handoff] ✅ Vendedor de la orden {request.sale_order_id}: {assigned_user_id}"
+                quotation_logger.log_sms_handoff(
+                    handoff_id=handoff_id,
+                    user_phone=request.user_phone,
+                    reason=request.reason,
+                    user_name=request.user_name,
+                    conversation_id=request.conversation_id,
+                    additional_context=request.additional_context,
+                    lead_id=getattr(request, "lead_id", None),
+                    sale_order_id=getattr(request, "sale_order_id", None),
+                    assigned_user_id=assigned_user_id,
+                    vendor_sms=vendor_sms,
+                    message_sid=None,
+                    status="error",
+                    error=result.get("message"),
                 )
-        except Exception as e:
-            print(f"[API Handoff] ⚠️  Error obteniendo vendedor de la orden: {e}")
+            except Exception as log_err:
+                log.warning("Error logging failed handoff: %s", log_err)
 
-    # CASO 3: No hay lead ni orden, usar balanceo de carga
-    # (vendedor con menos leads activos)
-    if not assigned_user_id:
-        print(f"[API Handoff] 🔍 Buscando vendedor con menos leads...")
-        try:
-            assigned_user_id = client.get_salesperson_with_least_opportunities()
-            if assigned_user_id:
-                print(f"[API Handoff] ✅ Vendedor con menos leads: {assigned_user_id}")
-            else:
-                print(f"[API Handoff] ⚠️  No se encontró vendedor disponible")
-        except Exception as e:
-            print(f"[API Handoff] ⚠️  Error obteniendo vendedor con menos leads: {e}")
-
-    # Obtener el número de WhatsApp del vendedor desde Odoo
-    if assigned_user_id:
-        vendor_sms = get_user_whatsapp_number(client, assigned_user_id)
-        # Limpiar prefijo "whatsapp:" si existe
-        if vendor_sms and vendor_sms.startswith("whatsapp:"):
-            vendor_sms = vendor_sms.replace("whatsapp:", "")
-        # Validar que el número no esté oculto por privacidad
-        if vendor_sms and ("X" in vendor_sms or "x" in vendor_sms):
-            print(
-                f"[API Handoff] ⚠️  Número del vendedor oculto por privacidad, usando default"
-            )
-            vendor_sms = None
-        if not vendor_sms:
-            print(
-                f"[API Handoff] ⚠️  No se pudo obtener número SMS válido del vendedor {assigned_user_id}, usando default"
-            )
-    else:
-        print(f"[API Handoff] ⚠️  No se asignó vendedor, usando número default")
-
-    # Enviar notificación SMS/WhatsApp
-    result = sms_client.send_handoff_notification(
-        user_phone=request.user_phone,
-        reason=request.reason,
-        to_number=vendor_sms,  # Número del vendedor o default
-        user_name=request.user_name,
-        conversation_id=request.conversation_id,
-        additional_context=request.additional_context,
-        assigned_user_id=assigned_user_id,
-    )
+            raise HTTPException(status_code=500, detail=result["message"])
 
-    # Si hubo error, registrar en logs y lanzar excepción
-    if result["status"] == "error":
+        # Registrar handoff exitoso en logs
         try:
             from datetime import datetime
             import uuid
@@ -536,7 +752,7 @@ async def elevenlabs_handoff(request: HandoffRequest):
             handoff_id = (
                 f"sms_{int(datetime.now().timestamp())}_{str(uuid.uuid4())[:8]}"
             )
-            quotation_logger.log_sms_handoff(
+            log_path = quotation_logger.log_sms_handoff(
                 handoff_id=handoff_id,
                 user_phone=request.user_phone,
                 reason=request.reason,
@@ -547,47 +763,82 @@ async def elevenlabs_handoff(request: HandoffRequest):
                 sale_order_id=getattr(request, "sale_order_id", None),
                 assigned_user_id=assigned_user_id,
                 vendor_sms=vendor_sms,
-                message_sid=None,
-                status="error",
-                error=result.get("message"),
+                message_sid=result.get("message_sid"),
+                status="success",
             )
+            log.info("Handoff logged to: %s", log_path)
         except Exception as log_err:
-            print(f"[API Handoff] ⚠️  Error logging failed handoff: {log_err}")
+            log.warning("Error logging successful handoff: %s", log_err)
 
-        raise HTTPException(status_code=500, detail=result["message"])
+        return {
+            "status": "ok",
+            "message": "Notificación SMS enviada al vendedor",
+            "message_sid": result.get("message_sid"),
+            "assigned_user_id": assigned_user_id,
+            "selected_number": result.get("selected_number"),
+        }
 
-    # Registrar handoff exitoso en logs
-    try:
-        from datetime import datetime
-        import uuid
-        from core.logger import quotation_logger
 
-        handoff_id = f"sms_{int(datetime.now().timestamp())}_{str(uuid.uuid4())[:8]}"
-        log_path = quotation_logger.log_sms_handoff(
+@app.get("/api/logs/events")
+async def query_log_events(
+    tracking_id: Optional[str] = None,
+    handoff_id: Optional[str] = None,
+    event: Optional[str] = None,
+    status: Optional[str] = None,
+    lead_id: Optional[int] = None,
+    sale_order_id: Optional[int] = None,
+    assigned_user_id: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    include_records: bool = False,
+):
+    """
+    Consulta el índice de eventos de log (cotizaciones y handoffs).
+
+    Cubre el historial local y el archivado en S3; los eventos se devuelven
+    del más reciente al más antiguo, paginados con `cursor`.
+
+    Args:
+        tracking_id / handoff_id / event / status: Filtros exactos
+        lead_id / sale_order_id / assigned_user_id: Filtros por ID de Odoo
+        since / until: Rango de timestamps ISO (until exclusivo)
+        q: Búsqueda de texto en error, motivo, contexto y nombres
+        cursor: `next_cursor` de la página anterior
+        limit: Eventos por página (máx. 500)
+        include_records: Adjuntar el evento JSON completo
+
+    Returns:
+        dict: {"items": [...], "next_cursor": str | None}
+
+    Ejemplo:
+        GET /api/logs/events?event=sms_handoff&status=error&assigned_user_id=42&since=2026-01-26
+    """
+    from core.logger import quotation_logger
+
+    try:
+        page = quotation_logger.query_events(
+            include_records=include_records,
+            tracking_id=tracking_id,
             handoff_id=handoff_id,
-            user_phone=request.user_phone,
-            reason=request.reason,
-            user_name=request.user_name,
-            conversation_id=request.conversation_id,
-            additional_context=request.additional_context,
-            lead_id=getattr(request, "lead_id", None),
-            sale_order_id=getattr(request, "sale_order_id", None),
+            event=event,
+            status=status,
+            lead_id=lead_id,
+            sale_order_id=sale_order_id,
             assigned_user_id=assigned_user_id,
-            vendor_sms=vendor_sms,
-            message_sid=result.get("message_sid"),
-            status="success",
+            since=since,
+            until=until,
+            text=q,
+            cursor=cursor,
+            limit=limit,
         )
-        print(f"[API Handoff] 📝 Handoff logged to: {log_path}")
-    except Exception as log_err:
-        print(f"[API Handoff] ⚠️  Error logging successful handoff: {log_err}")
-
-    return {
-        "status": "ok",
-        "message": "Notificación SMS enviada al vendedor",
-        "message_sid": result.get("message_sid"),
-        "assigned_user_id": assigned_user_id,
-        "selected_number": result.get("selected_number"),
-    }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return JSONResponse(content=page)
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -625,6 +876,9 @@ if __name__ == "__main__":
     print(
         f"   • Check Status:     http://{Config.HOST}:{Config.PORT}/api/quotation/status/{{id}}"
     )
+    print(
+        f"   • Lead Import:      http://{Config.HOST}:{Config.PORT}/api/leads/import"
+    )
     print(
         f"   • WhatsApp Handoff: http://{Config.HOST}:{Config.PORT}/api/elevenlabs/handoff"
     )
@@ -0,0 +1,8 @@
+"""
+Testing
+=======
+Dobles de servicios externos para ejecutar el servidor sin Odoo ni Twilio:
+
+    - fake_odoo: Odoo falso por XML-RPC/JSON-RPC (en proceso o subproceso)
+    - fake_twilio: API de mensajes de Twilio (`TWILIO_API_BASE_URL`)
+"""
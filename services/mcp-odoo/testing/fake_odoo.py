@@ -0,0 +1,1508 @@
+"""
+Fake Odoo
+=========
+Servidor Odoo falso (XML-RPC y JSON-RPC) para pruebas y benchmarks sin
+acceso a la instancia real.
+
+Implementa `common.authenticate` / `common.version` y `object.execute_kw`
+sobre un almacén en memoria con los modelos que usa el servicio:
+res.partner, res.users, crm.team, crm.stage, crm.lead, sale.order,
+sale.order.line, product.product (y categorías), product.pricelist(.item),
+project.project, project.task (y sus etapas).
+
+Métodos soportados: search, search_count, search_read, read, create, write,
+unlink, read_group, fields_get, name_search, message_post y las acciones de
+crm.lead (action_set_won[_rainbowman], action_set_lost).
+
+Latencia, jitter y fallos son configurables (también en caliente vía
+`POST /fake/config`); `GET /fake/stats` devuelve el conteo de llamadas por
+modelo/método.
+
+Uso en proceso:
+    from testing.fake_odoo import FakeOdooServer, FakeOdooConfig
+
+    with FakeOdooServer(config=FakeOdooConfig(latency=0.05, jitter=0.02)) as fake:
+        os.environ.update(fake.env())
+        client = OdooClient()
+
+Uso como subproceso:
+    python -m testing.fake_odoo --port 8069 --latency 0.05 --fault-rate 0.01
+"""
+
+import argparse
+import copy
+import http.server
+import json
+import random
+import threading
+import time
+import xmlrpc.client
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.domain import compile_domain, fields_in
+
+# ═══════════════════════════════════════════════════════════════════════
+# ESQUEMA
+# ═══════════════════════════════════════════════════════════════════════
+
+
+def _field(ftype: str, relation: str = None, inverse: str = None, **extra) -> dict:
+    data = {"type": ftype, **extra}
+    if relation:
+        data["relation"] = relation
+    if inverse:
+        data["relation_field"] = inverse
+    return data
+
+
+CHAR, TEXT, INT, FLOAT, BOOL = "char", "text", "integer", "float", "boolean"
+DATE, DATETIME, SELECTION = "date", "datetime", "selection"
+
+SCHEMA: Dict[str, Dict[str, dict]] = {
+    "res.partner": {
+        "name": _field(CHAR),
+        "email": _field(CHAR),
+        "phone": _field(CHAR),
+        "mobile": _field(CHAR),
+        "street": _field(CHAR),
+        "city": _field(CHAR),
+        "country_id": _field("many2one", "res.country"),
+        "vat": _field(CHAR),
+        "is_company": _field(BOOL),
+        "type": _field(
+            SELECTION,
+            selection=[
+                ["contact", "Contact"],
+                ["invoice", "Invoice Address"],
+                ["delivery", "Delivery Address"],
+                ["other", "Other Address"],
+            ],
+        ),
+        "active": _field(BOOL),
+        "parent_id": _field("many2one", "res.partner"),
+        "user_id": _field("many2one", "res.users"),
+    },
+    "res.users": {
+        "name": _field(CHAR),
+        "login": _field(CHAR),
+        "email": _field(CHAR),
+        "mobile": _field(CHAR),
+        "phone": _field(CHAR),
+        "active": _field(BOOL),
+        "partner_id": _field("many2one", "res.partner"),
+    },
+    "crm.team": {
+        "name": _field(CHAR),
+        "active": _field(BOOL),
+        "member_ids": _field("many2many", "res.users"),
+    },
+    "crm.stage": {
+        "name": _field(CHAR),
+        "sequence": _field(INT),
+        "is_won": _field(BOOL),
+    },
+    "crm.lead": {
+        "name": _field(CHAR),
+        "type": _field(
+            SELECTION, selection=[["lead", "Lead"], ["opportunity", "Opportunity"]]
+        ),
+        "partner_id": _field("many2one", "res.partner"),
+        "partner_name": _field(CHAR),
+        "contact_name": _field(CHAR),
+        "email_from": _field(CHAR),
+        "phone": _field(CHAR),
+        "city": _field(CHAR),
+        "description": _field(TEXT),
+        "user_id": _field("many2one", "res.users"),
+        "team_id": _field("many2one", "crm.team"),
+        "stage_id": _field("many2one", "crm.stage"),
+        "active": _field(BOOL),
+        "probability": _field(FLOAT),
+        "expected_revenue": _field(FLOAT),
+        "date_conversion": _field(DATETIME),
+        "date_closed": _field(DATETIME),
+        "lost_reason_id": _field(INT),
+        "x_studio_producto": _field(INT),
+        "order_ids": _field("one2many", "sale.order", "opportunity_id"),
+    },
+    "sale.order": {
+        "name": _field(CHAR),
+        "partner_id": _field("many2one", "res.partner"),
+        "user_id": _field("many2one", "res.users"),
+        "opportunity_id": _field("many2one", "crm.lead"),
+        "pricelist_id": _field("many2one", "product.pricelist"),
+        "payment_term_id": _field("many2one", "account.payment.term"),
+        "origin": _field(CHAR),
+        "note": _field(TEXT),
+        "state": _field(
+            SELECTION,
+            selection=[
+                ["draft", "Quotation"],
+                ["sent", "Quotation Sent"],
+                ["sale", "Sales Order"],
+                ["cancel", "Cancelled"],
+            ],
+        ),
+        "date_order": _field(DATETIME),
+        "validity_date": _field(DATE),
+        "order_line": _field("one2many", "sale.order.line", "order_id"),
+        "amount_untaxed": _field("monetary", compute=True),
+        "amount_tax": _field("monetary", compute=True),
+        "amount_total": _field("monetary", compute=True),
+    },
+    "sale.order.line": {
+        "order_id": _field("many2one", "sale.order"),
+        "product_id": _field("many2one", "product.product"),
+        "name": _field(TEXT),
+        "product_uom_qty": _field(FLOAT),
+        "price_unit": _field(FLOAT),
+        "discount": _field(FLOAT),
+        "display_type": _field(
+            SELECTION,
+            selection=[["line_section", "Section"], ["line_note", "Note"]],
+        ),
+        "price_subtotal": _field("monetary", compute=True),
+        "price_total": _field("monetary", compute=True),
+    },
+    "product.category": {
+        "name": _field(CHAR),
+    },
+    "product.product": {
+        "name": _field(CHAR),
+        "default_code": _field(CHAR),
+        "categ_id": _field("many2one", "product.category"),
+        "list_price": _field(FLOAT),
+        "active": _field(BOOL),
+        "sale_ok": _field(BOOL),
+        "description_sale": _field(TEXT),
+    },
+    "product.pricelist": {
+        "name": _field(CHAR),
+        "active": _field(BOOL),
+    },
+    "product.pricelist.item": {
+        "pricelist_id": _field("many2one", "product.pricelist"),
+        "product_id": _field("many2one", "product.product"),
+        "fixed_price": _field(FLOAT),
+        "min_quantity": _field(FLOAT),
+    },
+    "account.payment.term": {
+        "name": _field(CHAR),
+    },
+    "project.project": {
+        "name": _field(CHAR),
+        "active": _field(BOOL),
+        "user_id": _field("many2one", "res.users"),
+        "partner_id": _field("many2one", "res.partner"),
+    },
+    "project.task.type": {
+        "name": _field(CHAR),
+        "sequence": _field(INT),
+    },
+    "project.task": {
+        "name": _field(CHAR),
+        "active": _field(BOOL),
+        "project_id": _field("many2one", "project.project"),
+        "user_ids": _field("many2many", "res.users"),
+        "stage_id": _field("many2one", "project.task.type"),
+        "partner_id": _field("many2one", "res.partner"),
+        "date_deadline": _field(DATE),
+        "description": _field(TEXT),
+        "priority": _field(SELECTION, selection=[["0", "Normal"], ["1", "Urgent"]]),
+    },
+}
+
+# Orden por defecto (_order) de cada modelo
+DEFAULT_ORDER = {
+    "crm.lead": "id desc",
+    "sale.order": "date_order desc, id desc",
+    "crm.stage": "sequence, id",
+    "project.task.type": "sequence, id",
+}
+
+_COMMON_FIELDS = {
+    "id": _field(INT),
+    "display_name": _field(CHAR, compute=True),
+    "create_date": _field(DATETIME),
+    "write_date": _field(DATETIME),
+}
+
+_RELATIONAL = ("many2one", "one2many", "many2many")
+_NUMERIC = (INT, FLOAT, "monetary")
+
+
+class OdooError(Exception):
+    """Error de negocio de Odoo (se devuelve como Fault / error JSON-RPC)."""
+
+
+def _is_null(value) -> bool:
+    return value is None or value is False
+
+
+def _sort_key(value):
+    # Nulos al final; 0 no es nulo
+    return (_is_null(value), 0 if _is_null(value) else value)
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# ALMACÉN
+# ═══════════════════════════════════════════════════════════════════════
+
+
+class FakeOdooStore:
+    """Registros en memoria con la semántica ORM mínima que usa el servicio."""
+
+    def __init__(self, schema: Dict[str, Dict[str, dict]] = None):
+        self.schema = {
+            model: {**_COMMON_FIELDS, **fields}
+            for model, fields in (schema or SCHEMA).items()
+        }
+        self._records: Dict[str, Dict[int, dict]] = {m: {} for m in self.schema}
+        self._next_id: Dict[str, int] = {m: 1 for m in self.schema}
+        self._messages: List[dict] = []
+        self._lock = threading.RLock()
+
+        # Índices inversos de one2many: (modelo_hijo, campo) -> {padre: {hijos}}
+        self._children: Dict[Tuple[str, str], Dict[int, set]] = {}
+        for fields in self.schema.values():
+            for spec in fields.values():
+                if spec["type"] == "one2many":
+                    self._children[(spec["relation"], spec["relation_field"])] = {}
+
+    # ─── helpers ───────────────────────────────────────────────────────
+
+    def _model(self, model: str) -> Dict[str, dict]:
+        fields = self.schema.get(model)
+        if fields is None:
+            raise OdooError(f"Object {model} doesn't exist")
+        return fields
+
+    def _get(self, model: str, record_id: int) -> dict:
+        record = self._records[model].get(record_id)
+        if record is None:
+            raise OdooError(
+                "Record does not exist or has been deleted. "
+                f"(Record: {model}({record_id},))"
+            )
+        return record
+
+    def _display_name(self, model: str, record_id: int) -> str:
+        record = self._records.get(model, {}).get(record_id)
+        if record is None:
+            return f"{model},{record_id}"
+        if model == "sale.order.line":
+            product = self._display_name("product.product", record.get("product_id"))
+            order = self._display_name("sale.order", record.get("order_id"))
+            return f"{order} - {product}"
+        if model == "product.product" and record.get("default_code"):
+            return f"[{record['default_code']}] {record.get('name')}"
+        return record.get("name") or f"{model},{record_id}"
+
+    def _set_many2one(self, model: str, record: dict, field: str, value):
+        old = record.get(field)
+        value = value or False
+        index = self._children.get((model, field))
+        if index is not None:
+            if old:
+                index.get(old, set()).discard(record["id"])
+            if value:
+                index.setdefault(value, set()).add(record["id"])
+        record[field] = value
+
+    def _apply_commands(self, model: str, record: dict, field: str, spec, commands):
+        relation = spec["relation"]
+        if spec["type"] == "many2many":
+            current = list(record.get(field) or [])
+        if not isinstance(commands, (list, tuple)):
+            raise OdooError(f"Valor inválido para {model}.{field}: {commands!r}")
+        for command in commands:
+            if isinstance(command, int):
+                command = (4, command)
+            code = command[0]
+            if spec["type"] == "one2many":
+                inverse = spec["relation_field"]
+                if code == 0:
+                    self._create(relation, {**command[2], inverse: record["id"]})
+                elif code == 1:
+                    self._write(relation, [command[1]], command[2])
+                elif code in (2, 3):
+                    self._unlink(relation, [command[1]])
+                elif code == 4:
+                    self._write(relation, [command[1]], {inverse: record["id"]})
+                elif code == 5:
+                    children = self._children[(relation, inverse)].get(
+                        record["id"], set()
+                    )
+                    self._unlink(relation, list(children))
+                elif code == 6:
+                    children = self._children[(relation, inverse)].get(
+                        record["id"], set()
+                    )
+                    self._unlink(relation, [c for c in children if c not in command[2]])
+                    self._write(relation, list(command[2]), {inverse: record["id"]})
+            else:
+                if code == 0:
+                    current.append(self._create(relation, command[2]))
+                elif code in (3, 2):
+                    current = [i for i in current if i != command[1]]
+                    if code == 2:
+                        self._unlink(relation, [command[1]])
+                elif code == 4:
+                    if command[1] not in current:
+                        current.append(command[1])
+                elif code == 5:
+                    current = []
+                elif code == 6:
+                    current = list(command[2])
+        if spec["type"] == "many2many":
+            record[field] = current
+
+    def _assign(self, model: str, record: dict, values: dict):
+        fields = self.schema[model]
+        deferred = []
+        for field, value in values.items():
+            spec = fields.get(field)
+            if spec is None:
+                raise OdooError(f"Invalid field '{field}' on model '{model}'")
+            if spec.get("compute") or field == "id":
+                continue
+            if spec["type"] == "many2one":
+                if isinstance(value, (list, tuple)):
+                    value = value[0] if value else False
+                if value and value not in self._records.get(spec["relation"], {}):
+                    if spec["relation"] in self._records:
+                        raise OdooError(
+                            f"Registro inexistente {spec['relation']}({value}) "
+                            f"en {model}.{field}"
+                        )
+                self._set_many2one(model, record, field, value)
+            elif spec["type"] in ("one2many", "many2many"):
+                deferred.append((field, spec, value))
+            else:
+                record[field] = value
+        for field, spec, value in deferred:
+            self._apply_commands(model, record, field, spec, value or [])
+
+    def _defaults(self, model: str, record_id: int, values: dict) -> dict:
+        fields = self.schema[model]
+        now = _now()
+        defaults = {"create_date": now, "write_date": now}
+        if "active" in fields:
+            defaults["active"] = True
+        if model == "sale.order":
+            defaults.update(state="draft", date_order=now, name=f"S{record_id:05d}")
+        elif model == "res.partner":
+            defaults["type"] = "contact"
+        elif model == "crm.lead":
+            defaults.update(type="lead", probability=10.0)
+            if 1 in self._records["crm.stage"]:
+                defaults["stage_id"] = 1
+        elif model == "sale.order.line":
+            product = self._records["product.product"].get(values.get("product_id"))
+            defaults.update(product_uom_qty=1.0, discount=0.0, price_unit=0.0)
+            if product:
+                defaults["name"] = product.get("name")
+                defaults["price_unit"] = product.get("list_price", 0.0)
+        elif model == "product.product":
+            defaults["sale_ok"] = True
+        return defaults
+
+    def _create(self, model: str, values: dict, record_id: int = None) -> int:
+        self._model(model)
+        if record_id is None:
+            record_id = self._next_id[model]
+        elif record_id in self._records[model]:
+            raise OdooError(f"{model}({record_id}) ya existe")
+        self._next_id[model] = max(self._next_id[model], record_id + 1)
+        record = {"id": record_id}
+        self._records[model][record_id] = record
+        try:
+            self._assign(
+                model, record, {**self._defaults(model, record_id, values), **values}
+            )
+        except Exception:
+            self._records[model].pop(record_id, None)
+            raise
+        return record_id
+
+    def _write(self, model: str, ids: Iterable[int], values: dict):
+        self._model(model)
+        for record_id in ids:
+            record = self._get(model, record_id)
+            self._assign(model, record, {**values, "write_date": _now()})
+
+    def _unlink(self, model: str, ids: Iterable[int]):
+        self._model(model)
+        for record_id in list(ids):
+            record = self._records[model].pop(record_id, None)
+            if record is None:
+                continue
+            for field, spec in self.schema[model].items():
+                if spec["type"] == "many2one":
+                    index = self._children.get((model, field))
+                    if index is not None and record.get(field):
+                        index.get(record[field], set()).discard(record_id)
+                elif spec["type"] == "one2many":
+                    # ondelete="cascade" (líneas de pedido)
+                    children = self._children[
+                        (spec["relation"], spec["relation_field"])
+                    ]
+                    self._unlink(spec["relation"], list(children.pop(record_id, set())))
+
+    # ─── lectura ───────────────────────────────────────────────────────
+
+    def _compute(self, model: str, record: dict, field: str):
+        if field == "display_name":
+            return self._display_name(model, record["id"])
+        if model == "sale.order.line" and field in ("price_subtotal", "price_total"):
+            qty = record.get("product_uom_qty") or 0.0
+            price = record.get("price_unit") or 0.0
+            discount = record.get("discount") or 0.0
+            return round(qty * price * (1 - discount / 100.0), 2)
+        if model == "sale.order" and field.startswith("amount_"):
+            lines = self._children[("sale.order.line", "order_id")].get(
+                record["id"], ()
+            )
+            untaxed = sum(
+                self._compute(
+                    "sale.order.line",
+                    self._records["sale.order.line"][i],
+                    "price_subtotal",
+                )
+                for i in lines
+            )
+            if field == "amount_tax":
+                return 0.0
+            return round(float(untaxed), 2)
+        return False
+
+    def _value(self, model: str, record: dict, field: str):
+        spec = self.schema[model].get(field)
+        if spec is None:
+            raise OdooError(f"Invalid field '{field}' on model '{model}'")
+        if spec.get("compute"):
+            return self._compute(model, record, field)
+        ftype = spec["type"]
+        if ftype == "one2many":
+            children = self._children[(spec["relation"], spec["relation_field"])]
+            return sorted(children.get(record["id"], ()))
+        value = record.get(field)
+        if ftype == "many2one":
+            return (
+                [value, self._display_name(spec["relation"], value)] if value else False
+            )
+        if ftype == "many2many":
+            return list(value or [])
+        if value is None:
+            return 0 if ftype in _NUMERIC else False
+        return value
+
+    def _row(self, model: str, record: dict, fields: List[str]) -> dict:
+        row = {"id": record["id"]}
+        for field in fields:
+            row[field] = self._value(model, record, field)
+        return row
+
+    def _matcher(self, model: str, domain: list):
+        domain = list(domain or [])
+        fields = self.schema[model]
+        if "active" in fields and "active" not in fields_in(domain):
+            domain = [("active", "=", True)] + domain
+        predicate = compile_domain(domain)
+
+        # Los many2one se comparan por id; para like/ilike hace falta el nombre
+        named = [
+            leaf[0]
+            for leaf in domain
+            if isinstance(leaf, (list, tuple))
+            and len(leaf) == 3
+            and "like" in str(leaf[1])
+            and fields.get(leaf[0], {}).get("type") == "many2one"
+        ]
+        if not named:
+            return predicate
+
+        def match(record: dict) -> bool:
+            view = dict(record)
+            for field in named:
+                view[field] = self._value(model, record, field)
+            return predicate(view)
+
+        return match
+
+    def _sort(self, model: str, records: List[dict], order: Optional[str]):
+        order = order or DEFAULT_ORDER.get(model, "id")
+        for part in reversed([p.strip() for p in order.split(",") if p.strip()]):
+            tokens = part.split()
+            field = tokens[0]
+            reverse = len(tokens) > 1 and tokens[1].lower() == "desc"
+            if field not in self.schema[model]:
+                raise OdooError(f"Invalid field '{field}' on model '{model}' (order)")
+
+            def key(record, field=field):
+                if self.schema[model][field].get("compute"):
+                    return _sort_key(self._compute(model, record, field))
+                return _sort_key(record.get(field))
+
+            records.sort(key=key, reverse=reverse)
+        return records
+
+    def search(self, model, domain=None, offset=0, limit=None, order=None, count=False):
+        with self._lock:
+            self._model(model)
+            match = self._matcher(model, domain)
+            records = [r for r in self._records[model].values() if match(r)]
+            if count:
+                return len(records)
+            self._sort(model, records, order)
+            records = records[offset or 0 :]
+            if limit:
+                records = records[:limit]
+            return [r["id"] for r in records]
+
+    def search_count(self, model, domain=None, limit=None):
+        count = self.search(model, domain, count=True)
+        return min(count, limit) if limit else count
+
+    def read(self, model, ids, fields=None):
+        with self._lock:
+            model_fields = self._model(model)
+            if isinstance(ids, int):
+                ids = [ids]
+            fields = [f for f in (fields or model_fields) if f != "id"]
+            return [self._row(model, self._get(model, i), fields) for i in ids]
+
+    def search_read(
+        self, model, domain=None, fields=None, offset=0, limit=None, order=None
+    ):
+        with self._lock:
+            ids = self.search(model, domain, offset, limit, order)
+            return self.read(model, ids, fields)
+
+    def create(self, model, values):
+        with self._lock:
+            if isinstance(values, list):
+                return [self._create(model, v) for v in values]
+            return self._create(model, values)
+
+    def insert(self, model: str, values: dict, record_id: int = None) -> int:
+        """Crea un registro con un id concreto (para datos semilla)."""
+        with self._lock:
+            return self._create(model, values, record_id)
+
+    def write(self, model, ids, values):
+        with self._lock:
+            self._write(model, ids, values)
+            return True
+
+    def unlink(self, model, ids):
+        with self._lock:
+            self._unlink(model, ids)
+            return True
+
+    def fields_get(self, model, allfields=None, attributes=None):
+        fields = self._model(model)
+        result = {}
+        for name, spec in fields.items():
+            if allfields and name not in allfields:
+                continue
+            info = {
+                "type": spec["type"],
+                "string": name.replace("_", " ").title(),
+                "readonly": bool(spec.get("compute")),
+                "store": not spec.get("compute"),
+            }
+            if "relation" in spec:
+                info["relation"] = spec["relation"]
+            if "relation_field" in spec:
+                info["relation_field"] = spec["relation_field"]
+            if "selection" in spec:
+                info["selection"] = spec["selection"]
+            if attributes:
+                info = {k: v for k, v in info.items() if k in attributes}
+            result[name] = info
+        return result
+
+    def name_search(self, model, name="", args=None, operator="ilike", limit=100):
+        domain = list(args or [])
+        if name:
+            domain.append(("name", operator, name))
+        with self._lock:
+            ids = self.search(model, domain, limit=limit)
+            return [[i, self._display_name(model, i)] for i in ids]
+
+    def read_group(
+        self,
+        model,
+        domain,
+        fields,
+        groupby,
+        offset=0,
+        limit=None,
+        orderby=False,
+        lazy=True,
+    ):
+        """read_group con agregados sum/avg/min/max/count y fechas por granularidad."""
+        if isinstance(groupby, str):
+            groupby = [groupby]
+        groupby = list(groupby or [])
+        remaining = []
+        if lazy and groupby:
+            groupby, remaining = groupby[:1], groupby[1:]
+
+        with self._lock:
+            model_fields = self._model(model)
+            ids = self.search(model, domain)
+            records = [self._records[model][i] for i in ids]
+
+            aggregates = []  # (alias, función, campo)
+            for spec in fields or []:
+                name, _, func = spec.partition(":")
+                if "(" in func:
+                    func, _, source = func.partition("(")
+                    source = source.rstrip(")")
+                else:
+                    source = name
+                base = source.split(":")[0]
+                if (
+                    base in [g.split(":")[0] for g in groupby]
+                    or base not in model_fields
+                ):
+                    continue
+                if not func:
+                    if model_fields[base]["type"] not in _NUMERIC:
+                        continue
+                    func = "sum"
+                aggregates.append((name, func, base))
+
+            # clave hashable -> (registros, [(etiqueta, términos de dominio)])
+            groups: Dict[tuple, Tuple[List[dict], list]] = {}
+            for record in records:
+                values = [self._group_value(model, record, g) for g in groupby]
+                key = tuple(v[0] for v in values)
+                if key not in groups:
+                    groups[key] = ([], [v[1:] for v in values])
+                groups[key][0].append(record)
+
+            if lazy and groupby:
+                count_key = f"{groupby[0].split(':')[0]}_count"
+            else:
+                count_key = "__count"
+            result = []
+            for members, labels in groups.values():
+                row = {count_key: len(members)}
+                group_domain = list(domain or [])
+                for spec, (label, terms) in zip(groupby, labels):
+                    row[spec] = label
+                    group_domain.extend(terms)
+                for alias, func, base in aggregates:
+                    values = [
+                        (
+                            self._compute(model, r, base)
+                            if model_fields[base].get("compute")
+                            else (r.get(base) or 0)
+                        )
+                        for r in members
+                    ]
+                    row[alias] = _aggregate(func, values)
+                row["__domain"] = group_domain
+                if remaining:
+                    row["__context"] = {"group_by": remaining}
+                result.append(row)
+
+            _sort_groups(result, orderby or ", ".join(groupby), groupby)
+            result = result[offset or 0 :]
+            if limit:
+                result = result[:limit]
+            return result
+
+    def _group_value(self, model: str, record: dict, spec: str):
+        """(clave hashable, etiqueta, términos de dominio) del grupo de un registro."""
+        field, _, granularity = spec.partition(":")
+        ftype = self.schema[model].get(field, {}).get("type")
+        if ftype is None:
+            raise OdooError(f"Invalid field '{field}' on model '{model}' (groupby)")
+        value = record.get(field)
+        if _is_null(value) or value == []:
+            return (False, False, [(field, "=", False)])
+        if ftype == "many2one":
+            relation = self.schema[model][field]["relation"]
+            label = [value, self._display_name(relation, value)]
+            return (value, label, [(field, "=", value)])
+        if ftype in (DATE, DATETIME):
+            start, end, label = _date_bucket(value, granularity or "month")
+            return (start, label, [(field, ">=", start), (field, "<", end)])
+        if ftype == "many2many":
+            return (tuple(value), list(value), [(field, "in", list(value))])
+        return (value, value, [(field, "=", value)])
+
+    def message_post(self, model, ids, body="", subtype_xmlid="mail.mt_note", **kwargs):
+        with self._lock:
+            for record_id in ids:
+                self._get(model, record_id)
+            message_id = len(self._messages) + 1
+            self._messages.append(
+                {"id": message_id, "model": model, "res_ids": list(ids), "body": body}
+            )
+            return message_id
+
+    def count(self, model: str) -> int:
+        return len(self._records[model])
+
+
+def _aggregate(func: str, values: List[float]):
+    if func == "count":
+        return len(values)
+    if func == "count_distinct":
+        return len(set(values))
+    if not values:
+        return False
+    if func == "avg":
+        return sum(values) / len(values)
+    if func == "min":
+        return min(values)
+    if func == "max":
+        return max(values)
+    return sum(values)
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _date_bucket(value: str, granularity: str) -> Tuple[str, str, str]:
+    """(inicio, fin exclusivo, etiqueta) del periodo que contiene `value`."""
+    day = datetime.strptime(value[:10], "%Y-%m-%d").date()
+    if granularity == "day":
+        start, end, label = day, day + timedelta(days=1), day.strftime("%d %b %Y")
+    elif granularity == "week":
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=7)
+        label = f"W{day.isocalendar()[1]:02d} {day.isocalendar()[0]}"
+    elif granularity == "quarter":
+        quarter = (day.month - 1) // 3 + 1
+        start = date(day.year, 3 * quarter - 2, 1)
+        end, label = _add_months(start, 3), f"Q{quarter} {day.year}"
+    elif granularity == "year":
+        start, end = date(day.year, 1, 1), date(day.year + 1, 1, 1)
+        label = str(day.year)
+    else:
+        start = date(day.year, day.month, 1)
+        end, label = _add_months(start, 1), day.strftime("%B %Y")
+    return start.isoformat(), end.isoformat(), label
+
+
+def _sort_groups(rows: List[dict], orderby: str, groupby: List[str]):
+    for part in reversed([p.strip() for p in orderby.split(",") if p.strip()]):
+        tokens = part.split()
+        field, reverse = tokens[0], len(tokens) > 1 and tokens[1].lower() == "desc"
+        key_name = next((g for g in groupby if g.split(":")[0] == field), field)
+
+        def key(row, key_name=key_name):
+            value = row.get(key_name)
+            if isinstance(value, list):
+                is_m2o = len(value) == 2 and isinstance(value[1], str)
+                value = value[1] if is_m2o else str(value)
+            return _sort_key(value)
+
+        rows.sort(key=key, reverse=reverse)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# DATOS SEMILLA
+# ═══════════════════════════════════════════════════════════════════════
+
+_FIRST = [
+    "Ana",
+    "Luis",
+    "María",
+    "Jorge",
+    "Sofía",
+    "Carlos",
+    "Lucía",
+    "Pedro",
+    "Elena",
+    "Diego",
+]
+_LAST = [
+    "García",
+    "Hernández",
+    "López",
+    "Martínez",
+    "Pérez",
+    "Sánchez",
+    "Ramírez",
+    "Torres",
+]
+_CITIES = ["CDMX", "Guadalajara", "Monterrey", "Puebla", "Querétaro", "Mérida"]
+_PRODUCTS = [
+    "KettyBot",
+    "BellaBot",
+    "PuduBot",
+    "HolaBot",
+    "SwiftBot",
+    "CC1",
+    "FlashBot",
+]
+
+
+def seed(
+    store: FakeOdooStore,
+    users: int = 6,
+    partners: int = 50,
+    products: int = 30,
+    leads: int = 0,
+    orders: int = 0,
+    projects: int = 5,
+    tasks: int = 40,
+    rng: random.Random = None,
+) -> FakeOdooStore:
+    """
+    Carga datos semilla con los ids que el código espera (equipos 1 y 14,
+    etapas 1/2/3/10, tarifa 82, productos 26153/26174...).
+    """
+    rng = rng or random.Random(0)
+
+    for stage_id, name, seq in [
+        (1, "Nuevo", 1),
+        (2, "Calificado", 2),
+        (10, "Propuesta", 3),
+        (3, "Negociación", 4),
+        (4, "Ganado", 5),
+    ]:
+        store.insert(
+            "crm.stage",
+            {"name": name, "sequence": seq, "is_won": stage_id == 4},
+            stage_id,
+        )
+    for stage_id, name in enumerate(["Por hacer", "En progreso", "Hecho"], 1):
+        store.insert(
+            "project.task.type", {"name": name, "sequence": stage_id}, stage_id
+        )
+
+    store.insert(
+        "res.users",
+        {"name": "Administrator", "login": "admin", "mobile": "+5215500000000"},
+        2,
+    )
+    user_ids = []
+    for i in range(users):
+        name = f"{_FIRST[i % len(_FIRST)]} {_LAST[i % len(_LAST)]}"
+        user_ids.append(
+            store.insert(
+                "res.users",
+                {
+                    "name": name,
+                    "login": f"vendedor{i + 1}@example.com",
+                    "email": f"vendedor{i + 1}@example.com",
+                    "mobile": f"+52155{rng.randrange(10**7, 10**8)}",
+                },
+                100 + i,
+            )
+        )
+    store.insert(
+        "crm.team",
+        {"name": "Ventas", "member_ids": [(6, 0, user_ids[: max(1, users // 2)])]},
+        1,
+    )
+    store.insert("crm.team", {"name": "Servibot", "member_ids": [(6, 0, user_ids)]}, 14)
+
+    store.insert("product.pricelist", {"name": "Tarifa pública"}, 82)
+    category_ids = [
+        store.insert("product.category", {"name": name})
+        for name in ("Robots de servicio", "Robots de limpieza", "Accesorios")
+    ]
+    store.insert("account.payment.term", {"name": "30 días"}, 1)
+
+    product_ids = []
+    for i in range(products):
+        record_id = [26153, 26174][i] if i < 2 else 26100 + i
+        product_ids.append(
+            store.insert(
+                "product.product",
+                {
+                    "name": f"{_PRODUCTS[i % len(_PRODUCTS)]} {i + 1}",
+                    "default_code": f"RB{i + 1:04d}",
+                    "categ_id": category_ids[i % len(category_ids)],
+                    "list_price": float(rng.randrange(5_000, 250_000)),
+                },
+                record_id,
+            )
+        )
+        if i % 2 == 0:
+            store.insert(
+                "product.pricelist.item",
+                {
+                    "pricelist_id": 82,
+                    "product_id": record_id,
+                    "fixed_price": float(rng.randrange(5_000, 250_000)),
+                },
+            )
+
+    partner_ids = []
+    for i in range(partners):
+        name = f"{rng.choice(_FIRST)} {rng.choice(_LAST)} {i + 1}"
+        partner_ids.append(
+            store.create(
+                "res.partner",
+                {
+                    "name": name,
+                    "email": f"cliente{i + 1}@example.com",
+                    "phone": f"+52{rng.randrange(10**9, 10**10)}",
+                    "city": rng.choice(_CITIES),
+                },
+            )
+        )
+
+    lead_ids = []
+    for i in range(leads):
+        lead_ids.append(
+            store.create(
+                "crm.lead",
+                {
+                    "name": f"Oportunidad {i + 1}",
+                    "type": "opportunity",
+                    "partner_id": rng.choice(partner_ids) if partner_ids else False,
+                    "user_id": rng.choice(user_ids) if user_ids else False,
+                    "stage_id": rng.choice([1, 2, 10, 3]),
+                    "expected_revenue": float(rng.randrange(10_000, 500_000)),
+                },
+            )
+        )
+
+    for i in range(orders):
+        store.create(
+            "sale.order",
+            {
+                "partner_id": rng.choice(partner_ids) if partner_ids else False,
+                "user_id": rng.choice(user_ids) if user_ids else False,
+                "opportunity_id": rng.choice(lead_ids) if lead_ids else False,
+                "state": rng.choice(["draft", "sent", "sale"]),
+                "date_order": (
+                    datetime.now() - timedelta(days=rng.randrange(365))
+                ).strftime("%Y-%m-%d %H:%M:%S"),
+                "order_line": (
+                    [
+                        (
+                            0,
+                            0,
+                            {
+                                "product_id": rng.choice(product_ids),
+                                "product_uom_qty": float(rng.randrange(1, 5)),
+                            },
+                        )
+                        for _ in range(rng.randrange(1, 4))
+                    ]
+                    if product_ids
+                    else []
+                ),
+            },
+        )
+
+    project_ids = [
+        store.create(
+            "project.project",
+            {
+                "name": f"Implementación {i + 1}",
+                "user_id": rng.choice(user_ids) if user_ids else False,
+            },
+        )
+        for i in range(projects)
+    ]
+    for i in range(tasks if project_ids else 0):
+        store.create(
+            "project.task",
+            {
+                "name": f"Tarea {i + 1}",
+                "project_id": rng.choice(project_ids),
+                "user_ids": [(6, 0, [rng.choice(user_ids)])] if user_ids else [],
+                "stage_id": rng.randrange(1, 4),
+                "date_deadline": (
+                    date.today() + timedelta(days=rng.randrange(-30, 60))
+                ).isoformat(),
+            },
+        )
+    return store
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# LATENCIA, FALLOS Y DESPACHO
+# ═══════════════════════════════════════════════════════════════════════
+
+FAULT_KINDS = ("fault", "reset", "html", "timeout")
+
+
+class FakeOdooConfig:
+    """
+    Comportamiento del fake.
+
+    Args:
+        latency: Segundos base por llamada RPC
+        jitter: Variación uniforme ± sobre la latencia
+        auth_latency: Latencia de authenticate (default: latency)
+        faults: Reglas [{"rate": 0.05, "kind": "reset", "model": None, "method": None}]
+            kind: "fault" (xmlrpc Fault), "reset" (cierra la conexión),
+            "html" (502 con página HTML) o "timeout" (tarda timeout_delay)
+        timeout_delay: Segundos que tarda una respuesta con fallo "timeout"
+        db / login / password: Credenciales aceptadas (None = cualquiera)
+        seed: Semilla del generador aleatorio de latencia/fallos
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        auth_latency: Optional[float] = None,
+        faults: Optional[List[dict]] = None,
+        timeout_delay: float = 30.0,
+        db: Optional[str] = None,
+        login: Optional[str] = None,
+        password: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.auth_latency = auth_latency
+        self.faults = [dict(rule) for rule in (faults or [])]
+        self.timeout_delay = timeout_delay
+        self.db = db
+        self.login = login
+        self.password = password
+        self._rng = random.Random(seed)
+        for rule in self.faults:
+            if rule.get("kind", "fault") not in FAULT_KINDS:
+                raise ValueError(f"Tipo de fallo inválido: {rule.get('kind')}")
+
+    def update(self, **changes):
+        """Actualiza parámetros en caliente (mismas claves que el constructor)."""
+        for key in ("latency", "jitter", "auth_latency", "timeout_delay"):
+            if key in changes:
+                setattr(self, key, changes[key])
+        if "faults" in changes:
+            self.__init__(
+                self.latency,
+                self.jitter,
+                self.auth_latency,
+                changes["faults"],
+                self.timeout_delay,
+                self.db,
+                self.login,
+                self.password,
+            )
+
+    def delay(self, auth: bool = False) -> float:
+        base = (
+            self.auth_latency
+            if auth and self.auth_latency is not None
+            else self.latency
+        )
+        if self.jitter:
+            base += self._rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, base)
+
+    def pick_fault(self, model: Optional[str], method: str) -> Optional[str]:
+        for rule in self.faults:
+            if rule.get("model") not in (None, model):
+                continue
+            if rule.get("method") not in (None, method):
+                continue
+            if self._rng.random() < float(rule.get("rate", 0.0)):
+                return rule.get("kind", "fault")
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "latency": self.latency,
+            "jitter": self.jitter,
+            "auth_latency": self.auth_latency,
+            "faults": copy.deepcopy(self.faults),
+            "timeout_delay": self.timeout_delay,
+        }
+
+
+class _InjectedFault(Exception):
+    def __init__(self, kind: str):
+        super().__init__(kind)
+        self.kind = kind
+
+
+class FakeOdoo:
+    """Despacha llamadas `common`/`object` sobre el almacén, con latencia y fallos."""
+
+    UID = 2
+
+    def __init__(self, store: FakeOdooStore = None, config: FakeOdooConfig = None):
+        self.store = store if store is not None else seed(FakeOdooStore())
+        self.config = config or FakeOdooConfig()
+        self._stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+
+    # ─── estadísticas ──────────────────────────────────────────────────
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            calls = dict(self._stats)
+        return {
+            "total": sum(v for k, v in calls.items() if not k.startswith("fault:")),
+            "calls": calls,
+        }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+    # ─── servicios ─────────────────────────────────────────────────────
+
+    def _prepare(self, key: str, model: Optional[str], method: str, auth: bool = False):
+        self._count(key)
+        fault = self.config.pick_fault(model, method)
+        if fault:
+            self._count(f"fault:{fault}")
+        delay = self.config.delay(auth)
+        if fault == "timeout":
+            # Respuesta lenta pero correcta (el cliente decide si corta)
+            delay += self.config.timeout_delay
+            fault = None
+        if delay:
+            time.sleep(delay)
+        if fault:
+            raise _InjectedFault(fault)
+
+    def common(self, method: str, args: list):
+        if method == "version":
+            return {
+                "server_version": "18.0",
+                "server_serie": "18.0",
+                "protocol_version": 1,
+            }
+        if method in ("authenticate", "login"):
+            self._prepare("common.authenticate", None, "authenticate", auth=True)
+            db, login, password = args[0], args[1], args[2]
+            ok = (
+                (self.config.db is None or db == self.config.db)
+                and (self.config.login is None or login == self.config.login)
+                and (self.config.password is None or password == self.config.password)
+                and bool(login)
+            )
+            return self.UID if ok else False
+        raise OdooError(f"Método common.{method} no soportado")
+
+    def object(self, method: str, args: list):
+        if method not in ("execute_kw", "execute"):
+            raise OdooError(f"Método object.{method} no soportado")
+        db, uid, password, model, model_method = args[:5]
+        if method == "execute_kw":
+            call_args = args[5] if len(args) > 5 else []
+            call_kwargs = args[6] if len(args) > 6 else {}
+        else:
+            call_args, call_kwargs = list(args[5:]), {}
+        self._prepare(f"{model}.{model_method}", model, model_method)
+        if uid != self.UID or (
+            self.config.password is not None and password != self.config.password
+        ):
+            raise OdooError("Access Denied")
+        return self.execute_kw(model, model_method, call_args or [], call_kwargs or {})
+
+    def execute_kw(self, model: str, method: str, args: list, kwargs: dict):
+        """Ejecuta un método de modelo directamente sobre el almacén."""
+        store = self.store
+        kwargs = dict(kwargs)
+        kwargs.pop("context", None)
+        if method == "search_read":
+            domain = args[0] if args else kwargs.pop("domain", [])
+            fields = args[1] if len(args) > 1 else kwargs.pop("fields", None)
+            return store.search_read(model, domain, fields, **kwargs)
+        if method == "search":
+            return store.search(model, *args, **kwargs)
+        if method == "search_count":
+            return store.search_count(model, *args, **kwargs)
+        if method == "read":
+            fields = args[1] if len(args) > 1 else kwargs.pop("fields", None)
+            return store.read(model, args[0], fields)
+        if method == "create":
+            return store.create(model, args[0])
+        if method == "write":
+            return store.write(model, args[0], args[1])
+        if method == "unlink":
+            return store.unlink(model, args[0])
+        if method == "read_group":
+            return store.read_group(model, *args, **kwargs)
+        if method == "fields_get":
+            return store.fields_get(model, *args, **kwargs)
+        if method == "name_search":
+            return store.name_search(model, *args, **kwargs)
+        if method == "message_post":
+            return store.message_post(model, args[0], **kwargs)
+        if model == "crm.lead" and method in (
+            "action_set_won",
+            "action_set_won_rainbowman",
+        ):
+            store.write(
+                model,
+                args[0],
+                {"probability": 100.0, "stage_id": 4, "date_closed": _now()},
+            )
+            return True
+        if model == "crm.lead" and method == "action_set_lost":
+            store.write(model, args[0], {"probability": 0.0, "active": False, **kwargs})
+            return True
+        raise OdooError(f"The method '{method}' does not exist on the model '{model}'")
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# SERVIDOR HTTP
+# ═══════════════════════════════════════════════════════════════════════
+
+_HTML_502 = (
+    b"<!doctype html><html><head><title>502 Bad Gateway</title></head>"
+    b"<body><h1>502 Bad Gateway</h1></body></html>"
+)
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_HTTPServer"
+
+    def log_message(self, format, *args):  # noqa: A002 - firma de la clase base
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _fault_response(self, kind: str) -> bool:
+        """Aplica un fallo a nivel HTTP. Retorna True si ya respondió."""
+        if kind == "reset":
+            self.close_connection = True
+            return True
+        if kind == "html":
+            self._send(502, _HTML_502, "text/html")
+            return True
+        return False
+
+    def do_GET(self):
+        if self.path == "/fake/stats":
+            body = json.dumps(self.server.fake.stats()).encode()
+            self._send(200, body, "application/json")
+        elif self.path == "/fake/config":
+            body = json.dumps(self.server.fake.config.to_dict()).encode()
+            self._send(200, body, "application/json")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        fake = self.server.fake
+
+        if self.path == "/fake/config":
+            fake.config.update(**json.loads(body or b"{}"))
+            self._send(
+                200, json.dumps(fake.config.to_dict()).encode(), "application/json"
+            )
+            return
+        if self.path == "/fake/reset":
+            fake.reset_stats()
+            self._send(200, b"{}", "application/json")
+            return
+        if self.path.startswith("/xmlrpc/2/"):
+            self._xmlrpc(self.path.rsplit("/", 1)[-1], body)
+            return
+        if self.path == "/jsonrpc":
+            self._jsonrpc(body)
+            return
+        self._send(404, b"not found", "text/plain")
+
+    def _xmlrpc(self, service: str, body: bytes):
+        fake = self.server.fake
+        try:
+            params, method = xmlrpc.client.loads(body, use_builtin_types=True)
+            handler = {"common": fake.common, "object": fake.object}.get(service)
+            if handler is None:
+                raise OdooError(f"Servicio desconocido: {service}")
+            result = handler(method, list(params))
+            response = xmlrpc.client.dumps(
+                (result,), methodresponse=True, allow_none=True
+            )
+        except _InjectedFault as fault:
+            if self._fault_response(fault.kind):
+                return
+            response = xmlrpc.client.dumps(
+                xmlrpc.client.Fault(1, "Injected fault"), allow_none=True
+            )
+        except Exception as e:
+            response = xmlrpc.client.dumps(
+                xmlrpc.client.Fault(1, f"{type(e).__name__}: {e}"), allow_none=True
+            )
+        self._send(200, response.encode("utf-8"), "text/xml")
+
+    def _jsonrpc(self, body: bytes):
+        fake = self.server.fake
+        request_id = None
+        try:
+            payload = json.loads(body)
+            request_id = payload.get("id")
+            params = payload.get("params") or {}
+            handler = {"common": fake.common, "object": fake.object}.get(
+                params.get("service")
+            )
+            if handler is None:
+                raise OdooError(f"Servicio desconocido: {params.get('service')}")
+            result = handler(params.get("method"), list(params.get("args") or []))
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except _InjectedFault as fault:
+            if self._fault_response(fault.kind):
+                return
+            response = _jsonrpc_error(request_id, "Injected fault")
+        except Exception as e:
+            response = _jsonrpc_error(request_id, f"{type(e).__name__}: {e}")
+        self._send(200, json.dumps(response, default=str).encode(), "application/json")
+
+
+def _jsonrpc_error(request_id, message: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": 200,
+            "message": "Odoo Server Error",
+            "data": {"name": "odoo.exceptions.UserError", "message": message},
+        },
+    }
+
+
+class _HTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, fake: FakeOdoo):
+        super().__init__(address, _Handler)
+        self.fake = fake
+
+
+class FakeOdooServer:
+    """Fake Odoo escuchando por HTTP en un thread del proceso actual."""
+
+    def __init__(
+        self,
+        store: FakeOdooStore = None,
+        config: FakeOdooConfig = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        db: str = "fake",
+    ):
+        self.fake = FakeOdoo(store, config)
+        self.db = db
+        self._httpd = _HTTPServer((host, port), self.fake)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def store(self) -> FakeOdooStore:
+        return self.fake.store
+
+    @property
+    def config(self) -> FakeOdooConfig:
+        return self.fake.config
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(
+        self, login: str = "bench@example.com", api_key: str = "fake-key"
+    ) -> Dict[str, str]:
+        """Variables de entorno para que OdooClient y los clientes DEV usen el fake."""
+        values = {"URL": self.url, "DB": self.db, "LOGIN": login, "API_KEY": api_key}
+        env = {}
+        for prefix in ("ODOO_", "DEV_ODOO_"):
+            env.update({f"{prefix}{k}": v for k, v in values.items()})
+        return env
+
+    def stats(self) -> dict:
+        return self.fake.stats()
+
+    def reset_stats(self):
+        self.fake.reset_stats()
+
+    def start(self) -> "FakeOdooServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-odoo", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeOdooServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Fake Odoo XML-RPC/JSON-RPC")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8069)
+    parser.add_argument("--latency", type=float, default=0.0, help="segundos por RPC")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± segundos")
+    parser.add_argument("--auth-latency", type=float, default=None)
+    parser.add_argument("--fault-rate", type=float, default=0.0)
+    parser.add_argument("--fault-kind", choices=FAULT_KINDS, default="fault")
+    parser.add_argument("--partners", type=int, default=50)
+    parser.add_argument("--products", type=int, default=30)
+    parser.add_argument("--leads", type=int, default=0)
+    parser.add_argument("--orders", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    faults = (
+        [{"rate": args.fault_rate, "kind": args.fault_kind}] if args.fault_rate else []
+    )
+    store = seed(
+        FakeOdooStore(),
+        partners=args.partners,
+        products=args.products,
+        leads=args.leads,
+        orders=args.orders,
+        rng=random.Random(args.seed),
+    )
+    config = FakeOdooConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        auth_latency=args.auth_latency,
+        faults=faults,
+        seed=args.seed,
+    )
+    server = FakeOdooServer(store, config, host=args.host, port=args.port)
+    print(f"Fake Odoo escuchando en {server.url} (db={server.db})", flush=True)
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
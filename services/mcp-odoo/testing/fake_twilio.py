@@ -0,0 +1,170 @@
+"""
+Fake Twilio
+===========
+Stand-in local de la API de mensajes de Twilio
+(`POST /2010-04-01/Accounts/<sid>/Messages.json`).
+
+`SMSClient` lo usa si `TWILIO_API_BASE_URL` apunta aquí. Responde como
+Twilio (201 + JSON del mensaje) con latencia configurable y guarda los
+mensajes recibidos para inspeccionarlos.
+
+Uso:
+    with FakeTwilioServer(latency=0.15) as twilio:
+        os.environ.update(twilio.env())
+"""
+
+import http.server
+import json
+import random
+import threading
+import time
+import urllib.parse
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_HTTPServer"
+
+    def log_message(self, format, *args):  # noqa: A002 - firma de la clase base
+        pass
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        form = dict(urllib.parse.parse_qsl(self.rfile.read(length).decode()))
+        if not self.path.endswith("/Messages.json") or "/Accounts/" not in self.path:
+            self._send(404, {"code": 20404, "message": "Not found", "status": 404})
+            return
+
+        fake = self.server.fake
+        fake.wait()
+        if fake.should_fail():
+            self._send(
+                400,
+                {"code": 21211, "message": "Invalid 'To' Phone Number", "status": 400},
+            )
+            return
+
+        account_sid = self.path.split("/Accounts/")[1].split("/")[0]
+        message = fake.record(account_sid, form)
+        self._send(201, message)
+
+    def do_GET(self):
+        if self.path == "/fake/stats":
+            self._send(200, {"messages": len(self.server.fake.messages)})
+        else:
+            self._send(404, {"code": 20404, "message": "Not found", "status": 404})
+
+
+class _HTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, fake: "FakeTwilioServer"):
+        super().__init__(address, _Handler)
+        self.fake = fake
+
+
+class FakeTwilioServer:
+    """
+    API de mensajes de Twilio en un thread del proceso actual.
+
+    Args:
+        latency: Segundos por mensaje
+        jitter: Variación uniforme ± sobre la latencia
+        error_rate: Fracción de envíos que responden con error 400 de Twilio
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.messages: List[dict] = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), self)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Variables de entorno para que SMSClient envíe al stand-in."""
+        return {
+            "TWILIO_ACCOUNT_SID": "AC" + "0" * 32,
+            "TWILIO_AUTH_TOKEN": "fake-token",
+            "TWILIO_WHATSAPP_FROM": "whatsapp:+14155238886",
+            "TWILIO_SMS_FROM": "+14155238886",
+            "TWILIO_API_BASE_URL": self.url,
+            "VENDEDOR_WHATSAPP": "+5215500000000",
+        }
+
+    def wait(self):
+        delay = self.latency
+        if self.jitter:
+            delay += self._rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self._rng.random() < self.error_rate
+
+    def record(self, account_sid: str, form: dict) -> dict:
+        now = datetime.now(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        message = {
+            "sid": "SM" + uuid.uuid4().hex,
+            "account_sid": account_sid,
+            "from": form.get("From"),
+            "to": form.get("To"),
+            "body": form.get("Body"),
+            "status": "queued",
+            "direction": "outbound-api",
+            "num_segments": "1",
+            "date_created": now,
+            "date_updated": now,
+            "api_version": "2010-04-01",
+            "uri": f"/2010-04-01/Accounts/{account_sid}/Messages.json",
+        }
+        with self._lock:
+            self.messages.append(message)
+        return message
+
+    def start(self) -> "FakeTwilioServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-twilio", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeTwilioServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
@@ -6,18 +6,29 @@ Cada módulo debe exponer una función:
     register_<nombre>_tools(mcp: FastMCP, deps: dict) -> None
 
 donde `deps` puede contener clientes compartidos (p.ej. {'odoo': OdooClient}).
+
+Los módulos reciben un proxy de `mcp` cuyo decorador `tool` mide cada llamada
+(conteo por estado y latencia por nombre de tool) y la envuelve en una traza
+`mcp.<tool>`, sin cambios en los módulos.
 """
 
+import functools
 import importlib
+import inspect
 import pkgutil
+import time
 from types import ModuleType
 
+from core import tracing
+from core.metrics import MCP_TOOL_CALLS, MCP_TOOL_SECONDS
+
 
 def load_all(mcp, deps: dict, package_name: str = __name__):
     package = importlib.import_module(package_name)
+    instrumented = InstrumentedMCP(mcp)
     for info in pkgutil.iter_modules(package.__path__, package.__name__ + "."):
         mod = importlib.import_module(info.name)
-        _register_from_module(mod, mcp, deps)
+        _register_from_module(mod, instrumented, deps)
 
 
 def _register_from_module(mod: ModuleType, mcp, deps: dict):
@@ -32,3 +43,65 @@ def _register_from_module(mod: ModuleType, mcp, deps: dict):
     reg_alt = getattr(mod, f"register_{module_name}_tools", None)
     if callable(reg_alt):
         reg_alt(mcp, deps)
+
+
+class InstrumentedMCP:
+    """Proxy de FastMCP que envuelve cada tool registrada con métricas."""
+
+    def __init__(self, mcp):
+        self._mcp = mcp
+
+    def __getattr__(self, name):
+        return getattr(self._mcp, name)
+
+    def tool(self, *args, **kwargs):
+        register = self._mcp.tool(*args, **kwargs)
+
+        def decorator(fn):
+            positional = args[0] if args and isinstance(args[0], str) else None
+            tool_name = kwargs.get("name") or positional or fn.__name__
+            return register(instrument_tool(fn, tool_name))
+
+        return decorator
+
+
+def instrument_tool(fn, tool_name: str):
+    """Envuelve una tool (sync o async) con conteo, latencia y traza."""
+    span_name = f"mcp.{tool_name}"
+    ok = MCP_TOOL_CALLS.labels(tool_name, "ok")
+    error = MCP_TOOL_CALLS.labels(tool_name, "error")
+    seconds = MCP_TOOL_SECONDS.labels(tool_name)
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with tracing.start_trace(span_name, tool=tool_name):
+                    result = await fn(*args, **kwargs)
+            except Exception:
+                error.inc()
+                raise
+            finally:
+                seconds.observe(time.perf_counter() - start)
+            ok.inc()
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with tracing.start_trace(span_name, tool=tool_name):
+                result = fn(*args, **kwargs)
+        except Exception:
+            error.inc()
+            raise
+        finally:
+            seconds.observe(time.perf_counter() - start)
+        ok.inc()
+        return result
+
+    return wrapper
@@ -0,0 +1,226 @@
+# tools/analytics.py
+"""
+PRODUCCIÓN (Solo Lectura):
+- crm_pipeline_stats: conteo e ingreso esperado de leads/oportunidades
+  (crm.lead) por vendedor, equipo, etapa y periodo
+- sales_stats: conteo y montos de órdenes de venta (sale.order) por
+  vendedor, estado, cliente y periodo
+
+Los agregados los calcula Odoo con `read_group` (`core.analytics`): una sola
+RPC con los números exactos, sin listar registros ni sumarlos en el
+contexto. Los resultados se cachean ANALYTICS_CACHE_TTL segundos.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from core import analytics
+
+# Dimensión → campo de Odoo (las de fecha se agrupan por `interval`)
+LEAD_DIMENSIONS = {
+    "user": "user_id",
+    "team": "team_id",
+    "stage": "stage_id",
+    "type": "type",
+    "created": "create_date",
+    "closed": "date_closed",
+}
+LEAD_MEASURES = ["expected_revenue:sum", "probability:avg"]
+
+SALE_DIMENSIONS = {
+    "user": "user_id",
+    "state": "state",
+    "partner": "partner_id",
+    "date": "date_order",
+}
+SALE_MEASURES = ["amount_untaxed:sum", "amount_total:sum"]
+
+DATE_FIELDS = {"create_date", "date_closed", "date_order"}
+
+
+def _groupby(group_by: List[str], dimensions: Dict[str, str], interval: str):
+    """Dimensiones pedidas → specs de read_group ({spec: dimensión})."""
+    if interval not in analytics.INTERVALS:
+        raise ValueError(
+            f"interval inválido: {interval} ({', '.join(analytics.INTERVALS)})"
+        )
+    if not group_by:
+        raise ValueError("group_by vacío")
+    specs: Dict[str, str] = {}
+    for name in group_by:
+        field = dimensions.get(name)
+        if field is None:
+            raise ValueError(f"Dimensión inválida: {name} ({', '.join(dimensions)})")
+        specs[f"{field}:{interval}" if field in DATE_FIELDS else field] = name
+    return specs
+
+
+def _date_domain(
+    field: str, date_from: Optional[str], date_to: Optional[str]
+) -> List[list]:
+    """[date_from, date_to] inclusivos (YYYY-MM-DD) sobre `field`."""
+    domain = []
+    if date_from:
+        domain.append([field, ">=", date.fromisoformat(date_from).isoformat()])
+    if date_to:
+        end = date.fromisoformat(date_to) + timedelta(days=1)
+        domain.append([field, "<", end.isoformat()])
+    return domain
+
+
+def _totals(odoo, model: str, domain, groups, measures) -> Dict[str, Any]:
+    """
+    Totales del dominio. Si los grupos se truncaron en MAX_GROUPS, sumarlos
+    dejaría fuera al resto: se piden a Odoo con un read_group sin agrupar.
+    """
+    if len(groups) < analytics.MAX_GROUPS:
+        return analytics.totals(groups, measures)
+    overall, _ = analytics.aggregate(odoo, model, domain, [], measures)
+    return overall[0] if overall else analytics.totals([], measures)
+
+
+def _result(
+    groups, specs: Dict[str, str], measures, cached: bool, totals: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Grupos con nombres de dimensión en lugar de specs de Odoo, y totales."""
+    items = []
+    for group in groups:
+        item = {name: group.get(spec) for spec, name in specs.items()}
+        item["count"] = group["count"]
+        for measure in measures:
+            alias = measure.split(":")[0]
+            item[alias] = group.get(alias)
+        items.append(item)
+    return {
+        "groups": items,
+        "totals": totals,
+        "truncated": len(groups) >= analytics.MAX_GROUPS,
+        "cached": cached,
+    }
+
+
+def register(mcp, deps: dict):
+    """
+    Herramientas MCP de analítica (read_group).
+    - crm_pipeline_stats: pipeline de CRM agregado.
+    - sales_stats: ventas agregadas.
+    """
+    odoo = deps["odoo"]
+
+    @mcp.tool(
+        name="crm_pipeline_stats",
+        description=(
+            "Estadísticas del pipeline de CRM (crm.lead) calculadas en Odoo: "
+            "cuántos leads/oportunidades y cuánto ingreso esperado hay por "
+            "vendedor, equipo, etapa o periodo. Usar en lugar de listar y sumar."
+        ),
+    )
+    def crm_pipeline_stats(
+        group_by: Optional[List[str]] = None,
+        interval: str = "month",
+        lead_type: Optional[str] = "opportunity",
+        user_id: Optional[int] = None,
+        team_id: Optional[int] = None,
+        stage_id: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        date_field: str = "created",
+    ) -> Dict[str, Any]:
+        """
+        Conteos y sumas del pipeline agrupados en Odoo (una sola consulta).
+
+        Args:
+            group_by: Dimensiones: user, team, stage, type, created, closed
+                (por defecto ["user", "stage"]).
+            interval: Periodo de las dimensiones de fecha: day, week, month,
+                quarter, year.
+            lead_type: 'opportunity', 'lead' o None para ambos.
+            user_id: Solo un vendedor (res.users id).
+            team_id: Solo un equipo de ventas (crm.team id).
+            stage_id: Solo una etapa (crm.stage id).
+            date_from: Fecha inicial inclusiva (YYYY-MM-DD).
+            date_to: Fecha final inclusiva (YYYY-MM-DD).
+            date_field: Fecha que filtran date_from/date_to: created o closed.
+
+        Returns:
+            {"groups": [{<dimensión>: valor, "count", "expected_revenue",
+             "probability"}], "totals": {...}, "truncated": bool,
+             "cached": bool}. Los many2one vienen como [id, "Nombre"].
+        """
+        domain: List[list] = []
+        if lead_type:
+            domain.append(["type", "=", lead_type])
+        if user_id:
+            domain.append(["user_id", "=", int(user_id)])
+        if team_id:
+            domain.append(["team_id", "=", int(team_id)])
+        if stage_id:
+            domain.append(["stage_id", "=", int(stage_id)])
+        try:
+            specs = _groupby(group_by or ["user", "stage"], LEAD_DIMENSIONS, interval)
+            if date_field not in ("created", "closed"):
+                raise ValueError(f"date_field inválido: {date_field} (created, closed)")
+            domain += _date_domain(LEAD_DIMENSIONS[date_field], date_from, date_to)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        groups, cached = analytics.aggregate(
+            odoo, "crm.lead", domain, list(specs), LEAD_MEASURES
+        )
+        totals = _totals(odoo, "crm.lead", domain, groups, LEAD_MEASURES)
+        return _result(groups, specs, LEAD_MEASURES, cached, totals)
+
+    @mcp.tool(
+        name="sales_stats",
+        description=(
+            "Estadísticas de órdenes de venta (sale.order) calculadas en Odoo: "
+            "cuántas órdenes y cuánto monto hay por vendedor, estado, cliente "
+            "o periodo. Usar en lugar de list_sales para totales."
+        ),
+    )
+    def sales_stats(
+        group_by: Optional[List[str]] = None,
+        interval: str = "month",
+        state: Optional[str] = None,
+        user_id: Optional[int] = None,
+        partner_id: Optional[int] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Conteos y montos de ventas agrupados en Odoo (una sola consulta).
+
+        Args:
+            group_by: Dimensiones: user, state, partner, date (por defecto
+                ["user"]).
+            interval: Periodo de la dimensión date: day, week, month,
+                quarter, year.
+            state: Solo un estado ('draft', 'sent', 'sale', 'done', 'cancel').
+            user_id: Solo un vendedor (res.users id).
+            partner_id: Solo un cliente (res.partner id).
+            date_from: Fecha de orden inicial inclusiva (YYYY-MM-DD).
+            date_to: Fecha de orden final inclusiva (YYYY-MM-DD).
+
+        Returns:
+            {"groups": [{<dimensión>: valor, "count", "amount_untaxed",
+             "amount_total"}], "totals": {...}, "truncated": bool,
+             "cached": bool}. Los many2one vienen como [id, "Nombre"].
+        """
+        domain: List[list] = []
+        if state:
+            domain.append(["state", "=", state])
+        if user_id:
+            domain.append(["user_id", "=", int(user_id)])
+        if partner_id:
+            domain.append(["partner_id", "=", int(partner_id)])
+        try:
+            specs = _groupby(group_by or ["user"], SALE_DIMENSIONS, interval)
+            domain += _date_domain("date_order", date_from, date_to)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        groups, cached = analytics.aggregate(
+            odoo, "sale.order", domain, list(specs), SALE_MEASURES
+        )
+        totals = _totals(odoo, "sale.order", domain, groups, SALE_MEASURES)
+        return _result(groups, specs, SALE_MEASURES, cached, totals)
@@ -8,121 +8,15 @@ from pydantic import BaseModel
 import os
 from datetime import datetime
 from core.tasks import TaskStatus
-import unicodedata
-import re
+from core.log import get_logger
+from core.odoo_client import OdooClient
+from core import analytics, mirror
+from core.contacts import normalize_email, normalize_phone
+from core.partner_index import index_for
+from core.order_lines import sync_order_lines
+from core.domain import normalize
 
-
-def normalize_email(email: str) -> str:
-    """
-    Normaliza y limpia un email eliminando acentos, espacios y caracteres inválidos.
-    Corrige automáticamente errores comunes.
-
-    Args:
-        email: Email a normalizar
-
-    Returns:
-        Email normalizado y corregido en minúsculas sin acentos
-
-    Raises:
-        ValueError: Si el email no tiene el formato mínimo requerido (usuario@dominio)
-
-    Example:
-        normalize_email("López@Gmail.com") -> "lopez@gmail.com"
-        normalize_email("aguilar@gmail.com7") -> "aguilar@gmail.com"
-        normalize_email("test@test.co1m") -> "test@test.com"
-    """
-    # Guardar original para logs
-    original = email
-
-    # Eliminar espacios al inicio y final
-    email = email.strip()
-
-    # Convertir a minúsculas
-    email = email.lower()
-
-    # Eliminar acentos y diacríticos
-    email = unicodedata.normalize("NFKD", email)
-    email = email.encode("ASCII", "ignore").decode("ASCII")
-
-    # Eliminar espacios internos que puedan quedar
-    email = email.replace(" ", "")
-    email = email.replace(",", "")
-
-    # Intentos de corrección y normalización en cadena
-    # 1) Si hay múltiples @, conservar el primero y concatenar el resto
-    if email.count("@") > 1:
-        parts = email.split("@")
-        user = parts[0]
-        domain = "".join(parts[1:])
-        email = f"{user}@{domain}"
-
-    # 2) Si no hay @, intentar inferirlo reemplazando el primer punto por @ (heurística)
-    if email.count("@") == 0:
-        if "." in email:
-            idx = email.find(".")
-            user = email[:idx]
-            domain = email[idx + 1 :]
-            email = f"{user}@{domain}"
-        else:
-            # No se puede inferir, fallback al email genérico
-            fallback = "emailinvalido@corporativosade.com.mx"
-            print(f"⚠️ Email inválido '{original}' -> usando fallback '{fallback}'")
-            return fallback
-
-    # A partir de aquí deberíamos tener 1 @
-    if email.count("@") != 1:
-        fallback = "emailinvalido@corporativosade.com.mx"
-        print(f"⚠️ Email inválido '{original}' -> usando fallback '{fallback}'")
-        return fallback
-
-    user, domain = email.split("@", 1)
-
-    # Usuario no puede estar vacío
-    if not user:
-        fallback = "emailinvalido@corporativosade.com.mx"
-        print(
-            f"⚠️ Email inválido '{original}' (usuario vacío) -> usando fallback '{fallback}'"
-        )
-        return fallback
-
-    # CORRECCIÓN AUTOMÁTICA: Eliminar números al final de la extensión
-    domain = re.sub(r"(\.[a-zA-Z]+)\d+$", r"\1", domain)
-
-    # CORRECCIÓN AUTOMÁTICA: Arreglar números mezclados en la extensión
-    domain = re.sub(r"\.([a-zA-Z]+)\d+([a-zA-Z]+)$", r".\1\2", domain)
-
-    # Si el dominio no tiene punto, intentar añadir .com
-    if "." not in domain:
-        domain_candidate = domain + ".com"
-        email_candidate = f"{user}@{domain_candidate}"
-        email_pattern = r"^[a-zA-Z0-9._-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-        if re.match(email_pattern, email_candidate):
-            domain = domain_candidate
-        else:
-            fallback = "emailinvalido@corporativosade.com.mx"
-            print(
-                f"⚠️ Email '{original}' no pudo ser corregido -> usando fallback '{fallback}'"
-            )
-            return fallback
-
-    # Reconstruir email limpio
-    email_clean = f"{user}@{domain}"
-
-    # Validación final del formato
-    email_pattern = r"^[a-zA-Z0-9._-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-
-    if not re.match(email_pattern, email_clean):
-        fallback = "emailinvalido@corporativosade.com.mx"
-        print(
-            f"⚠️ Email '{original}' inválido después de limpieza -> usando fallback '{fallback}'"
-        )
-        return fallback
-
-    # Log si se hizo corrección
-    if original != email_clean:
-        print(f"📧 Email corregido: '{original}' -> '{email_clean}'")
-
-    return email_clean
+log = get_logger(__name__)
 
 
 class QuotationResult(BaseModel):
@@ -140,15 +34,29 @@ class QuotationResult(BaseModel):
     steps: Dict[str, str]
 
 
-class DevOdooCRMClient:
+# Actualización masiva de leads (dev_bulk_update_leads)
+BULK_LEAD_FIELDS = (
+    "stage_id",
+    "user_id",
+    "team_id",
+    "type",
+    "priority",
+    "tag_ids",
+    "date_deadline",
+    "lost_reason_id",
+    "active",
+)
+BULK_CHUNK_SIZE = int(os.getenv("LEAD_BULK_CHUNK_SIZE", "200"))
+BULK_MAX_RECORDS = int(os.getenv("LEAD_BULK_MAX_RECORDS", "2000"))
+
+
+class DevOdooCRMClient(OdooClient):
     """
     Cliente Odoo específico para el ambiente de DESARROLLO (CRM/Cotizaciones).
     Se conecta a: pegasuscontrol-dev18-25468489.dev.odoo.com
     """
 
     def __init__(self):
-        import xmlrpc.client
-
         # Configuración específica para DESARROLLO
         # Intentar leer variables DEV_, si no existen, usar ODOO_ as fallback
         
@@ -157,38 +65,22 @@ class DevOdooCRMClient:
         env_user = os.environ.get("DEV_ODOO_LOGIN") or os.environ.get("ODOO_LOGIN")
         env_key = os.environ.get("DEV_ODOO_API_KEY") or os.environ.get("ODOO_API_KEY") or os.environ.get("ODOO_PASSWORD")
         
-        self.url = (env_url or "https://pegasuscontrol-dev18-25468489.dev.odoo.com").rstrip("/")
-        self.db = env_db or "pegasuscontrol-dev18-25468489"
-        self.username = env_user
-        self.password = env_key
-
-        if not self.username or not self.password:
+        if not env_user or not env_key:
             raise ValueError(
                 "Faltan credenciales DEV_ODOO_LOGIN o DEV_ODOO_API_KEY (ni ODOO_*) en .env"
             )
 
-        # Conexión XML-RPC a desarrollo con allow_none=True para manejar valores None
-        self.common = xmlrpc.client.ServerProxy(
-            f"{self.url}/xmlrpc/2/common", allow_none=True
+        # Conexión XML-RPC y autenticación (execute_kw instrumentado en OdooClient)
+        super().__init__(
+            url=env_url or "https://pegasuscontrol-dev18-25468489.dev.odoo.com",
+            db=env_db or "pegasuscontrol-dev18-25468489",
+            username=env_user,
+            password=env_key,
         )
-        self.models = xmlrpc.client.ServerProxy(
-            f"{self.url}/xmlrpc/2/object", allow_none=True
-        )
-
-        # Autenticación
-        self.uid = self.common.authenticate(self.db, self.username, self.password, {})
 
         if not self.uid:
             raise ValueError("No se pudo autenticar en el ambiente de desarrollo")
 
-    def execute_kw(self, model: str, method: str, args=None, kwargs=None):
-        """Ejecuta un método en el modelo especificado."""
-        args = args or []
-        kwargs = kwargs or {}
-        return self.models.execute_kw(
-            self.db, self.uid, self.password, model, method, args, kwargs
-        )
-
     def search_read(
         self, model: str, domain: list, fields: list, limit: int = 1
     ) -> list:
@@ -201,10 +93,20 @@ class DevOdooCRMClient:
         """Crea un nuevo registro."""
         return self.execute_kw(model, "create", [values])
 
+    def create_many(self, model: str, values_list: List[Dict[str, Any]]) -> List[int]:
+        """Crea varios registros con un solo create (devuelve sus ids en orden)."""
+        if not values_list:
+            return []
+        return self.execute_kw(model, "create", [list(values_list)])
+
     def write(self, model: str, record_id: int, values: Dict[str, Any]) -> bool:
         """Actualiza un registro existente."""
         return self.execute_kw(model, "write", [[record_id], values])
 
+    def write_many(self, model: str, record_ids: List[int], values: Dict[str, Any]) -> bool:
+        """Aplica los mismos valores a varios registros con un solo write."""
+        return self.execute_kw(model, "write", [list(record_ids), values])
+
     def read(self, model: str, record_id: int, fields: list = None) -> Dict[str, Any]:
         """Lee un registro por ID."""
         fields = fields or []
@@ -347,12 +249,10 @@ def register(mcp, deps: dict):
         import os
 
         environment = os.getenv("ODOO_ENVIRONMENT", "dev").lower()
-        print(f"[CRM Tool] 🌍 Ambiente detectado: {environment}")
+        log.debug("Ambiente detectado: %s", environment)
         if environment == "prod":
-            print(f"[CRM Tool] 📊 Usando cliente de PRODUCCIÓN")
             return prod_client
         else:
-            print(f"[CRM Tool] 🔧 Usando cliente de DESARROLLO")
             return get_dev_client()
 
     @mcp.tool(
@@ -462,7 +362,7 @@ def register(mcp, deps: dict):
         }
 
         # Crear tarea en TaskManager
-        task_manager.create_task(tracking_id, params)
+        task_manager.create_task(tracking_id, params, source="mcp")
 
         # Log inicial
         quotation_logger.log_quotation(
@@ -478,7 +378,7 @@ def register(mcp, deps: dict):
 
             try:
                 task.start()
-                task.update_progress("Iniciando cliente Odoo...")
+                task.update_progress("Iniciando cliente Odoo...", stage="connect")
 
                 client = get_odoo_client()  # Usa el cliente según ODOO_ENVIRONMENT
 
@@ -491,7 +391,7 @@ def register(mcp, deps: dict):
                         # Test de conexión simple
                         client.search_read("res.partner", [], ["id"], limit=1)
                         if attempt > 0:
-                            print(f"✅ Conexión Odoo exitosa en intento {attempt + 1}")
+                            log.info("Conexión Odoo exitosa en intento %d", attempt + 1)
                         break
                     except Exception as conn_error:
                         error_type = type(conn_error).__name__
@@ -501,8 +401,12 @@ def register(mcp, deps: dict):
                                 if attempt < len(retry_delays)
                                 else 10
                             )
-                            print(
-                                f"⚠️ Intento {attempt + 1}/{max_retries} falló ({error_type}), esperando {delay}s..."
+                            log.warning(
+                                "Intento %d/%d falló (%s), esperando %ss...",
+                                attempt + 1,
+                                max_retries,
+                                error_type,
+                                delay,
                             )
                             import time
 
@@ -515,52 +419,50 @@ def register(mcp, deps: dict):
                 steps = {}
 
                 # PASO 1: Verificar/Crear Partner
-                task.update_progress("Verificando partner...")
-
-                # Validar y normalizar email
-                try:
-                    email_normalizado = normalize_email(email)
-                except ValueError as email_error:
-                    raise Exception(f"Email inválido: {str(email_error)}")
-
-                existing_partners = client.search_read(
-                    "res.partner",
-                    [("email", "=", email_normalizado)],
-                    ["id", "name", "email", "phone"],
-                    limit=1,
+                task.update_progress("Verificando partner...", stage="partner")
+
+                # Normalizar email y teléfono (E.164; inválido se conserva)
+                email_normalizado = normalize_email(email)
+                phone_normalizado = normalize_phone(phone) or phone
+
+                partner_values = {
+                    "name": contact_name,
+                    "email": email_normalizado,
+                    "phone": phone_normalizado,
+                    "is_company": False,
+                    "type": "contact",
+                }
+                # Agregar ciudad si se proporciona
+                if ciudad:
+                    partner_values["city"] = ciudad
+
+                # Índice local por email: evita el search_read si ya se conoce
+                # y serializa cotizaciones simultáneas del mismo cliente
+                partner, created = index_for(client).get_or_create(
+                    client, email_normalizado, partner_values
                 )
-
-                if existing_partners:
-                    partner_id = existing_partners[0]["id"]
-                    partner_full_name = existing_partners[0]["name"]
+                partner_id = partner.id
+                if created:
+                    partner_full_name = partner_name
                     steps["partner"] = (
-                        f"Partner existente: {partner_full_name} (ID: {partner_id})"
+                        f"Nuevo partner creado: {partner_full_name} (ID: {partner_id})"
                     )
                 else:
-                    partner_values = {
-                        "name": contact_name,
-                        "email": email_normalizado,
-                        "phone": phone,
-                        "is_company": False,
-                        "type": "contact",
-                    }
-                    # Agregar ciudad si se proporciona
-                    if ciudad:
-                        partner_values["city"] = ciudad
-
-                    partner_id = client.create("res.partner", partner_values)
-                    partner_full_name = partner_name
+                    partner_full_name = partner.name
                     steps["partner"] = (
-                        f"Nuevo partner creado: {partner_full_name} (ID: {partner_id})"
+                        f"Partner existente: {partner_full_name} (ID: {partner_id})"
                     )
 
                 task.update_progress("Partner verificado")
 
                 # PASO 2: Asignar vendedor
-                task.update_progress("Asignando vendedor...")
+                task.update_progress("Asignando vendedor...", stage="assign_user")
                 assigned_user_id = user_id
                 if not assigned_user_id:
-                    assigned_user_id = client.get_salesperson_with_least_opportunities()
+                    # Conteo de oportunidades desde el espejo local
+                    assigned_user_id = mirror.reader(
+                        client
+                    ).get_salesperson_with_least_opportunities()
                     if assigned_user_id:
                         steps["user"] = (
                             f"Vendedor asignado automáticamente (ID: {assigned_user_id})"
@@ -573,12 +475,12 @@ def register(mcp, deps: dict):
                 task.update_progress("Vendedor asignado")
 
                 # PASO 3: Crear Lead
-                task.update_progress("Creando lead...")
+                task.update_progress("Creando lead...", stage="lead")
                 lead_values = {
                     "name": lead_name,
                     "partner_name": partner_name,
                     "contact_name": contact_name,
-                    "phone": phone,
+                    "phone": phone_normalizado,
                     "email_from": email_normalizado,
                     "type": "lead",
                     "partner_id": partner_id,
@@ -605,7 +507,9 @@ def register(mcp, deps: dict):
                 task.update_progress("Lead creado")
 
                 # PASO 4: Convertir a Oportunidad
-                task.update_progress("Convirtiendo a oportunidad...")
+                task.update_progress(
+                    "Convirtiendo a oportunidad...", stage="opportunity"
+                )
                 from datetime import datetime
 
                 conversion_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -623,7 +527,7 @@ def register(mcp, deps: dict):
                 task.update_progress("Oportunidad creada")
 
                 # PASO 5: Crear Sale Order
-                task.update_progress("Creando cotización...")
+                task.update_progress("Creando cotización...", stage="sale_order")
                 sale_values = {
                     "partner_id": partner_id,
                     "opportunity_id": lead_id,
@@ -669,7 +573,8 @@ def register(mcp, deps: dict):
                 # Agregar cada producto
                 for idx, product_data in enumerate(products_to_add, 1):
                     task.update_progress(
-                        f"Agregando producto {idx}/{len(products_to_add)}..."
+                        f"Agregando producto {idx}/{len(products_to_add)}...",
+                        stage="order_lines",
                     )
 
                     pid = product_data["product_id"]
@@ -745,10 +650,12 @@ def register(mcp, deps: dict):
                 )
 
                 # Enviar notificación SMS al vendedor
+                task.update_progress("Notificando al vendedor...", stage="notification")
                 notification_data = None
                 try:
                     from core.whatsapp import sms_client
                     from core.helpers import get_user_whatsapp_number
+                    from core.notifications import quotation_lead_data
                     from datetime import datetime
 
                     # Obtener el vendedor asignado al lead
@@ -766,45 +673,16 @@ def register(mcp, deps: dict):
                         if vendor_sms and ("X" in vendor_sms or "x" in vendor_sms):
                             vendor_sms = None
 
-                        # Preparar datos del lead para el mensaje
-                        # Obtener nombres de productos para el mensaje
-                        product_names = []
-                        for prod in products_added:
-                            try:
-                                prod_info = client.read(
-                                    "product.product", prod["product_id"], ["name"]
-                                )
-                                if prod_info:
-                                    product_names.append(
-                                        f"{prod_info['name']} (x{prod['qty']})"
-                                    )
-                            except:
-                                product_names.append(
-                                    f"Producto ID {prod['product_id']}"
-                                )
-
-                        lead_data_for_sms = {
-                            "sale_order_name": sale_order_name,
-                            "partner_name": partner_full_name,
-                            "ciudad": (
-                                ciudad if ciudad else "N/A"
-                            ),  # Usar parámetro primero
-                            "email": email,
-                            "products": (
-                                ", ".join(product_names) if product_names else "N/A"
-                            ),
-                        }
-
-                        # Si no se proporcionó ciudad, intentar obtenerla del partner
-                        if not ciudad:
-                            try:
-                                partner_data = client.read(
-                                    "res.partner", partner_id, ["city"]
-                                )
-                                if partner_data and partner_data.get("city"):
-                                    lead_data_for_sms["ciudad"] = partner_data["city"]
-                            except Exception as e:
-                                print(f"⚠️ No se pudo obtener ciudad del partner: {e}")
+                        # Preparar datos del lead para el mensaje: nombres de
+                        # producto y ciudad del partner en lecturas en bloque
+                        lead_data_for_sms = quotation_lead_data(
+                            client,
+                            sale_order_name,
+                            partner=[partner_id, partner_full_name],
+                            email=email,
+                            products=products_added,
+                            city=ciudad,  # Usar parámetro primero
+                        )
 
                         # Enviar WhatsApp (reutilizando sms_client como lo hace message_notification)
                         sms_result = sms_client.send_handoff_notification(
@@ -827,8 +705,9 @@ def register(mcp, deps: dict):
                                 "vendor_number": vendor_sms or "default",
                                 "status": "success",
                             }
-                            print(
-                                f"✅ WhatsApp de cotización enviado. SID: {sms_result.get('message_sid')}"
+                            log.info(
+                                "WhatsApp de cotización enviado. SID: %s",
+                                sms_result.get("message_sid"),
                             )
                         else:
                             notification_data = {
@@ -838,12 +717,13 @@ def register(mcp, deps: dict):
                                 "error": sms_result.get("message"),
                                 "vendor_id": vendor_id,
                             }
-                            print(
-                                f"⚠️ Error enviando WhatsApp de cotización: {sms_result.get('message')}"
+                            log.warning(
+                                "Error enviando WhatsApp de cotización: %s",
+                                sms_result.get("message"),
                             )
                     else:
-                        print(
-                            "⚠️ No se pudo determinar el vendedor para enviar WhatsApp"
+                        log.warning(
+                            "No se pudo determinar el vendedor para enviar WhatsApp"
                         )
                         notification_data = {
                             "sent": False,
@@ -853,7 +733,7 @@ def register(mcp, deps: dict):
                         }
 
                 except Exception as sms_error:
-                    print(f"❌ Error al enviar WhatsApp de cotización: {sms_error}")
+                    log.error("Error al enviar WhatsApp de cotización: %s", sms_error)
                     notification_data = {
                         "sent": False,
                         "method": "whatsapp",
@@ -903,17 +783,21 @@ def register(mcp, deps: dict):
                 }
 
                 # Log más detallado
-                print(f"❌ Error en cotización {tracking_id}:")
-                print(f"   Tipo: {error_details['error_type']}")
-                print(f"   Mensaje: {error_details['error_message']}")
+                log.error(
+                    "Error en cotización %s: %s: %s",
+                    tracking_id,
+                    error_details["error_type"],
+                    error_details["error_message"],
+                    extra={"tracking_id": tracking_id},
+                )
 
                 # Si es error HTML de Odoo
                 if error_msg.startswith("<!doctype html") or error_msg.startswith(
                     "<!DOCTYPE"
                 ):
                     error_msg = "Odoo server error (502/HTML response). Server may be down or overloaded."
-                    print(
-                        f"   ⚠️ Odoo devolvió HTML en lugar de XML-RPC - servidor caído o error 502"
+                    log.warning(
+                        "Odoo devolvió HTML en lugar de XML-RPC - servidor caído o error 502"
                     )
 
                 task.fail(error_msg)
@@ -955,17 +839,19 @@ Ciudad: {params.get('ciudad', 'N/A')}"""
                     )
 
                     if notification_result.get("status") == "success":
-                        print(
-                            f"📱 Notificación de error enviada. SID: {notification_result.get('message_sid')}"
+                        log.info(
+                            "Notificación de error enviada. SID: %s",
+                            notification_result.get("message_sid"),
                         )
                     else:
-                        print(
-                            f"⚠️ No se pudo enviar notificación de error: {notification_result.get('message')}"
+                        log.warning(
+                            "No se pudo enviar notificación de error: %s",
+                            notification_result.get("message"),
                         )
 
                 except Exception as notification_error:
-                    print(
-                        f"⚠️ Error al enviar notificación de fallo: {notification_error}"
+                    log.warning(
+                        "Error al enviar notificación de fallo: %s", notification_error
                     )
 
         # Lanzar thread
@@ -1058,6 +944,10 @@ Ciudad: {params.get('ciudad', 'N/A')}"""
             response["error"] = task.error
             response["success"] = False  # Para ElevenLabs
 
+        # Cascada de latencias por etapa y RPC (ver core/tracing.py)
+        if task.trace.root is not None:
+            response["trace"] = task.trace.waterfall()
+
         return response
 
     @mcp.tool(
@@ -1092,8 +982,9 @@ Ciudad: {params.get('ciudad', 'N/A')}"""
             unlink_other_quotations: Si es True y se linkea una cotización, desvincula las otras.
             products: Lista de productos para actualizar en la cotización.
                       Format: [{"product_id": int, "qty": float, "price": float}]
-            replace_products: Si es True (default), elimina las líneas existentes en la cotización
-                              antes de agregar las nuevas. Si es False, solo agrega.
+            replace_products: Si es True (default), la cotización queda con exactamente estos
+                              productos: actualiza las líneas del mismo producto, agrega las
+                              nuevas y elimina las demás (core.order_lines). Si es False, solo agrega.
             convert_to_opportunity: Si es True, convierte el lead a oportunidad si aún no lo es.
                                     Si se proporciona link_quotation_id, se fuerza a True automáticamente.
 
@@ -1211,42 +1102,19 @@ Ciudad: {params.get('ciudad', 'N/A')}"""
             sale_order_name = sale_order["name"]
 
             if products:
-                if replace_products:
-                    client.write("sale.order", sale_order_id, {"order_line": [(5, 0, 0)]})
-
-                for prod in products:
-                    pid = prod.get("product_id")
-                    qty = prod.get("qty", 1.0)
-                    price = prod.get("price", -1.0)
-
-                    line_values = {
-                        "order_id": sale_order_id,
-                        "product_id": pid,
-                        "product_uom_qty": qty,
-                    }
-
-                    if price > 0:
-                        line_values["price_unit"] = price
-                    else:
-                        try:
-                            product_data = client.read(
-                                "product.product", pid, ["list_price"]
-                            )
-                            if product_data:
-                                list_price = product_data.get("list_price", 0.0)
-                                line_values["price_unit"] = list_price
-                        except Exception as e:
-                            logs.append(f"Error fetching price for {pid}: {e}")
-
-                    line_id = client.create("sale.order.line", line_values)
-
-                    if price > 0:
-                        try:
-                            client.write("sale.order.line", line_id, {"price_unit": price})
-                        except Exception as e:
-                            logs.append(f"Error forcing price for line {line_id}: {e}")
-
-                products_updated = True
+                # Un solo write con el diff de líneas (actualizar/agregar/eliminar)
+                try:
+                    line_sync = sync_order_lines(
+                        client, sale_order_id, products, replace=replace_products
+                    )
+                    logs.append(
+                        f"Sale Order {sale_order_id} lines: {line_sync['added']} added, "
+                        f"{line_sync['updated']} updated, {line_sync['removed']} removed, "
+                        f"{line_sync['unchanged']} unchanged"
+                    )
+                    products_updated = True
+                except Exception as e:
+                    logs.append(f"Error updating lines of Sale Order {sale_order_id}: {e}")
         elif products:
             logs.append("No active sale order found for this lead to update products")
 
@@ -1263,3 +1131,107 @@ Ciudad: {params.get('ciudad', 'N/A')}"""
             "logs": logs,
         }
 
+    @mcp.tool(
+        name="dev_bulk_update_leads",
+        description="Actualiza muchos leads/oportunidades a la vez en el ambiente de DESARROLLO (p.ej. mover a una etapa o reasignar vendedor) por lista de ids o dominio. Por defecto es dry_run: solo cuenta y muestra ejemplos; con dry_run=False aplica un write por bloque.",
+    )
+    def dev_bulk_update_leads(
+        values: Dict[str, Any],
+        lead_ids: Optional[List[int]] = None,
+        domain: Optional[List[Any]] = None,
+        dry_run: bool = True,
+    ) -> dict:
+        """
+        Aplica los mismos valores a un conjunto de leads con un write por bloque
+        (LEAD_BULK_CHUNK_SIZE ids, default 200) en lugar de uno por registro.
+
+        Args:
+            values: Campos a escribir, p.ej. {"stage_id": 3} o {"user_id": 7}.
+                    Permitidos: stage_id, user_id, team_id, type, priority, tag_ids,
+                    date_deadline, lost_reason_id, active.
+            lead_ids: IDs de crm.lead a actualizar.
+            domain: Dominio de Odoo para seleccionar los leads, p.ej.
+                    [["user_id", "=", 7], ["create_date", ">=", "2026-10-12"]].
+                    Si se dan ids y dominio, se actualizan los ids que cumplan el dominio.
+                    Como en Odoo, los archivados solo entran si el dominio menciona active.
+            dry_run: Si es True (default), no escribe: devuelve cuántos leads se
+                     actualizarían y algunos ejemplos.
+
+        Returns:
+            Dict con count y, si se aplicó, el resultado de cada bloque
+            ({"ids": [primero, último], "count", "success", "error"?}).
+        """
+        if not values:
+            return {"error": "values is required", "success": False}
+        invalid = [field for field in values if field not in BULK_LEAD_FIELDS]
+        if invalid:
+            return {
+                "error": f"Fields not allowed in bulk update: {', '.join(invalid)}. "
+                f"Allowed: {', '.join(BULK_LEAD_FIELDS)}",
+                "success": False,
+            }
+        if lead_ids is None and not domain:
+            return {"error": "Provide lead_ids or domain", "success": False}
+
+        try:
+            search_domain = normalize(domain) if domain else []
+        except ValueError as e:
+            return {"error": str(e), "success": False}
+        if lead_ids is not None:
+            search_domain = [("id", "in", [int(i) for i in lead_ids])] + search_domain
+
+        # Selección en Odoo (no en el espejo): decide qué registros se escriben
+        client = mirror.live(get_odoo_client())
+        ids = client.execute_kw(
+            "crm.lead", "search", [search_domain], {"limit": BULK_MAX_RECORDS + 1, "order": "id"}
+        )
+        if len(ids) > BULK_MAX_RECORDS:
+            return {
+                "error": f"More than {BULK_MAX_RECORDS} leads match; narrow the selection "
+                "(LEAD_BULK_MAX_RECORDS)",
+                "success": False,
+            }
+
+        if dry_run:
+            sample = client.search_read(
+                "crm.lead", [("id", "in", ids[:10])], ["id", "name", "stage_id", "user_id"], 10
+            ) if ids else []
+            return {
+                "success": True,
+                "dry_run": True,
+                "count": len(ids),
+                "values": values,
+                "sample": sample,
+            }
+
+        chunks = []
+        updated = 0
+        for start in range(0, len(ids), BULK_CHUNK_SIZE):
+            chunk = ids[start:start + BULK_CHUNK_SIZE]
+            result = {"ids": [chunk[0], chunk[-1]], "count": len(chunk)}
+            try:
+                client.write_many("crm.lead", chunk, values)
+                result["success"] = True
+                updated += len(chunk)
+            except Exception as e:
+                log.error("Error en actualización masiva de leads %s-%s: %s", chunk[0], chunk[-1], e)
+                result["success"] = False
+                result["error"] = str(e)
+            chunks.append(result)
+
+        log.info("Actualización masiva: %d/%d leads con %s", updated, len(ids), values)
+        if updated:
+            # Agregados y espejo reflejan la escritura sin esperar su TTL/ciclo
+            analytics.clear_cache()
+            if mirror.ENABLED:
+                try:
+                    mirror.mirror_for(client).sync_model(client, "crm.lead")
+                except Exception as e:
+                    log.warning("No se pudo sincronizar crm.lead tras la actualización masiva: %s", e)
+        return {
+            "success": updated == len(ids),
+            "dry_run": False,
+            "count": len(ids),
+            "updated": updated,
+            "chunks": chunks,
+        }
@@ -0,0 +1,68 @@
+# tools/logs.py
+from typing import Optional, Dict, Any
+
+
+def register(mcp, deps: dict):
+    """
+    Registra las herramientas MCP de consulta de logs.
+    - query_logs: consulta el índice de eventos de cotizaciones y handoffs.
+    """
+
+    @mcp.tool(
+        name="query_logs",
+        description=(
+            "Consultar el historial de cotizaciones y handoffs SMS "
+            "(por tracking_id, vendedor, estado, fechas o texto del error)"
+        ),
+    )
+    def query_logs(
+        tracking_id: Optional[str] = None,
+        handoff_id: Optional[str] = None,
+        event: Optional[str] = None,
+        status: Optional[str] = None,
+        lead_id: Optional[int] = None,
+        sale_order_id: Optional[int] = None,
+        assigned_user_id: Optional[int] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        q: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        include_records: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Consulta eventos de log indexados, del más reciente al más antiguo.
+
+        Args:
+            tracking_id: ID de seguimiento de una cotización.
+            handoff_id: ID de un handoff SMS.
+            event: "quotation" o "sms_handoff".
+            status: Estado del evento (completed, failed, success, error...).
+            lead_id / sale_order_id: IDs de Odoo relacionados.
+            assigned_user_id: ID del vendedor asignado.
+            since / until: Rango ISO (p.ej. "2026-01-26", until exclusivo).
+            q: Texto a buscar en error, motivo, contexto y nombres.
+            cursor: `next_cursor` devuelto por la página anterior.
+            limit: Eventos por página (por defecto 20).
+            include_records: Incluir el evento completo (input/output).
+
+        Returns:
+            {"items": [...], "next_cursor": str | None}
+        """
+        from core.logger import quotation_logger
+
+        return quotation_logger.query_events(
+            include_records=include_records,
+            tracking_id=tracking_id,
+            handoff_id=handoff_id,
+            event=event,
+            status=status,
+            lead_id=lead_id,
+            sale_order_id=sale_order_id,
+            assigned_user_id=assigned_user_id,
+            since=since,
+            until=until,
+            text=q,
+            cursor=cursor,
+            limit=limit,
+        )
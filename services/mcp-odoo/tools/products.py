@@ -0,0 +1,146 @@
+# tools/products.py
+"""
+PRODUCCIÓN (Solo Lectura):
+- search_products: busca en el catálogo (product.product) por nombre, código o
+  categoría, con el precio de la tarifa de cotizaciones
+
+La búsqueda usa el índice difuso local (`core.text_index`) sobre el espejo
+del catálogo: sin acentos, tolera errores de dedo y responde en
+milisegundos. Si el espejo no está al día, busca con ilike en Odoo.
+
+Variables de entorno:
+    PRODUCT_PRICELIST_ID  Tarifa de la que sale `pricelist_price` (default: 82)
+"""
+
+from typing import Optional, List, Dict
+from pydantic import BaseModel
+import os
+
+from core import mirror, text_index
+from core.pagination import clamp_limit
+from core.text_index import fold
+
+PRICELIST_ID = int(os.getenv("PRODUCT_PRICELIST_ID", "82"))
+
+PRODUCT_FIELDS = ["id", "name", "default_code", "categ_id", "list_price"]
+
+
+class Product(BaseModel):
+    """Producto del catálogo (product.product) con su precio de tarifa."""
+
+    id: int
+    name: str
+    default_code: Optional[str] = None
+    category: Optional[str] = None
+    list_price: float = 0.0
+    pricelist_price: Optional[float] = None
+    score: Optional[float] = None
+
+
+def _pricelist_prices(odoo, product_ids: List[int]) -> Dict[int, float]:
+    """Precio fijo de PRICELIST_ID por producto (regla de menor cantidad mínima)."""
+    items = odoo.search_read(
+        "product.pricelist.item",
+        [("pricelist_id", "=", PRICELIST_ID), ("product_id", "in", product_ids)],
+        ["product_id", "fixed_price", "min_quantity"],
+        None,
+    )
+    prices: Dict[int, tuple] = {}
+    for item in items:
+        product = item.get("product_id")
+        if not product:
+            continue
+        key = (item.get("min_quantity") or 0.0, -item["id"])
+        current = prices.get(product[0])
+        if current is None or key < current[0]:
+            prices[product[0]] = (key, item.get("fixed_price") or 0.0)
+    return {product_id: price for product_id, (_, price) in prices.items()}
+
+
+def register(mcp, deps: dict):
+    """
+    Herramientas MCP del catálogo de productos.
+    - search_products: productos por nombre/código/categoría con precio de tarifa.
+    """
+    odoo = mirror.reader(deps["odoo"])
+    text_index.warm(deps["odoo"], ["product.product"])
+
+    @mcp.tool(
+        name="search_products",
+        description=(
+            "Buscar productos (product.product) por nombre, código interno o "
+            "categoría; tolera acentos y errores de dedo. Devuelve product_id, "
+            "precio de lista y precio de la tarifa de cotizaciones."
+        ),
+    )
+    def search_products(
+        query: str,
+        limit: int = 10,
+        category: Optional[str] = None,
+    ) -> Dict[str, List[dict]]:
+        """
+        Busca productos vendibles para armar una cotización.
+
+        Args:
+            query: Nombre, código interno (default_code) o categoría.
+            limit: Resultados máximos (por defecto 10).
+            category: Filtrar por nombre de categoría (ilike).
+
+        Returns:
+            {"items": [Product...]} del más al menos relevante; `score` es la
+            similitud (0..1) cuando la búsqueda usó el índice local.
+        """
+        limit = clamp_limit(limit)
+        domain = [("sale_ok", "=", True)]
+        if category:
+            domain.append(("categ_id", "ilike", category))
+
+        similarity: Dict[int, float] = {}
+        hits = None
+        if query:
+            hits = text_index.search(odoo, "product.product", query, limit * 3)
+        if hits is not None:
+            similarity = dict(hits)
+            if not similarity:
+                return {"items": []}
+            domain.append(("id", "in", list(similarity)))
+            rows = odoo.search_read(
+                "product.product", domain, PRODUCT_FIELDS, len(similarity)
+            )
+        else:
+            if query:
+                domain = [
+                    "|",
+                    "|",
+                    ("name", "ilike", query),
+                    ("default_code", "ilike", query),
+                    ("categ_id", "ilike", query),
+                ] + domain
+            rows = odoo.search_read("product.product", domain, PRODUCT_FIELDS, limit)
+
+        # Código exacto primero; luego similitud (orden de Odoo sin índice)
+        code = fold(query or "")
+        rows.sort(
+            key=lambda r: (
+                not code or fold(r.get("default_code") or "") != code,
+                -similarity.get(r["id"], 0.0),
+            )
+        )
+        rows = rows[:limit]
+
+        prices = _pricelist_prices(odoo, [r["id"] for r in rows]) if rows else {}
+        items = []
+        for r in rows:
+            categ = r.get("categ_id")
+            items.append(
+                Product(
+                    id=r["id"],
+                    name=r.get("name") or "",
+                    default_code=r.get("default_code") or None,
+                    category=categ[1] if isinstance(categ, list) else None,
+                    list_price=r.get("list_price") or 0.0,
+                    pricelist_price=prices.get(r["id"]),
+                    score=similarity.get(r["id"]),
+                ).model_dump()
+            )
+        return {"items": items}
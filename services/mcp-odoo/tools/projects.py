@@ -1,32 +1,43 @@
-from typing import Optional, List
+from typing import Optional, List, Any, Dict
 from pydantic import BaseModel
 
+from core import mirror
+from core.pagination import page_result, paginate, select_fields
+
 class Project(BaseModel):
     id: int
     name: str
     active: bool | None = True
 
+PROJECT_FIELDS = tuple(Project.model_fields)
+
 def register(mcp, deps: dict):
     """
     Registra las herramientas MCP relacionadas con Proyectos.
     - list_projects: lista proyectos con filtros opcionales.
     """
-    odoo = deps["odoo"]
+    odoo = mirror.reader(deps["odoo"])
 
     @mcp.tool(name="list_projects", description="Listar proyectos de Odoo con filtros opcionales")
     def list_projects(q: Optional[str] = None,
                       active: Optional[bool] = None,
-                      limit: int = 50) -> List[Project]:
+                      limit: int = 50,
+                      fields: Optional[List[str]] = None,
+                      cursor: Optional[str] = None,
+                   compact: bool = False) -> Dict[str, Any]:
         """
-        Lista proyectos (model: project.project).
+        Lista proyectos (model: project.project) por id.
 
         Args:
             q: Filtro por nombre (ilike).
             active: True/False para filtrar por estado activo; None = sin filtro.
-            limit: Límite de resultados (por defecto 50).
+            limit: Proyectos por página (por defecto 50).
+            fields: Campos a devolver (id, name, active); None = todos.
+            cursor: `next_cursor` de la página anterior.
+            compact: Respuesta columnar (columns/rows/refs) en lugar de items.
 
         Returns:
-            Lista de Project (id, name, active).
+            {"items": [Project...], "next_cursor": str | None}, o columnar si `compact`
         """
         domain = []
         if q:
@@ -34,10 +45,16 @@ def register(mcp, deps: dict):
         if active is not None:
             domain.append(["active", "=", bool(active)])
 
-        rows = odoo.search_read(
-            "project.project",
-            domain,
-            ["id", "name", "active"],
-            limit
-        )
-        return [Project(**row) for row in rows]
+        try:
+            selected = select_fields(fields, PROJECT_FIELDS)
+            rows, next_cursor = paginate(
+                odoo, "project.project", domain, selected, (("id", False),), limit, cursor
+            )
+        except ValueError as e:
+            return {"error": str(e)}
+        # name es obligatorio en el modelo aunque no se haya pedido
+        items = [
+            Project.model_validate({"name": "", **row}).model_dump(include=set(selected))
+            for row in rows
+        ]
+        return page_result(items, next_cursor, compact)
@@ -1,8 +1,9 @@
 # tools/sales.py
 """
 PRODUCCIÓN (Solo Lectura):
-- list_sales: lista órdenes de venta con filtros
+- list_sales: lista órdenes de venta con filtros (paginada por cursor)
 - get_sale: obtiene detalles de una orden específica
+- get_sales: detalle de varias órdenes con sus líneas (dos lecturas en total)
 
 DESARROLLO (Lectura y Escritura):
 - dev_create_sale: crea orden de venta en desarrollo
@@ -11,9 +12,13 @@ DESARROLLO (Lectura y Escritura):
 - dev_read_sale: lee orden desde desarrollo
 """
 from typing import Optional, List, Any, Dict
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, TypeAdapter, field_validator
 import os
 
+from core import mirror
+from core.odoo_client import OdooClient
+from core.pagination import page_result, paginate, select_fields
+
 
 class SaleOrder(BaseModel):
     """Modelo para órdenes de venta (sale.order)."""
@@ -33,6 +38,89 @@ class SaleOrder(BaseModel):
         return str(v)
 
 
+# Valida la lista completa en una sola llamada a pydantic-core
+_SALE_ORDER_LIST = TypeAdapter(List[SaleOrder])
+
+# Campos seleccionables en list_sales y orden estable para paginar
+SALE_ORDER_FIELDS = tuple(SaleOrder.model_fields)
+_SALE_ORDER_ORDER = (("date_order", True), ("id", True))
+
+# Detalle de get_sale/get_sales
+SALE_DETAIL_FIELDS = [
+    "id",
+    "name",
+    "partner_id",
+    "date_order",
+    "amount_total",
+    "amount_untaxed",
+    "amount_tax",
+    "state",
+    "user_id",
+    "payment_term_id",
+    "validity_date",
+    "note",
+]
+SALE_LINE_FIELDS = [
+    "id",
+    "product_id",
+    "name",
+    "product_uom_qty",
+    "price_unit",
+    "price_subtotal",
+]
+MAX_SALE_IDS = 50
+
+
+def _sale_document(r: Dict[str, Any]) -> Dict[str, Any]:
+    """Documento de get_sale a partir de una fila con SALE_DETAIL_FIELDS."""
+    doc = SaleOrder.model_validate(
+        {
+            "id": r["id"],
+            "name": r.get("name") or "",
+            "partner_id": r.get("partner_id"),
+            "date_order": r.get("date_order"),
+            "amount_total": r.get("amount_total", 0.0),
+            "state": r.get("state"),
+            "user_id": r.get("user_id"),
+        }
+    ).model_dump()
+
+    # Agregar campos adicionales
+    doc["amount_untaxed"] = r.get("amount_untaxed", 0.0)
+    doc["amount_tax"] = r.get("amount_tax", 0.0)
+    doc["payment_term_id"] = r.get("payment_term_id")
+    doc["validity_date"] = r.get("validity_date")
+    doc["note"] = r.get("note")
+    return doc
+
+
+def _product_names(odoo, lines: List[Dict[str, Any]]) -> Dict[int, str]:
+    """
+    Nombre de catálogo ("[código] nombre") de los productos de `lines`.
+
+    Sale del espejo de product.product cuando está al día (sin RPC); los
+    productos que no encuentre conservan el nombre que trae la línea.
+    """
+    product_ids = {
+        line["product_id"][0]
+        for line in lines
+        if isinstance(line.get("product_id"), list)
+    }
+    if not product_ids:
+        return {}
+    products = odoo.search_read(
+        "product.product",
+        [["id", "in", sorted(product_ids)]],
+        ["id", "name", "default_code"],
+        None,
+    )
+    names = {}
+    for p in products:
+        code = p.get("default_code")
+        names[p["id"]] = f"[{code}] {p['name']}" if code else p["name"]
+    return names
+
+
 class DevSaleOrder(BaseModel):
     """Modelo para órdenes creadas en desarrollo."""
 
@@ -42,46 +130,35 @@ class DevSaleOrder(BaseModel):
     environment: str = "development"
 
 
-class DevOdooSalesClient:
+class DevOdooSalesClient(OdooClient):
     """
     Cliente Odoo específico para el ambiente de DESARROLLO (ventas).
     Se conecta a: pegasuscontrol-dev18-25468489.dev.odoo.com
     """
 
     def __init__(self):
-        import xmlrpc.client
-
         # Configuración específica para DESARROLLO
-        self.url = os.environ.get(
-            "DEV_ODOO_URL", "https://pegasuscontrol-dev18-25468489.dev.odoo.com"
-        ).rstrip("/")
-        self.db = os.environ.get("DEV_ODOO_DB", "pegasuscontrol-dev18-25468489")
-        self.username = os.environ.get("DEV_ODOO_LOGIN")
-        self.password = os.environ.get("DEV_ODOO_API_KEY")
-
-        if not self.username or not self.password:
+        username = os.environ.get("DEV_ODOO_LOGIN")
+        password = os.environ.get("DEV_ODOO_API_KEY")
+
+        if not username or not password:
             raise ValueError(
                 "Faltan credenciales DEV_ODOO_LOGIN o DEV_ODOO_API_KEY en .env"
             )
 
-        # Conexión XML-RPC a desarrollo
-        self.common = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/common")
-        self.models = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/object")
-
-        # Autenticación
-        self.uid = self.common.authenticate(self.db, self.username, self.password, {})
+        # Conexión XML-RPC y autenticación (execute_kw instrumentado en OdooClient)
+        super().__init__(
+            url=os.environ.get(
+                "DEV_ODOO_URL", "https://pegasuscontrol-dev18-25468489.dev.odoo.com"
+            ),
+            db=os.environ.get("DEV_ODOO_DB", "pegasuscontrol-dev18-25468489"),
+            username=username,
+            password=password,
+        )
 
         if not self.uid:
             raise ValueError("No se pudo autenticar en el ambiente de desarrollo")
 
-    def execute_kw(self, model: str, method: str, args=None, kwargs=None):
-        """Ejecuta un método en el modelo especificado."""
-        args = args or []
-        kwargs = kwargs or {}
-        return self.models.execute_kw(
-            self.db, self.uid, self.password, model, method, args, kwargs
-        )
-
     def create(self, model: str, values: Dict[str, Any]) -> int:
         """Crea un nuevo registro en el modelo especificado."""
         return self.execute_kw(model, "create", [values])
@@ -104,13 +181,13 @@ def register(mcp, deps: dict):
     Registra las herramientas MCP para Órdenes de Venta.
 
     PRODUCCIÓN (Solo Lectura):
-    - list_sales, get_sale
+    - list_sales, get_sale, get_sales
 
     DESARROLLO (Lectura y Escritura):
     - dev_create_sale, dev_create_sale_line, dev_update_sale, dev_read_sale
     """
-    # Cliente de PRODUCCIÓN (solo lectura)
-    odoo = deps["odoo"]
+    # Cliente de PRODUCCIÓN (solo lectura, respaldado por el espejo local)
+    odoo = mirror.reader(deps["odoo"])
 
     # Cliente de DESARROLLO (lectura y escritura) - lazy loading
     dev_client = None
@@ -132,19 +209,27 @@ def register(mcp, deps: dict):
         state: Optional[str] = None,
         q: Optional[str] = None,
         limit: int = 50,
-    ) -> List[SaleOrder]:
+        fields: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        compact: bool = False,
+    ) -> Dict[str, Any]:
         """
-        Lista órdenes de venta desde Odoo.
+        Lista órdenes de venta desde Odoo, de la más reciente a la más antigua.
 
         Args:
             partner_id: Filtrar por cliente (res.partner id).
             user_id: Filtrar por vendedor (res.users id).
             state: Filtrar por estado ('draft', 'sent', 'sale', 'done', 'cancel').
             q: Búsqueda por nombre/referencia de la orden (ilike).
-            limit: Límite de resultados (por defecto 50).
+            limit: Órdenes por página (por defecto 50, máximo PAGINATION_MAX_LIMIT).
+            fields: Campos a devolver (id, name, partner_id, date_order,
+                amount_total, state, user_id); None = todos. `id` siempre se incluye.
+            cursor: `next_cursor` de la página anterior.
+            compact: Respuesta columnar (columns/rows/refs) en lugar de items.
 
         Returns:
-            Lista de SaleOrder (id, name, partner_id, date_order, amount_total, state, user_id).
+            {"items": [SaleOrder...], "next_cursor": str | None}, o
+            {"columns", "rows", "refs", "next_cursor"} si `compact`
         """
         domain = []
 
@@ -160,30 +245,32 @@ def register(mcp, deps: dict):
         if q:
             domain.append(["name", "ilike", q])
 
-        fields = [
-            "id",
-            "name",
-            "partner_id",
-            "date_order",
-            "amount_total",
-            "state",
-            "user_id",
-        ]
-        rows = odoo.search_read("sale.order", domain, fields, limit)
-
-        sales: List[SaleOrder] = []
-        for r in rows:
-            payload = {
-                "id": r["id"],
-                "name": r.get("name") or "",
-                "partner_id": r.get("partner_id"),
-                "date_order": r.get("date_order"),
-                "amount_total": r.get("amount_total", 0.0),
-                "state": r.get("state"),
-                "user_id": r.get("user_id"),
-            }
-            sales.append(SaleOrder.model_validate(payload))
-        return sales
+        try:
+            selected = select_fields(fields, SALE_ORDER_FIELDS)
+            rows, next_cursor = paginate(
+                odoo, "sale.order", domain, selected, _SALE_ORDER_ORDER, limit, cursor
+            )
+        except ValueError as e:
+            return {"error": str(e)}
+
+        orders = _SALE_ORDER_LIST.validate_python(
+            [
+                {
+                    "id": r["id"],
+                    "name": r.get("name") or "",
+                    "partner_id": r.get("partner_id"),
+                    "date_order": r.get("date_order"),
+                    "amount_total": r.get("amount_total", 0.0),
+                    "state": r.get("state"),
+                    "user_id": r.get("user_id"),
+                }
+                for r in rows
+            ]
+        )
+        items = _SALE_ORDER_LIST.dump_python(
+            orders, include={"__all__": set(selected)}
+        )
+        return page_result(items, next_cursor, compact)
 
     @mcp.tool(
         name="get_sale",
@@ -200,74 +287,123 @@ def register(mcp, deps: dict):
         Returns:
             Diccionario con los datos de la orden de venta.
         """
-        fields = [
-            "id",
-            "name",
-            "partner_id",
-            "date_order",
-            "amount_total",
-            "amount_untaxed",
-            "amount_tax",
-            "state",
-            "user_id",
-            "payment_term_id",
-            "validity_date",
-            "note",
-        ]
+        # live_if_empty: una orden recién creada puede no estar aún en el espejo
+        rows = odoo.search_read(
+            "sale.order",
+            [["id", "=", int(sale_id)]],
+            SALE_DETAIL_FIELDS,
+            1,
+            live_if_empty=True,
+        )
+
+        if not rows:
+            return {"error": f"Sale order {sale_id} not found"}
+
+        doc = _sale_document(rows[0])
 
+        # Si se solicitan las líneas de la orden (por order_id: el espejo no
+        # guarda el one2many order_line)
         if include_lines:
-            fields.append("order_line")
+            doc["order_lines"] = odoo.search_read(
+                "sale.order.line",
+                [["order_id", "=", int(sale_id)]],
+                SALE_LINE_FIELDS,
+                None,
+                live_if_empty=True,
+            )
 
-        rows = odoo.search_read("sale.order", [["id", "=", int(sale_id)]], fields, 1)
+        return doc
 
-        if not rows:
-            return {"error": f"Sale order {sale_id} not found"}
+    @mcp.tool(
+        name="get_sales",
+        description=(
+            "Obtener el detalle de varias órdenes de venta (p.ej. para comparar "
+            "cotizaciones) en una sola llamada, con sus líneas"
+        ),
+    )
+    def get_sales(
+        sale_ids: List[int],
+        include_lines: bool = True,
+        product_names: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Obtiene varias órdenes de venta: una lectura para las órdenes y otra
+        para todas sus líneas, unidas localmente.
+
+        Args:
+            sale_ids: IDs de las órdenes (máx. 50), en el orden deseado.
+            include_lines: Si True, incluye las líneas de cada orden.
+            product_names: Si True, `product_id` de cada línea trae el nombre
+                del catálogo ("[RB0002] BellaBot 2", del espejo); si False,
+                solo el id.
+
+        Returns:
+            {"sales": [orden...]} en el orden pedido; una orden inexistente
+            aparece como {"id": ..., "error": "..."}.
+        """
+        ids = list(dict.fromkeys(int(sale_id) for sale_id in sale_ids))
+        if len(ids) > MAX_SALE_IDS:
+            return {"error": f"Too many sale ids ({len(ids)}); max {MAX_SALE_IDS}."}
+        if not ids:
+            return {"sales": []}
+
+        rows = odoo.search_read(
+            "sale.order", [["id", "in", ids]], SALE_DETAIL_FIELDS, len(ids)
+        )
+        docs = {r["id"]: _sale_document(r) for r in rows}
+
+        # Las que el espejo aún no tiene (creadas hace segundos) se leen de
+        # Odoo, con sus líneas; las demás siguen saliendo del espejo
+        live = mirror.live(odoo)
+        live_ids = []
+        missing = [sale_id for sale_id in ids if sale_id not in docs]
+        if missing and live is not odoo:
+            rows = live.search_read(
+                "sale.order", [["id", "in", missing]], SALE_DETAIL_FIELDS, len(missing)
+            )
+            docs.update((r["id"], _sale_document(r)) for r in rows)
+            live_ids = [r["id"] for r in rows]
 
-        r = rows[0]
-
-        # Construir el documento de respuesta
-        doc = SaleOrder.model_validate(
-            {
-                "id": r["id"],
-                "name": r.get("name") or "",
-                "partner_id": r.get("partner_id"),
-                "date_order": r.get("date_order"),
-                "amount_total": r.get("amount_total", 0.0),
-                "state": r.get("state"),
-                "user_id": r.get("user_id"),
-            }
-        ).model_dump()
-
-        # Agregar campos adicionales
-        doc["amount_untaxed"] = r.get("amount_untaxed", 0.0)
-        doc["amount_tax"] = r.get("amount_tax", 0.0)
-        doc["payment_term_id"] = r.get("payment_term_id")
-        doc["validity_date"] = r.get("validity_date")
-        doc["note"] = r.get("note")
-
-        # Si se solicitan las líneas de la orden
-        if include_lines and r.get("order_line"):
-            line_ids = r["order_line"]
-            if isinstance(line_ids, list) and line_ids:
-                # Leer las líneas de la orden
+        if include_lines and docs:
+            for doc in docs.values():
+                doc["order_lines"] = []
+            line_fields = ["order_id", *SALE_LINE_FIELDS]
+            mirrored_ids = [sale_id for sale_id in docs if sale_id not in live_ids]
+            lines = []
+            if mirrored_ids:
                 lines = odoo.search_read(
                     "sale.order.line",
-                    [["id", "in", line_ids]],
-                    [
-                        "id",
-                        "product_id",
-                        "name",
-                        "product_uom_qty",
-                        "price_unit",
-                        "price_subtotal",
-                    ],
-                    len(line_ids),
+                    [["order_id", "in", mirrored_ids]],
+                    line_fields,
+                    None,
+                    live_if_empty=True,
                 )
-                doc["order_lines"] = lines
-            else:
-                doc["order_lines"] = []
+            if live_ids:
+                lines += live.search_read(
+                    "sale.order.line", [["order_id", "in", live_ids]], line_fields, None
+                )
+            names = _product_names(odoo, lines) if product_names else {}
+            for line in lines:
+                order = line.pop("order_id", None)
+                doc = docs.get(order[0] if isinstance(order, list) else order)
+                if doc is None:
+                    continue
+                product = line.get("product_id")
+                if isinstance(product, list):
+                    line["product_id"] = (
+                        [product[0], names.get(product[0], product[1])]
+                        if product_names
+                        else product[0]
+                    )
+                doc["order_lines"].append(line)
 
-        return doc
+        return {
+            "sales": [
+                docs.get(sale_id)
+                or {"id": sale_id, "error": f"Sale order {sale_id} not found"}
+                for sale_id in ids
+            ]
+        }
 
     # ═══════════════════════════════════════════════════════════════
     # HERRAMIENTAS DE DESARROLLO (Escritura en ambiente de desarrollo)
@@ -1,178 +1,239 @@
 """
 Search Tools
 ============
-Tools de búsqueda y recuperación de documentos (proyectos y tareas).
+Tools de búsqueda y recuperación de documentos (proyectos, tareas y los
+demás modelos de `core.search.SEARCHABLE`).
+
+`fetch_many` recupera varios documentos con un `search_read` por modelo
+(`id in [...]`): diez ids de proyectos y tareas son dos RPC.
 """
 
-from typing import Dict, Any, List
-from core import encode_content, odoo_form_url, wants_projects, wants_tasks
+from typing import Dict, Any, List, Optional, Tuple
+from core import encode_content, odoo_form_url
+from core import mirror, search, text_index
+
+MAX_FETCH_MANY = 50
+
+PROJECT_FIELDS = ["id", "name", "active"]
+TASK_FIELDS = [
+    "id",
+    "name",
+    "project_id",
+    "user_id",
+    "stage_id",
+    "date_deadline",
+    "description",
+]
+
+
+def _parse_doc_id(doc_id: str) -> Tuple[str, int]:
+    """
+    "<tipo>:<id>" → (tipo, id).
+
+    Raises:
+        ValueError: Si el formato, el id o el tipo no son válidos.
+    """
+    if ":" not in doc_id:
+        raise ValueError("Invalid id format. Use 'project:<id>' or 'task:<id>'.")
+    kind, raw_id = doc_id.split(":", 1)
+    try:
+        rid = int(raw_id)
+    except ValueError:
+        raise ValueError("Invalid numeric id.")
+    if kind not in ("project", "task") and kind not in search.SEARCHABLE:
+        raise ValueError(
+            f"Unknown kind '{kind}'. Use one of: {', '.join(search.SEARCHABLE)}."
+        )
+    return kind, rid
+
+
+def _fetch_spec(kind: str) -> Tuple[str, str, List[str]]:
+    """(modelo, etiqueta, campos a leer) de un tipo de documento."""
+    if kind == "project":
+        return "project.project", "Project", PROJECT_FIELDS
+    if kind == "task":
+        return "project.task", "Task", TASK_FIELDS
+    spec = search.SEARCHABLE[kind]
+    return spec.model, spec.label, ["id", spec.name_field, *spec.fetch_fields]
+
+
+def _document(kind: str, r: dict) -> Dict[str, Any]:
+    """Documento de `fetch` a partir del registro leído con `_fetch_spec`."""
+    rid = r["id"]
+
+    if kind == "project":
+        return {
+            "id": f"project:{rid}",
+            "title": f"Project · {r.get('name','(sin nombre)')}",
+            "text": r.get("name", ""),
+            "url": odoo_form_url("project.project", rid),
+            "metadata": {
+                "model": "project.project",
+                "active": r.get("active", True),
+            },
+        }
+
+    if kind == "task":
+        # project_id/user_id/stage_id suelen venir como [id, "Nombre"]
+        meta: Dict[str, Any] = {"model": "project.task"}
+        for key in ("project_id", "user_id", "stage_id"):
+            val = r.get(key)
+            if isinstance(val, list) and len(val) >= 1:
+                meta[key] = {"id": val[0], "name": val[1] if len(val) > 1 else None}
+            else:
+                meta[key] = val
+        meta["date_deadline"] = r.get("date_deadline")
+
+        return {
+            "id": f"task:{rid}",
+            "title": f"Task · {r.get('name','(sin nombre)')}",
+            "text": (r.get("description") or r.get("name") or "").strip(),
+            "url": odoo_form_url("project.task", rid),
+            "metadata": meta,
+        }
+
+    # Resto de modelos buscables: nombre + campos de fetch_fields
+    spec = search.SEARCHABLE[kind]
+    name = r.get(spec.name_field) or "(sin nombre)"
+    meta = {"model": spec.model}
+    for key in spec.fetch_fields:
+        val = r.get(key)
+        if isinstance(val, list) and len(val) == 2:
+            meta[key] = {"id": val[0], "name": val[1]}
+        else:
+            meta[key] = val
+
+    return {
+        "id": f"{kind}:{rid}",
+        "title": f"{spec.label} · {name}",
+        "text": name,
+        "url": odoo_form_url(spec.model, rid),
+        "metadata": meta,
+    }
 
 
 def register_search_tools(mcp, deps):
     """Registra los tools de búsqueda en MCP"""
+    odoo = mirror.reader(deps["odoo"])
+    text_index.warm(deps["odoo"])
 
     @mcp.tool(
         name="search",
-        description="Busca en Odoo proyectos y/o tareas según el query. Devuelve results[] con id/title/url.",
+        description=(
+            "Busca en Odoo proyectos, tareas, leads, ventas, productos y contactos según el "
+            "query (en paralelo, ordenados por relevancia). Devuelve results[] "
+            "con id/title/url."
+        ),
     )
-    def mcp_search(query: str, limit: int = 10) -> Dict[str, Any]:
+    def mcp_search(
+        query: str, limit: int = 10, models: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
-        Busca proyectos y/o tareas en Odoo.
+        Busca en los modelos registrados en `core.search.SEARCHABLE`.
 
         Args:
             query: cadena de búsqueda (ilike)
             limit: máximo de resultados total
+            models: tipos a buscar (project, task, lead, sale, product, partner); por
+                defecto los que mencione el query, o proyectos y tareas
 
         Returns (content array, type=text, JSON string):
-          {"results":[{"id":"project:1","title":"Project · X","url":"..."},
-                      {"id":"task:2","title":"Task · Y","url":"..."}]}
+          {"results":[{"id":"project:1","title":"Project · X","url":"...","score":3.9},
+                      {"id":"task:2","title":"Task · Y","url":"...","score":1.2}]}
         """
-        odoo = deps["odoo"]
-        want_p = wants_projects(query)
-        want_t = wants_tasks(query)
-
-        if not (want_p or want_t):
-            # Si no detecta, buscamos en ambos
-            want_p = want_t = True
-
-        # Dividimos el límite (p. ej. mitad y mitad) si se buscan ambos
-        lim_p = limit if want_p and not want_t else max(1, limit // 2) if want_p else 0
-        lim_t = limit if want_t and not want_p else max(1, limit // 2) if want_t else 0
-
-        results: List[Dict[str, Any]] = []
-
-        # Buscar proyectos
-        if want_p and lim_p:
-            domain = [["name", "ilike", query]] if query else []
-            rows = odoo.search_read(
-                "project.project", domain, ["id", "name", "active"], lim_p
-            )
-            for r in rows:
-                pid = int(r["id"])
-                results.append(
-                    {
-                        "id": f"project:{pid}",
-                        "title": f"Project · {r.get('name','(sin nombre)')}",
-                        "url": odoo_form_url("project.project", pid),
-                    }
-                )
-
-        # Buscar tareas
-        if want_t and lim_t:
-            domain = [["name", "ilike", query]] if query else []
-            rows = odoo.search_read(
-                "project.task",
-                domain,
-                ["id", "name", "project_id", "user_id", "stage_id", "date_deadline"],
-                lim_t,
-            )
-            for r in rows:
-                tid = int(r["id"])
-                results.append(
-                    {
-                        "id": f"task:{tid}",
-                        "title": f"Task · {r.get('name','(sin nombre)')}",
-                        "url": odoo_form_url("project.task", tid),
-                    }
-                )
-
+        try:
+            results = search.search(odoo, query, limit, models)
+        except ValueError as e:
+            return encode_content({"error": str(e)})
         return encode_content({"results": results})
 
     @mcp.tool(
         name="fetch",
-        description="Recupera el documento completo por id (project:<id> o task:<id>) con texto y metadatos.",
+        description="Recupera el documento completo por id (project:<id>, task:<id>, lead:<id>, sale:<id>, product:<id>, partner:<id>) con texto y metadatos.",
     )
     def mcp_fetch(doc_id: str) -> Dict[str, Any]:
         """
         Recupera detalles completos de un proyecto o tarea.
 
         Args:
-            doc_id: "project:<id>" o "task:<id>"
+            doc_id: "<tipo>:<id>" con un tipo de la tool search
 
         Returns (content array, type=text, JSON string):
           {"id":"task:123","title":"...","text":"...","url":"...","metadata":{...}}
         """
         odoo = deps["odoo"]
 
-        if ":" not in doc_id:
+        try:
+            kind, rid = _parse_doc_id(doc_id)
+        except ValueError as e:
+            return encode_content({"error": str(e)})
+
+        model, label, fields = _fetch_spec(kind)
+        rows = odoo.search_read(model, [["id", "=", rid]], fields, 1)
+        if not rows:
+            return encode_content({"error": f"{label} {rid} not found"})
+        return encode_content(_document(kind, rows[0]))
+
+    @mcp.tool(
+        name="fetch_many",
+        description=(
+            "Recupera varios documentos por id (los mismos de fetch) en una sola "
+            "llamada; devuelve documents[] en el mismo orden, con error por id."
+        ),
+    )
+    def mcp_fetch_many(doc_ids: List[str]) -> Dict[str, Any]:
+        """
+        Recupera varios documentos con una lectura por modelo.
+
+        Args:
+            doc_ids: ids "<tipo>:<id>" de la tool search (máx. 50)
+
+        Returns (content array, type=text, JSON string):
+          {"documents":[{"id":"task:123","title":"...",...},
+                        {"id":"lead:9","error":"Lead 9 not found"}]}
+        """
+        odoo = deps["odoo"]
+
+        if len(doc_ids) > MAX_FETCH_MANY:
             return encode_content(
-                {"error": "Invalid id format. Use 'project:<id>' or 'task:<id>'."}
+                {"error": f"Too many ids ({len(doc_ids)}); max {MAX_FETCH_MANY}."}
             )
 
-        kind, raw_id = doc_id.split(":", 1)
-        try:
-            rid = int(raw_id)
-        except ValueError:
-            return encode_content({"error": "Invalid numeric id."})
-
-        # Fetch proyecto
-        if kind == "project":
-            rows = odoo.search_read(
-                "project.project", [["id", "=", rid]], ["id", "name", "active"], 1
-            )
-            if not rows:
-                return encode_content({"error": f"Project {rid} not found"})
-
-            r = rows[0]
-            title = f"Project · {r.get('name','(sin nombre)')}"
-            text = r.get("name", "")
-            url = odoo_form_url("project.project", rid)
-
-            doc = {
-                "id": f"project:{rid}",
-                "title": title,
-                "text": text,
-                "url": url,
-                "metadata": {
-                    "model": "project.project",
-                    "active": r.get("active", True),
-                },
-            }
-            return encode_content(doc)
-
-        # Fetch tarea
-        if kind == "task":
-            rows = odoo.search_read(
-                "project.task",
-                [["id", "=", rid]],
-                [
-                    "id",
-                    "name",
-                    "project_id",
-                    "user_id",
-                    "stage_id",
-                    "date_deadline",
-                    "description",
-                ],
-                1,
-            )
-            if not rows:
-                return encode_content({"error": f"Task {rid} not found"})
-
-            r = rows[0]
-            title = f"Task · {r.get('name','(sin nombre)')}"
-            text = (r.get("description") or r.get("name") or "").strip()
-            url = odoo_form_url("project.task", rid)
-
-            # project_id/user_id/stage_id suelen venir como [id, "Nombre"]
-            meta: Dict[str, Any] = {"model": "project.task"}
-            for key in ("project_id", "user_id", "stage_id"):
-                val = r.get(key)
-                if isinstance(val, list) and len(val) >= 1:
-                    meta[key] = {"id": val[0], "name": val[1] if len(val) > 1 else None}
-                else:
-                    meta[key] = val
-            meta["date_deadline"] = r.get("date_deadline")
-
-            doc = {
-                "id": f"task:{rid}",
-                "title": title,
-                "text": text,
-                "url": url,
-                "metadata": meta,
-            }
-            return encode_content(doc)
-
-        return encode_content(
-            {"error": f"Unknown kind '{kind}'. Use 'project' or 'task'."}
-        )
+        # Agrupar por tipo: un search_read por modelo con todos sus ids
+        parsed: Dict[str, Any] = {}
+        wanted: Dict[str, List[int]] = {}
+        for doc_id in doc_ids:
+            try:
+                kind, rid = parsed[doc_id] = _parse_doc_id(doc_id)
+            except ValueError as e:
+                parsed[doc_id] = e
+                continue
+            ids = wanted.setdefault(kind, [])
+            if rid not in ids:
+                ids.append(rid)
+
+        found: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        failed: Dict[str, str] = {}
+        for kind, ids in wanted.items():
+            model, label, fields = _fetch_spec(kind)
+            try:
+                rows = odoo.search_read(model, [["id", "in", ids]], fields, len(ids))
+            except Exception as e:
+                failed[kind] = f"Error reading {model}: {e}"
+                continue
+            for r in rows:
+                found[(kind, r["id"])] = _document(kind, r)
+
+        documents = []
+        for doc_id in doc_ids:
+            key = parsed[doc_id]
+            if isinstance(key, ValueError):
+                documents.append({"id": doc_id, "error": str(key)})
+            elif key in found:
+                documents.append(found[key])
+            elif key[0] in failed:
+                documents.append({"id": doc_id, "error": failed[key[0]]})
+            else:
+                label = _fetch_spec(key[0])[1]
+                documents.append({"id": doc_id, "error": f"{label} {key[1]} not found"})
+        return encode_content({"documents": documents})
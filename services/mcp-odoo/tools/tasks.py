@@ -1,6 +1,9 @@
 # tools/tasks.py
 from typing import Optional, List, Any, Dict
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, TypeAdapter, field_validator
+
+from core import mirror, text_index
+from core.pagination import page_result, paginate, rank_page, select_fields
 
 class Task(BaseModel):
     id: int
@@ -16,19 +19,34 @@ class Task(BaseModel):
             return None
         return str(v)
 
+# Valida la lista completa en una sola llamada a pydantic-core
+_TASK_LIST = TypeAdapter(List[Task])
+
+# Coincidencias difusas máximas que filtra list_tasks(q=...)
+MAX_FUZZY_MATCHES = 500
+
+# Campos seleccionables en list_tasks (`assignees` sale de user_id/user_ids)
+TASK_FIELDS = tuple(Task.model_fields)
+
 def register(mcp, deps: dict):
     """
     Herramientas MCP para Tareas (project.task).
     - list_tasks: permite filtrar por id de proyecto, usuario, etapa o nombre de usuario.
     - get_task: obtiene detalles de una tarea por id.
     """
-    odoo = deps["odoo"]
+    odoo = mirror.reader(deps["odoo"])
+    text_index.warm(deps["odoo"], ["project.task"])
+    user_field_info: Dict[str, str] = {}
 
     def _detect_user_field() -> Dict[str, str]:
-        fields = odoo.execute_kw("project.task", "fields_get", [], {"attributes": ["type"]})
-        if "user_id" in fields:
-            return {"field": "user_id", "mode": "single"}
-        return {"field": "user_ids", "mode": "multi"}
+        # El esquema no cambia en caliente: un solo fields_get por proceso
+        if not user_field_info:
+            fields = odoo.execute_kw("project.task", "fields_get", [], {"attributes": ["type"]})
+            if "user_id" in fields:
+                user_field_info.update(field="user_id", mode="single")
+            else:
+                user_field_info.update(field="user_ids", mode="multi")
+        return user_field_info
 
     def _assignees_from_row(row: Dict[str, Any], user_field: str) -> List[Any]:
         val = row.get(user_field)
@@ -51,7 +69,27 @@ def register(mcp, deps: dict):
                    assigned_to_name: Optional[str] = None,
                    stage_id: Optional[int] = None,
                    q: Optional[str] = None,
-                   limit: int = 50) -> List[Task]:
+                   limit: int = 50,
+                   fields: Optional[List[str]] = None,
+                   cursor: Optional[str] = None,
+                   compact: bool = False) -> Dict[str, Any]:
+        """
+        Lista tareas, de la más reciente a la más antigua (con `q` y el índice
+        local, de la más a la menos relevante).
+
+        Args:
+            q: Búsqueda difusa (sin acentos, tolera errores de dedo) en nombre,
+                proyecto, asignados y descripción; sin índice local, ilike por nombre.
+            limit: Tareas por página (por defecto 50).
+            fields: Campos a devolver (id, name, project_id, assignees,
+                stage_id, date_deadline); None = todos.
+            cursor: `next_cursor` de la página anterior.
+            compact: Respuesta columnar (columns/rows/refs) en lugar de items;
+                los asignados quedan como lista de ids.
+
+        Returns:
+            {"items": [Task...], "next_cursor": str | None}, o columnar si `compact`
+        """
         user_info = _detect_user_field()
         user_field = user_info["field"]
         is_single = user_info["mode"] == "single"
@@ -75,15 +113,33 @@ def register(mcp, deps: dict):
 
         if stage_id:
             domain.append(["stage_id", "=", int(stage_id)])
+        scores = None
         if q:
-            domain.append(["name", "ilike", q])
-
-        fields = ["id", "name", "project_id", "stage_id", "date_deadline", user_field]
-        rows = odoo.search_read("project.task", domain, fields, limit)
-
-        tasks: List[Task] = []
-        for r in rows:
-            payload = {
+            hits = text_index.search(odoo, "project.task", q, MAX_FUZZY_MATCHES)
+            if hits is None:
+                domain.append(["name", "ilike", q])
+            else:
+                scores = dict(hits)
+                domain.append(["id", "in", list(scores)])
+
+        try:
+            selected = select_fields(fields, TASK_FIELDS)
+            read_fields = [user_field if f == "assignees" else f for f in selected]
+            if scores is None:
+                rows, next_cursor = paginate(
+                    odoo, "project.task", domain, read_fields, (("id", True),), limit, cursor
+                )
+            else:
+                # Con el índice: por relevancia (las coincidencias ya están acotadas)
+                rows = []
+                if scores:
+                    rows = odoo.search_read("project.task", domain, read_fields, len(scores))
+                rows, next_cursor = rank_page("project.task", rows, scores, limit, cursor)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        tasks = _TASK_LIST.validate_python([
+            {
                 "id": r["id"],
                 "name": r.get("name") or "",
                 "project_id": r.get("project_id"),
@@ -91,8 +147,10 @@ def register(mcp, deps: dict):
                 "date_deadline": r.get("date_deadline"),
                 "assignees": _assignees_from_row(r, user_field),
             }
-            tasks.append(Task.model_validate(payload))
-        return tasks
+            for r in rows
+        ])
+        items = _TASK_LIST.dump_python(tasks, include={"__all__": set(selected)})
+        return page_result(items, next_cursor, compact)
 
     @mcp.tool(
         name="get_task",
@@ -106,7 +164,9 @@ def register(mcp, deps: dict):
         if include_description:
             fields.append("description")
 
-        rows = odoo.search_read("project.task", [["id", "=", int(task_id)]], fields, 1)
+        rows = odoo.search_read(
+            "project.task", [["id", "=", int(task_id)]], fields, 1, live_if_empty=True
+        )
         if not rows:
             return {"error": f"Task {task_id} not found"}
         r = rows[0]
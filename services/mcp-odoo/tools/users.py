@@ -1,34 +1,45 @@
 # tools/users.py
-from typing import Optional, List
+from typing import Optional, List, Any, Dict
 from pydantic import BaseModel
 
+from core import mirror
+from core.pagination import page_result, paginate, select_fields
+
 class User(BaseModel):
     id: int
     name: str
     login: str | None = None
     active: bool | None = True
 
+USER_FIELDS = tuple(User.model_fields)
+
 def register(mcp, deps: dict):
     """
     Registra las herramientas MCP relacionadas con Usuarios.
     - list_users: lista usuarios con filtros opcionales.
     """
-    odoo = deps["odoo"]
+    odoo = mirror.reader(deps["odoo"])
 
     @mcp.tool(name="list_users", description="Listar usuarios de Odoo con filtros opcionales")
     def list_users(q: Optional[str] = None,
                    active: Optional[bool] = None,
-                   limit: int = 50) -> List[User]:
+                   limit: int = 50,
+                   fields: Optional[List[str]] = None,
+                   cursor: Optional[str] = None,
+                   compact: bool = False) -> Dict[str, Any]:
         """
-        Lista usuarios (model: res.users).
+        Lista usuarios (model: res.users) por id.
 
         Args:
             q: Filtro por nombre (ilike).
             active: True/False para filtrar por estado activo; None = sin filtro.
-            limit: Límite de resultados (por defecto 50).
+            limit: Usuarios por página (por defecto 50).
+            fields: Campos a devolver (id, name, login, active); None = todos.
+            cursor: `next_cursor` de la página anterior.
+            compact: Respuesta columnar (columns/rows/refs) en lugar de items.
 
         Returns:
-            Lista de User (id, name, login, active).
+            {"items": [User...], "next_cursor": str | None}, o columnar si `compact`
         """
         domain = []
         if q:
@@ -36,10 +47,16 @@ def register(mcp, deps: dict):
         if active is not None:
             domain.append(["active", "=", bool(active)])
 
-        rows = odoo.search_read(
-            "res.users",
-            domain,
-            ["id", "name", "login", "active"],
-            limit
-        )
-        return [User(**row) for row in rows]
+        try:
+            selected = select_fields(fields, USER_FIELDS)
+            rows, next_cursor = paginate(
+                odoo, "res.users", domain, selected, (("id", False),), limit, cursor
+            )
+        except ValueError as e:
+            return {"error": str(e)}
+        # name es obligatorio en el modelo aunque no se haya pedido
+        items = [
+            User.model_validate({"name": "", **row}).model_dump(include=set(selected))
+            for row in rows
+        ]
+        return page_result(items, next_cursor, compact)
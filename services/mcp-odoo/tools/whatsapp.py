@@ -8,9 +8,14 @@ from pydantic import BaseModel
 from datetime import datetime
 import uuid
 
+from core import mirror
 from core.whatsapp import sms_client
 from core.helpers import get_user_whatsapp_number
+from core.notifications import quotation_lead_data
 from core.logger import quotation_logger
+from core.log import get_logger
+
+log = get_logger(__name__)
 
 
 class HandoffResult(BaseModel):
@@ -48,17 +53,20 @@ def register(mcp, deps: dict):
         return dev_client
 
     def get_odoo_client():
-        """Retorna el cliente de Odoo según el ambiente configurado."""
+        """
+        Retorna el cliente de Odoo según el ambiente configurado, respaldado
+        por el espejo local para lecturas.
+        """
         import os
 
         environment = os.getenv("ODOO_ENVIRONMENT", "dev").lower()
-        print(f"[MCP Tool] 🌍 Ambiente detectado: {environment}")
+        log.debug("Ambiente detectado: %s", environment)
         if environment == "prod":
-            print(f"[MCP Tool] 📊 Usando cliente de PRODUCCIÓN")
-            return prod_client
+            log.debug("Usando cliente de PRODUCCIÓN")
+            return mirror.reader(prod_client)
         else:
-            print(f"[MCP Tool] 🔧 Usando cliente de DESARROLLO")
-            return get_dev_client()
+            log.debug("Usando cliente de DESARROLLO")
+            return mirror.reader(get_dev_client())
 
     @mcp.tool(
         name="message_notification",
@@ -97,14 +105,14 @@ def register(mcp, deps: dict):
             ValueError: Si el servicio de SMS no está configurado
             Exception: Si hay error al enviar el mensaje
         """
-        print(f"[MCP Tool] sms_handoff llamado para {user_phone} - {reason}")
+        log.info("sms_handoff llamado para %s - %s", user_phone, reason)
 
         # Verificar configuración
         if not sms_client.is_configured():
             error_msg = (
                 "SMS service not configured. Check TWILIO_* environment variables."
             )
-            print(f"[MCP Tool] ❌ {error_msg}")
+            log.error("%s", error_msg)
             raise ValueError(error_msg)
 
         # Determinar el vendedor a quien enviar
@@ -115,59 +123,49 @@ def register(mcp, deps: dict):
 
         # Caso 1: Hay lead_id, obtener el vendedor del lead
         if lead_id:
-            print(f"[MCP Tool] 📋 Lead ID proporcionado: {lead_id}")
+            log.info("Lead ID proporcionado: %s", lead_id)
             try:
                 lead = client.read("crm.lead", lead_id, ["user_id"])
                 if lead and lead.get("user_id"):
                     # El lead tiene vendedor asignado, usar ese
                     assigned_user_id = lead["user_id"][0]
-                    print(
-                        f"[MCP Tool] ✅ Vendedor ya asignado en lead: {assigned_user_id}"
-                    )
+                    log.info("Vendedor ya asignado en lead: %s", assigned_user_id)
                 else:
                     # El lead NO tiene vendedor, aplicar lógica de balanceo
-                    print(
-                        f"[MCP Tool] ⚠️  Lead sin vendedor asignado, aplicando lógica de balanceo..."
+                    log.warning(
+                        "Lead sin vendedor asignado, aplicando lógica de balanceo..."
                     )
             except Exception as e:
-                print(f"[MCP Tool] ⚠️  Error leyendo lead: {e}")
+                log.warning("Error leyendo lead: %s", e)
 
         # Caso 2: Hay sale_order_id, obtener el vendedor de la orden
         elif sale_order_id:
-            print(f"[MCP Tool] 📋 Sale Order ID proporcionado: {sale_order_id}")
+            log.info("Sale Order ID proporcionado: %s", sale_order_id)
             try:
                 order = client.read("sale.order", sale_order_id, ["user_id"])
                 if order and order.get("user_id"):
                     # La orden tiene vendedor asignado, usar ese
                     assigned_user_id = order["user_id"][0]
-                    print(
-                        f"[MCP Tool] ✅ Vendedor ya asignado en orden: {assigned_user_id}"
-                    )
+                    log.info("Vendedor ya asignado en orden: %s", assigned_user_id)
                 else:
                     # La orden NO tiene vendedor, aplicar lógica de balanceo
-                    print(
-                        f"[MCP Tool] ⚠️  Orden sin vendedor asignado, aplicando lógica de balanceo..."
+                    log.warning(
+                        "Orden sin vendedor asignado, aplicando lógica de balanceo..."
                     )
             except Exception as e:
-                print(f"[MCP Tool] ⚠️  Error leyendo orden: {e}")
+                log.warning("Error leyendo orden: %s", e)
 
         # Caso 3: No hay vendedor asignado todavía, usar lógica de "vendedor con menos leads"
         if not assigned_user_id:
-            print(
-                f"[MCP Tool] 🔍 Aplicando lógica de balanceo (vendedor con menos leads)..."
-            )
+            log.info("Aplicando lógica de balanceo (vendedor con menos leads)...")
             try:
                 assigned_user_id = client.get_salesperson_with_least_opportunities()
                 if assigned_user_id:
-                    print(
-                        f"[MCP Tool] ✅ Vendedor seleccionado por balanceo: {assigned_user_id}"
-                    )
+                    log.info("Vendedor seleccionado por balanceo: %s", assigned_user_id)
                 else:
-                    print(
-                        f"[MCP Tool] ⚠️  No se encontró vendedor disponible en el equipo"
-                    )
+                    log.warning("No se encontró vendedor disponible en el equipo")
             except Exception as e:
-                print(f"[MCP Tool] ❌ Error en lógica de balanceo: {e}")
+                log.error("Error en lógica de balanceo: %s", e)
 
         # Obtener el número SMS del vendedor
         vendor_sms = None
@@ -178,88 +176,54 @@ def register(mcp, deps: dict):
                 vendor_sms = vendor_sms.replace("whatsapp:", "")
             # Validar que el número no tenga 'X' (número oculto por privacidad en dev)
             if vendor_sms and ("X" in vendor_sms or "x" in vendor_sms):
-                print(f"[MCP Tool] ⚠️  Número del vendedor oculto por privacidad")
+                log.warning("Número del vendedor oculto por privacidad")
                 vendor_sms = None
 
         # Si no se pudo obtener número del vendedor, es un error
         if not vendor_sms:
             error_msg = f"No se pudo obtener número válido del vendedor (ID: {assigned_user_id})"
-            print(f"[MCP Tool] ❌ {error_msg}")
+            log.error("%s", error_msg)
             raise ValueError(error_msg)
 
         # Si hay lead_id, intentar obtener datos de la cotización para el mensaje
         lead_data = None
         if lead_id:
             try:
-                print(
-                    f"[MCP Tool] 📋 Obteniendo datos de cotización del lead {lead_id}..."
-                )
-                # Leer datos del lead y orden de venta asociada
-                lead_info = client.search_read(
-                    "crm.lead",
-                    [["id", "=", lead_id]],
-                    ["name", "partner_id", "email_from", "order_ids"],
-                    limit=1,
+                log.info("Obteniendo datos de cotización del lead %s...", lead_id)
+                # Leer datos del lead y su orden de venta más reciente (por
+                # opportunity_id; lead y orden suelen ser de hace segundos, por
+                # eso se confirma en Odoo si el espejo no los tiene)
+                lead_info = client.read(
+                    "crm.lead", lead_id, ["name", "partner_id", "email_from"]
                 )
+                orders = []
+                if lead_info:
+                    orders = client.search_read(
+                        "sale.order",
+                        [["opportunity_id", "=", lead_id]],
+                        ["name", "partner_id"],
+                        1,
+                        live_if_empty=True,
+                    )
 
-                if lead_info and lead_info[0].get("order_ids"):
-                    order_ids = lead_info[0]["order_ids"]
-                    if order_ids:
-                        # Obtener la orden de venta
-                        order_info = client.read(
-                            "sale.order",
-                            order_ids[0],
-                            ["name", "partner_id", "order_line"],
-                        )
-
-                        if order_info:
-                            # Obtener productos de la orden
-                            order_lines = order_info.get("order_line", [])
-                            product_names = []
-
-                            if order_lines:
-                                for line_id in order_lines:
-                                    try:
-                                        line_info = client.read(
-                                            "sale.order.line",
-                                            line_id,
-                                            ["product_id", "product_uom_qty"],
-                                        )
-                                        if line_info and line_info.get("product_id"):
-                                            prod_name = line_info["product_id"][1]
-                                            prod_qty = line_info.get(
-                                                "product_uom_qty", 1
-                                            )
-                                            product_names.append(
-                                                f"{prod_name} (x{prod_qty})"
-                                            )
-                                    except Exception as e:
-                                        print(
-                                            f"[MCP Tool] ⚠️  Error leyendo línea de orden: {e}"
-                                        )
-
-                            # Preparar lead_data para el mensaje
-                            partner_name = (
-                                order_info.get("partner_id", [False, "N/A"])[1]
-                                if order_info.get("partner_id")
-                                else "N/A"
-                            )
-
-                            lead_data = {
-                                "sale_order_name": order_info.get("name", "N/A"),
-                                "partner_name": partner_name,
-                                "ciudad": "N/A",
-                                "email": lead_info[0].get("email_from", "N/A"),
-                                "products": (
-                                    ", ".join(product_names) if product_names else "N/A"
-                                ),
-                            }
-                            print(
-                                f"[MCP Tool] ✅ Datos de cotización obtenidos: {order_info.get('name')}"
-                            )
+                if orders:
+                    order_info = orders[0]
+
+                    # Líneas, nombres de producto y ciudad en lecturas en bloque
+                    lead_data = quotation_lead_data(
+                        client,
+                        order_info.get("name"),
+                        partner=order_info.get("partner_id"),
+                        email=lead_info.get("email_from"),
+                        order_id=order_info["id"],
+                    )
+                    log.info(
+                        "Datos de cotización obtenidos: %s",
+                        order_info.get("name"),
+                    )
 
             except Exception as e:
-                print(f"[MCP Tool] ⚠️  Error obteniendo datos de cotización: {e}")
+                log.warning("Error obteniendo datos de cotización: %s", e)
                 # Continuar sin lead_data
 
         # Enviar notificación
@@ -277,7 +241,7 @@ def register(mcp, deps: dict):
         # Verificar resultado
         if result["status"] == "error":
             error_msg = f"Failed to send SMS: {result['message']}"
-            print(f"[MCP Tool] ❌ {error_msg}")
+            log.error("%s", error_msg)
 
             # Log error handoff
             try:
@@ -300,13 +264,11 @@ def register(mcp, deps: dict):
                     error=result.get("message"),
                 )
             except Exception as log_err:
-                print(f"[MCP Tool] ⚠️  Error logging failed handoff: {log_err}")
+                log.warning("Error logging failed handoff: %s", log_err)
 
             raise Exception(error_msg)
 
-        print(
-            f"[MCP Tool] ✅ SMS handoff sent successfully. SID: {result.get('message_sid')}"
-        )
+        log.info("SMS handoff sent successfully. SID: %s", result.get("message_sid"))
 
         # Log successful handoff
         try:
@@ -327,9 +289,9 @@ def register(mcp, deps: dict):
                 message_sid=result.get("message_sid"),
                 status="success",
             )
-            print(f"[MCP Tool] 📝 Handoff logged to: {log_path}")
+            log.info("Handoff logged to: %s", log_path)
         except Exception as log_err:
-            print(f"[MCP Tool] ⚠️  Error logging successful handoff: {log_err}")
+            log.warning("Error logging successful handoff: %s", log_err)
 
         return HandoffResult(
             status="success",
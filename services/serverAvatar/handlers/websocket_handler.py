@@ -8,7 +8,9 @@ import asyncio
 from aiohttp import web
 
 from services import HeyGenService, ElevenLabsService
-from utils import Logger
+from utils import get_logger
+
+log = get_logger(__name__)
 
 
 class WebSocketHandler:
@@ -34,21 +36,21 @@ class WebSocketHandler:
         ws_client = web.WebSocketResponse()
         await ws_client.prepare(request)
 
-        Logger.avatar("Cliente conectado")
+        log.info("Cliente conectado")
 
         avatar_session = None
 
         try:
             # 1. Crear avatar de streaming
-            Logger.video("Creando Streaming Avatar...")
+            log.info("Creando Streaming Avatar...")
 
             try:
                 avatar_data = await self.heygen.create_streaming_avatar()
                 avatar_session = avatar_data["session_id"]
-                Logger.success(f"Avatar creado: {avatar_session}")
+                log.info("Avatar creado: %s", avatar_session)
             except Exception as e:
                 error_msg = f"Error al crear avatar: {str(e)}"
-                Logger.error(error_msg)
+                log.error("%s", error_msg)
                 await ws_client.send_json(
                     {"type": "error", "message": error_msg, "step": "create_avatar"}
                 )
@@ -64,50 +66,50 @@ class WebSocketHandler:
                     "access_token": avatar_data["access_token"],
                 }
             )
-            Logger.success("Avatar enviado al cliente (LiveKit)")
+            log.info("Avatar enviado al cliente (LiveKit)")
 
             # 3. Esperar confirmación del cliente
-            Logger.info("⏳ Esperando confirmación del cliente...")
+            log.info("Esperando confirmación del cliente...")
 
             try:
                 client_ready_msg = await asyncio.wait_for(
                     ws_client.receive_json(), timeout=30.0
                 )
-                Logger.info(f"📨 Mensaje recibido del cliente: {client_ready_msg}")
+                log.debug("Mensaje recibido del cliente: %s", client_ready_msg)
             except asyncio.TimeoutError:
-                Logger.error("⏱️ Timeout esperando confirmación del cliente (30s)")
+                log.error("Timeout esperando confirmación del cliente (30s)")
                 await ws_client.close()
                 return ws_client
 
             if client_ready_msg.get("type") == "client_ready":
-                Logger.success("✅ Cliente confirmó LiveKit conectado")
+                log.info("Cliente confirmó LiveKit conectado")
 
                 # 4. Iniciar sesión del avatar
-                Logger.avatar("🎬 Iniciando sesión del avatar...")
+                log.info("Iniciando sesión del avatar...")
                 start_result = await self.heygen.start_session(avatar_session)
-                Logger.info(f"📊 Resultado start_session: {start_result}")
+                log.debug("Resultado start_session: %s", start_result)
 
                 # Esperar a que el avatar se active
-                Logger.info("⏳ Esperando 2s a que avatar se active...")
+                log.debug("Esperando 2s a que avatar se active...")
                 await asyncio.sleep(2)
 
                 # 5. Enviar mensaje de bienvenida
-                Logger.avatar("💬 Enviando mensaje de bienvenida...")
+                log.debug("Enviando mensaje de bienvenida...")
                 welcome_result = await self.heygen.send_task(
                     session_id=avatar_session,
                     text="¡Hola! Estoy listo para ayudarte.",
                     task_type="repeat",
                 )
 
-                Logger.info(f"📊 Resultado bienvenida: {welcome_result}")
+                log.debug("Resultado bienvenida: %s", welcome_result)
 
                 if welcome_result and welcome_result.get("code") == 100:
-                    Logger.success("✅ Avatar hablando bienvenida")
+                    log.info("Avatar hablando bienvenida")
                 else:
-                    Logger.warning(f"⚠️ Error en bienvenida: {welcome_result}")
+                    log.warning("Error en bienvenida: %s", welcome_result)
 
             # 6. Conectar a ElevenLabs y establecer relay
-            Logger.ai("Conectando a ElevenLabs...")
+            log.info("Conectando a ElevenLabs...")
             await ws_client.send_json({"type": "elevenlabs_connected"})
 
             closed = asyncio.Event()
@@ -115,16 +117,16 @@ class WebSocketHandler:
             # Callbacks para procesar respuestas de ElevenLabs
             async def on_agent_response(text: str):
                 """Cuando la IA responde, enviar al avatar"""
-                Logger.avatar(f"Enviando a avatar: '{text[:50]}...'")
+                log.debug("Enviando a avatar: %.50r", text)
 
                 repeat_result = await self.heygen.send_task(
                     session_id=avatar_session, text=text, task_type="repeat"
                 )
 
                 if repeat_result and repeat_result.get("code") == 100:
-                    Logger.audio("Avatar sincronizando labios...")
+                    log.debug("Avatar sincronizando labios...")
                 else:
-                    Logger.error(f"Error en repeat: {repeat_result}")
+                    log.error("Error en repeat: %s", repeat_result)
 
                 # Enviar transcripción al cliente
                 await ws_client.send_json({"type": "agent_response", "text": text})
@@ -138,22 +140,19 @@ class WebSocketHandler:
                 ws_client, on_agent_response, on_user_transcript, closed
             )
 
-            Logger.info("Conversación terminada")
+            log.info("Conversación terminada")
 
         except Exception as e:
-            Logger.error(f"Error: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.error("Error: %s", e, exc_info=True)
             await ws_client.send_json({"type": "error", "message": str(e)})
 
         finally:
             # Cerrar sesión del avatar
             if avatar_session:
-                Logger.avatar("Cerrando sesión del avatar...")
+                log.info("Cerrando sesión del avatar...")
                 await self.heygen.stop_session(avatar_session)
 
-            Logger.avatar("Cliente desconectado")
+            log.info("Cliente desconectado")
             await ws_client.close()
 
         return ws_client
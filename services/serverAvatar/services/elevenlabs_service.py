@@ -11,7 +11,9 @@ from typing import Callable, Optional
 from aiohttp import ClientSession, WSMsgType
 
 from core.config import Config
-from utils import Logger
+from utils import get_logger
+
+log = get_logger(__name__)
 
 
 class ElevenLabsService:
@@ -42,7 +44,7 @@ class ElevenLabsService:
             async with session.ws_connect(
                 self.ws_url, headers=self.headers
             ) as ws_elevenlabs:
-                Logger.success("Conectado a ElevenLabs ConvAI")
+                log.info("Conectado a ElevenLabs ConvAI")
 
                 # Tareas paralelas: cliente->elevenlabs y elevenlabs->callbacks
                 await asyncio.gather(
@@ -56,14 +58,14 @@ class ElevenLabsService:
                     return_exceptions=True,
                 )
 
-                Logger.info("Relay de ElevenLabs terminado")
+                log.info("Relay de ElevenLabs terminado")
 
     async def _client_to_elevenlabs(self, ws_client, ws_elevenlabs, closed_event):
         """
         Relay: Cliente → ElevenLabs
         Envía audio PCM16 del cliente a ElevenLabs
         """
-        Logger.audio("Esperando audio del cliente...")
+        log.debug("Esperando audio del cliente...")
 
         try:
             while not closed_event.is_set():
@@ -89,9 +91,9 @@ class ElevenLabsService:
                     continue
 
         except Exception as e:
-            Logger.warning(f"Error en client_to_elevenlabs: {e}")
+            log.warning("Error en client_to_elevenlabs: %s", e)
         finally:
-            Logger.info("client_to_elevenlabs terminado")
+            log.info("client_to_elevenlabs terminado")
 
     async def _elevenlabs_to_callbacks(
         self, ws_elevenlabs, on_agent_response, on_user_transcript, closed_event
@@ -100,7 +102,7 @@ class ElevenLabsService:
         Relay: ElevenLabs → Callbacks
         Procesa respuestas de ElevenLabs y ejecuta callbacks
         """
-        Logger.event("Escuchando respuestas de ElevenLabs...")
+        log.debug("Escuchando respuestas de ElevenLabs...")
         msg_count = 0
 
         try:
@@ -118,7 +120,7 @@ class ElevenLabsService:
                             agent_response = self._extract_agent_response(data)
 
                             if agent_response:
-                                Logger.ai(f"ElevenLabs dice: {agent_response[:100]}...")
+                                log.debug("ElevenLabs dice: %.100s", agent_response)
                                 await on_agent_response(agent_response)
 
                         # Transcripción del usuario
@@ -127,7 +129,7 @@ class ElevenLabsService:
                                 "user_transcript", ""
                             )
                             if transcript:
-                                Logger.info(f"👤 Usuario dijo: {transcript}")
+                                log.debug("Usuario dijo: %s", transcript)
                                 await on_user_transcript(transcript)
 
                         # Audio generado (no lo usamos, el avatar genera su audio)
@@ -136,10 +138,10 @@ class ElevenLabsService:
 
                         # Otros eventos
                         elif event_type != "ping_event":
-                            Logger.event(f"ElevenLabs: {event_type}")
+                            log.debug("ElevenLabs: %s", event_type)
 
                     elif msg.type in (WSMsgType.CLOSE, WSMsgType.CLOSED):
-                        Logger.warning("ElevenLabs cerró conexión")
+                        log.warning("ElevenLabs cerró conexión")
                         closed_event.set()
                         break
 
@@ -147,12 +149,9 @@ class ElevenLabsService:
                     continue
 
         except Exception as e:
-            Logger.warning(f"Error en elevenlabs_to_callbacks: {e}")
-            import traceback
-
-            traceback.print_exc()
+            log.warning("Error en elevenlabs_to_callbacks: %s", e, exc_info=True)
         finally:
-            Logger.info(f"elevenlabs_to_callbacks terminado ({msg_count} mensajes)")
+            log.info("elevenlabs_to_callbacks terminado (%d mensajes)", msg_count)
 
     @staticmethod
     def _extract_agent_response(data: dict) -> Optional[str]:
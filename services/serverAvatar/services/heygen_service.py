@@ -9,7 +9,9 @@ from typing import Dict, Any, Optional
 from aiohttp import ClientSession
 
 from core.config import Config
-from utils import Logger
+from utils import get_logger
+
+log = get_logger(__name__)
 
 
 class HeyGenService:
@@ -49,8 +51,7 @@ class HeyGenService:
                 if data.get("code") != 100:
                     raise Exception(f"HeyGen API error: {data}")
 
-                Logger.debug("Respuesta completa de HeyGen:")
-                print(json.dumps(data, indent=2))
+                log.debug("Respuesta completa de HeyGen: %s", data)
 
                 session_id = data["data"]["session_id"]
                 sdp = data["data"].get("sdp")
@@ -58,11 +59,13 @@ class HeyGenService:
                 url = data["data"].get("url")  # LiveKit URL
                 access_token = data["data"].get("access_token")  # LiveKit token
 
-                Logger.success("Streaming Avatar creado")
-                Logger.info(f"   Session ID: {session_id}")
-                Logger.info(f"   SDP: {'✓' if sdp else '✗'}")
-                Logger.info(f"   LiveKit URL: {'✓' if url else '✗'}")
-                Logger.info(f"   Access Token: {'✓' if access_token else '✗'}")
+                log.info(
+                    "Streaming Avatar creado: %s (sdp=%s, livekit_url=%s, access_token=%s)",
+                    session_id,
+                    bool(sdp),
+                    bool(url),
+                    bool(access_token),
+                )
 
                 return {
                     "session_id": session_id,
@@ -91,11 +94,11 @@ class HeyGenService:
             ) as resp:
                 if resp.status != 200:
                     text = await resp.text()
-                    Logger.warning(f"Error iniciando sesión: {text}")
+                    log.warning("Error iniciando sesión: %s", text)
                     return False
 
                 data = await resp.json()
-                Logger.success(f"Sesión iniciada: {data}")
+                log.info("Sesión iniciada: %s", data)
                 return True
 
     async def stop_session(self, session_id: str) -> bool:
@@ -116,11 +119,11 @@ class HeyGenService:
             ) as resp:
                 if resp.status != 200:
                     text = await resp.text()
-                    Logger.warning(f"Error cerrando sesión: {text}")
+                    log.warning("Error cerrando sesión: %s", text)
                     return False
 
                 data = await resp.json()
-                Logger.success(f"Sesión cerrada: {data}")
+                log.info("Sesión cerrada: %s", data)
                 return True
 
     async def send_task(
@@ -144,10 +147,7 @@ class HeyGenService:
             "task_mode": "sync",
         }
 
-        Logger.debug("Enviando al avatar:")
-        Logger.info(f"   Texto: '{text[:80]}...'")
-        Logger.info(f"   Task type: {task_type}")
-        Logger.debug(f"   Payload completo: {payload}")
+        log.debug("Enviando al avatar (%s): %.80r", task_type, text)
 
         async with ClientSession() as session:
             async with session.post(
@@ -156,14 +156,16 @@ class HeyGenService:
                 response_text = await resp.text()
 
                 if resp.status != 200:
-                    Logger.error(f"Error {resp.status} al enviar comando")
-                    Logger.error(f"   Respuesta: {response_text}")
+                    log.error(
+                        "Error %s al enviar comando: %s", resp.status, response_text
+                    )
                     return None
 
                 data = json.loads(response_text)
-                Logger.success("Avatar aceptó el comando")
-                Logger.info(
-                    f"   Duration: {data.get('data', {}).get('duration_ms', 'N/A')} ms"
+                task_data = data.get("data") or {}
+                log.debug(
+                    "Avatar aceptó el comando (task_id=%s, duration=%s ms)",
+                    task_data.get("task_id", "N/A"),
+                    task_data.get("duration_ms", "N/A"),
                 )
-                Logger.info(f"   Task ID: {data.get('data', {}).get('task_id', 'N/A')}")
                 return data
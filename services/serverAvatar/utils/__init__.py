@@ -2,58 +2,76 @@
 Logger Utility
 ==============
 Sistema de logging centralizado para el servidor.
+
+Los módulos usan `get_logger(__name__)` (ver `utils.log`). `Logger` se
+mantiene como fachada con emojis sobre el mismo logging estructurado.
 """
 
+import logging
+
+from utils.log import configure, get_logger
+
+_log = get_logger("avatar")
+
+
+def _emit(level: int, prefix: str, message: str, args: tuple):
+    # Sin concatenar ni formatear si el nivel está suprimido
+    if _log.isEnabledFor(level):
+        _log.log(level, prefix + message, *args, stacklevel=3)
+
 
 class Logger:
-    """Logger simple con emojis para mejor visualización"""
+    """Fachada con emojis sobre el logger estructurado (nivel y filtros por módulo)"""
 
     @staticmethod
-    def info(message: str):
+    def info(message: str, *args):
         """Log de información"""
-        print(f"ℹ️  {message}")
+        _emit(logging.INFO, "ℹ️  ", message, args)
 
     @staticmethod
-    def success(message: str):
+    def success(message: str, *args):
         """Log de éxito"""
-        print(f"✅ {message}")
+        _emit(logging.INFO, "✅ ", message, args)
 
     @staticmethod
-    def warning(message: str):
+    def warning(message: str, *args):
         """Log de advertencia"""
-        print(f"⚠️  {message}")
+        _emit(logging.WARNING, "⚠️  ", message, args)
 
     @staticmethod
-    def error(message: str):
+    def error(message: str, *args):
         """Log de error"""
-        print(f"❌ {message}")
+        _emit(logging.ERROR, "❌ ", message, args)
 
     @staticmethod
-    def debug(message: str):
+    def debug(message: str, *args):
         """Log de debug"""
-        print(f"🔍 {message}")
+        _emit(logging.DEBUG, "🔍 ", message, args)
 
     @staticmethod
-    def event(message: str):
+    def event(message: str, *args):
         """Log de evento"""
-        print(f"📨 {message}")
+        _emit(logging.DEBUG, "📨 ", message, args)
 
     @staticmethod
-    def avatar(message: str):
+    def avatar(message: str, *args):
         """Log relacionado con avatar"""
-        print(f"🎭 {message}")
+        _emit(logging.INFO, "🎭 ", message, args)
 
     @staticmethod
-    def audio(message: str):
+    def audio(message: str, *args):
         """Log relacionado con audio"""
-        print(f"🎤 {message}")
+        _emit(logging.DEBUG, "🎤 ", message, args)
 
     @staticmethod
-    def video(message: str):
+    def video(message: str, *args):
         """Log relacionado con video"""
-        print(f"📹 {message}")
+        _emit(logging.INFO, "📹 ", message, args)
 
     @staticmethod
-    def ai(message: str):
+    def ai(message: str, *args):
         """Log relacionado con IA"""
-        print(f"🤖 {message}")
+        _emit(logging.DEBUG, "🤖 ", message, args)
+
+
+__all__ = ["Logger", "configure", "get_logger"]